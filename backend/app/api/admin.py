@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
+
+from ..services.health import health_monitor
 
 router = APIRouter()
 security = HTTPBearer()
@@ -19,7 +21,14 @@ class SystemHealth(BaseModel):
     database: str
     redis: str
     kucoin_api: str
+    websocket: str
     uptime: str
+    uptime_seconds: float
+    event_loop_lag_ms: Optional[float]
+    event_loop_lag_max_ms: Optional[float]
+    memory_rss_bytes: Optional[int]
+    memory_peak_rss_bytes: Optional[int]
+    checks: Dict[str, Dict[str, Any]]
 
 @router.get("/users", response_model=List[User])
 async def get_users(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -45,13 +54,25 @@ async def toggle_user_status(user_id: int, credentials: HTTPAuthorizationCredent
 @router.get("/system-health", response_model=SystemHealth)
 async def get_system_health(credentials: HTTPAuthorizationCredentials = Depends(security)):
     # TODO: Implement admin role check
-    # TODO: Implement actual system health checks
+    report = await health_monitor.check()
+    checks = report["checks"]
+
+    def status(name: str) -> str:
+        return checks.get(name, {}).get("status", "unknown")
+
     return SystemHealth(
-        status="healthy",
-        database="connected",
-        redis="connected",
-        kucoin_api="connected",
-        uptime="2h 15m"
+        status=report["status"],
+        database=status("database"),
+        redis=status("redis"),
+        kucoin_api=status("exchange"),
+        websocket=status("websocket"),
+        uptime=report["uptime"],
+        uptime_seconds=report["uptime_seconds"],
+        event_loop_lag_ms=report["event_loop_lag"]["last_ms"],
+        event_loop_lag_max_ms=report["event_loop_lag"]["max_ms"],
+        memory_rss_bytes=report["memory"]["rss_bytes"],
+        memory_peak_rss_bytes=report["memory"]["peak_rss_bytes"],
+        checks=checks,
     )
 
 @router.get("/orders")
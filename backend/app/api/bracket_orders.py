@@ -1,14 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Optional
 
 from ..models.bracket_order import (
+    BracketOrderBatchAmend,
+    BracketOrderBatchCancel,
+    BracketOrderBatchCreate,
+    BracketOrderBatchResponse,
+    BracketOrderCancelAll,
     BracketOrderCreate,
     BracketOrderResponse,
     BracketOrderUpdate,
-    BracketOrderValidationError
+    BracketOrderValidationError,
+    FillEvent,
+    OrderStatus
 )
+from ..exchange.base import ExchangeError
 from ..services.bracket_order_service import bracket_order_service
+from ..services.amend_coalescer import amend_coalescer
+from ..services.market_data import MarketDataUnavailable
+from .errors import exchange_http_exception
 
 router = APIRouter()
 security = HTTPBearer()
@@ -20,28 +31,118 @@ async def create_bracket_order(
 ):
     """Create a new bracket order"""
     try:
-        bracket_order = bracket_order_service.create_bracket_order(order)
+        bracket_order = await bracket_order_service.create_bracket_order(order)
         return bracket_order
     except BracketOrderValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create bracket order: {str(e)}"
         )
 
+@router.post("/batch", response_model=BracketOrderBatchResponse)
+async def create_bracket_orders(
+    batch: BracketOrderBatchCreate,
+    # credentials: HTTPAuthorizationCredentials = Depends(security)  # Temporarily disabled for testing
+):
+    """Create up to 100 bracket orders; results are reported per item"""
+    try:
+        return await bracket_order_service.create_bracket_orders(batch.orders, atomic=batch.atomic)
+    except BracketOrderValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create bracket orders: {str(e)}"
+        )
+
+@router.post("/batch/cancel", response_model=BracketOrderBatchResponse)
+async def cancel_bracket_orders(
+    batch: BracketOrderBatchCancel,
+    # credentials: HTTPAuthorizationCredentials = Depends(security)  # Temporarily disabled for testing
+):
+    """Cancel up to 100 bracket orders; results are reported per item"""
+    try:
+        return await bracket_order_service.cancel_bracket_orders(batch.order_ids, atomic=batch.atomic)
+    except BracketOrderValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to cancel bracket orders: {str(e)}"
+        )
+
+@router.post("/batch/amend", response_model=BracketOrderBatchResponse)
+async def amend_bracket_orders(
+    batch: BracketOrderBatchAmend,
+    # credentials: HTTPAuthorizationCredentials = Depends(security)  # Temporarily disabled for testing
+):
+    """Amend prices of up to 100 pending bracket orders; results are reported per item"""
+    try:
+        return await bracket_order_service.amend_bracket_orders(batch.amendments, atomic=batch.atomic)
+    except BracketOrderValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to amend bracket orders: {str(e)}"
+        )
+
+@router.post("/cancel-all", response_model=BracketOrderBatchResponse)
+async def cancel_all_bracket_orders(
+    request: BracketOrderCancelAll,
+    # credentials: HTTPAuthorizationCredentials = Depends(security)  # Temporarily disabled for testing
+):
+    """Cancel every open bracket order on a symbol, optionally for one side only"""
+    try:
+        return await bracket_order_service.cancel_all_bracket_orders(request.symbol, side=request.side)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to cancel bracket orders: {str(e)}"
+        )
+
 @router.get("/", response_model=List[BracketOrderResponse])
 async def get_bracket_orders(
+    response: Response,
     symbol: Optional[str] = None,
+    status_filter: Optional[List[OrderStatus]] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
     # credentials: HTTPAuthorizationCredentials = Depends(security)  # Temporarily disabled for testing
 ):
-    """Get all bracket orders, optionally filtered by symbol"""
+    """Get bracket orders newest first, optionally filtered by symbol and status.
+
+    When more results exist, the cursor for the next page is returned in the
+    X-Next-Cursor header.
+    """
     try:
-        orders = bracket_order_service.get_bracket_orders(symbol=symbol)
+        orders, next_cursor = await bracket_order_service.query_bracket_orders(
+            symbol=symbol, statuses=status_filter, limit=limit, cursor=cursor
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return orders
+    except BracketOrderValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -54,7 +155,7 @@ async def get_bracket_order(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Get a specific bracket order by ID"""
-    order = bracket_order_service.get_bracket_order(order_id)
+    order = await bracket_order_service.get_bracket_order(order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,26 +163,49 @@ async def get_bracket_order(
         )
     return order
 
+@router.get("/{order_id}/fills", response_model=List[FillEvent])
+async def get_bracket_order_fills(
+    order_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Fill history of a bracket order, oldest first"""
+    order = await bracket_order_service.get_bracket_order(order_id)
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bracket order not found"
+        )
+    return await bracket_order_service.get_fills(order_id)
+
 @router.put("/{order_id}", response_model=BracketOrderResponse)
 async def update_bracket_order(
     order_id: str,
     updates: BracketOrderUpdate,
     # credentials: HTTPAuthorizationCredentials = Depends(security)  # Temporarily disabled for testing
 ):
-    """Update a bracket order (only for pending orders)"""
+    """Update a bracket order (only for pending orders).
+
+    Rapid edits of the same order (a chart drag) are coalesced: each one is
+    validated and acknowledged right away, and only the latest intent is
+    committed once the edits pause (see AMEND_COALESCE_MS).
+    """
     try:
-        updated_order = bracket_order_service.update_bracket_order(order_id, updates)
+        updated_order = await amend_coalescer.submit(order_id, updates)
         if not updated_order:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Bracket order not found or cannot be updated"
             )
         return updated_order
+    except HTTPException:
+        raise
     except BracketOrderValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -94,7 +218,10 @@ async def cancel_bracket_order(
     # credentials: HTTPAuthorizationCredentials = Depends(security)  # Temporarily disabled for testing
 ):
     """Cancel a bracket order"""
-    success = bracket_order_service.cancel_bracket_order(order_id)
+    try:
+        success = await bracket_order_service.cancel_bracket_order(order_id)
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -107,12 +234,20 @@ async def get_market_price(
     symbol: str,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    """Get current market price for a symbol"""
+    """Get current market price for a symbol from the market data cache"""
     try:
-        price = bracket_order_service.get_current_market_price(symbol)
-        return {"symbol": symbol, "price": str(price)}
-    except Exception as e:
+        quote = await bracket_order_service.get_current_market_price(symbol)
+    except MarketDataUnavailable as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get market price: {str(e)}"
-        )
\ No newline at end of file
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    return {
+        "symbol": symbol,
+        "price": str(quote.last),
+        "bid": str(quote.bid),
+        "ask": str(quote.ask),
+        "timestamp": quote.timestamp,
+        "source": quote.source,
+        "age_ms": round(quote.age_ms()),
+    }
@@ -0,0 +1,9 @@
+from fastapi import HTTPException, status
+
+from ..exchange.base import ExchangeError, ExchangeRateLimitError
+
+def exchange_http_exception(error: ExchangeError) -> HTTPException:
+    """Map an exchange failure to 429 (rate limited) or 502 (rejected / unreachable)"""
+    if isinstance(error, ExchangeRateLimitError):
+        return HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(error))
+    return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Exchange error: {error}")
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from ..models.bracket_order import BracketOrderValidationError
+from ..models.risk import PositionSize, PositionSizeBatchRequest, PositionSizeBatchResponse, PositionSizeRequest
+from ..exchange.base import ExchangeError
+from ..services.market_data import MarketDataUnavailable
+from ..services.risk import risk_calculator
+from .errors import exchange_http_exception
+
+router = APIRouter()
+
+@router.post("/position-size", response_model=PositionSize)
+async def size_position(request: PositionSizeRequest):
+    """Size a bracket so that hitting its stop loses the chosen share of the account"""
+    try:
+        return await risk_calculator.size(
+            request.bracket, request.account_balance, request.risk_level, request.risk_percent
+        )
+    except BracketOrderValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except MarketDataUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
+
+@router.post("/position-size/batch", response_model=PositionSizeBatchResponse)
+async def size_positions(request: PositionSizeBatchRequest):
+    """Size up to 10,000 brackets against one account; results are reported per item"""
+    try:
+        result = await risk_calculator.size_batch(
+            request.brackets, request.account_balance, request.risk_level, request.risk_percent
+        )
+    except BracketOrderValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
+    # Already JSON-ready; skips re-validating every item against the response model
+    return JSONResponse(result)
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from decimal import Decimal
+from datetime import datetime, timezone
+import asyncio
+import uuid
+
+from ..exchange.base import ExchangeError, ExchangeGateway
+from ..exchange.factory import exchange_gateway
+from ..models.bracket_order import OrderSide
+from ..models.exchange import ExchangeOrderRequest, ExchangeOrderType
+from ..services.candles import TIMEFRAMES, candle_aggregator
+from ..services.order_book_service import order_book_service
+from ..services.symbols import symbol_registry
+from .errors import exchange_http_exception
 
 router = APIRouter()
 security = HTTPBearer()
 
 class OrderRequest(BaseModel):
     symbol: str
-    side: str  # "buy" or "sell"
-    type: str  # "market" or "limit"
+    side: OrderSide
+    type: ExchangeOrderType
     quantity: Decimal
     price: Optional[Decimal] = None
 
@@ -33,66 +45,201 @@ class Portfolio(BaseModel):
     balances: List[Balance]
     total_value_usd: Decimal
 
-@router.get("/portfolio", response_model=Portfolio)
-async def get_portfolio(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    # TODO: Implement actual KuCoin portfolio retrieval
-    return Portfolio(
-        balances=[
-            Balance(currency="BTC", available=Decimal("0.5"), frozen=Decimal("0.0")),
-            Balance(currency="USDT", available=Decimal("1000.0"), frozen=Decimal("0.0")),
-        ],
-        total_value_usd=Decimal("25000.0")
+def get_gateway() -> ExchangeGateway:
+    if exchange_gateway is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Exchange gateway not configured"
+        )
+    return exchange_gateway
+
+def _balances(accounts: List[dict]) -> Dict[str, Balance]:
+    """Trade account balances summed per currency"""
+    balances: Dict[str, Balance] = {}
+    for account in accounts:
+        balance = balances.setdefault(
+            account["currency"],
+            Balance(currency=account["currency"], available=Decimal("0"), frozen=Decimal("0")),
+        )
+        balance.available += Decimal(account["available"])
+        balance.frozen += Decimal(account["holds"])
+    return balances
+
+def _to_order(item: dict) -> Order:
+    return Order(
+        id=item["id"],
+        symbol=item["symbol"],
+        side=item["side"],
+        type=item["type"],
+        quantity=Decimal(item["size"]),
+        price=Decimal(item["price"]) if item.get("price") else None,
+        status="active" if item.get("isActive") else ("cancelled" if item.get("cancelExist") else "done"),
+        created_at=datetime.fromtimestamp(item["createdAt"] / 1000, tz=timezone.utc).isoformat(),
     )
 
+@router.get("/portfolio", response_model=Portfolio)
+async def get_portfolio(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    gateway: ExchangeGateway = Depends(get_gateway),
+):
+    try:
+        balances = list(_balances(await gateway.get_accounts()).values())
+        
+        # Value non-USDT holdings at the last trade price, fetched concurrently
+        priced = [b for b in balances if b.currency != "USDT"]
+        tickers = await asyncio.gather(
+            *(gateway.get_ticker(f"{b.currency}-USDT") for b in priced), return_exceptions=True
+        )
+        total = sum((b.available + b.frozen for b in balances if b.currency == "USDT"), Decimal("0"))
+        for balance, ticker in zip(priced, tickers):
+            if not isinstance(ticker, BaseException):
+                total += (balance.available + balance.frozen) * Decimal(ticker["price"])
+        return Portfolio(balances=balances, total_value_usd=total)
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
+
 @router.get("/balance")
-async def get_balance(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    # TODO: Implement actual KuCoin balance retrieval
+async def get_balance(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    gateway: ExchangeGateway = Depends(get_gateway),
+):
+    try:
+        balances = _balances(await gateway.get_accounts())
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
     return {
-        "BTC": {"available": "0.5", "frozen": "0.0"},
-        "USDT": {"available": "1000.0", "frozen": "0.0"},
-        "ETH": {"available": "2.0", "frozen": "0.0"}
+        currency: {"available": str(b.available), "frozen": str(b.frozen)}
+        for currency, b in balances.items()
     }
 
 @router.post("/orders", response_model=Order)
-async def place_order(order: OrderRequest, credentials: HTTPAuthorizationCredentials = Depends(security)):
-    # TODO: Implement actual KuCoin order placement
+async def place_order(
+    order: OrderRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    gateway: ExchangeGateway = Depends(get_gateway),
+):
+    if order.type == ExchangeOrderType.LIMIT and not order.price:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Price is required for limit orders"
+        )
+    try:
+        order_id = await gateway.place_order(ExchangeOrderRequest(
+            client_oid=uuid.uuid4().hex,
+            symbol=order.symbol,
+            side=order.side,
+            type=order.type,
+            size=order.quantity,
+            price=order.price if order.type == ExchangeOrderType.LIMIT else None,
+        ))
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
     return Order(
-        id="demo_order_123",
+        id=order_id,
         symbol=order.symbol,
-        side=order.side,
-        type=order.type,
+        side=order.side.value,
+        type=order.type.value,
         quantity=order.quantity,
         price=order.price,
         status="active",
-        created_at="2025-07-24T10:00:00Z"
+        created_at=datetime.now(timezone.utc).isoformat(),
     )
 
 @router.get("/orders", response_model=List[Order])
-async def get_orders(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    # TODO: Implement actual KuCoin order retrieval
-    return [
-        Order(
-            id="demo_order_123",
-            symbol="BTC-USDT",
-            side="buy",
-            type="limit",
-            quantity=Decimal("0.1"),
-            price=Decimal("50000.0"),
-            status="active",
-            created_at="2025-07-24T10:00:00Z"
-        )
-    ]
+async def get_orders(
+    symbol: Optional[str] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    gateway: ExchangeGateway = Depends(get_gateway),
+):
+    try:
+        return [_to_order(item) for item in await gateway.list_orders(symbol=symbol)]
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
 
 @router.delete("/orders/{order_id}")
-async def cancel_order(order_id: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
-    # TODO: Implement actual KuCoin order cancellation
+async def cancel_order(
+    order_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    gateway: ExchangeGateway = Depends(get_gateway),
+):
+    try:
+        await gateway.cancel_order(order_id)
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
     return {"message": f"Order {order_id} cancelled successfully"}
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as If-None-Match requires
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
 @router.get("/symbols")
-async def get_trading_symbols():
-    # TODO: Implement actual KuCoin symbols retrieval
-    return [
-        {"symbol": "BTC-USDT", "base": "BTC", "quote": "USDT"},
-        {"symbol": "ETH-USDT", "base": "ETH", "quote": "USDT"},
-        {"symbol": "ETH-BTC", "base": "ETH", "quote": "BTC"}
-    ]
\ No newline at end of file
+async def get_trading_symbols(if_none_match: Optional[str] = Header(None)):
+    """Symbols open for trading with their tick size, lot size and minimum order value.
+
+    Served from the symbol registry with an ETag; a request whose
+    If-None-Match still matches gets an empty 304. 503 until the list
+    has been loaded.
+    """
+    try:
+        await symbol_registry.ensure_loaded()
+    except ExchangeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Symbol list unavailable: {e}"
+        )
+    if not symbol_registry.loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Symbol list unavailable: exchange gateway not configured"
+        )
+    etag, body = symbol_registry.listing()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+@router.get("/orderbook/{symbol}")
+async def get_order_book(
+    symbol: str,
+    depth: int = Query(20, ge=1, le=100),
+    gateway: ExchangeGateway = Depends(get_gateway),
+):
+    """Top-of-book depth; served from the live book when the symbol is streamed"""
+    book = order_book_service.get_book(symbol)
+    if book is not None:
+        return {**book.snapshot(depth), "source": "stream"}
+    try:
+        snapshot = await gateway.get_order_book(symbol)
+    except ExchangeError as e:
+        raise exchange_http_exception(e)
+    return {
+        "symbol": symbol,
+        "sequence": int(snapshot["sequence"]),
+        "timestamp": snapshot.get("time", 0),
+        "bids": snapshot["bids"][:depth],
+        "asks": snapshot["asks"][:depth],
+        "source": "rest",
+    }
+
+@router.get("/candles/{symbol}")
+async def get_candles(
+    symbol: str,
+    timeframe: str = Query("1m"),
+    limit: int = Query(500, ge=1, le=1000),
+    end: Optional[int] = Query(None, description="Only bars opening before this time (seconds)"),
+):
+    """OHLCV bars oldest first, the last one still open; live updates stream over WebSocket"""
+    if timeframe not in TIMEFRAMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"timeframe must be one of {', '.join(TIMEFRAMES)}"
+        )
+    candles = await candle_aggregator.history(symbol, timeframe, limit=limit, end=end)
+    return {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "candles": [candle.to_dict() for candle in candles],
+    }
@@ -0,0 +1 @@
+# Exchange package
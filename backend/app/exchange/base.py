@@ -0,0 +1,180 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import uuid
+
+from ..models.bracket_order import BracketOrderResponse, EntryType, OrderSide
+from ..models.exchange import BracketLegs, ExchangeOrderRequest, ExchangeOrderType, StopDirection
+
+class ExchangeError(Exception):
+    """Request rejected by the exchange or failed in transit"""
+
+    def __init__(self, message: str, code: Optional[str] = None, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+class ExchangeRateLimitError(ExchangeError):
+    """The exchange answered 429 despite client-side throttling"""
+
+# Called with (method, endpoint template, seconds, error) after every REST
+# request; error is None, "transport", "rate_limited" or "rejected"
+RequestListener = Callable[[str, str, float, Optional[str]], None]
+
+class ExchangeGateway(ABC):
+    """Async order entry and account access for one exchange account"""
+
+    def __init__(self):
+        self._request_listeners: List[RequestListener] = []
+
+    def add_request_listener(self, listener: RequestListener) -> None:
+        """Register a callback for request timings and failures (e.g. metrics)"""
+        self._request_listeners.append(listener)
+
+    def _notify_request(self, method: str, template: str, seconds: float, error: Optional[str]) -> None:
+        for listener in self._request_listeners:
+            listener(method, template, seconds, error)
+
+    async def start(self) -> None:
+        """Open connections"""
+
+    async def close(self) -> None:
+        """Release connections"""
+
+    async def ping(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def place_order(self, order: ExchangeOrderRequest) -> str:
+        """Submit an order; returns the exchange order id"""
+
+    @abstractmethod
+    async def cancel_order(self, order_id: str, stop: bool = False) -> None:
+        """Cancel a regular order, or a stop order when ``stop`` is set"""
+
+    @abstractmethod
+    async def list_orders(self, symbol: Optional[str] = None, status: str = "active") -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def get_accounts(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def get_symbols(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        """Best bid/ask and last trade for a symbol"""
+
+    @abstractmethod
+    async def get_order_book(self, symbol: str) -> Dict[str, Any]:
+        """L2 snapshot: {"sequence", "time", "bids": [[price, size]], "asks": [...]}"""
+
+    @abstractmethod
+    async def get_candles(self, symbol: str, interval: str, start: int, end: int) -> List[List[str]]:
+        """Klines between ``start`` and ``end`` (seconds) for a KuCoin interval ("1min", "1hour", ...).
+
+        Rows are [time, open, close, high, low, volume, turnover], newest first.
+        """
+
+    # Bracket orders
+
+    @staticmethod
+    def bracket_leg_requests(order: BracketOrderResponse, exits: bool = True) -> List[ExchangeOrderRequest]:
+        """Entry, stop loss and take profit orders for a bracket, in that order.
+
+        With ``exits=False`` only the entry is returned (exits are triggered
+        server-side).
+        """
+        exit_side = OrderSide.SELL if order.side == OrderSide.BUY else OrderSide.BUY
+        legs = [ExchangeOrderRequest(
+            client_oid=uuid.uuid4().hex,
+            symbol=order.symbol,
+            side=order.side,
+            type=ExchangeOrderType(order.entry_type.value),
+            size=order.quantity,
+            price=order.entry_price if order.entry_type == EntryType.LIMIT else None,
+        )]
+        if not exits:
+            return legs
+        if order.stop_loss_price is not None:
+            legs.append(ExchangeOrderRequest(
+                client_oid=uuid.uuid4().hex,
+                symbol=order.symbol,
+                side=exit_side,
+                type=ExchangeOrderType.MARKET,
+                size=order.quantity,
+                # A long is stopped out on the way down, a short on the way up
+                stop=StopDirection.LOSS if exit_side == OrderSide.SELL else StopDirection.ENTRY,
+                stop_price=order.stop_loss_price,
+            ))
+        for tp in order.take_profit_levels:
+            legs.append(ExchangeOrderRequest(
+                client_oid=uuid.uuid4().hex,
+                symbol=order.symbol,
+                side=exit_side,
+                type=ExchangeOrderType.LIMIT,
+                size=tp.quantity,
+                price=tp.price,
+            ))
+        return legs
+
+    async def submit_bracket(self, order: BracketOrderResponse, exits: bool = True) -> BracketLegs:
+        """Submit all legs of a bracket concurrently.
+
+        If any leg is rejected the legs that were accepted are cancelled
+        before the error is raised, so no half-placed bracket is left behind.
+        """
+        legs = self.bracket_leg_requests(order, exits)
+        results = await asyncio.gather(*(self.place_order(leg) for leg in legs), return_exceptions=True)
+
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if failures:
+            await asyncio.gather(
+                *(
+                    self.cancel_order(order_id, stop=leg.stop is not None)
+                    for leg, order_id in zip(legs, results)
+                    if not isinstance(order_id, BaseException)
+                ),
+                return_exceptions=True,
+            )
+            raise failures[0]
+
+        has_stop = exits and order.stop_loss_price is not None
+        return BracketLegs(
+            entry_order_id=results[0],
+            stop_loss_order_id=results[1] if has_stop else None,
+            take_profit_order_ids=list(results[2 if has_stop else 1:]),
+        )
+
+    async def cancel_bracket(self, order: BracketOrderResponse) -> None:
+        """Cancel every placed leg of a bracket concurrently"""
+        cancels = []
+        if order.entry_order_id:
+            cancels.append(self.cancel_order(order.entry_order_id))
+        if order.stop_loss_order_id:
+            cancels.append(self.cancel_order(order.stop_loss_order_id, stop=True))
+        cancels.extend(self.cancel_order(tp.order_id) for tp in order.take_profit_levels if tp.order_id)
+        results = await asyncio.gather(*cancels, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def replace_bracket(
+        self, old: BracketOrderResponse, new: BracketOrderResponse, exits: bool = True
+    ) -> BracketLegs:
+        """Cancel the legs of ``old`` and submit ``new`` in their place"""
+        await self.cancel_bracket(old)
+        return await self.submit_bracket(new, exits)
+
+    def stats(self) -> dict:
+        return {}
+
+def apply_legs(order: BracketOrderResponse, legs: BracketLegs) -> None:
+    """Record the exchange order ids of submitted legs on a bracket"""
+    order.entry_order_id = legs.entry_order_id
+    order.stop_loss_order_id = legs.stop_loss_order_id
+    for tp, order_id in zip(order.take_profit_levels, legs.take_profit_order_ids):
+        tp.order_id = order_id
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from decouple import config
+
+from .base import ExchangeGateway
+
+def create_exchange_gateway(kind: str = None) -> Optional[ExchangeGateway]:
+    """Build the gateway selected by EXCHANGE_GATEWAY.
+
+    - ``none``: no exchange; bracket orders are only stored
+    - ``mock``: in-process mock exchange (no network), the development default
+    - ``kucoin``: KuCoin REST API (sandbox when KUCOIN_SANDBOX is set, or any
+      KUCOIN_BASE_URL such as a standalone mock server)
+    """
+    kind = (kind or config("EXCHANGE_GATEWAY", default="mock")).lower()
+    if kind == "none":
+        return None
+
+    import httpx
+
+    from .kucoin import KUCOIN_SANDBOX_URL, KUCOIN_URL, KuCoinGateway
+
+    options = dict(
+        max_connections=config("EXCHANGE_MAX_CONNECTIONS", default=20, cast=int),
+        max_keepalive_connections=config("EXCHANGE_MAX_KEEPALIVE", default=10, cast=int),
+        timeout=config("EXCHANGE_TIMEOUT", default=10.0, cast=float),
+    )
+    if kind == "mock":
+        from .mock_server import MOCK_API_KEY, MOCK_API_SECRET, MOCK_PASSPHRASE, create_mock_exchange_app
+
+        return KuCoinGateway(
+            MOCK_API_KEY,
+            MOCK_API_SECRET,
+            MOCK_PASSPHRASE,
+            base_url="http://mock-exchange",
+            transport=httpx.ASGITransport(app=create_mock_exchange_app()),
+            **options,
+        )
+    if kind == "kucoin":
+        default_url = KUCOIN_SANDBOX_URL if config("KUCOIN_SANDBOX", default=False, cast=bool) else KUCOIN_URL
+        return KuCoinGateway(
+            config("KUCOIN_API_KEY"),
+            config("KUCOIN_SECRET_KEY"),
+            config("KUCOIN_PASSPHRASE"),
+            base_url=config("KUCOIN_BASE_URL", default=default_url),
+            **options,
+        )
+    raise ValueError(f"Unknown exchange gateway: {kind}")
+
+# Global instance
+exchange_gateway = create_exchange_gateway()
@@ -0,0 +1,201 @@
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import httpx
+
+from ..models.exchange import ExchangeOrderRequest
+from .base import ExchangeError, ExchangeGateway, ExchangeRateLimitError
+from .rate_limit import EndpointRateLimiter
+
+KUCOIN_URL = "https://api.kucoin.com"
+KUCOIN_SANDBOX_URL = "https://openapi-sandbox.kucoin.com"
+
+SUCCESS_CODE = "200000"
+
+def _b64_hmac(key: hmac.HMAC, message: bytes) -> str:
+    mac = key.copy()
+    mac.update(message)
+    return base64.b64encode(mac.digest()).decode("ascii")
+
+class KuCoinGateway(ExchangeGateway):
+    """KuCoin spot REST gateway.
+
+    One ``httpx.AsyncClient`` is shared by every request, so connections
+    (and their TLS sessions) are kept alive and reused from a bounded pool.
+    Each request is signed exactly once over the bytes that are sent: the
+    keyed HMAC is prepared at construction and only copied per request,
+    which takes microseconds and is done inline on the event loop.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        passphrase: str,
+        base_url: str = KUCOIN_URL,
+        rate_limiter: Optional[EndpointRateLimiter] = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        super().__init__()
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter or EndpointRateLimiter()
+        self._hmac = hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            headers={
+                "KC-API-KEY": api_key,
+                # API key v2: the passphrase is sent signed with the secret
+                "KC-API-PASSPHRASE": _b64_hmac(self._hmac, passphrase.encode("utf-8")),
+                "KC-API-KEY-VERSION": "2",
+                "Content-Type": "application/json",
+            },
+        )
+
+        # Metrics
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.latency_seconds = 0.0
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def ping(self) -> bool:
+        await self._request("GET", "/api/v1/timestamp", signed=False)
+        return True
+
+    def sign(self, timestamp: str, method: str, path: str, body: bytes = b"") -> str:
+        """KC-API-SIGN: base64(HMAC-SHA256(secret, timestamp + method + path + body))"""
+        return _b64_hmac(self._hmac, timestamp.encode("ascii") + method.encode("ascii") + path.encode("utf-8") + body)
+
+    async def _request(
+        self,
+        method: str,
+        template: str,
+        path: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        signed: bool = True,
+    ) -> Any:
+        path = path or template
+        if params:
+            query = urlencode({k: v for k, v in params.items() if v is not None})
+            if query:
+                path = f"{path}?{query}"
+        content = json.dumps(body, separators=(",", ":"), default=str).encode("utf-8") if body is not None else b""
+
+        await self.rate_limiter.acquire(method, template)
+
+        headers = None
+        if signed:
+            timestamp = str(int(time.time() * 1000))
+            headers = {"KC-API-TIMESTAMP": timestamp, "KC-API-SIGN": self.sign(timestamp, method, path, content)}
+
+        self.requests += 1
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(method, path, content=content or None, headers=headers)
+        except httpx.HTTPError as e:
+            self.errors += 1
+            elapsed = time.perf_counter() - started
+            self.latency_seconds += elapsed
+            self._notify_request(method, template, elapsed, "transport")
+            raise ExchangeError(f"{method} {template} failed: {e}") from e
+        elapsed = time.perf_counter() - started
+        self.latency_seconds += elapsed
+
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        code = str(payload.get("code", ""))
+        if response.status_code == 429:
+            self.errors += 1
+            self.rate_limited += 1
+            self._notify_request(method, template, elapsed, "rate_limited")
+            raise ExchangeRateLimitError(payload.get("msg", "Rate limit exceeded"), code, 429)
+        if response.status_code >= 400 or code != SUCCESS_CODE:
+            self.errors += 1
+            self._notify_request(method, template, elapsed, "rejected")
+            raise ExchangeError(payload.get("msg") or f"HTTP {response.status_code}", code, response.status_code)
+        self._notify_request(method, template, elapsed, None)
+        return payload.get("data")
+
+    @staticmethod
+    def _order_body(order: ExchangeOrderRequest) -> Dict[str, Any]:
+        body = {
+            "clientOid": order.client_oid,
+            "symbol": order.symbol,
+            "side": order.side.value,
+            "type": order.type.value,
+            "size": str(order.size),
+        }
+        if order.price is not None:
+            body["price"] = str(order.price)
+        if order.stop is not None:
+            body["stop"] = order.stop.value
+            body["stopPrice"] = str(order.stop_price)
+        return body
+
+    async def place_order(self, order: ExchangeOrderRequest) -> str:
+        template = "/api/v1/stop-order" if order.stop is not None else "/api/v1/orders"
+        data = await self._request("POST", template, body=self._order_body(order))
+        return data["orderId"]
+
+    async def cancel_order(self, order_id: str, stop: bool = False) -> None:
+        template = "/api/v1/stop-order/{id}" if stop else "/api/v1/orders/{id}"
+        await self._request("DELETE", template, path=template.replace("{id}", order_id))
+
+    async def list_orders(self, symbol: Optional[str] = None, status: str = "active") -> List[Dict[str, Any]]:
+        data = await self._request("GET", "/api/v1/orders", params={"status": status, "symbol": symbol})
+        return data.get("items", [])
+
+    async def get_accounts(self) -> List[Dict[str, Any]]:
+        return await self._request("GET", "/api/v1/accounts", params={"type": "trade"})
+
+    async def get_symbols(self) -> List[Dict[str, Any]]:
+        return await self._request("GET", "/api/v2/symbols", signed=False)
+
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        return await self._request(
+            "GET", "/api/v1/market/orderbook/level1", params={"symbol": symbol}, signed=False
+        )
+
+    async def get_order_book(self, symbol: str) -> Dict[str, Any]:
+        return await self._request(
+            "GET", "/api/v1/market/orderbook/level2_100", params={"symbol": symbol}, signed=False
+        )
+
+    async def get_candles(self, symbol: str, interval: str, start: int, end: int) -> List[List[str]]:
+        return await self._request(
+            "GET",
+            "/api/v1/market/candles",
+            params={"symbol": symbol, "type": interval, "startAt": start, "endAt": end},
+            signed=False,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "avg_latency_ms": round(self.latency_seconds / self.requests * 1000, 3) if self.requests else 0.0,
+            "rate_limits": self.rate_limiter.stats(),
+        }
@@ -0,0 +1,338 @@
+"""Local stand-in for the KuCoin spot REST API.
+
+Verifies request signatures, enforces the same weighted resource pools as
+the real exchange (fixed 30s windows) and keeps orders in memory, so the
+gateway can be exercised and load-tested without network access.
+
+    python -m app.exchange.mock_server [--port 8100] [--latency-ms 0]
+"""
+from typing import Any, Dict, Optional
+from decimal import Decimal
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from .rate_limit import KUCOIN_ENDPOINT_WEIGHTS, KUCOIN_POOLS
+
+MOCK_API_KEY = "mock-key"
+MOCK_API_SECRET = "mock-secret"
+MOCK_PASSPHRASE = "mock-passphrase"
+
+# Signed requests older than this are rejected, as on the real exchange
+TIMESTAMP_TOLERANCE_MS = 5000
+
+MOCK_PRICES = {
+    "BTC-USDT": Decimal("45000"),
+    "ETH-USDT": Decimal("3000"),
+    "BNB-USDT": Decimal("300"),
+    "ADA-USDT": Decimal("0.5"),
+    "SOL-USDT": Decimal("100"),
+    "DOT-USDT": Decimal("7"),
+    "MATIC-USDT": Decimal("0.8"),
+    "LINK-USDT": Decimal("15"),
+    "ETH-BTC": Decimal("0.0667"),
+}
+
+# KuCoin kline types and their length in seconds
+MOCK_CANDLE_INTERVALS = {
+    "1min": 60, "3min": 180, "5min": 300, "15min": 900, "30min": 1800,
+    "1hour": 3600, "2hour": 7200, "4hour": 14400, "6hour": 21600, "8hour": 28800, "12hour": 43200,
+    "1day": 86400, "1week": 604800,
+}
+MAX_CANDLES_PER_REQUEST = 1500
+
+def _mock_candle(symbol: str, interval: str, start: int) -> list:
+    """Deterministic bar for one bucket, so repeated requests agree"""
+    rng = random.Random(f"{symbol}:{interval}:{start}")
+    price = MOCK_PRICES[symbol]
+    open_ = price * (1 + Decimal(str(round(rng.uniform(-0.01, 0.01), 6))))
+    close = open_ * (1 + Decimal(str(round(rng.uniform(-0.002, 0.002), 6))))
+    high = max(open_, close) * (1 + Decimal(str(round(rng.uniform(0, 0.001), 6))))
+    low = min(open_, close) * (1 - Decimal(str(round(rng.uniform(0, 0.001), 6))))
+    volume = Decimal(str(round(rng.uniform(1, 100), 4)))
+    row = [open_, close, high, low]
+    return [str(start)] + [str(value.quantize(Decimal("0.0001"))) for value in row] + [str(volume), str((volume * close).quantize(Decimal("0.01")))]
+
+MOCK_BALANCES = {
+    "BTC": Decimal("0.5"),
+    "USDT": Decimal("1000"),
+    "ETH": Decimal("2"),
+}
+
+class MockExchangeError(Exception):
+    def __init__(self, status_code: int, code: str, msg: str):
+        self.status_code = status_code
+        self.code = code
+        self.msg = msg
+
+def _error(status_code: int, code: str, msg: str) -> JSONResponse:
+    return JSONResponse({"code": code, "msg": msg}, status_code=status_code)
+
+def _ok(data: Any) -> Dict[str, Any]:
+    return {"code": "200000", "data": data}
+
+class _Pools:
+    """Fixed-window usage per resource pool"""
+
+    def __init__(self):
+        self.window_start: Dict[str, float] = {}
+        self.used: Dict[str, int] = {}
+
+    def consume(self, pool: str, weight: int) -> Optional[int]:
+        """Charge a request; returns the remaining quota, or None if exhausted"""
+        quota, window = KUCOIN_POOLS[pool]
+        now = time.monotonic()
+        if now - self.window_start.get(pool, float("-inf")) >= window:
+            self.window_start[pool] = now
+            self.used[pool] = 0
+        if self.used[pool] + weight > quota:
+            return None
+        self.used[pool] += weight
+        return quota - self.used[pool]
+
+def create_mock_exchange_app(
+    api_key: str = MOCK_API_KEY,
+    api_secret: str = MOCK_API_SECRET,
+    passphrase: str = MOCK_PASSPHRASE,
+    latency_ms: float = 0,
+    enforce_rate_limits: bool = True,
+) -> FastAPI:
+    app = FastAPI(title="Mock KuCoin Exchange")
+    secret = api_secret.encode("utf-8")
+    signed_passphrase = base64.b64encode(
+        hmac.new(secret, passphrase.encode("utf-8"), hashlib.sha256).digest()
+    ).decode("ascii")
+    pools = _Pools()
+    orders: Dict[str, Dict[str, Any]] = {}
+    stop_orders: Dict[str, Dict[str, Any]] = {}
+    app.state.orders = orders
+    app.state.stop_orders = stop_orders
+    app.state.requests = 0
+
+    async def gate(request: Request, response: Response):
+        """Authenticates, charges the resource pool and simulates latency"""
+        app.state.requests += 1
+        template = request.scope["route"].path
+        pool, weight = KUCOIN_ENDPOINT_WEIGHTS.get((request.method, template), ("spot", 1))
+
+        if pool != "public":
+            await _verify(request)
+        if enforce_rate_limits:
+            remaining = pools.consume(pool, weight)
+            if remaining is None:
+                raise MockExchangeError(429, "429000", "Too many requests")
+            response.headers["gw-ratelimit-remaining"] = str(remaining)
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    async def _verify(request: Request):
+        headers = request.headers
+        if headers.get("KC-API-KEY") != api_key:
+            raise MockExchangeError(401, "400003", "KC-API-KEY not exists")
+        if headers.get("KC-API-PASSPHRASE") != signed_passphrase:
+            raise MockExchangeError(401, "400004", "Invalid KC-API-PASSPHRASE")
+        timestamp = headers.get("KC-API-TIMESTAMP", "")
+        if not timestamp.isdigit() or abs(time.time() * 1000 - int(timestamp)) > TIMESTAMP_TOLERANCE_MS:
+            raise MockExchangeError(401, "400002", "Invalid KC-API-TIMESTAMP")
+        path = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+        body = await request.body()
+        expected = base64.b64encode(
+            hmac.new(secret, timestamp.encode("ascii") + request.method.encode("ascii") + path.encode("utf-8") + body, hashlib.sha256).digest()
+        ).decode("ascii")
+        if not hmac.compare_digest(expected, headers.get("KC-API-SIGN", "")):
+            raise MockExchangeError(401, "400005", "Invalid KC-API-SIGN")
+
+    # Every route registered below goes through gate() first
+    app.router.dependencies.append(Depends(gate))
+
+    @app.exception_handler(MockExchangeError)
+    async def mock_error_handler(request: Request, exc: MockExchangeError):
+        return _error(exc.status_code, exc.code, exc.msg)
+
+    def _new_order(body: Dict[str, Any], stop: bool) -> Dict[str, Any]:
+        return {
+            "id": uuid.uuid4().hex,
+            "clientOid": body.get("clientOid"),
+            "symbol": body.get("symbol"),
+            "side": body.get("side"),
+            "type": body.get("type", "limit"),
+            "size": body.get("size"),
+            "price": body.get("price"),
+            "stop": body.get("stop") if stop else None,
+            "stopPrice": body.get("stopPrice") if stop else None,
+            "isActive": True,
+            "cancelExist": False,
+            "createdAt": int(time.time() * 1000),
+        }
+
+    def _check_order(body: Dict[str, Any]) -> Optional[JSONResponse]:
+        if body.get("symbol") not in MOCK_PRICES:
+            return _error(400, "400100", "Unsupported trading pair")
+        if body.get("side") not in ("buy", "sell"):
+            return _error(400, "400100", "Invalid side")
+        if body.get("type", "limit") == "limit" and not body.get("price"):
+            return _error(400, "400100", "Price is required for limit orders")
+        return None
+
+    @app.post("/api/v1/orders")
+    async def place_order(request: Request):
+        body = json.loads(await request.body() or b"{}")
+        error = _check_order(body)
+        if error is not None:
+            return error
+        order = _new_order(body, stop=False)
+        orders[order["id"]] = order
+        return _ok({"orderId": order["id"]})
+
+    @app.post("/api/v1/stop-order")
+    async def place_stop_order(request: Request):
+        body = json.loads(await request.body() or b"{}")
+        error = _check_order(body)
+        if error is not None:
+            return error
+        if body.get("stop") not in ("loss", "entry") or not body.get("stopPrice"):
+            return _error(400, "400100", "stop and stopPrice are required")
+        order = _new_order(body, stop=True)
+        stop_orders[order["id"]] = order
+        return _ok({"orderId": order["id"]})
+
+    @app.delete("/api/v1/orders/{id}")
+    async def cancel_order(id: str):
+        order = orders.get(id)
+        if order is None or not order["isActive"]:
+            return _error(400, "400100", "order_not_exist_or_not_allow_to_cancel")
+        order["isActive"], order["cancelExist"] = False, True
+        return _ok({"cancelledOrderIds": [id]})
+
+    @app.delete("/api/v1/stop-order/{id}")
+    async def cancel_stop_order(id: str):
+        if stop_orders.pop(id, None) is None:
+            return _error(400, "400100", "order_not_exist_or_not_allow_to_cancel")
+        return _ok({"cancelledOrderIds": [id]})
+
+    @app.get("/api/v1/orders")
+    async def list_orders(status: str = "active", symbol: Optional[str] = None):
+        active = status == "active"
+        items = [
+            order for order in orders.values()
+            if order["isActive"] == active and (symbol is None or order["symbol"] == symbol)
+        ]
+        return _ok({"currentPage": 1, "pageSize": len(items), "totalNum": len(items), "totalPage": 1, "items": items})
+
+    @app.get("/api/v1/orders/{id}")
+    async def get_order(id: str):
+        order = orders.get(id)
+        if order is None:
+            return _error(404, "400100", "order not exist")
+        return _ok(order)
+
+    @app.get("/api/v1/accounts")
+    async def get_accounts(type: Optional[str] = None):
+        return _ok([
+            {
+                "id": f"mock-{currency.lower()}",
+                "currency": currency,
+                "type": "trade",
+                "balance": str(balance),
+                "available": str(balance),
+                "holds": "0",
+            }
+            for currency, balance in MOCK_BALANCES.items()
+        ])
+
+    @app.get("/api/v2/symbols")
+    async def get_symbols():
+        return _ok([
+            {
+                "symbol": symbol,
+                "name": symbol,
+                "baseCurrency": symbol.split("-")[0],
+                "quoteCurrency": symbol.split("-")[1],
+                "baseMinSize": "0.00001",
+                "quoteMinSize": "0.1",
+                "baseIncrement": "0.00000001",
+                "quoteIncrement": "0.000001",
+                "priceIncrement": "0.01" if price >= 1 else "0.0001",
+                "enableTrading": True,
+            }
+            for symbol, price in MOCK_PRICES.items()
+        ])
+
+    @app.get("/api/v1/market/orderbook/level1")
+    async def get_ticker(symbol: str):
+        price = MOCK_PRICES.get(symbol)
+        if price is None:
+            return _error(400, "400100", "Unsupported trading pair")
+        spread = price * Decimal("0.0001")
+        return _ok({
+            "sequence": str(int(time.time() * 1000)),
+            "price": str(price),
+            "size": "0.01",
+            "bestBid": str(price - spread),
+            "bestBidSize": "1",
+            "bestAsk": str(price + spread),
+            "bestAskSize": "1",
+            "time": int(time.time() * 1000),
+        })
+
+    @app.get("/api/v1/market/orderbook/level2_100")
+    async def get_order_book(symbol: str):
+        price = MOCK_PRICES.get(symbol)
+        if price is None:
+            return _error(400, "400100", "Unsupported trading pair")
+        tick = price * Decimal("0.0001")
+        return _ok({
+            "sequence": str(int(time.time() * 1000)),
+            "time": int(time.time() * 1000),
+            "bids": [[str(price - tick * i), str(Decimal(i) / 10)] for i in range(1, 101)],
+            "asks": [[str(price + tick * i), str(Decimal(i) / 10)] for i in range(1, 101)],
+        })
+
+    @app.get("/api/v1/market/candles")
+    async def get_candles(symbol: str, type: str, startAt: int = 0, endAt: int = 0):
+        if symbol not in MOCK_PRICES:
+            return _error(400, "400100", "Unsupported trading pair")
+        seconds = MOCK_CANDLE_INTERVALS.get(type)
+        if seconds is None:
+            return _error(400, "400100", "Unsupported kline type")
+        end = endAt or int(time.time())
+        start = max(startAt, end - seconds * MAX_CANDLES_PER_REQUEST)
+        # Newest first, like the real endpoint (weekly bars open on Monday)
+        offset = 4 * 86400 if type == "1week" else 0
+        bucket = (end - offset) // seconds * seconds + offset
+        rows = []
+        while bucket >= start and len(rows) < MAX_CANDLES_PER_REQUEST:
+            rows.append(_mock_candle(symbol, type, bucket))
+            bucket -= seconds
+        return _ok(rows)
+
+    @app.get("/api/v1/timestamp")
+    async def get_timestamp():
+        return _ok(int(time.time() * 1000))
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the mock KuCoin exchange")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--no-rate-limits", action="store_true")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_mock_exchange_app(latency_ms=args.latency_ms, enforce_rate_limits=not args.no_rate_limits),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
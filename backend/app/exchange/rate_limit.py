@@ -0,0 +1,126 @@
+from typing import Dict, Optional, Tuple
+import asyncio
+import time
+
+class TokenBucket:
+    """Continuously refilling token bucket.
+
+    ``acquire`` waits (without blocking the loop) until enough tokens are
+    available; waiters are served in arrival order so heavy requests are not
+    starved by light ones.
+    """
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        # Metrics
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_sec)
+        self._updated = now
+
+    def try_acquire(self, weight: float = 1) -> bool:
+        if self._lock.locked():
+            return False
+        self._refill(time.monotonic())
+        if self._tokens < weight:
+            return False
+        self._tokens -= weight
+        self.acquired += 1
+        return True
+
+    async def acquire(self, weight: float = 1) -> float:
+        """Take ``weight`` tokens; returns the seconds spent waiting"""
+        if weight > self.capacity:
+            raise ValueError(f"Weight {weight} exceeds bucket capacity {self.capacity}")
+        if self.try_acquire(weight):
+            return 0.0
+        started = time.monotonic()
+        async with self._lock:
+            self.throttled += 1
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    break
+                await asyncio.sleep((weight - self._tokens) / self.refill_per_sec)
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.wait_seconds += waited
+        return waited
+
+    @property
+    def available(self) -> float:
+        self._refill(time.monotonic())
+        return self._tokens
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "available": round(self.available, 2),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+# KuCoin resource pools: (quota, window seconds). The spot pool is per
+# account, the public pool per IP.
+KUCOIN_POOLS: Dict[str, Tuple[int, int]] = {
+    "spot": (4000, 30),
+    "public": (2000, 30),
+}
+
+# (method, path template) -> (pool, weight), from KuCoin's REST rate limit tables
+KUCOIN_ENDPOINT_WEIGHTS: Dict[Tuple[str, str], Tuple[str, int]] = {
+    ("POST", "/api/v1/orders"): ("spot", 2),
+    ("DELETE", "/api/v1/orders/{id}"): ("spot", 3),
+    ("GET", "/api/v1/orders"): ("spot", 2),
+    ("GET", "/api/v1/orders/{id}"): ("spot", 2),
+    ("POST", "/api/v1/stop-order"): ("spot", 2),
+    ("DELETE", "/api/v1/stop-order/{id}"): ("spot", 3),
+    ("GET", "/api/v1/accounts"): ("spot", 5),
+    ("GET", "/api/v2/symbols"): ("public", 4),
+    ("GET", "/api/v1/market/orderbook/level1"): ("public", 2),
+    ("GET", "/api/v1/market/orderbook/level2_100"): ("public", 4),
+    ("GET", "/api/v1/market/candles"): ("public", 3),
+    ("GET", "/api/v1/timestamp"): ("public", 3),
+}
+
+class EndpointRateLimiter:
+    """Client-side limiter with one token bucket per resource pool.
+
+    Each endpoint draws its documented weight from its pool, so a burst of
+    cheap order placements and an expensive account query share the budget
+    the same way the exchange accounts for it.
+    """
+
+    def __init__(
+        self,
+        pools: Optional[Dict[str, Tuple[int, int]]] = None,
+        weights: Optional[Dict[Tuple[str, str], Tuple[str, int]]] = None,
+        default: Tuple[str, int] = ("spot", 1),
+    ):
+        pools = KUCOIN_POOLS if pools is None else pools
+        self.weights = KUCOIN_ENDPOINT_WEIGHTS if weights is None else weights
+        self.default = default
+        self.buckets = {
+            name: TokenBucket(quota, quota / window) for name, (quota, window) in pools.items()
+        }
+
+    async def acquire(self, method: str, path_template: str) -> float:
+        pool, weight = self.weights.get((method, path_template), self.default)
+        bucket = self.buckets.get(pool)
+        if bucket is None:
+            return 0.0
+        return await bucket.acquire(weight)
+
+    def stats(self) -> dict:
+        return {name: bucket.stats() for name, bucket in self.buckets.items()}
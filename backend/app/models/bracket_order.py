@@ -20,6 +20,11 @@ class OrderStatus(str, Enum):
     CANCELLED = "cancelled"
     REJECTED = "rejected"
 
+class BracketLeg(str, Enum):
+    ENTRY = "entry"
+    STOP_LOSS = "stop_loss"
+    TAKE_PROFIT = "take_profit"
+
 class TakeProfitLevel(BaseModel):
     """Individual take profit level"""
     price: Decimal
@@ -71,6 +76,9 @@ class BracketOrderResponse(BaseModel):
     remaining_quantity: Decimal = Decimal("0")
     total_pnl: Optional[Decimal] = None
     
+    # Sequence number of the last fill log record reflected (a fill or a logged state)
+    fill_seq: int = 0
+    
     class Config:
         json_encoders = {
             Decimal: str,
@@ -91,6 +99,61 @@ class BracketOrderUpdate(BaseModel):
             'take_profit_levels': {'exclude_unset': True}
         }
 
+class BracketOrderAmend(BracketOrderUpdate):
+    """One item of a batch amend request"""
+    order_id: str
+
+class BracketOrderBatchCreate(BaseModel):
+    """Batch of bracket orders to create"""
+    orders: List[BracketOrderCreate]
+    atomic: bool = False  # Apply nothing if any item fails validation
+
+class BracketOrderBatchCancel(BaseModel):
+    """Batch of bracket orders to cancel"""
+    order_ids: List[str]
+    atomic: bool = False
+
+class BracketOrderBatchAmend(BaseModel):
+    """Batch of bracket order price amendments"""
+    amendments: List[BracketOrderAmend]
+    atomic: bool = False
+
+class BracketOrderCancelAll(BaseModel):
+    """Cancel every open bracket order on a symbol, optionally one side only"""
+    symbol: str
+    side: Optional[OrderSide] = None
+
+class BracketOrderBatchItem(BaseModel):
+    """Per-item result of a batch operation"""
+    index: int
+    success: bool
+    order_id: Optional[str] = None
+    order: Optional[BracketOrderResponse] = None
+    error: Optional[str] = None
+
+class BracketOrderBatchResponse(BaseModel):
+    """Batch operation results, in request order"""
+    results: List[BracketOrderBatchItem]
+    succeeded: int
+    failed: int
+
+class FillEvent(BaseModel):
+    """One execution against a leg of a bracket order"""
+    seq: int = 0  # Assigned by the fill log on append
+    order_id: str
+    leg: BracketLeg
+    level: Optional[int] = None  # Take profit index
+    quantity: Decimal
+    price: Decimal
+    exchange_order_id: Optional[str] = None
+    timestamp: datetime
+    
+    class Config:
+        json_encoders = {
+            Decimal: str,
+            datetime: lambda dt: dt.isoformat()
+        }
+
 class BracketOrderValidationError(Exception):
     """Custom exception for bracket order validation errors"""
     pass
\ No newline at end of file
@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from decimal import Decimal
+from enum import Enum
+
+from .bracket_order import OrderSide
+
+class ExchangeOrderType(str, Enum):
+    MARKET = "market"
+    LIMIT = "limit"
+
+class StopDirection(str, Enum):
+    LOSS = "loss"    # Triggers when the price falls to the stop price
+    ENTRY = "entry"  # Triggers when the price rises to the stop price
+
+class ExchangeOrderRequest(BaseModel):
+    """Single order as sent to the exchange"""
+    client_oid: str
+    symbol: str
+    side: OrderSide
+    type: ExchangeOrderType
+    size: Decimal
+    price: Optional[Decimal] = None  # Required for LIMIT
+    
+    # Stop orders only
+    stop: Optional[StopDirection] = None
+    stop_price: Optional[Decimal] = None
+
+class BracketLegs(BaseModel):
+    """Exchange order ids of the legs of one bracket order"""
+    entry_order_id: str
+    stop_loss_order_id: Optional[str] = None
+    take_profit_order_ids: List[str] = []
@@ -0,0 +1,87 @@
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, Numeric, String
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.types import TypeDecorator
+from typing import List, Optional
+from decimal import Decimal
+from datetime import datetime
+
+# SQLite only auto-increments INTEGER PRIMARY KEY columns
+SeqType = BigInteger().with_variant(Integer, "sqlite")
+
+class ExactDecimal(TypeDecorator):
+    """Arbitrary-precision NUMERIC; stored as text on SQLite, which has no exact decimal type"""
+    impl = Numeric
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String(64))
+        return dialect.type_descriptor(Numeric())
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and dialect.name == "sqlite":
+            return str(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and not isinstance(value, Decimal):
+            return Decimal(value)
+        return value
+
+class Base(DeclarativeBase):
+    pass
+
+class BracketOrderRow(Base):
+    """Bracket order table; ``seq`` preserves creation order for keyset pagination"""
+    __tablename__ = "bracket_orders"
+
+    seq: Mapped[int] = mapped_column(SeqType, primary_key=True, autoincrement=True)
+    id: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
+    symbol: Mapped[str] = mapped_column(String(32), nullable=False)
+    side: Mapped[str] = mapped_column(String(8), nullable=False)
+    quantity: Mapped[Decimal] = mapped_column(ExactDecimal(), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(), nullable=False)
+
+    entry_type: Mapped[str] = mapped_column(String(8), nullable=False)
+    entry_price: Mapped[Optional[Decimal]] = mapped_column(ExactDecimal())
+    entry_order_id: Mapped[Optional[str]] = mapped_column(String(64))
+    entry_filled_quantity: Mapped[Decimal] = mapped_column(ExactDecimal(), nullable=False, default=Decimal("0"))
+    entry_average_price: Mapped[Optional[Decimal]] = mapped_column(ExactDecimal())
+
+    stop_loss_price: Mapped[Optional[Decimal]] = mapped_column(ExactDecimal())
+    stop_loss_order_id: Mapped[Optional[str]] = mapped_column(String(64))
+
+    total_filled_quantity: Mapped[Decimal] = mapped_column(ExactDecimal(), nullable=False, default=Decimal("0"))
+    remaining_quantity: Mapped[Decimal] = mapped_column(ExactDecimal(), nullable=False, default=Decimal("0"))
+    total_pnl: Mapped[Optional[Decimal]] = mapped_column(ExactDecimal())
+    fill_seq: Mapped[int] = mapped_column(SeqType, nullable=False, default=0)
+
+    take_profit_levels: Mapped[List["TakeProfitRow"]] = relationship(
+        back_populates="bracket_order",
+        order_by="TakeProfitRow.level",
+        cascade="all, delete-orphan",
+        lazy="raise",
+    )
+
+    __table_args__ = (
+        Index("ix_bracket_orders_symbol_seq", "symbol", "seq"),
+        Index("ix_bracket_orders_status_seq", "status", "seq"),
+        Index("ix_bracket_orders_symbol_status_seq", "symbol", "status", "seq"),
+        Index("ix_bracket_orders_symbol_side_status_seq", "symbol", "side", "status", "seq"),
+    )
+
+class TakeProfitRow(Base):
+    __tablename__ = "bracket_order_take_profits"
+
+    id: Mapped[int] = mapped_column(SeqType, primary_key=True, autoincrement=True)
+    bracket_order_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("bracket_orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    level: Mapped[int] = mapped_column(Integer, nullable=False)
+    price: Mapped[Decimal] = mapped_column(ExactDecimal(), nullable=False)
+    quantity: Mapped[Decimal] = mapped_column(ExactDecimal(), nullable=False)
+    order_id: Mapped[Optional[str]] = mapped_column(String(64))
+    filled_quantity: Mapped[Decimal] = mapped_column(ExactDecimal(), nullable=False, default=Decimal("0"))
+
+    bracket_order: Mapped[BracketOrderRow] = relationship(back_populates="take_profit_levels")
@@ -0,0 +1,78 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from decimal import Decimal
+from enum import Enum
+
+from .bracket_order import BracketOrderCreate, OrderSide
+
+class RiskLevel(str, Enum):
+    """Position calculator presets"""
+    CONSERVATIVE = "conservative"
+    MODERATE = "moderate"
+    AGGRESSIVE = "aggressive"
+
+# Share of the account lost if the stop is hit, in percent
+RISK_LEVEL_PERCENT = {
+    RiskLevel.CONSERVATIVE: Decimal("0.25"),
+    RiskLevel.MODERATE: Decimal("0.5"),
+    RiskLevel.AGGRESSIVE: Decimal("1"),
+}
+
+class PositionSizeRequest(BaseModel):
+    """Size one bracket so that hitting its stop loses the chosen share of the account.
+
+    The bracket's quantity only sets the proportions of its take profit
+    levels; market entries are sized at the current ask (buys) or bid (sells).
+    """
+    bracket: BracketOrderCreate
+    account_balance: Decimal
+    risk_level: RiskLevel = RiskLevel.CONSERVATIVE
+    risk_percent: Optional[Decimal] = None  # Overrides risk_level
+
+class PositionSizeBatchRequest(BaseModel):
+    """Many brackets sized against the same account and risk"""
+    brackets: List[BracketOrderCreate]
+    account_balance: Decimal
+    risk_level: RiskLevel = RiskLevel.CONSERVATIVE
+    risk_percent: Optional[Decimal] = None
+
+class TakeProfitRisk(BaseModel):
+    """One take profit level of a sized bracket"""
+    price: Decimal
+    quantity: Decimal
+    reward: Decimal        # Profit at this level, in the quote currency
+    reward_risk: float     # R:R of this level's price
+
+class PositionSize(BaseModel):
+    """Sized bracket with its risk figures; amounts are in the quote currency"""
+    symbol: str
+    side: OrderSide
+    entry_price: Decimal
+    stop_loss_price: Decimal
+    risk_budget: Decimal     # Account balance x risk percent
+    quantity: Decimal        # Largest base increment multiple within the budget
+    position_value: Decimal
+    dollar_risk: Decimal     # Loss if the stop is hit at the sized quantity
+    risk_percent: float      # dollar_risk as a percentage of the account
+    take_profits: List[TakeProfitRisk]
+    total_reward: Decimal
+    reward_risk: float       # total_reward / dollar_risk
+    bracket: BracketOrderCreate  # Ready to submit to POST /api/bracket-orders
+
+    class Config:
+        json_encoders = {
+            Decimal: str
+        }
+
+class PositionSizeBatchItem(BaseModel):
+    """Per-item result of a batch sizing request"""
+    index: int
+    success: bool
+    result: Optional[PositionSize] = None
+    error: Optional[str] = None
+
+class PositionSizeBatchResponse(BaseModel):
+    """Batch sizing results, in request order"""
+    results: List[PositionSizeBatchItem]
+    succeeded: int
+    failed: int
@@ -0,0 +1,188 @@
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+
+from decouple import config
+import structlog
+
+from ..exchange.base import ExchangeError
+from ..models.bracket_order import BracketOrderResponse, BracketOrderUpdate, BracketOrderValidationError
+from .bracket_order_service import AMENDABLE_FIELDS, BracketOrderService, bracket_order_service
+from .bracket_validation import fields_set
+
+logger = structlog.get_logger(__name__)
+
+# Called with (event, order) where event is "accepted" (an edit passed
+# validation; the order is the not yet committed intent) or "rejected"
+# (committing failed; the order is the state actually stored)
+AmendListener = Callable[[str, BracketOrderResponse], None]
+
+class _PendingAmend:
+    """Edits to one order merged since its last commit"""
+    __slots__ = ("order_id", "changes", "preview", "first_at", "handle", "edits")
+
+    def __init__(self, order_id: str, first_at: float):
+        self.order_id = order_id
+        self.changes: Dict[str, Any] = {}
+        self.preview: Optional[BracketOrderResponse] = None
+        self.first_at = first_at
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.edits = 0
+
+class AmendCoalescer:
+    """Merges rapid successive amendments of the same order (a chart drag).
+
+    Every edit is validated at once against the latest accepted intent and
+    acknowledged to listeners, but only the merged result is committed
+    (store write, exchange replace, "updated" event): ``window_ms`` after
+    the last edit, and at most ``max_delay_ms`` after the first one so a
+    long drag still reaches the exchange. Commits of one order never
+    overlap; edits arriving during a commit start the next window. A commit
+    re-applies the merged fields to the stored order, so fills or a cancel
+    in the meantime are respected, and a failure is reported with the
+    stored state for the client to snap back to.
+
+    With ``window_ms`` of 0 every edit is committed directly.
+    """
+
+    def __init__(self, service: BracketOrderService, window_ms: int = 150, max_delay_ms: int = 1000):
+        self.service = service
+        self.window = window_ms / 1000
+        self.max_delay = max(max_delay_ms, window_ms) / 1000
+        self._pending: Dict[str, _PendingAmend] = {}
+        self._committing: Dict[str, _PendingAmend] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._listeners: List[AmendListener] = []
+        self.edits = 0
+        self.coalesced = 0
+        self.commits = 0
+        self.rejected = 0
+
+    def add_listener(self, listener: AmendListener) -> None:
+        """Register a callback for acknowledgements (e.g. WebSocket push)"""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, order: BracketOrderResponse) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event, order)
+            except Exception as e:
+                logger.error("amend_listener_failed", order_id=order.id, error=str(e))
+
+    async def submit(self, order_id: str, updates: BracketOrderUpdate) -> Optional[BracketOrderResponse]:
+        """Validate and accept an edit; returns the accepted intent, None if the order can't be amended.
+
+        Raises BracketOrderValidationError for an invalid edit, which leaves
+        the pending intent unchanged.
+        """
+        if self.window <= 0:
+            return await self.service.update_bracket_order(order_id, updates)
+
+        base = self._intent(order_id)
+        if base is None:
+            stored = await self.service.get_bracket_order(order_id)
+            # Another first edit may have been accepted during the read; build on it
+            base = self._intent(order_id) or stored
+            if base is None:
+                return None
+
+        preview = self.service.preview_update(base, updates)
+        if preview is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(order_id)
+        if pending is None:
+            pending = self._pending[order_id] = _PendingAmend(order_id, loop.time())
+        pending.changes.update((field, getattr(updates, field)) for field in fields_set(updates) & AMENDABLE_FIELDS)
+        pending.preview = preview
+        pending.edits += 1
+        self.edits += 1
+
+        # Debounce, but never past the deadline set by the first edit
+        if pending.handle is not None:
+            pending.handle.cancel()
+        delay = min(self.window, pending.first_at + self.max_delay - loop.time())
+        pending.handle = loop.call_later(max(delay, 0), self._due, order_id)
+
+        self._notify("accepted", preview)
+        return preview
+
+    def _intent(self, order_id: str) -> Optional[BracketOrderResponse]:
+        """Latest accepted, not yet stored state of an order (None when it has no edits in flight)"""
+        pending = self._pending.get(order_id) or self._committing.get(order_id)
+        return pending.preview if pending is not None else None
+
+    def _due(self, order_id: str) -> None:
+        pending = self._pending.get(order_id)
+        if pending is None:
+            return
+        pending.handle = None
+        if order_id not in self._tasks:
+            self._start(order_id)
+
+    def _start(self, order_id: str) -> None:
+        pending = self._pending.pop(order_id)
+        self.coalesced += pending.edits - 1
+        self._committing[order_id] = pending
+        task = self._tasks[order_id] = asyncio.create_task(self._commit(pending))
+        task.add_done_callback(lambda _: self._committed(order_id))
+
+    def _committed(self, order_id: str) -> None:
+        self._tasks.pop(order_id, None)
+        self._committing.pop(order_id, None)
+        pending = self._pending.get(order_id)
+        # Its window ran out while the previous commit was in flight
+        if pending is not None and pending.handle is None:
+            self._start(order_id)
+
+    async def _commit(self, pending: _PendingAmend) -> None:
+        order_id = pending.order_id
+        try:
+            order = await self.service.update_bracket_order(order_id, BracketOrderUpdate(**pending.changes))
+            error = None if order is not None else "order can no longer be amended"
+        except (BracketOrderValidationError, ExchangeError) as e:
+            error = str(e)
+        except Exception as e:
+            error = f"unexpected error: {e}"
+
+        if error is None:
+            self.commits += 1
+            return
+        self.rejected += 1
+        logger.warning("amendment_rejected", order_id=order_id, edits=pending.edits, error=error)
+        current = await self.service.get_bracket_order(order_id)
+        if current is not None:
+            self._notify("rejected", current)
+
+    async def flush(self) -> None:
+        """Commit every pending amendment now and wait for all commits"""
+        for order_id, pending in list(self._pending.items()):
+            if pending.handle is not None:
+                pending.handle.cancel()
+                pending.handle = None
+            if order_id not in self._tasks:
+                self._start(order_id)
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    async def stop(self) -> None:
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000,
+            "max_delay_ms": self.max_delay * 1000,
+            "edits": self.edits,
+            "commits": self.commits,
+            "rejected": self.rejected,
+            "coalesced": self.coalesced,
+            "pending": len(self._pending),
+            "committing": len(self._committing),
+        }
+
+# Global instance
+amend_coalescer = AmendCoalescer(
+    bracket_order_service,
+    window_ms=config("AMEND_COALESCE_MS", default=150, cast=int),
+    max_delay_ms=config("AMEND_MAX_DELAY_MS", default=1000, cast=int),
+)
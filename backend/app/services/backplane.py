@@ -0,0 +1,162 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional, Set
+import asyncio
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+MessageHandler = Callable[[str, bytes], Awaitable[None]]
+
+BROADCAST_CHANNEL = "broadcast"
+ORDER_CHANNEL = "orders"
+
+class Backplane(ABC):
+    """Cross-process pub/sub used to fan WebSocket updates out to every node.
+
+    Publishers send once per channel; each node subscribes only to the
+    channels its local clients need and fans out locally.
+    """
+
+    def __init__(self):
+        self._handler: Optional[MessageHandler] = None
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    @abstractmethod
+    async def publish(self, channel: str, data: bytes):
+        ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str):
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, channel: str):
+        ...
+
+    async def ping(self) -> bool:
+        return True
+
+class InMemoryHub:
+    """Shared message bus for InMemoryBackplane nodes in one process"""
+
+    def __init__(self):
+        self.nodes: Dict[str, Set["InMemoryBackplane"]] = {}  # channel -> subscribed nodes
+        self.published = 0
+
+    def deliver(self, channel: str, data: bytes):
+        self.published += 1
+        for node in list(self.nodes.get(channel, ())):
+            node._receive(channel, data)
+
+class InMemoryBackplane(Backplane):
+    """Stand-in backplane for tests and single-process runs.
+
+    Nodes created with the same hub behave like separate workers attached to
+    the same Redis server.
+    """
+
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        super().__init__()
+        self.hub = hub or InMemoryHub()
+        self.channels: Set[str] = set()
+
+    async def stop(self):
+        for channel in list(self.channels):
+            await self.unsubscribe(channel)
+        await super().stop()
+
+    async def publish(self, channel: str, data: bytes):
+        self.hub.deliver(channel, data)
+
+    async def subscribe(self, channel: str):
+        self.channels.add(channel)
+        self.hub.nodes.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, channel: str):
+        self.channels.discard(channel)
+        nodes = self.hub.nodes.get(channel)
+        if nodes is not None:
+            nodes.discard(self)
+            if not nodes:
+                del self.hub.nodes[channel]
+
+    def _receive(self, channel: str, data: bytes):
+        if self._handler is not None:
+            # Deliver asynchronously, like a real network hop
+            asyncio.get_running_loop().create_task(self._handler(channel, data))
+
+class RedisBackplane(Backplane):
+    """Redis pub/sub backplane"""
+
+    def __init__(self, url: str):
+        super().__init__()
+        import redis.asyncio as aioredis
+
+        self.url = url
+        self._redis = aioredis.from_url(url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self, handler: MessageHandler):
+        await super().start(handler)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        await self._pubsub.close()
+        await self._redis.close()
+        await super().stop()
+
+    async def publish(self, channel: str, data: bytes):
+        await self._redis.publish(channel, data)
+
+    async def subscribe(self, channel: str):
+        await self._pubsub.subscribe(channel)
+
+    async def unsubscribe(self, channel: str):
+        await self._pubsub.unsubscribe(channel)
+
+    async def ping(self) -> bool:
+        return bool(await self._redis.ping())
+
+    async def _read_loop(self):
+        while True:
+            if not self._pubsub.subscribed:
+                await asyncio.sleep(0.1)
+                continue
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("backplane_read_failed", error=str(e))
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or self._handler is None:
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode("utf-8")
+            try:
+                await self._handler(channel, message["data"])
+            except Exception as e:
+                logger.error("backplane_handler_failed", channel=channel, error=str(e))
+
+def create_backplane(kind: str, redis_url: str = "") -> Optional[Backplane]:
+    """Build a backplane from configuration: 'none', 'memory' or 'redis'"""
+    kind = (kind or "none").lower()
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return InMemoryBackplane()
+    if kind == "redis":
+        return RedisBackplane(redis_url)
+    raise ValueError(f"Unknown WebSocket backplane: {kind}")
@@ -0,0 +1,389 @@
+"""Deterministic tick replay of bracket order variants.
+
+Every variant of a parameter grid is turned into a BracketOrderCreate and
+checked with the same rules as ``validate_bracket_order``, then replayed
+against a symbol's recorded ticks from the columnar archive:
+
+    python -m app.services.backtest --archive data/candles --symbols BTC-USDT,ETH-USDT \\
+        --stops 0.5,1,2 --take-profits "1;1,2;1,2,3" --splits "1;0.5,0.5;0.3,0.3,0.4" [--workers 4]
+
+Fills follow the live trigger engine: buy entries fill on the ask, long
+exits on the bid (and the reverse for sells), and exits are armed from
+the tick after the entry. A variant is never replayed tick by tick: the
+first crossing of every stop and take profit comes from a binary search
+on the running high/low since the entry, for all variants at once.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import product
+import argparse
+import os
+import time
+
+import numpy as np
+
+from ..models.bracket_order import (
+    BracketOrderCreate,
+    BracketOrderValidationError,
+    EntryType,
+    OrderSide,
+    TakeProfitLevel,
+)
+from ..storage.columnar import ColumnarStore
+from .bracket_validation import MAX_TAKE_PROFIT_LEVELS, validate_bracket
+
+# Replay outcome per variant
+STATUSES = ("rejected", "unfilled", "open", "closed")
+REJECTED, UNFILLED, OPEN, CLOSED = range(len(STATUSES))
+
+class BracketVariant(NamedTuple):
+    """Bracket parameters relative to the price at the start of the replay (percentages)"""
+    side: OrderSide
+    stop_pct: Optional[float]           # Stop distance from entry; None for no stop
+    take_profit_pct: Tuple[float, ...]  # Take profit distances from entry, nearest first
+    splits: Tuple[float, ...]           # Share of the quantity per take profit
+    entry_offset_pct: float = 0.0       # 0 for a market entry, else a limit this far inside the market
+
+class FillModel(NamedTuple):
+    """Costs applied to recorded trade prices"""
+    spread_bps: float = 2.0    # Quoted spread around the trade price (bid/ask = price -/+ half)
+    slippage_bps: float = 1.0  # Extra cost of market fills: market entries and stops
+    fee_bps: float = 10.0      # Per fill, on notional
+
+def bracket_grid(
+    sides: Sequence[OrderSide] = (OrderSide.BUY,),
+    stops_pct: Sequence[Optional[float]] = (1.0,),
+    take_profits_pct: Sequence[Tuple[float, ...]] = ((2.0,),),
+    splits: Sequence[Tuple[float, ...]] = ((1.0,),),
+    entry_offsets_pct: Sequence[float] = (0.0,),
+) -> List[BracketVariant]:
+    """Every combination, pairing take profit sets only with splits of the same length"""
+    return [
+        BracketVariant(side, stop, tuple(tps), tuple(split), offset)
+        for side, offset, stop, tps, split in product(sides, entry_offsets_pct, stops_pct, take_profits_pct, splits)
+        if len(tps) == len(split)
+    ]
+
+class _VariantArrays:
+    """Variant parameters as arrays; absent take profits have NaN distances and zero quantity"""
+
+    def __init__(self, variants: Sequence[BracketVariant], quantity: float):
+        count = len(variants)
+        self.direction = np.array([1.0 if v.side == OrderSide.BUY else -1.0 for v in variants])
+        self.offset = np.array([v.entry_offset_pct for v in variants], dtype=float) / 100
+        self.stop = np.array([np.nan if v.stop_pct is None else v.stop_pct for v in variants], dtype=float) / 100
+        self.take_profit = np.full((count, MAX_TAKE_PROFIT_LEVELS), np.nan)
+        self.quantity = np.zeros((count, MAX_TAKE_PROFIT_LEVELS))
+        for i, v in enumerate(variants):
+            levels = min(len(v.take_profit_pct), MAX_TAKE_PROFIT_LEVELS)
+            self.take_profit[i, :levels] = v.take_profit_pct[:levels]
+            self.quantity[i, :levels] = [share * quantity for share in v.splits[:levels]]
+        self.take_profit /= 100
+
+def _decimal(value: float) -> Decimal:
+    return Decimal(repr(float(value)))
+
+def _validate(symbol: str, variants: Sequence[BracketVariant], quantity: float, entry: np.ndarray) -> Dict[int, str]:
+    """Rejection message per variant index, using the live validation rules.
+
+    ``entry`` is each variant's intended entry: its limit price, or for a
+    market entry the touch it would take, which is also the reference the
+    live service validates market entries against.
+    """
+    rejected = {}
+    for i, variant in enumerate(variants):
+        if len(variant.take_profit_pct) != len(variant.splits):
+            rejected[i] = "Take profit distances and splits differ in length"
+            continue
+        sign = 1 if variant.side == OrderSide.BUY else -1
+        price = float(entry[i])
+        limit = variant.entry_offset_pct != 0
+        order = BracketOrderCreate(
+            symbol=symbol,
+            side=variant.side,
+            quantity=_decimal(quantity),
+            entry_type=EntryType.LIMIT if limit else EntryType.MARKET,
+            entry_price=_decimal(price) if limit else None,
+            stop_loss_price=None if variant.stop_pct is None else _decimal(price * (1 - sign * (variant.stop_pct / 100))),
+            take_profit_levels=[
+                TakeProfitLevel(price=_decimal(price * (1 + sign * (pct / 100))), quantity=_decimal(quantity * share))
+                for pct, share in zip(variant.take_profit_pct, variant.splits)
+            ],
+        )
+        try:
+            validate_bracket(order, _decimal(price))
+        except BracketOrderValidationError as e:
+            rejected[i] = str(e)
+    return rejected
+
+def _first_crossing(running: np.ndarray, thresholds: np.ndarray, rising: bool) -> np.ndarray:
+    """First index where a running max reaches (or a running min falls to) each threshold; len if never"""
+    if rising:
+        return np.searchsorted(running, thresholds, side="left")
+    return np.searchsorted(-running, -thresholds, side="left")
+
+def replay(
+    symbol: str,
+    times: np.ndarray,
+    prices: np.ndarray,
+    variants: Sequence[BracketVariant],
+    quantity: float = 1.0,
+    fill_model: FillModel = FillModel(),
+) -> Dict[str, np.ndarray]:
+    """Replay every variant against one symbol's ticks.
+
+    Each variant opens at the first tick (market) or once the market
+    reaches its limit. Take profits fill at their price; the stop closes
+    what is left at the first tick through it, at that tick's price if it
+    gapped past the stop, less slippage. Positions still open at the end
+    are marked to the last price. Returns one array per field, indexed
+    like ``variants``, plus a ``rejections`` dict of validation messages.
+    """
+    count = len(variants)
+    n = len(prices)
+    params = _VariantArrays(variants, quantity)
+    d = params.direction
+    status = np.full(count, UNFILLED, dtype=np.int8)
+    result = {
+        "entry_time": np.full(count, -1, dtype=np.int64),
+        "exit_time": np.full(count, -1, dtype=np.int64),
+        "entry_price": np.full(count, np.nan),
+        "take_profit_filled": np.zeros((count, MAX_TAKE_PROFIT_LEVELS), dtype=bool),
+        "stopped": np.zeros(count, dtype=bool),
+        "realized_pnl": np.zeros(count),
+        "unrealized_pnl": np.zeros(count),
+        "fees": np.zeros(count),
+        "r_multiple": np.full(count, np.nan),
+    }
+    if n == 0:
+        result["status"] = status
+        result["rejections"] = {}
+        return result
+
+    prices = np.asarray(prices, dtype=float)
+    half_spread = fill_model.spread_bps / 2e4
+    slippage = fill_model.slippage_bps / 1e4
+    bid = prices * (1 - half_spread)
+    ask = prices * (1 + half_spread)
+
+    # Intended entry: the touch at the start for market entries, else the limit price
+    buy = d > 0
+    touch = np.where(buy, ask[0], bid[0])
+    market = params.offset == 0
+    entry_ref = touch * (1 - d * params.offset)
+    stop = entry_ref * (1 - d * params.stop)
+    take_profit = entry_ref[:, None] * (1 + d[:, None] * params.take_profit)
+
+    rejections = _validate(symbol, variants, quantity, entry_ref)
+    status[list(rejections)] = REJECTED
+    live = status != REJECTED
+
+    # Entry fills
+    entry_idx = np.zeros(count, dtype=np.int64)
+    limit_buy = live & ~market & buy
+    limit_sell = live & ~market & ~buy
+    if limit_buy.any():
+        entry_idx[limit_buy] = _first_crossing(np.minimum.accumulate(ask), entry_ref[limit_buy], rising=False)
+    if limit_sell.any():
+        entry_idx[limit_sell] = _first_crossing(np.maximum.accumulate(bid), entry_ref[limit_sell], rising=True)
+    entered = live & (entry_idx < n)
+    entry_price = np.where(market, touch * (1 + d * slippage), entry_ref)
+
+    # Exit crossings, grouped by side and entry tick so each group shares one running high/low
+    stop_idx = np.full(count, n, dtype=np.int64)
+    tp_idx = np.full((count, MAX_TAKE_PROFIT_LEVELS), n, dtype=np.int64)
+    for is_buy in (True, False):
+        side_mask = entered & (buy if is_buy else ~buy)
+        for start in np.unique(entry_idx[side_mask]):
+            group = np.flatnonzero(side_mask & (entry_idx == start))
+            # Longs exit into the bid, shorts buy back from the ask
+            segment = (bid if is_buy else ask)[start + 1:]
+            if not len(segment):
+                continue
+            high = np.maximum.accumulate(segment)
+            low = np.minimum.accumulate(segment)
+            stops = stop[group]
+            has_stop = ~np.isnan(stops)
+            levels = take_profit[group]
+            has_level = ~np.isnan(levels)
+            if is_buy:
+                found = _first_crossing(low, np.where(has_stop, stops, -np.inf), rising=False)
+                hits = _first_crossing(high, np.where(has_level, levels, np.inf).ravel(), rising=True)
+            else:
+                found = _first_crossing(high, np.where(has_stop, stops, np.inf), rising=True)
+                hits = _first_crossing(low, np.where(has_level, levels, -np.inf).ravel(), rising=False)
+            stop_idx[group] = np.where(has_stop, start + 1 + found, n)
+            tp_idx[group] = np.where(has_level, start + 1 + hits.reshape(levels.shape), n)
+
+    # Take profits fill if reached before the stop; the stop closes the remainder
+    filled = entered[:, None] & (tp_idx < stop_idx[:, None]) & (tp_idx < n)
+    filled_quantity = np.where(filled, params.quantity, 0.0)
+    remaining = quantity - filled_quantity.sum(axis=1)
+    remaining[np.isclose(remaining, 0, atol=1e-12)] = 0
+    stopped = entered & (stop_idx < n) & (remaining > 0)
+
+    stop_tick = np.minimum(stop_idx, n - 1)
+    through = np.where(buy, np.minimum(stop, bid[stop_tick]), np.maximum(stop, ask[stop_tick]))
+    stop_price = np.where(stopped, through * (1 - d * slippage), 0.0)
+
+    tp_value = np.where(filled, take_profit, 0.0) * filled_quantity
+    realized = d * (tp_value.sum(axis=1) - entry_price * filled_quantity.sum(axis=1))
+    realized += np.where(stopped, d * (stop_price - entry_price) * remaining, 0.0)
+    still_open = entered & ~stopped & (remaining > 0)
+    mark = np.where(buy, bid[-1], ask[-1])
+    unrealized = np.where(still_open, d * (mark - entry_price) * remaining, 0.0)
+
+    fee = fill_model.fee_bps / 1e4
+    fees = fee * (entry_price * quantity + tp_value.sum(axis=1) + stop_price * np.where(stopped, remaining, 0.0))
+    risk = np.abs(entry_price - stop) * quantity
+
+    last_tp = np.where(filled, tp_idx, -1).max(axis=1)
+    exit_idx = np.where(stopped, stop_idx, np.where(still_open, -1, last_tp))
+
+    status[entered] = np.where(still_open[entered], OPEN, CLOSED)
+    result.update({
+        "status": status,
+        "rejections": rejections,
+        "entry_time": np.where(entered, times[np.minimum(entry_idx, n - 1)], -1),
+        "exit_time": np.where(entered & (exit_idx >= 0), times[np.maximum(exit_idx, 0)], -1),
+        "entry_price": np.where(entered, entry_price, np.nan),
+        "take_profit_filled": filled,
+        "stopped": stopped,
+        "realized_pnl": np.where(entered, realized - fees, 0.0),
+        "unrealized_pnl": unrealized,
+        "fees": np.where(entered, fees, 0.0),
+        "r_multiple": np.where(entered & (risk > 0), (realized - fees + unrealized) / np.where(risk > 0, risk, 1), np.nan),
+    })
+    return result
+
+def _replay_archived(
+    root: str, symbol: str, start: Optional[int], end: Optional[int],
+    variants: Sequence[BracketVariant], quantity: float, fill_model: FillModel,
+) -> Dict[str, np.ndarray]:
+    """Process pool worker: map the symbol's ticks and replay them"""
+    ticks = ColumnarStore(root).ticks(symbol).range(start, end)
+    return replay(symbol, ticks["time"], ticks["price"], variants, quantity, fill_model)
+
+def run_backtest(
+    root: str,
+    symbols: Sequence[str],
+    variants: Sequence[BracketVariant],
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    quantity: float = 1.0,
+    fill_model: FillModel = FillModel(),
+    workers: int = 1,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Replay the variants on each symbol's archived ticks (times in ms), one process per symbol.
+
+    Workers memory-map the archive themselves, so only the variants go
+    over the pipe. Results are keyed by symbol in the given order and do
+    not depend on the number of workers.
+    """
+    if workers <= 1 or len(symbols) <= 1:
+        return {
+            symbol: _replay_archived(root, symbol, start, end, variants, quantity, fill_model)
+            for symbol in symbols
+        }
+    with ProcessPoolExecutor(max_workers=min(workers, len(symbols))) as pool:
+        futures = {
+            symbol: pool.submit(_replay_archived, root, symbol, start, end, variants, quantity, fill_model)
+            for symbol in symbols
+        }
+        return {symbol: future.result() for symbol, future in futures.items()}
+
+def summarize(variants: Sequence[BracketVariant], results: Dict[str, Dict[str, np.ndarray]]) -> List[dict]:
+    """Per-variant statistics across symbols, best net PnL first"""
+    if not results:
+        return []
+    status = np.stack([r["status"] for r in results.values()])
+    entered = status >= OPEN
+    closed = status == CLOSED
+    realized = np.stack([r["realized_pnl"] for r in results.values()])
+    unrealized = np.stack([r["unrealized_pnl"] for r in results.values()])
+    r_multiple = np.stack([r["r_multiple"] for r in results.values()])
+    stopped = np.stack([r["stopped"] for r in results.values()])
+    tp_filled = np.stack([r["take_profit_filled"] for r in results.values()])
+    net = realized + unrealized
+
+    rows = []
+    for i, variant in enumerate(variants):
+        trades = int(entered[:, i].sum())
+        rejection = next((r["rejections"][i] for r in results.values() if i in r["rejections"]), None)
+        r_values = r_multiple[entered[:, i], i]
+        r_values = r_values[~np.isnan(r_values)]
+        rows.append({
+            "variant": i,
+            "side": variant.side.value,
+            "entry_offset_pct": variant.entry_offset_pct,
+            "stop_pct": variant.stop_pct,
+            "take_profit_pct": list(variant.take_profit_pct),
+            "splits": list(variant.splits),
+            "rejected": rejection,
+            "trades": trades,
+            "closed": int(closed[:, i].sum()),
+            "net_pnl": float(net[:, i].sum()),
+            "realized_pnl": float(realized[:, i].sum()),
+            "win_rate": float((net[closed[:, i], i] > 0).mean()) if closed[:, i].any() else None,
+            "mean_r": float(r_values.mean()) if len(r_values) else None,
+            "stop_rate": float(stopped[:, i].sum() / trades) if trades else None,
+            "take_profit_rates": [
+                float(tp_filled[:, i, k].sum() / trades) if trades else None
+                for k in range(len(variant.take_profit_pct))
+            ],
+        })
+    rows.sort(key=lambda row: (row["rejected"] is not None, -row["net_pnl"], row["variant"]))
+    return rows
+
+def _floats(text: str) -> List[float]:
+    return [float(part) for part in text.split(",") if part.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive", default=os.environ.get("CANDLE_ARCHIVE_PATH", "data/candles"))
+    parser.add_argument("--symbols", required=True, help="comma separated")
+    parser.add_argument("--sides", default="buy", help="buy, sell or buy,sell")
+    parser.add_argument("--stops", default="1", help="stop distances in %%, comma separated")
+    parser.add_argument("--take-profits", default="2", help="take profit sets in %%, e.g. '1;1,2;1,2,3'")
+    parser.add_argument("--splits", default="1", help="quantity shares per set, e.g. '1;0.5,0.5;0.3,0.3,0.4'")
+    parser.add_argument("--entry-offsets", default="0", help="limit entry offsets in %%, 0 = market")
+    parser.add_argument("--start", type=int, default=None, help="first tick time, ms")
+    parser.add_argument("--end", type=int, default=None, help="end tick time (exclusive), ms")
+    parser.add_argument("--quantity", type=float, default=1.0)
+    parser.add_argument("--spread-bps", type=float, default=FillModel().spread_bps)
+    parser.add_argument("--slippage-bps", type=float, default=FillModel().slippage_bps)
+    parser.add_argument("--fee-bps", type=float, default=FillModel().fee_bps)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    variants = bracket_grid(
+        sides=[OrderSide(side.strip()) for side in args.sides.split(",")],
+        stops_pct=_floats(args.stops),
+        take_profits_pct=[tuple(_floats(group)) for group in args.take_profits.split(";")],
+        splits=[tuple(_floats(group)) for group in args.splits.split(";")],
+        entry_offsets_pct=_floats(args.entry_offsets),
+    )
+    symbols = [symbol.strip() for symbol in args.symbols.split(",") if symbol.strip()]
+    started = time.perf_counter()
+    results = run_backtest(
+        args.archive, symbols, variants, args.start, args.end, args.quantity,
+        FillModel(args.spread_bps, args.slippage_bps, args.fee_bps), args.workers,
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(variants)} variants x {len(symbols)} symbols in {elapsed:.2f}s")
+    for row in summarize(variants, results)[:args.top]:
+        if row["rejected"]:
+            print(f"  #{row['variant']:<5} rejected: {row['rejected']}")
+            continue
+        win_rate = "-" if row["win_rate"] is None else f"{row['win_rate']:.0%}"
+        mean_r = "-" if row["mean_r"] is None else f"{row['mean_r']:+.2f}R"
+        print(
+            f"  #{row['variant']:<5} {row['side']:4} stop {row['stop_pct']}% tp {row['take_profit_pct']} "
+            f"x {row['splits']}  pnl {row['net_pnl']:+.4f}  trades {row['trades']}  win {win_rate}  {mean_r}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+from typing import AbstractSet, Any, Callable, Dict, Optional, Sequence, Tuple
+from collections import OrderedDict
+from decimal import Decimal
+import operator
+
+from pydantic import BaseModel
+
+from ..models.bracket_order import (
+    BracketOrderCreate,
+    BracketOrderResponse,
+    BracketOrderValidationError,
+    EntryType,
+    OrderSide,
+    TakeProfitLevel,
+)
+from .symbols import SymbolInfo
+
+MAX_TAKE_PROFIT_LEVELS = 3
+
+_ZERO = Decimal("0")
+
+# The deprecated v1 spellings go through warning machinery on every call under
+# pydantic v2, which dominates a hot path like a chart drag
+_PYDANTIC_V2 = hasattr(BaseModel, "model_copy")
+
+def fields_set(model: BaseModel) -> AbstractSet[str]:
+    """Fields explicitly set on a request model"""
+    return model.model_fields_set if _PYDANTIC_V2 else model.__fields_set__
+
+def copy_with(model: BaseModel, changes: Dict[str, Any]) -> BaseModel:
+    """Shallow copy with ``changes`` applied, without re-validation"""
+    return model.model_copy(update=changes) if _PYDANTIC_V2 else model.copy(update=changes)
+
+class SideRules:
+    """Price checks of one side, resolved once instead of branching per call"""
+    __slots__ = ("stop_invalid", "take_profit_invalid", "misordered", "stop_error", "take_profit_error", "order_error")
+
+    def __init__(
+        self,
+        stop_invalid: Callable[[Decimal, Decimal], bool],
+        take_profit_invalid: Callable[[Decimal, Decimal], bool],
+        misordered: Callable[[Decimal, Decimal], bool],
+        stop_error: str,
+        take_profit_error: str,
+        order_error: str,
+    ):
+        self.stop_invalid = stop_invalid            # (stop, reference)
+        self.take_profit_invalid = take_profit_invalid  # (take profit, reference)
+        self.misordered = misordered                # (take profit, next take profit)
+        self.stop_error = stop_error
+        self.take_profit_error = take_profit_error
+        self.order_error = order_error
+
+SIDE_RULES: Dict[OrderSide, SideRules] = {
+    # Buys: stop loss below entry, take profits above it, lowest first
+    OrderSide.BUY: SideRules(
+        operator.ge, operator.le, operator.gt,
+        "Stop loss must be below entry price for buy orders",
+        "Take profit {} must be above entry price for buy orders",
+        "Take profit levels should be ordered from lowest to highest price for buy orders",
+    ),
+    # Sells: stop loss above entry, take profits below it, highest first
+    OrderSide.SELL: SideRules(
+        operator.le, operator.ge, operator.lt,
+        "Stop loss must be above entry price for sell orders",
+        "Take profit {} must be below entry price for sell orders",
+        "Take profit levels should be ordered from highest to lowest price for sell orders",
+    ),
+}
+
+def check_stop_loss(rules: SideRules, stop: Optional[Decimal], reference: Optional[Decimal]) -> None:
+    if reference and stop and rules.stop_invalid(stop, reference):
+        raise BracketOrderValidationError(rules.stop_error)
+
+def check_take_profits_against(rules: SideRules, prices: Sequence[Decimal], reference: Optional[Decimal]) -> None:
+    if not reference:
+        return
+    for i, price in enumerate(prices):
+        if rules.take_profit_invalid(price, reference):
+            raise BracketOrderValidationError(rules.take_profit_error.format(i + 1))
+
+def check_take_profit_levels(
+    rules: SideRules, quantity: Decimal, levels: Sequence[TakeProfitLevel]
+) -> Tuple[Tuple[Decimal, ...], Decimal]:
+    """Count, quantity and ordering checks; returns (prices, total quantity)"""
+    if len(levels) > MAX_TAKE_PROFIT_LEVELS:
+        raise BracketOrderValidationError(f"Maximum {MAX_TAKE_PROFIT_LEVELS} take profit levels allowed")
+
+    total = _ZERO
+    for i, tp in enumerate(levels):
+        if tp.quantity <= 0:
+            raise BracketOrderValidationError(f"Take profit {i+1} quantity must be positive")
+        if tp.price <= 0:
+            raise BracketOrderValidationError(f"Take profit {i+1} price must be positive")
+        total += tp.quantity
+    if total > quantity:
+        raise BracketOrderValidationError("Total take profit quantities cannot exceed order quantity")
+
+    prices = tuple(tp.price for tp in levels)
+    for current, following in zip(prices, prices[1:]):
+        if rules.misordered(current, following):
+            raise BracketOrderValidationError(rules.order_error)
+    return prices, total
+
+def validate_bracket(
+    order: BracketOrderCreate, reference: Optional[Decimal], symbol: Optional[SymbolInfo] = None
+) -> None:
+    """Full validation of a new bracket; ``reference`` is the expected entry price.
+
+    With the symbol's exchange rules, prices, quantities and order values
+    are also checked against its tick size, lot size and minimum value.
+    """
+    if order.quantity <= 0:
+        raise BracketOrderValidationError("Quantity must be positive")
+    if order.entry_type == EntryType.LIMIT:
+        if not order.entry_price or order.entry_price <= 0:
+            raise BracketOrderValidationError("Entry price is required for limit orders")
+
+    rules = SIDE_RULES[order.side]
+    check_stop_loss(rules, order.stop_loss_price, reference)
+    check_take_profits_against(rules, [tp.price for tp in order.take_profit_levels], reference)
+    check_take_profit_levels(rules, order.quantity, order.take_profit_levels)
+    if symbol is not None:
+        symbol.check_bracket(order, reference)
+
+class BracketInvariants:
+    """Validated prices of a stored bracket, kept so amendments only check what changed"""
+    __slots__ = ("source", "rules", "symbol", "quantity", "entry_price", "stop", "take_profit_prices")
+
+    def __init__(self, order: BracketOrderResponse, symbol: Optional[SymbolInfo] = None):
+        self.source = order
+        self.rules = SIDE_RULES[order.side]
+        self.symbol = symbol  # Exchange rules the changed prices must also meet
+        self.quantity = order.quantity
+        self.entry_price = order.entry_price
+        self.stop = order.stop_loss_price
+        self.take_profit_prices = tuple(tp.price for tp in order.take_profit_levels)
+
+    def check_amendment(self, entry_type: EntryType, changes: Dict[str, Any], reference: Optional[Decimal]) -> None:
+        """Validate the changed fields against the cached ones.
+
+        ``reference`` is the expected entry price after the change (the new
+        limit price, or the market price for market entries). A moved entry
+        re-checks the stop and the nearest take profit, since the levels are
+        already known to be ordered; new levels get the full level checks.
+        """
+        rules = self.rules
+        symbol = self.symbol
+        entry_moved = "entry_price" in changes and entry_type == EntryType.LIMIT
+        if entry_moved:
+            entry_price = changes["entry_price"]
+            if not entry_price or entry_price <= 0:
+                raise BracketOrderValidationError("Entry price is required for limit orders")
+            if symbol is not None:
+                symbol.check_price(entry_price, "Entry price")
+                symbol.check_notional(self.quantity, entry_price, "Order")
+        market = entry_type == EntryType.MARKET
+
+        if "stop_loss_price" in changes or entry_moved or market:
+            stop = changes.get("stop_loss_price", self.stop)
+            check_stop_loss(rules, stop, reference)
+            if symbol is not None and stop is not None and "stop_loss_price" in changes:
+                symbol.check_price(stop, "Stop loss price")
+                symbol.check_notional(self.quantity, stop, "Stop loss")
+
+        if "take_profit_levels" in changes:
+            levels = changes["take_profit_levels"]
+            check_take_profits_against(rules, [tp.price for tp in levels], reference)
+            check_take_profit_levels(rules, self.quantity, levels)
+            if symbol is not None:
+                symbol.check_take_profit_levels(levels)
+        elif (entry_moved or market) and self.take_profit_prices:
+            check_take_profits_against(rules, self.take_profit_prices[:1], reference)
+
+class ValidationCache:
+    """Most recently amended brackets' invariants, LRU-bounded.
+
+    An entry is only used for the exact order object it was built from, so
+    a store that hands out fresh objects simply rebuilds it (cheaply), and
+    one that keeps live objects reuses it across a whole drag.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, BracketInvariants]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, order: BracketOrderResponse, symbol: Optional[SymbolInfo] = None) -> BracketInvariants:
+        invariants = self._entries.get(order.id)
+        if invariants is not None and invariants.source is order and invariants.symbol is symbol:
+            self.hits += 1
+            self._entries.move_to_end(order.id)
+            return invariants
+        self.misses += 1
+        return self.put(order, symbol)
+
+    def put(self, order: BracketOrderResponse, symbol: Optional[SymbolInfo] = None) -> BracketInvariants:
+        invariants = self._entries[order.id] = BracketInvariants(order, symbol)
+        self._entries.move_to_end(order.id)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return invariants
+
+    def discard(self, order_id: str) -> None:
+        self._entries.pop(order_id, None)
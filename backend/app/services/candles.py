@@ -0,0 +1,377 @@
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from decimal import Decimal
+import asyncio
+import time
+
+from decouple import config
+import numpy as np
+import structlog
+
+from ..exchange.base import ExchangeError, ExchangeGateway
+from ..exchange.factory import exchange_gateway
+from ..storage.columnar import ColumnarStore
+from .market_data import MarketDataCache, Quote, market_data_cache
+
+logger = structlog.get_logger(__name__)
+
+# Chart timeframes and their length in seconds
+TIMEFRAMES: Dict[str, int] = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+    "1w": 604800,
+}
+TIMEFRAME_NAMES: Dict[int, str] = {seconds: name for name, seconds in TIMEFRAMES.items()}
+
+# Exchange kline type for each timeframe, used to backfill history
+KUCOIN_INTERVALS: Dict[int, str] = {
+    60: "1min", 300: "5min", 900: "15min", 3600: "1hour", 14400: "4hour", 86400: "1day", 604800: "1week",
+}
+
+# The epoch was a Thursday; weekly bars open on Monday 00:00 UTC
+WEEK_OFFSET = 4 * 86400
+
+_ZERO = Decimal("0")
+
+def bucket_start(timestamp: int, seconds: int) -> int:
+    """Open time (seconds) of the bar of length ``seconds`` containing ``timestamp`` (seconds)"""
+    offset = WEEK_OFFSET if seconds == 604800 else 0
+    return (timestamp - offset) // seconds * seconds + offset
+
+class Candle:
+    """One OHLCV bar; the open bar of a series is updated in place"""
+    __slots__ = ("time", "open", "high", "low", "close", "volume", "ticks")
+
+    def __init__(self, time: int, open: Decimal, high: Decimal, low: Decimal, close: Decimal, volume: Decimal = _ZERO, ticks: int = 0):
+        self.time = time  # Bar open, seconds since epoch
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.ticks = ticks
+
+    def add(self, price: Decimal, size: Decimal) -> None:
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += size
+        self.ticks += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "time": self.time,
+            "open": str(self.open),
+            "high": str(self.high),
+            "low": str(self.low),
+            "close": str(self.close),
+            "volume": str(self.volume),
+        }
+
+    @classmethod
+    def from_kucoin(cls, row: List[str]) -> "Candle":
+        # [time, open, close, high, low, volume, turnover]
+        return cls(int(row[0]), Decimal(row[1]), Decimal(row[3]), Decimal(row[4]), Decimal(row[2]), Decimal(row[5]))
+
+def candles_to_columns(bars: List[Candle]) -> Dict[str, list]:
+    """Column arrays for appending bars to a columnar store"""
+    return {
+        "time": [bar.time for bar in bars],
+        "open": [float(bar.open) for bar in bars],
+        "high": [float(bar.high) for bar in bars],
+        "low": [float(bar.low) for bar in bars],
+        "close": [float(bar.close) for bar in bars],
+        "volume": [float(bar.volume) for bar in bars],
+    }
+
+def candles_from_columns(columns: Dict[str, np.ndarray]) -> List[Candle]:
+    """Bars from columnar store views (floats come back as their shortest decimal form)"""
+    return [
+        Candle(time, Decimal(repr(o)), Decimal(repr(h)), Decimal(repr(l)), Decimal(repr(c)), Decimal(repr(v)))
+        for time, o, h, l, c, v in zip(
+            columns["time"].tolist(), columns["open"].tolist(), columns["high"].tolist(),
+            columns["low"].tolist(), columns["close"].tolist(), columns["volume"].tolist(),
+        )
+    ]
+
+class CandleSeries:
+    """Bars of one timeframe for one symbol in a bounded ring buffer, oldest first.
+
+    The last bar is the open one. A tick for a later bucket starts a new
+    bar, evicting the oldest once ``capacity`` is reached; ticks older than
+    the open bar are ignored (counted in ``late``).
+    """
+
+    def __init__(self, seconds: int, capacity: int):
+        self.seconds = seconds
+        self.bars: Deque[Candle] = deque(maxlen=capacity)
+        self.late = 0
+
+    def add(self, timestamp: int, price: Decimal, size: Decimal) -> Optional[Candle]:
+        """Fold a tick (timestamp in seconds) into its bar; returns that bar, or None if too late"""
+        start = bucket_start(timestamp, self.seconds)
+        bars = self.bars
+        if bars:
+            current = bars[-1]
+            if start == current.time:
+                current.add(price, size)
+                return current
+            if start < current.time:
+                self.late += 1
+                return None
+        bar = Candle(start, price, price, price, price, size, 1)
+        bars.append(bar)
+        return bar
+
+    def backfill(self, history: List[Candle]) -> None:
+        """Put exchange bars (oldest first) in front of the live ones.
+
+        Live bars win on overlap, except that the first live bar only saw
+        ticks from when streaming began: it takes the exchange bar's open and
+        widens its range and volume with it.
+        """
+        first_live = self.bars[0] if self.bars else None
+        older = []
+        for bar in history:
+            if first_live is None or bar.time < first_live.time:
+                older.append(bar)
+            elif bar.time == first_live.time:
+                first_live.open = bar.open
+                first_live.high = max(first_live.high, bar.high)
+                first_live.low = min(first_live.low, bar.low)
+                first_live.volume += bar.volume
+        room = self.bars.maxlen - len(self.bars)
+        if room <= 0 or not older:
+            return
+        self.bars.extendleft(reversed(older[-room:]))
+
+    def last(self, limit: int, end: Optional[int] = None) -> List[Candle]:
+        """Up to ``limit`` most recent bars opening before ``end`` (seconds), oldest first"""
+        bars = self.bars
+        if end is None:
+            count = min(limit, len(bars))
+            return [bars[i] for i in range(len(bars) - count, len(bars))]
+        picked = []
+        for bar in reversed(bars):
+            if bar.time < end:
+                picked.append(bar)
+                if len(picked) == limit:
+                    break
+        picked.reverse()
+        return picked
+
+# Called with (symbol, {timeframe seconds: updated bar}) after every tick
+CandleListener = Callable[[str, Dict[int, Candle]], None]
+
+class CandleAggregator:
+    """OHLCV bars for every chart timeframe, built once on the server from market data ticks.
+
+    Each tick costs one O(1) update of the open bar per timeframe: the 1m
+    bar and every higher timeframe's bar fold the same tick, so higher
+    timeframes never rescan minutes. Bars live in a ring buffer of
+    ``capacity`` bars per (symbol, timeframe). History older than the
+    first live bar is fetched from the exchange the first time a
+    (symbol, timeframe) is read; concurrent readers share that request.
+    A read also leases the symbol's market data stream, so a chart being
+    polled keeps its open bar live.
+
+    With an ``archive`` store, every bar is appended to it when it closes
+    and ticks are appended once a minute, and reads reaching past the ring
+    buffer continue from the archive.
+    """
+
+    def __init__(
+        self,
+        gateway: Optional[ExchangeGateway] = None,
+        market_data: Optional[MarketDataCache] = None,
+        capacity: int = 1000,
+        timeframes: Optional[Dict[str, int]] = None,
+        archive: Optional[ColumnarStore] = None,
+    ):
+        self.gateway = gateway
+        self.market_data = market_data
+        self.archive = archive
+        self._pending_ticks: Dict[str, List[Tuple[int, float, float]]] = {}
+        self.capacity = capacity
+        self.timeframes = tuple(sorted((timeframes or TIMEFRAMES).values()))
+        self._series: Dict[str, Dict[int, CandleSeries]] = {}
+        self._listeners: List[CandleListener] = []
+        self._backfilled: Dict[Tuple[str, int], asyncio.Future] = {}
+
+        # Metrics
+        self.ticks = 0
+        self.backfills = 0
+        self.backfill_failures = 0
+        self.archived_bars = 0
+        self.archived_ticks = 0
+        self.archive_failures = 0
+
+    def add_listener(self, listener: CandleListener) -> None:
+        """Register a callback for bar updates (e.g. WebSocket fan-out)"""
+        self._listeners.append(listener)
+
+    def _series_for(self, symbol: str) -> Dict[int, CandleSeries]:
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._series[symbol] = {
+                seconds: CandleSeries(seconds, self.capacity) for seconds in self.timeframes
+            }
+        return series
+
+    # Updates
+
+    def on_quote(self, symbol: str, quote: Quote) -> None:
+        """Market data listener: the ticker carries last trade prices, not sizes, so volume comes from backfill"""
+        self.add_tick(symbol, quote.last, _ZERO, quote.timestamp)
+
+    def add_tick(self, symbol: str, price: Decimal, size: Decimal, timestamp_ms: int) -> None:
+        timestamp = timestamp_ms // 1000
+        updated = {}
+        archive = self.archive
+        for seconds, series in self._series_for(symbol).items():
+            previous = series.bars[-1] if archive is not None and series.bars else None
+            bar = series.add(timestamp, price, size)
+            if bar is not None:
+                updated[seconds] = bar
+                if previous is not None and bar is not previous:
+                    self._archive_bars(symbol, seconds, [previous])
+                    if seconds == self.timeframes[0]:
+                        self.flush_ticks(symbol)
+        self.ticks += 1
+        if archive is not None:
+            self._pending_ticks.setdefault(symbol, []).append((timestamp_ms, float(price), float(size)))
+        if not updated:
+            return
+        for listener in self._listeners:
+            try:
+                listener(symbol, updated)
+            except Exception as e:
+                logger.error("candle_listener_failed", symbol=symbol, error=str(e))
+
+    # Archive
+
+    def _archive_bars(self, symbol: str, seconds: int, bars: List[Candle]) -> None:
+        """Append closed bars newer than the archived ones"""
+        try:
+            series = self.archive.candles(symbol, TIMEFRAME_NAMES[seconds])
+            last = series.last_time()
+            bars = [bar for bar in bars if last is None or bar.time > last]
+            if bars:
+                self.archived_bars += series.append(candles_to_columns(bars))
+        except (OSError, ValueError) as e:
+            self.archive_failures += 1
+            logger.error("candle_archive_failed", symbol=symbol, timeframe=TIMEFRAME_NAMES[seconds], error=str(e))
+
+    def flush_ticks(self, symbol: Optional[str] = None) -> None:
+        """Append buffered ticks (of one symbol, or all) to the archive"""
+        symbols = [symbol] if symbol is not None else list(self._pending_ticks)
+        for name in symbols:
+            ticks = self._pending_ticks.pop(name, None)
+            if not ticks:
+                continue
+            try:
+                series = self.archive.ticks(name)
+                last = series.last_time()
+                # The archive stays time ordered: ticks older than its last one are dropped
+                ticks.sort(key=lambda tick: tick[0])
+                if last is not None and ticks[0][0] < last:
+                    ticks = [tick for tick in ticks if tick[0] >= last]
+                times, prices, sizes = zip(*ticks) if ticks else ((), (), ())
+                self.archived_ticks += series.append({"time": times, "price": prices, "size": sizes})
+            except (OSError, ValueError) as e:
+                self.archive_failures += 1
+                logger.error("tick_archive_failed", symbol=name, error=str(e))
+
+    # Reads
+
+    def current(self, symbol: str, seconds: int) -> Optional[Candle]:
+        series = self._series.get(symbol)
+        if series is None or not series[seconds].bars:
+            return None
+        return series[seconds].bars[-1]
+
+    async def history(self, symbol: str, timeframe: str, limit: int = 500, end: Optional[int] = None) -> List[Candle]:
+        """Most recent bars of a timeframe, oldest first, backfilled from the exchange on first read"""
+        seconds = TIMEFRAMES.get(timeframe)
+        if seconds is None or seconds not in self.timeframes:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        if self.market_data is not None:
+            self.market_data.lease(symbol)
+        await self._backfill(symbol, seconds)
+        series = self._series.get(symbol)
+        bars = series[seconds].last(limit, end) if series is not None else []
+        if len(bars) < limit and self.archive is not None:
+            before = bars[0].time if bars else end
+            try:
+                archived = self.archive.candles(symbol, timeframe).tail(limit - len(bars), before)
+                bars = candles_from_columns(archived) + bars
+            except (OSError, ValueError) as e:
+                logger.warning("candle_archive_read_failed", symbol=symbol, timeframe=timeframe, error=str(e))
+        return bars
+
+    async def _backfill(self, symbol: str, seconds: int) -> None:
+        if self.gateway is None:
+            return
+        key = (symbol, seconds)
+        pending = self._backfilled.get(key)
+        if pending is not None:
+            if not pending.done():
+                await asyncio.shield(pending)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._backfilled[key] = future
+        try:
+            end = int(time.time())
+            rows = await self.gateway.get_candles(
+                symbol, KUCOIN_INTERVALS[seconds], end - seconds * self.capacity, end
+            )
+            history = sorted((Candle.from_kucoin(row) for row in rows or ()), key=lambda bar: bar.time)
+            series = self._series_for(symbol)[seconds]
+            series.backfill(history)
+            self.backfills += 1
+            if self.archive is not None:
+                # Everything but the open bar is final
+                self._archive_bars(symbol, seconds, list(series.bars)[:-1])
+        except (ExchangeError, KeyError, ValueError, IndexError) as e:
+            # Serve live bars only; the next read tries again
+            self.backfill_failures += 1
+            del self._backfilled[key]
+            logger.warning("candle_backfill_failed", symbol=symbol, timeframe=TIMEFRAME_NAMES[seconds], error=str(e))
+        finally:
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._series),
+            "timeframes": [TIMEFRAME_NAMES.get(seconds, seconds) for seconds in self.timeframes],
+            "capacity": self.capacity,
+            "bars": sum(len(series.bars) for by_tf in self._series.values() for series in by_tf.values()),
+            "ticks": self.ticks,
+            "late_ticks": sum(series.late for by_tf in self._series.values() for series in by_tf.values()),
+            "backfills": self.backfills,
+            "backfill_failures": self.backfill_failures,
+            "archive": self.archive.root if self.archive is not None else None,
+            "archived_bars": self.archived_bars,
+            "archived_ticks": self.archived_ticks,
+            "archive_failures": self.archive_failures,
+        }
+
+def create_candle_archive(path: Optional[str] = None) -> Optional[ColumnarStore]:
+    """Columnar store at CANDLE_ARCHIVE_PATH, or None when unset"""
+    path = path if path is not None else config("CANDLE_ARCHIVE_PATH", default="")
+    return ColumnarStore(path) if path else None
+
+# Global instance
+candle_aggregator = CandleAggregator(
+    gateway=exchange_gateway,
+    market_data=market_data_cache,
+    capacity=config("CANDLE_CAPACITY", default=1000, cast=int),
+    archive=create_candle_archive(),
+)
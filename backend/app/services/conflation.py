@@ -0,0 +1,86 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+
+class _Stream:
+    """Conflation state for one (symbol, interval) pair"""
+    __slots__ = ("pending", "last_flush", "timer")
+
+    def __init__(self):
+        self.pending: Optional[Any] = None
+        self.last_flush = float("-inf")
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+class TickConflator:
+    """Keeps only the latest tick per symbol and cadence.
+
+    A tick is delivered immediately when the stream has been quiet for a full
+    interval; otherwise it replaces any pending tick and is flushed when the
+    interval elapses. A delivered tick is therefore never older than the
+    stream's interval.
+    """
+
+    def __init__(self, deliver: Callable[[str, int, Any], None]):
+        self._deliver = deliver
+        self._streams: Dict[Tuple[str, int], _Stream] = {}
+
+        # Metrics
+        self.ticks_received = 0
+        self.ticks_delivered = 0
+        self.ticks_conflated = 0
+        self.flushes_by_interval: Dict[int, int] = {}
+
+    def submit(self, symbol: str, interval_ms: int, payload: Any):
+        key = (symbol, interval_ms)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream()
+        self.ticks_received += 1
+
+        if stream.pending is not None:
+            # Superseded before it was flushed
+            self.ticks_conflated += 1
+            stream.pending = payload
+            return
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        interval = interval_ms / 1000
+        if now - stream.last_flush >= interval:
+            self._flush_now(key, stream, payload, now)
+        else:
+            stream.pending = payload
+            stream.timer = loop.call_at(stream.last_flush + interval, self._on_timer, key)
+
+    def discard(self, symbol: str, interval_ms: int):
+        """Drop a stream once nobody is subscribed to it at this cadence"""
+        stream = self._streams.pop((symbol, interval_ms), None)
+        if stream is not None and stream.timer is not None:
+            stream.timer.cancel()
+
+    def close(self):
+        for stream in self._streams.values():
+            if stream.timer is not None:
+                stream.timer.cancel()
+        self._streams.clear()
+
+    def _on_timer(self, key: Tuple[str, int]):
+        stream = self._streams.get(key)
+        if stream is None or stream.pending is None:
+            return
+        payload, stream.pending, stream.timer = stream.pending, None, None
+        self._flush_now(key, stream, payload, asyncio.get_running_loop().time())
+
+    def _flush_now(self, key: Tuple[str, int], stream: _Stream, payload: Any, now: float):
+        stream.last_flush = now
+        self.ticks_delivered += 1
+        self.flushes_by_interval[key[1]] = self.flushes_by_interval.get(key[1], 0) + 1
+        self._deliver(key[0], key[1], payload)
+
+    def stats(self) -> dict:
+        return {
+            "streams": len(self._streams),
+            "ticks_received": self.ticks_received,
+            "ticks_delivered": self.ticks_delivered,
+            "ticks_conflated": self.ticks_conflated,
+            "flushes_by_interval_ms": dict(self.flushes_by_interval),
+        }
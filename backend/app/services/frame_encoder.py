@@ -0,0 +1,104 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+from decimal import Decimal
+from datetime import datetime
+from enum import Enum
+import json
+
+try:  # Faster JSON backend, used automatically when installed
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+try:  # Compact binary format, opt-in per client
+    import msgpack
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+
+class FrameFormat(str, Enum):
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+class Frame:
+    """An encoded WebSocket frame shared by every recipient.
+
+    JSON frames go out as text frames, decoded from the encoded bytes once per
+    frame rather than once per send.
+    """
+    __slots__ = ("data", "binary", "text")
+
+    def __init__(self, data: bytes, binary: bool = False, text: Optional[str] = None):
+        self.data = data
+        self.binary = binary
+        self.text = text if text is not None or binary else data.decode("utf-8")
+
+    @classmethod
+    def from_text(cls, text: str) -> "Frame":
+        return cls(text.encode("utf-8"), binary=False, text=text)
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+def _json_dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+def _msgpack_dumps(payload: Any) -> bytes:
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+def available_formats() -> Tuple[FrameFormat, ...]:
+    if msgpack is not None:
+        return (FrameFormat.JSON, FrameFormat.MSGPACK)
+    return (FrameFormat.JSON,)
+
+def encode_frame(payload: Any, frame_format: FrameFormat = FrameFormat.JSON) -> Frame:
+    """Encode a payload once into a frame that can be sent to many clients"""
+    if frame_format == FrameFormat.MSGPACK:
+        return Frame(_msgpack_dumps(payload), binary=True)
+    return Frame(_json_dumps(payload), binary=False)
+
+def decode_message(data: Any, frame_format: FrameFormat = FrameFormat.JSON) -> Any:
+    """Decode an incoming client message (text or binary)"""
+    if isinstance(data, (bytes, bytearray)) and frame_format == FrameFormat.MSGPACK:
+        return msgpack.unpackb(data, raw=False)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def negotiate_format(
+    requested: Optional[str] = None,
+    subprotocols: Iterable[str] = (),
+) -> Tuple[FrameFormat, Optional[str]]:
+    """Pick a frame format from a ``?format=`` query param or WebSocket subprotocol.
+
+    Returns the format and the subprotocol to echo back on accept (if any).
+    Unknown or unavailable formats fall back to JSON.
+    """
+    supported = {f.value: f for f in available_formats()}
+    for subprotocol in subprotocols:
+        if subprotocol in supported:
+            return supported[subprotocol], subprotocol
+    if requested and requested.lower() in supported:
+        return supported[requested.lower()], None
+    return FrameFormat.JSON, None
+
+class FrameCache:
+    """Encodes a payload lazily, at most once per format"""
+    __slots__ = ("payload", "_frames")
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self._frames: Dict[FrameFormat, Frame] = {}
+
+    def get(self, frame_format: FrameFormat) -> Frame:
+        try:
+            return self._frames[frame_format]
+        except KeyError:
+            frame = self._frames[frame_format] = encode_frame(self.payload, frame_format)
+            return frame
@@ -0,0 +1,203 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+import asyncio
+import collections
+import os
+import resource
+import sys
+import time
+
+from decouple import config
+import structlog
+
+from .metrics import EVENT_LOOP_LAG
+
+logger = structlog.get_logger(__name__)
+
+# A probe returns optional detail; {"status": "disabled"} marks a dependency
+# that is not configured. Raising (or returning False) marks it down.
+Probe = Callable[[], Awaitable[Any]]
+
+PROCESS_STARTED = time.time()
+
+def format_uptime(seconds: float) -> str:
+    """``"3d 4h 12m"`` style, down to the minute"""
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    return f"{hours}h {minutes}m"
+
+def memory_usage() -> Dict[str, Optional[int]]:
+    """Current and peak resident set size in bytes (current needs /proc)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak_bytes = peak if sys.platform == "darwin" else peak * 1024
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            rss_bytes = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        rss_bytes = None
+    return {"rss_bytes": rss_bytes, "peak_rss_bytes": peak_bytes}
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task.
+
+    Sleeps ``interval`` seconds at a time; anything beyond that is time
+    the loop spent on other work before it could resume us. Keeps the
+    last ``window`` samples for a recent maximum.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 120):
+        self.interval = interval
+        self.samples: Deque[float] = collections.deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.samples.append(lag)
+            EVENT_LOOP_LAG.set(lag)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        if not self.samples:
+            return {"last_ms": None, "max_ms": None}
+        return {
+            "last_ms": round(self.samples[-1] * 1000, 3),
+            "max_ms": round(max(self.samples) * 1000, 3),
+        }
+
+class HealthMonitor:
+    """Dependency probes run concurrently, each under a timeout, with the report cached.
+
+    Within ``ttl`` seconds every caller gets the same report, and callers
+    arriving while a check is running wait for it instead of starting
+    another, so load balancer polls and the admin panel cost at most one
+    round of probes per ``ttl``. A failing probe in ``critical`` makes the
+    service unhealthy; any other failure only degrades it.
+    """
+
+    def __init__(self, ttl: float = 2.0, timeout: float = 1.0, lag_monitor: Optional[LoopLagMonitor] = None):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.lag_monitor = lag_monitor or LoopLagMonitor()
+        self._probes: Dict[str, Probe] = {}
+        self._critical: Set[str] = set()
+        self._report: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._pending: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.cache_hits = 0
+
+    def add_probe(self, name: str, probe: Probe, critical: bool = False) -> None:
+        self._probes[name] = probe
+        if critical:
+            self._critical.add(name)
+
+    def start(self) -> None:
+        self.lag_monitor.start()
+
+    async def stop(self) -> None:
+        await self.lag_monitor.stop()
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
+    async def check(self) -> Dict[str, Any]:
+        """The cached report, refreshed when older than ``ttl``"""
+        if self._report is not None and time.monotonic() - self._checked_at < self.ttl:
+            self.cache_hits += 1
+            return self._report
+        if self._pending is None:
+            self._pending = asyncio.create_task(self._refresh())
+            self._pending.add_done_callback(self._clear_pending)
+        else:
+            self.cache_hits += 1
+        # Shielded: a caller disconnecting must not cancel the check others wait on
+        return await asyncio.shield(self._pending)
+
+    def _clear_pending(self, task: asyncio.Task) -> None:
+        if self._pending is task:
+            self._pending = None
+
+    async def _refresh(self) -> Dict[str, Any]:
+        names = list(self._probes)
+        results = await asyncio.gather(*(self._run_probe(name) for name in names))
+        checks = dict(zip(names, results))
+        failed = {name for name, result in checks.items() if result["status"] in ("down", "timeout")}
+        if failed & self._critical:
+            status = "unhealthy"
+        elif failed:
+            status = "degraded"
+        else:
+            status = "healthy"
+        uptime = time.time() - PROCESS_STARTED
+        self._report = {
+            "status": status,
+            "checks": checks,
+            "uptime_seconds": round(uptime, 1),
+            "uptime": format_uptime(uptime),
+            "event_loop_lag": self.lag_monitor.stats(),
+            "memory": memory_usage(),
+            "checked_at": time.time(),
+        }
+        self._checked_at = time.monotonic()
+        self.checks += 1
+        if failed:
+            logger.warning("health_check_failed", status=status, failed=sorted(failed))
+        return self._report
+
+    async def _run_probe(self, name: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(self._probes[name](), self.timeout)
+        except asyncio.TimeoutError:
+            result = {"status": "timeout"}
+        except Exception as e:
+            result = {"status": "down", "error": str(e) or type(e).__name__}
+        else:
+            if detail is False:
+                result = {"status": "down"}
+            elif isinstance(detail, dict):
+                result = {"status": "ok", **detail}
+            else:
+                result = {"status": "ok"}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "probes": sorted(self._probes),
+            "critical": sorted(self._critical),
+            "ttl": self.ttl,
+            "timeout": self.timeout,
+            "checks": self.checks,
+            "cache_hits": self.cache_hits,
+            "event_loop_lag": self.lag_monitor.stats(),
+        }
+
+def create_health_monitor() -> HealthMonitor:
+    return HealthMonitor(
+        ttl=config("HEALTH_CACHE_TTL", default=2.0, cast=float),
+        timeout=config("HEALTH_PROBE_TIMEOUT", default=1.0, cast=float),
+        lag_monitor=LoopLagMonitor(interval=config("HEALTH_LOOP_LAG_INTERVAL", default=0.5, cast=float)),
+    )
+
+# Global instance
+health_monitor = create_health_monitor()
@@ -0,0 +1,273 @@
+from typing import Callable, Dict, List, Optional
+from decimal import Decimal
+import asyncio
+import time
+
+from decouple import config
+import structlog
+
+from ..exchange.base import ExchangeError, ExchangeGateway
+from ..exchange.factory import exchange_gateway
+from .market_data_feeds import KuCoinTickerFeed, MarketDataFeed, SimulatedTickerFeed
+
+logger = structlog.get_logger(__name__)
+
+class MarketDataUnavailable(Exception):
+    """No quote within the staleness limits and the REST snapshot failed"""
+
+class Quote:
+    """Top of book and last trade for one symbol"""
+    __slots__ = ("symbol", "bid", "ask", "last", "timestamp", "received_at", "source")
+
+    def __init__(self, symbol: str, bid: Decimal, ask: Decimal, last: Decimal, timestamp: int, received_at: float, source: str):
+        self.symbol = symbol
+        self.bid = bid
+        self.ask = ask
+        self.last = last
+        self.timestamp = timestamp      # Exchange time, ms since epoch
+        self.received_at = received_at  # Local monotonic clock
+        self.source = source            # "stream" or "rest"
+
+    def age_ms(self, now: Optional[float] = None) -> float:
+        return ((now if now is not None else time.monotonic()) - self.received_at) * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "price": str(self.last),
+            "bid": str(self.bid),
+            "ask": str(self.ask),
+            "timestamp": self.timestamp,
+        }
+
+# Called with (symbol, quote) for every streamed tick
+QuoteListener = Callable[[str, Quote], None]
+
+class MarketDataCache:
+    """Latest quote per symbol, fed by one upstream stream per symbol.
+
+    Readers (REST, validation, WebSocket fan-out) share the cache; a symbol
+    is streamed while WebSocket clients hold it (``acquire``/``release``)
+    or while it has been read within the lease period. Reads are O(1).
+    A quote older than ``stale_after_ms`` is refreshed from a REST snapshot
+    through the exchange gateway's pooled client; concurrent refreshes of
+    the same symbol share one request. If that fails, a quote younger than
+    ``max_stale_ms`` is still served.
+    """
+
+    def __init__(
+        self,
+        feed: Optional[MarketDataFeed] = None,
+        gateway: Optional[ExchangeGateway] = None,
+        stale_after_ms: int = 2000,
+        max_stale_ms: int = 30000,
+        lease_seconds: float = 300.0,
+    ):
+        self.feed = feed
+        self.gateway = gateway
+        self.stale_after_ms = stale_after_ms
+        self.max_stale_ms = max_stale_ms
+        self.lease_seconds = lease_seconds
+
+        self.quotes: Dict[str, Quote] = {}
+        self._refs: Dict[str, int] = {}       # symbol -> WebSocket demand count
+        self._leases: Dict[str, float] = {}   # symbol -> lease expiry (monotonic)
+        self._streaming: set = set()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listeners: List[QuoteListener] = []
+        self._janitor: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.ticks = 0
+        self.fresh_reads = 0
+        self.rest_snapshots = 0
+        self.rest_failures = 0
+        self.stale_reads = 0
+
+    async def start(self) -> None:
+        if self.feed is not None:
+            await self.feed.start(self._on_tick)
+        self._janitor = asyncio.create_task(self._expire_leases_loop())
+
+    async def stop(self) -> None:
+        if self._janitor is not None:
+            self._janitor.cancel()
+            self._janitor = None
+        if self.feed is not None:
+            await self.feed.stop()
+
+    def add_listener(self, listener: QuoteListener) -> None:
+        """Register a callback for streamed ticks (e.g. WebSocket fan-out)"""
+        self._listeners.append(listener)
+
+    # Demand
+
+    def acquire(self, symbol: str) -> None:
+        """Hold a symbol's stream open (one call per subscribing holder)"""
+        self._refs[symbol] = self._refs.get(symbol, 0) + 1
+        self._sync_stream(symbol)
+
+    def release(self, symbol: str) -> None:
+        refs = self._refs.get(symbol, 0) - 1
+        if refs > 0:
+            self._refs[symbol] = refs
+        else:
+            self._refs.pop(symbol, None)
+        self._sync_stream(symbol)
+
+    def lease(self, symbol: str) -> None:
+        """Keep a symbol streaming for the lease period without reading it"""
+        self._touch(symbol, time.monotonic())
+
+    def _touch(self, symbol: str, now: float) -> None:
+        if symbol not in self._refs:
+            self._leases[symbol] = now + self.lease_seconds
+            if symbol not in self._streaming:
+                self._sync_stream(symbol)
+
+    def _sync_stream(self, symbol: str) -> None:
+        wanted = symbol in self._refs or symbol in self._leases
+        if wanted == (symbol in self._streaming):
+            return
+        if wanted:
+            self._streaming.add(symbol)
+            if self.feed is not None:
+                self.feed.subscribe(symbol)
+        else:
+            self._streaming.discard(symbol)
+            if self.feed is not None:
+                self.feed.unsubscribe(symbol)
+
+    async def _expire_leases_loop(self):
+        interval = max(1.0, min(30.0, self.lease_seconds / 10))
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for symbol in [s for s, expires in self._leases.items() if expires <= now]:
+                del self._leases[symbol]
+                self._sync_stream(symbol)
+
+    # Updates
+
+    def _on_tick(self, symbol: str, bid: Decimal, ask: Decimal, last: Decimal, timestamp: int) -> None:
+        quote = Quote(symbol, bid, ask, last, timestamp, time.monotonic(), "stream")
+        self.quotes[symbol] = quote
+        self.ticks += 1
+        for listener in self._listeners:
+            try:
+                listener(symbol, quote)
+            except Exception as e:
+                logger.error("market_data_listener_failed", symbol=symbol, error=str(e))
+
+    # Reads
+
+    def get_quote(self, symbol: str) -> Optional[Quote]:
+        """Latest quote regardless of age (O(1), never does I/O)"""
+        return self.quotes.get(symbol)
+
+    def fresh_quote(self, symbol: str) -> Optional[Quote]:
+        """Latest quote if it is within ``stale_after_ms``; keeps the symbol streaming"""
+        now = time.monotonic()
+        self._touch(symbol, now)
+        quote = self.quotes.get(symbol)
+        if quote is not None and quote.age_ms(now) <= self.stale_after_ms:
+            return quote
+        return None
+
+    async def get(self, symbol: str) -> Quote:
+        """Fresh quote, refreshed from a REST snapshot when the stream is behind"""
+        quote = self.fresh_quote(symbol)
+        if quote is not None:
+            self.fresh_reads += 1
+            return quote
+        try:
+            return await self._snapshot(symbol)
+        except (ExchangeError, MarketDataUnavailable, KeyError, ValueError) as e:
+            self.rest_failures += 1
+            quote = self.quotes.get(symbol)
+            if quote is not None and quote.age_ms() <= self.max_stale_ms:
+                self.stale_reads += 1
+                return quote
+            # Don't keep streaming a symbol nobody could price
+            if self._leases.pop(symbol, None) is not None:
+                self._sync_stream(symbol)
+            raise MarketDataUnavailable(f"No market data for {symbol}: {e}") from e
+
+    async def _snapshot(self, symbol: str) -> Quote:
+        if self.gateway is None:
+            raise MarketDataUnavailable("No exchange gateway for REST snapshots")
+        inflight = self._inflight.get(symbol)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[symbol] = future
+        try:
+            data = await self.gateway.get_ticker(symbol)
+            self.rest_snapshots += 1
+            timestamp = int(data.get("time") or time.time() * 1000)
+            quote = self.quotes.get(symbol)
+            # A streamed tick may have arrived while the request was in flight
+            if quote is None or quote.timestamp <= timestamp:
+                quote = Quote(
+                    symbol,
+                    Decimal(data["bestBid"]),
+                    Decimal(data["bestAsk"]),
+                    Decimal(data["price"]),
+                    timestamp,
+                    time.monotonic(),
+                    "rest",
+                )
+                self.quotes[symbol] = quote
+            future.set_result(quote)
+            return quote
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures aren't logged as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._inflight[symbol]
+
+    def stats(self) -> dict:
+        return {
+            "feed": type(self.feed).__name__ if self.feed else None,
+            "feed_connected": self.feed.connected if self.feed else False,
+            "symbols_cached": len(self.quotes),
+            "symbols_streaming": len(self._streaming),
+            "websocket_demand": len(self._refs),
+            "leased": len(self._leases),
+            "stale_after_ms": self.stale_after_ms,
+            "max_stale_ms": self.max_stale_ms,
+            "ticks": self.ticks,
+            "fresh_reads": self.fresh_reads,
+            "rest_snapshots": self.rest_snapshots,
+            "rest_failures": self.rest_failures,
+            "stale_reads": self.stale_reads,
+        }
+
+def create_market_data_feed(kind: str = None) -> Optional[MarketDataFeed]:
+    """Build the feed selected by MARKET_DATA_FEED ('none', 'simulated' or 'kucoin')"""
+    kind = (kind or config("MARKET_DATA_FEED", default="simulated")).lower()
+    if kind == "none":
+        return None
+    if kind == "simulated":
+        from ..exchange.mock_server import MOCK_PRICES
+
+        return SimulatedTickerFeed(
+            MOCK_PRICES, interval=config("MARKET_DATA_SIM_INTERVAL_MS", default=500, cast=int) / 1000
+        )
+    if kind == "kucoin":
+        from ..exchange.kucoin import KUCOIN_SANDBOX_URL, KUCOIN_URL
+
+        default_url = KUCOIN_SANDBOX_URL if config("KUCOIN_SANDBOX", default=False, cast=bool) else KUCOIN_URL
+        return KuCoinTickerFeed(config("KUCOIN_BASE_URL", default=default_url))
+    raise ValueError(f"Unknown market data feed: {kind}")
+
+# Global instance
+market_data_cache = MarketDataCache(
+    feed=create_market_data_feed(),
+    gateway=exchange_gateway,
+    stale_after_ms=config("MARKET_DATA_STALE_MS", default=2000, cast=int),
+    max_stale_ms=config("MARKET_DATA_MAX_STALE_MS", default=30000, cast=int),
+    lease_seconds=config("MARKET_DATA_LEASE_SECONDS", default=300.0, cast=float),
+)
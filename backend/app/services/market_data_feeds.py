@@ -0,0 +1,329 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Set
+from decimal import Decimal
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Called with (symbol, bid, ask, last, exchange timestamp in ms)
+TickHandler = Callable[[str, Decimal, Decimal, Decimal, int], None]
+
+# Called with (symbol, incremental update) in KuCoin level2 format:
+# {"sequenceStart", "sequenceEnd", "changes": {"bids": [[price, size, seq]], "asks": [...]}, "time"}
+Level2Handler = Callable[[str, Dict[str, Any]], None]
+
+class MarketDataFeed(ABC):
+    """Upstream ticker stream.
+
+    ``subscribe``/``unsubscribe`` are called at most once per symbol
+    transition by the cache, so the feed holds exactly one upstream
+    subscription per symbol regardless of how many readers there are.
+    """
+
+    def __init__(self):
+        self.symbols: Set[str] = set()
+        self._on_tick: Optional[TickHandler] = None
+
+    async def start(self, on_tick: TickHandler) -> None:
+        self._on_tick = on_tick
+
+    async def stop(self) -> None:
+        self._on_tick = None
+
+    @abstractmethod
+    def subscribe(self, symbol: str) -> None:
+        ...
+
+    @abstractmethod
+    def unsubscribe(self, symbol: str) -> None:
+        ...
+
+    @property
+    def connected(self) -> bool:
+        return True
+
+class SimulatedTickerFeed(MarketDataFeed):
+    """Random-walk ticks for development and benchmarks"""
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, Decimal]] = None,
+        interval: float = 0.5,
+        volatility: float = 0.0005,
+        seed: Optional[int] = None,
+    ):
+        super().__init__()
+        self.prices = dict(prices or {})
+        self.interval = interval
+        self.volatility = volatility
+        self._random = random.Random(seed)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, on_tick: TickHandler) -> None:
+        await super().start(on_tick)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await super().stop()
+
+    def subscribe(self, symbol: str) -> None:
+        self.symbols.add(symbol)
+
+    def unsubscribe(self, symbol: str) -> None:
+        self.symbols.discard(symbol)
+
+    def tick(self, symbol: str) -> None:
+        price = self.prices[symbol]
+        step = Decimal(str(round(self._random.gauss(0, self.volatility), 6)))
+        price = max(price * (1 + step), Decimal("0.0001")).quantize(Decimal("0.0001"))
+        self.prices[symbol] = price
+        spread = (price * Decimal("0.0001")).quantize(Decimal("0.0001"))
+        self._on_tick(symbol, price - spread, price + spread, price, int(time.time() * 1000))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for symbol in list(self.symbols):
+                # Unknown symbols never tick, like an unlisted pair upstream
+                if self._on_tick is not None and symbol in self.prices:
+                    self.tick(symbol)
+
+class KuCoinTickerFeed(MarketDataFeed):
+    """KuCoin public WebSocket ``/market/ticker`` stream.
+
+    One connection carries every symbol; subscriptions are batched up to
+    100 symbols per topic and replayed after a reconnect.
+    """
+
+    TOPIC = "/market/ticker:"
+    MAX_SYMBOLS_PER_TOPIC = 100
+
+    def __init__(self, rest_base_url: str, reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        super().__init__()
+        self.rest_base_url = rest_base_url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._task: Optional[asyncio.Task] = None
+        self._ws = None
+        self.reconnects = 0
+
+    async def start(self, on_tick: TickHandler) -> None:
+        await super().start(on_tick)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await super().stop()
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    def subscribe(self, symbol: str) -> None:
+        self.symbols.add(symbol)
+        self._send_topic("subscribe", [symbol])
+
+    def unsubscribe(self, symbol: str) -> None:
+        self.symbols.discard(symbol)
+        self._send_topic("unsubscribe", [symbol])
+
+    def _send_topic(self, action: str, symbols):
+        if self._ws is None:
+            return  # Replayed on (re)connect
+        message = json.dumps({
+            "id": uuid.uuid4().hex,
+            "type": action,
+            "topic": self.TOPIC + ",".join(symbols),
+            "response": False,
+        })
+        asyncio.create_task(self._safe_send(message))
+
+    async def _safe_send(self, message: str):
+        try:
+            await self._ws.send(message)
+        except Exception as e:
+            logger.warning("kucoin_feed_send_failed", error=str(e))
+
+    async def _connect_info(self):
+        import httpx
+
+        async with httpx.AsyncClient(base_url=self.rest_base_url, timeout=10.0) as client:
+            response = await client.post("/api/v1/bullet-public")
+            data = response.json()["data"]
+        server = data["instanceServers"][0]
+        url = f"{server['endpoint']}?token={data['token']}&connectId={uuid.uuid4().hex}"
+        return url, server.get("pingInterval", 18000) / 1000
+
+    async def _run(self):
+        import websockets
+
+        delay = self.reconnect_delay
+        while True:
+            try:
+                url, ping_interval = await self._connect_info()
+                async with websockets.connect(url, ping_interval=None) as ws:
+                    self._ws = ws
+                    delay = self.reconnect_delay
+                    symbols = sorted(self.symbols)
+                    for i in range(0, len(symbols), self.MAX_SYMBOLS_PER_TOPIC):
+                        self._send_topic("subscribe", symbols[i:i + self.MAX_SYMBOLS_PER_TOPIC])
+                    pinger = asyncio.create_task(self._ping_loop(ws, ping_interval))
+                    try:
+                        async for raw in ws:
+                            self._handle(raw)
+                    finally:
+                        pinger.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("kucoin_feed_disconnected", error=str(e))
+            self._ws = None
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _ping_loop(self, ws, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await ws.send(json.dumps({"id": uuid.uuid4().hex, "type": "ping"}))
+
+    def _handle(self, raw):
+        message = json.loads(raw)
+        if message.get("type") != "message" or self._on_tick is None:
+            return
+        topic = message.get("topic", "")
+        if not topic.startswith(self.TOPIC):
+            return
+        self._dispatch(topic[len(self.TOPIC):], message["data"])
+
+    def _dispatch(self, symbol: str, data: Dict[str, Any]):
+        self._on_tick(
+            symbol,
+            Decimal(data["bestBid"]),
+            Decimal(data["bestAsk"]),
+            Decimal(data["price"]),
+            int(data.get("time") or time.time() * 1000),
+        )
+
+class SimulatedLevel2Feed(MarketDataFeed):
+    """Random level changes around a mid price, with snapshots from the same state.
+
+    ``gap_probability`` drops whole updates to exercise sequence-gap recovery.
+    """
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, Decimal]] = None,
+        interval: float = 0.1,
+        levels: int = 50,
+        changes_per_update: int = 4,
+        gap_probability: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        super().__init__()
+        self.prices = dict(prices or {})
+        self.interval = interval
+        self.levels = levels
+        self.changes_per_update = changes_per_update
+        self.gap_probability = gap_probability
+        self._random = random.Random(seed)
+        self._books: Dict[str, Dict[str, Dict[Decimal, Decimal]]] = {}
+        self._sequences: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, on_update: Level2Handler) -> None:
+        await super().start(on_update)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await super().stop()
+
+    def subscribe(self, symbol: str) -> None:
+        self.symbols.add(symbol)
+        if symbol in self.prices and symbol not in self._books:
+            self._seed(symbol)
+
+    def unsubscribe(self, symbol: str) -> None:
+        self.symbols.discard(symbol)
+
+    def _tick_size(self, symbol: str) -> Decimal:
+        return (self.prices[symbol] * Decimal("0.0001")).quantize(Decimal("0.0001")) or Decimal("0.0001")
+
+    def _seed(self, symbol: str):
+        mid, tick = self.prices[symbol], self._tick_size(symbol)
+        self._books[symbol] = {
+            "bids": {mid - tick * i: Decimal(self._random.randint(1, 100)) / 10 for i in range(1, self.levels + 1)},
+            "asks": {mid + tick * i: Decimal(self._random.randint(1, 100)) / 10 for i in range(1, self.levels + 1)},
+        }
+        self._sequences[symbol] = 1
+
+    async def snapshot(self, symbol: str) -> Dict[str, Any]:
+        """Full book in the shape of KuCoin's REST level2 snapshot"""
+        book = self._books.get(symbol)
+        if book is None:
+            raise KeyError(symbol)
+        return {
+            "sequence": str(self._sequences[symbol]),
+            "time": int(time.time() * 1000),
+            "bids": [[str(p), str(s)] for p, s in sorted(book["bids"].items(), reverse=True)],
+            "asks": [[str(p), str(s)] for p, s in sorted(book["asks"].items())],
+        }
+
+    def update(self, symbol: str) -> Dict[str, Any]:
+        """Mutate the simulated book and return the incremental update"""
+        book, tick, mid = self._books[symbol], self._tick_size(symbol), self.prices[symbol]
+        start = self._sequences[symbol] + 1
+        sequence = start - 1
+        changes: Dict[str, List[List[str]]] = {"bids": [], "asks": []}
+        for _ in range(self.changes_per_update):
+            side = "bids" if self._random.random() < 0.5 else "asks"
+            offset = tick * self._random.randint(1, self.levels)
+            price = mid - offset if side == "bids" else mid + offset
+            size = Decimal(self._random.randint(0, 100)) / 10  # 0 removes the level
+            sequence += 1
+            if size:
+                book[side][price] = size
+            else:
+                book[side].pop(price, None)
+            changes[side].append([str(price), str(size), str(sequence)])
+        self._sequences[symbol] = sequence
+        return {
+            "sequenceStart": start,
+            "sequenceEnd": sequence,
+            "symbol": symbol,
+            "changes": changes,
+            "time": int(time.time() * 1000),
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for symbol in list(self.symbols):
+                if self._on_tick is None or symbol not in self._books:
+                    continue
+                update = self.update(symbol)
+                if self.gap_probability and self._random.random() < self.gap_probability:
+                    continue  # Lost in transit
+                self._on_tick(symbol, update)
+
+class KuCoinLevel2Feed(KuCoinTickerFeed):
+    """KuCoin public ``/market/level2`` incremental order book stream"""
+
+    TOPIC = "/market/level2:"
+
+    def _dispatch(self, symbol: str, data: Dict[str, Any]):
+        self._on_tick(symbol, data)
@@ -0,0 +1,169 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Label values only ever come from fixed sets: route templates (never raw
+# paths), exchange endpoint templates, and the most subscribed symbols with
+# the rest folded into "other". Client ids and order ids are never labels.
+
+# Sub-millisecond work (validation, fan-out) needs finer buckets than the defaults
+FAST_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 1e-2, 1e-1)
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "cronix_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=REQUEST_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("cronix_http_requests_in_flight", "HTTP requests being handled")
+
+BRACKET_VALIDATION_SECONDS = Histogram(
+    "cronix_bracket_validation_seconds", "Bracket order validation time",
+    ["kind"], buckets=FAST_BUCKETS,
+)
+VALIDATE_CREATE = BRACKET_VALIDATION_SECONDS.labels("create")
+VALIDATE_AMEND = BRACKET_VALIDATION_SECONDS.labels("amend")
+
+WS_FANOUT_SECONDS = Histogram(
+    "cronix_ws_fanout_seconds", "Time to encode and enqueue one message for all its recipients",
+    ["stream"], buckets=FAST_BUCKETS,
+)
+FANOUT_PRICE = WS_FANOUT_SECONDS.labels("price")
+FANOUT_DEPTH = WS_FANOUT_SECONDS.labels("depth")
+FANOUT_ORDER = WS_FANOUT_SECONDS.labels("order")
+FANOUT_CANDLE = WS_FANOUT_SECONDS.labels("candle")
+FANOUT_BROADCAST = WS_FANOUT_SECONDS.labels("broadcast")
+
+EXCHANGE_REQUEST_SECONDS = Histogram(
+    "cronix_exchange_request_duration_seconds", "Exchange REST latency by endpoint template",
+    ["method", "endpoint"], buckets=REQUEST_BUCKETS,
+)
+EXCHANGE_ERRORS = Counter(
+    "cronix_exchange_errors_total", "Failed exchange requests",
+    ["method", "endpoint", "kind"],
+)
+
+EVENT_LOOP_LAG = Gauge("cronix_event_loop_lag_seconds", "Last measured event loop wake-up delay")
+
+def observe_exchange_request(method: str, template: str, seconds: float, error: Optional[str]) -> None:
+    """Exchange gateway request listener"""
+    EXCHANGE_REQUEST_SECONDS.labels(method, template).observe(seconds)
+    if error is not None:
+        EXCHANGE_ERRORS.labels(method, template, error).inc()
+
+class MetricsMiddleware:
+    """ASGI middleware timing HTTP requests by method, route template and status.
+
+    The template is looked up from the endpoint the router matched, so
+    ``/api/bracket-orders/{order_id}`` is one series however many ids are
+    requested; anything unrouted is reported as "unmatched". Labelled
+    children are cached, so a request costs two clock reads, a dict lookup
+    and an observation.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+        self._templates: Optional[Dict[Any, str]] = None
+        self._children: Dict[Tuple[str, str, int], Any] = {}
+
+    def _route(self, scope: Dict[str, Any]) -> str:
+        if self._templates is None:
+            self._templates = {
+                route.endpoint: route.path
+                for route in getattr(scope.get("app"), "routes", ())
+                if hasattr(route, "endpoint")
+            }
+        return self._templates.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            key = (scope["method"], self._route(scope), status)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = HTTP_REQUEST_SECONDS.labels(*key)
+            child.observe(elapsed)
+
+class WebSocketCollector(Collector):
+    """Connection, subscription and send queue gauges read from the manager at scrape time.
+
+    Nothing is tracked on the hot path. Per-symbol subscriptions are
+    reported for the ``top_symbols`` most subscribed symbols; the rest are
+    summed under ``symbol="other"``.
+    """
+
+    def __init__(self, manager: Any, top_symbols: int = 20):
+        self.manager = manager
+        self.top_symbols = top_symbols
+
+    def collect(self) -> Iterable[Any]:
+        manager = self.manager
+        connections = list(manager.active_connections.values())
+
+        yield GaugeMetricFamily("cronix_ws_connections", "Open WebSocket connections", value=len(connections))
+
+        subscriptions = GaugeMetricFamily(
+            "cronix_ws_subscriptions", "Price subscriptions per symbol", labels=["symbol"]
+        )
+        counts = sorted(
+            ((len(manager.price_subscribers.subscribers(symbol)), symbol) for symbol in manager.price_subscribers.symbols()),
+            reverse=True,
+        )
+        for count, symbol in counts[:self.top_symbols]:
+            subscriptions.add_metric([symbol], count)
+        if len(counts) > self.top_symbols:
+            subscriptions.add_metric(["other"], sum(count for count, _ in counts[self.top_symbols:]))
+        yield subscriptions
+
+        yield GaugeMetricFamily(
+            "cronix_ws_depth_subscriptions", "Order book depth subscriptions",
+            value=manager.depth_subscribers.subscription_count(),
+        )
+        yield GaugeMetricFamily(
+            "cronix_ws_order_subscribers", "Clients streaming bracket order updates",
+            value=len(manager.order_subscribers),
+        )
+
+        depths = [connection.depth for connection in connections]
+        queue_depth = GaugeMetricFamily(
+            "cronix_ws_send_queue_depth", "Frames waiting in client send queues", labels=["stat"]
+        )
+        queue_depth.add_metric(["max"], max(depths, default=0))
+        queue_depth.add_metric(["total"], sum(depths))
+        yield queue_depth
+
+        yield CounterMetricFamily(
+            "cronix_ws_frames_dropped", "Frames dropped from full send queues",
+            value=manager.total_dropped + sum(connection.dropped for connection in connections),
+        )
+        yield CounterMetricFamily(
+            "cronix_ws_frames_coalesced", "Frames superseded by a newer one before sending",
+            value=manager.total_coalesced + sum(connection.coalesced for connection in connections),
+        )
+        yield CounterMetricFamily(
+            "cronix_ws_slow_consumer_disconnects", "Clients disconnected for not keeping up",
+            value=manager.slow_consumer_disconnects,
+        )
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition body and content type for the /metrics endpoint"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,155 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bisect import bisect_left, insort
+from decimal import Decimal
+
+Level = Tuple[Decimal, Decimal]  # (price, size)
+
+_ZERO = Decimal("0")
+
+class SequenceGap(Exception):
+    """An incremental update does not follow the book's sequence"""
+
+    def __init__(self, expected: int, received: int):
+        super().__init__(f"Expected sequence {expected}, received {received}")
+        self.expected = expected
+        self.received = received
+
+class BookSide:
+    """Price levels of one side, best first.
+
+    Prices live in a bisect-maintained sorted list (negated for bids so the
+    best level is always index 0) next to a price -> size dict. Lookups are
+    O(log n), the best level is O(1) and top-N is O(N). Adding or removing
+    a level shifts the list with a single memmove, which for books of a few
+    thousand levels is far cheaper than a tree in pure Python.
+    """
+    __slots__ = ("descending", "_keys", "sizes")
+
+    def __init__(self, descending: bool):
+        self.descending = descending
+        self._keys: List[Decimal] = []
+        self.sizes: Dict[Decimal, Decimal] = {}
+
+    def _key(self, price: Decimal) -> Decimal:
+        return -price if self.descending else price
+
+    def set(self, price: Decimal, size: Decimal) -> bool:
+        """Set a level's size (0 removes it). Returns whether the book changed"""
+        if size == _ZERO:
+            if self.sizes.pop(price, None) is None:
+                return False
+            keys = self._keys
+            i = bisect_left(keys, self._key(price))
+            del keys[i]
+            return True
+        previous = self.sizes.get(price)
+        if previous is None:
+            insort(self._keys, self._key(price))
+        elif previous == size:
+            return False
+        self.sizes[price] = size
+        return True
+
+    def load(self, levels: Sequence[Tuple[Any, Any]]):
+        sizes = {}
+        for price, size in levels:
+            size = Decimal(size)
+            if size != _ZERO:
+                sizes[Decimal(price)] = size
+        self.sizes = sizes
+        self._keys = sorted(self._key(price) for price in sizes)
+
+    def best(self) -> Optional[Level]:
+        if not self._keys:
+            return None
+        price = self._key(self._keys[0])
+        return price, self.sizes[price]
+
+    def top(self, n: int) -> List[Level]:
+        sizes = self.sizes
+        if self.descending:
+            return [(-key, sizes[-key]) for key in self._keys[:n]]
+        return [(key, sizes[key]) for key in self._keys[:n]]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, price: Decimal) -> bool:
+        return price in self.sizes
+
+class OrderBook:
+    """L2 book maintained from a snapshot plus KuCoin-style incremental updates.
+
+    An update carries ``sequenceStart``/``sequenceEnd`` and per-side changes
+    ``[price, size, sequence]``; size 0 removes a level and price 0 is a
+    sequence-only change. Updates already covered by the book are ignored;
+    an update starting past ``sequence + 1`` raises SequenceGap and the book
+    must be reloaded from a snapshot.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.sequence = 0
+        self.timestamp = 0
+        self.updates_applied = 0
+
+    def load_snapshot(self, sequence: int, bids: Sequence, asks: Sequence, timestamp: int = 0):
+        self.bids.load(bids)
+        self.asks.load(asks)
+        self.sequence = int(sequence)
+        self.timestamp = timestamp
+
+    def apply(self, update: Dict[str, Any]) -> bool:
+        """Apply an incremental update. Returns whether any level changed"""
+        start = int(update["sequenceStart"])
+        end = int(update["sequenceEnd"])
+        sequence = self.sequence
+        if end <= sequence:
+            return False
+        if start > sequence + 1:
+            raise SequenceGap(sequence + 1, start)
+
+        changed = False
+        changes = update["changes"]
+        for side, levels in ((self.bids, changes.get("bids", ())), (self.asks, changes.get("asks", ()))):
+            for price, size, level_sequence in levels:
+                if int(level_sequence) <= sequence:
+                    continue
+                price = Decimal(price)
+                # Sequence-only change
+                if price == _ZERO:
+                    continue
+                if side.set(price, Decimal(size)):
+                    changed = True
+        self.sequence = end
+        self.timestamp = update.get("time", self.timestamp)
+        self.updates_applied += 1
+        return changed
+
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best()
+
+    def spread(self) -> Optional[Decimal]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def top(self, depth: int) -> Tuple[List[Level], List[Level]]:
+        """Best ``depth`` levels per side as (bids, asks)"""
+        return self.bids.top(depth), self.asks.top(depth)
+
+    def snapshot(self, depth: int) -> Dict[str, Any]:
+        bids, asks = self.top(depth)
+        return {
+            "symbol": self.symbol,
+            "sequence": self.sequence,
+            "timestamp": self.timestamp,
+            "bids": [[str(p), str(s)] for p, s in bids],
+            "asks": [[str(p), str(s)] for p, s in asks],
+        }
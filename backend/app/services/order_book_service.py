@@ -0,0 +1,314 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from decimal import Decimal
+import asyncio
+
+from decouple import config
+import structlog
+
+from ..exchange.factory import exchange_gateway
+from .market_data_feeds import KuCoinLevel2Feed, MarketDataFeed, SimulatedLevel2Feed
+from .order_book import OrderBook, SequenceGap
+
+logger = structlog.get_logger(__name__)
+
+SnapshotFetcher = Callable[[str], Awaitable[Dict[str, Any]]]
+
+# Called with (symbol, depth, payload) for every depth delta
+DepthListener = Callable[[str, int, Dict[str, Any]], None]
+
+class _DepthView:
+    """Top-N levels last published for one (symbol, depth) group"""
+    __slots__ = ("bids", "asks", "sequence")
+
+    def __init__(self):
+        self.bids: Dict[str, str] = {}
+        self.asks: Dict[str, str] = {}
+        self.sequence = 0
+
+class _BookState:
+    __slots__ = ("book", "synced", "buffer", "refs", "views", "flush_handle", "resync_task")
+
+    def __init__(self, symbol: str):
+        self.book = OrderBook(symbol)
+        self.synced = False
+        self.buffer: List[Dict[str, Any]] = []
+        self.refs = 0
+        self.views: Dict[int, _DepthView] = {}
+        self.flush_handle: Optional[asyncio.Handle] = None
+        self.resync_task: Optional[asyncio.Task] = None
+
+def _diff(old: Dict[str, str], new: Dict[str, str]) -> List[List[str]]:
+    changes = [[price, size] for price, size in new.items() if old.get(price) != size]
+    changes.extend([price, "0"] for price in old if price not in new)
+    return changes
+
+class OrderBookService:
+    """Maintains L2 books for the symbols someone is watching.
+
+    Updates arriving before the snapshot (or after a sequence gap) are
+    buffered, the book is reloaded from a snapshot and the buffered updates
+    newer than it are replayed. Depth subscribers get a snapshot of their
+    (symbol, depth) group followed by deltas computed between consecutive
+    published views at most every ``publish_interval_ms``, so resyncs are
+    invisible to clients and each delta carries a per-group sequence number
+    for client-side gap detection.
+    """
+
+    def __init__(
+        self,
+        feed: Optional[MarketDataFeed] = None,
+        snapshot_fetcher: Optional[SnapshotFetcher] = None,
+        publish_interval_ms: int = 100,
+        max_buffered_updates: int = 1000,
+        resync_delay: float = 1.0,
+    ):
+        self.feed = feed
+        self.snapshot_fetcher = snapshot_fetcher
+        self.publish_interval_ms = publish_interval_ms
+        self.max_buffered_updates = max_buffered_updates
+        self.resync_delay = resync_delay
+        self.books: Dict[str, _BookState] = {}
+        self._listeners: List[DepthListener] = []
+
+        # Metrics
+        self.updates_received = 0
+        self.gaps = 0
+        self.resyncs = 0
+        self.snapshot_failures = 0
+        self.malformed = 0
+        self.deltas_published = 0
+
+    async def start(self) -> None:
+        if self.feed is not None:
+            await self.feed.start(self.on_update)
+
+    async def stop(self) -> None:
+        for state in self.books.values():
+            self._cancel(state)
+        if self.feed is not None:
+            await self.feed.stop()
+
+    def add_listener(self, listener: DepthListener) -> None:
+        """Register a callback for depth deltas (e.g. WebSocket fan-out)"""
+        self._listeners.append(listener)
+
+    # Demand
+
+    def acquire(self, symbol: str) -> None:
+        state = self.books.get(symbol)
+        if state is None:
+            state = self.books[symbol] = _BookState(symbol)
+            if self.feed is not None:
+                self.feed.subscribe(symbol)
+            self._resync(state)
+        state.refs += 1
+
+    def release(self, symbol: str) -> None:
+        state = self.books.get(symbol)
+        if state is None:
+            return
+        state.refs -= 1
+        if state.refs <= 0:
+            del self.books[symbol]
+            self._cancel(state)
+            if self.feed is not None:
+                self.feed.unsubscribe(symbol)
+
+    def on_depth_demand(self, symbol: str, depth: int, wanted: bool) -> None:
+        """A (symbol, depth) group gained its first or lost its last subscriber"""
+        if wanted:
+            self.acquire(symbol)
+            state = self.books[symbol]
+            view = state.views[depth] = _DepthView()
+            if state.synced:
+                bids, asks = state.book.top(depth)
+                view.bids = {str(p): str(s) for p, s in bids}
+                view.asks = {str(p): str(s) for p, s in asks}
+        else:
+            state = self.books.get(symbol)
+            if state is not None:
+                state.views.pop(depth, None)
+            self.release(symbol)
+
+    # Reads
+
+    def get_book(self, symbol: str) -> Optional[OrderBook]:
+        """The maintained book, or None when the symbol isn't tracked or is resyncing"""
+        state = self.books.get(symbol)
+        return state.book if state is not None and state.synced else None
+
+    def depth_snapshot(self, symbol: str, depth: int) -> Optional[Dict[str, Any]]:
+        """What a new subscriber of a (symbol, depth) group starts from"""
+        state = self.books.get(symbol)
+        view = state.views.get(depth) if state is not None else None
+        if view is None:
+            return None
+        return {
+            "type": "depth_snapshot",
+            "symbol": symbol,
+            "depth": depth,
+            "sequence": view.sequence,
+            "bids": sorted(([p, s] for p, s in view.bids.items()), key=lambda level: Decimal(level[0]), reverse=True),
+            "asks": sorted(([p, s] for p, s in view.asks.items()), key=lambda level: Decimal(level[0])),
+        }
+
+    # Updates
+
+    def on_update(self, symbol: str, update: Dict[str, Any]) -> None:
+        state = self.books.get(symbol)
+        if state is None:
+            return
+        self.updates_received += 1
+        if not state.synced:
+            state.buffer.append(update)
+            if len(state.buffer) > self.max_buffered_updates:
+                # Older updates are covered by the snapshot or trigger another resync
+                del state.buffer[0]
+            return
+        try:
+            changed = state.book.apply(update)
+        except SequenceGap as e:
+            self.gaps += 1
+            logger.warning("order_book_gap", symbol=symbol, error=str(e))
+            self._resync(state)
+            state.buffer.append(update)
+            return
+        except Exception as e:
+            # The book may be half updated; rebuild it from a fresh snapshot
+            self.malformed += 1
+            logger.warning("order_book_update_malformed", symbol=symbol, error=str(e))
+            self._resync(state)
+            return
+        if changed:
+            self._mark_dirty(symbol, state)
+
+    def _resync(self, state: _BookState) -> None:
+        state.synced = False
+        state.buffer = []
+        if state.resync_task is None or state.resync_task.done():
+            state.resync_task = asyncio.create_task(self._load(state))
+
+    async def _load(self, state: _BookState) -> None:
+        symbol = state.book.symbol
+        while self.books.get(symbol) is state:
+            if self.snapshot_fetcher is None:
+                return
+            try:
+                snapshot = await self.snapshot_fetcher(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.snapshot_failures += 1
+                logger.warning("order_book_snapshot_failed", symbol=symbol, error=str(e))
+                await asyncio.sleep(self.resync_delay)
+                continue
+            self.resyncs += 1
+            book = state.book
+            buffered, state.buffer = state.buffer, []
+            try:
+                book.load_snapshot(snapshot["sequence"], snapshot["bids"], snapshot["asks"], snapshot.get("time", 0))
+                for update in buffered:
+                    book.apply(update)
+            except SequenceGap:
+                # Snapshot older than the buffered stream; try again
+                self.gaps += 1
+                await asyncio.sleep(self.resync_delay)
+                continue
+            except Exception as e:
+                # Malformed snapshot or buffered update; the stream resumes from a fresh snapshot
+                self.malformed += 1
+                logger.warning("order_book_resync_failed", symbol=symbol, error=str(e))
+                await asyncio.sleep(self.resync_delay)
+                continue
+            state.synced = True
+            self._mark_dirty(symbol, state)
+            return
+
+    def _cancel(self, state: _BookState) -> None:
+        if state.resync_task is not None:
+            state.resync_task.cancel()
+        if state.flush_handle is not None:
+            state.flush_handle.cancel()
+
+    def _mark_dirty(self, symbol: str, state: _BookState) -> None:
+        if not state.views or state.flush_handle is not None:
+            return
+        if self.publish_interval_ms <= 0:
+            self._flush(symbol)
+            return
+        state.flush_handle = asyncio.get_running_loop().call_later(
+            self.publish_interval_ms / 1000, self._flush, symbol
+        )
+
+    def _flush(self, symbol: str) -> None:
+        state = self.books.get(symbol)
+        if state is None:
+            return
+        state.flush_handle = None
+        if not state.synced:
+            return
+        book = state.book
+        for depth, view in state.views.items():
+            bids, asks = book.top(depth)
+            bids = {str(p): str(s) for p, s in bids}
+            asks = {str(p): str(s) for p, s in asks}
+            bid_changes, ask_changes = _diff(view.bids, bids), _diff(view.asks, asks)
+            if not bid_changes and not ask_changes:
+                continue
+            view.bids, view.asks = bids, asks
+            view.sequence += 1
+            payload = {
+                "type": "depth_update",
+                "symbol": symbol,
+                "depth": depth,
+                "sequence": view.sequence,
+                "bids": bid_changes,
+                "asks": ask_changes,
+            }
+            self.deltas_published += 1
+            for listener in self._listeners:
+                try:
+                    listener(symbol, depth, payload)
+                except Exception as e:
+                    logger.error("depth_listener_failed", symbol=symbol, error=str(e))
+
+    def stats(self) -> dict:
+        return {
+            "feed": type(self.feed).__name__ if self.feed else None,
+            "books": len(self.books),
+            "synced": sum(1 for state in self.books.values() if state.synced),
+            "depth_groups": sum(len(state.views) for state in self.books.values()),
+            "levels": {
+                symbol: {"bids": len(state.book.bids), "asks": len(state.book.asks)}
+                for symbol, state in self.books.items()
+            },
+            "updates_received": self.updates_received,
+            "gaps": self.gaps,
+            "resyncs": self.resyncs,
+            "snapshot_failures": self.snapshot_failures,
+            "malformed": self.malformed,
+            "deltas_published": self.deltas_published,
+        }
+
+def create_order_book_service(kind: str = None) -> OrderBookService:
+    """Build the service for ORDER_BOOK_FEED ('none', 'simulated' or 'kucoin')"""
+    kind = (kind or config("ORDER_BOOK_FEED", default="simulated")).lower()
+    interval = config("ORDER_BOOK_PUBLISH_INTERVAL_MS", default=100, cast=int)
+    if kind == "none":
+        return OrderBookService(publish_interval_ms=interval)
+    if kind == "simulated":
+        from ..exchange.mock_server import MOCK_PRICES
+
+        feed = SimulatedLevel2Feed(MOCK_PRICES)
+        return OrderBookService(feed, feed.snapshot, publish_interval_ms=interval)
+    if kind == "kucoin":
+        from ..exchange.kucoin import KUCOIN_SANDBOX_URL, KUCOIN_URL
+
+        default_url = KUCOIN_SANDBOX_URL if config("KUCOIN_SANDBOX", default=False, cast=bool) else KUCOIN_URL
+        feed = KuCoinLevel2Feed(config("KUCOIN_BASE_URL", default=default_url))
+        fetcher = exchange_gateway.get_order_book if exchange_gateway is not None else None
+        return OrderBookService(feed, fetcher, publish_interval_ms=interval)
+    raise ValueError(f"Unknown order book feed: {kind}")
+
+# Global instance
+order_book_service = create_order_book_service()
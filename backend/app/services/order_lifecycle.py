@@ -0,0 +1,102 @@
+from typing import Dict, FrozenSet
+from decimal import Decimal
+
+from ..models.bracket_order import (
+    BracketLeg,
+    BracketOrderResponse,
+    BracketOrderValidationError,
+    FillEvent,
+    OrderSide,
+    OrderStatus,
+)
+
+# PENDING -> ACTIVE (entry filled) -> PARTIALLY_FILLED (some exits filled)
+# -> FILLED (position closed); open orders can be CANCELLED, a pending one REJECTED
+TRANSITIONS: Dict[OrderStatus, FrozenSet[OrderStatus]] = {
+    OrderStatus.PENDING: frozenset({OrderStatus.ACTIVE, OrderStatus.CANCELLED, OrderStatus.REJECTED}),
+    OrderStatus.ACTIVE: frozenset({OrderStatus.PARTIALLY_FILLED, OrderStatus.FILLED, OrderStatus.CANCELLED}),
+    OrderStatus.PARTIALLY_FILLED: frozenset({OrderStatus.FILLED, OrderStatus.CANCELLED}),
+    OrderStatus.FILLED: frozenset(),
+    OrderStatus.CANCELLED: frozenset(),
+    OrderStatus.REJECTED: frozenset(),
+}
+
+_ZERO = Decimal("0")
+
+class InvalidTransition(BracketOrderValidationError):
+    """Status change not allowed by the bracket order lifecycle"""
+
+def can_transition(current: OrderStatus, target: OrderStatus) -> bool:
+    return target == current or target in TRANSITIONS[current]
+
+def transition(order: BracketOrderResponse, target: OrderStatus) -> None:
+    """Move an order to a new status, enforcing the lifecycle"""
+    if not can_transition(order.status, target):
+        raise InvalidTransition(f"Bracket order cannot go from {order.status.value} to {target.value}")
+    order.status = target
+
+def open_position(order: BracketOrderResponse) -> Decimal:
+    """Quantity bought (sold) by the entry and not yet closed by exits"""
+    return order.entry_filled_quantity - order.total_filled_quantity
+
+def check_fill(order: BracketOrderResponse, fill: FillEvent) -> None:
+    """Reject fills the order cannot take (overfills, unknown levels, closed orders)"""
+    if fill.quantity <= 0 or fill.price <= 0:
+        raise BracketOrderValidationError("Fill quantity and price must be positive")
+    if fill.leg == BracketLeg.ENTRY:
+        if order.status not in (OrderStatus.PENDING, OrderStatus.ACTIVE):
+            raise InvalidTransition(f"Entry fill on a {order.status.value} bracket order")
+        if order.entry_filled_quantity + fill.quantity > order.quantity:
+            raise BracketOrderValidationError("Entry fill exceeds the order quantity")
+        return
+    if order.status not in (OrderStatus.ACTIVE, OrderStatus.PARTIALLY_FILLED):
+        raise InvalidTransition(f"Exit fill on a {order.status.value} bracket order")
+    if fill.quantity > open_position(order):
+        raise BracketOrderValidationError("Exit fill exceeds the open position")
+    if fill.leg == BracketLeg.TAKE_PROFIT:
+        if fill.level is None or not 0 <= fill.level < len(order.take_profit_levels):
+            raise BracketOrderValidationError("Unknown take profit level")
+        tp = order.take_profit_levels[fill.level]
+        if tp.filled_quantity + fill.quantity > tp.quantity:
+            raise BracketOrderValidationError(f"Fill exceeds take profit {fill.level + 1} quantity")
+
+def apply_fill(order: BracketOrderResponse, fill: FillEvent) -> None:
+    """Fold one fill into the order's aggregates and status in O(1).
+
+    The entry average is a running volume-weighted mean; each exit books
+    its realized PnL against it. Fills at or below ``order.fill_seq`` were
+    already applied and are ignored, which makes log replay idempotent.
+    """
+    if fill.seq and fill.seq <= order.fill_seq:
+        return
+    check_fill(order, fill)
+    quantity, price = fill.quantity, fill.price
+
+    if fill.leg == BracketLeg.ENTRY:
+        filled = order.entry_filled_quantity
+        average = order.entry_average_price or _ZERO
+        order.entry_average_price = (average * filled + price * quantity) / (filled + quantity)
+        order.entry_filled_quantity = filled + quantity
+        if order.entry_order_id is None:
+            order.entry_order_id = fill.exchange_order_id
+        transition(order, OrderStatus.ACTIVE)
+    else:
+        if fill.leg == BracketLeg.TAKE_PROFIT:
+            tp = order.take_profit_levels[fill.level]
+            tp.filled_quantity += quantity
+            if fill.exchange_order_id:
+                tp.order_id = fill.exchange_order_id
+        elif fill.exchange_order_id:
+            order.stop_loss_order_id = fill.exchange_order_id
+        direction = 1 if order.side == OrderSide.BUY else -1
+        order.total_pnl = (order.total_pnl or _ZERO) + direction * (price - order.entry_average_price) * quantity
+        order.total_filled_quantity += quantity
+        order.remaining_quantity = order.quantity - order.total_filled_quantity
+        # A stop loss closes the bracket; otherwise it is done once every unit is out
+        closed = order.remaining_quantity <= 0 or (
+            fill.leg == BracketLeg.STOP_LOSS and open_position(order) <= 0
+        )
+        transition(order, OrderStatus.FILLED if closed else OrderStatus.PARTIALLY_FILLED)
+
+    if fill.seq:
+        order.fill_seq = fill.seq
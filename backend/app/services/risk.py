@@ -0,0 +1,400 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from decimal import Context, Decimal, ROUND_FLOOR, ROUND_HALF_EVEN
+import asyncio
+
+import numpy as np
+import structlog
+
+from ..models.bracket_order import BracketOrderCreate, BracketOrderValidationError, EntryType, OrderSide
+from ..models.risk import RISK_LEVEL_PERCENT, RiskLevel
+from .bracket_validation import MAX_TAKE_PROFIT_LEVELS, validate_bracket
+from .market_data import MarketDataCache, MarketDataUnavailable, market_data_cache
+from .symbols import SymbolRegistry, symbol_registry
+
+logger = structlog.get_logger(__name__)
+
+# Upper bound on brackets per sizing batch
+MAX_SIZING_BATCH = 10_000
+
+class SymbolIncrements(NamedTuple):
+    base: Decimal   # Quantity step
+    quote: Decimal  # Funds step; amounts are rounded to it
+
+# Used until the exchange's symbol list is loaded (or with no exchange configured)
+DEFAULT_INCREMENTS = SymbolIncrements(Decimal("0.00000001"), Decimal("0.000001"))
+
+# Enough digits that no product or quotient below is ever rounded before the final step
+_EXACT = Context(prec=60)
+
+# Float quotients within this relative distance of a rounding boundary are
+# recomputed with Decimal. Float inputs are correctly rounded and each goes
+# through at most four operations, so the float error stays far below it.
+_EDGE = 1e-13
+
+# Beyond 2**52 floats no longer hold every integer
+_MAX_FLOAT_STEPS = 2.0 ** 52
+
+def _floor_div(num: Decimal, den: Decimal) -> int:
+    return int(_EXACT.divide(num, den).to_integral_value(ROUND_FLOOR))
+
+def _round_div(num: Decimal, den: Decimal) -> int:
+    return int(_EXACT.divide(num, den).to_integral_value(ROUND_HALF_EVEN))
+
+def _amount(steps: int, increment: Decimal) -> str:
+    """Fixed-point string of a whole number of increments (never exponent notation)"""
+    return f"{steps * increment:f}"
+
+def resolve_risk_percent(level: RiskLevel, percent: Optional[Decimal]) -> Decimal:
+    risk = percent if percent is not None else RISK_LEVEL_PERCENT[level]
+    if not 0 < risk <= 100:
+        raise BracketOrderValidationError("Risk percent must be between 0 and 100")
+    return risk
+
+def risk_budget(balance: Decimal, percent: Decimal, increments: SymbolIncrements) -> Decimal:
+    """Amount lost if the stop is hit, rounded down to the quote increment"""
+    if balance <= 0:
+        raise BracketOrderValidationError("Account balance must be positive")
+    return _floor_div(_EXACT.multiply(balance, percent), 100 * increments.quote) * increments.quote
+
+def check_sizable(order: BracketOrderCreate, entry: Decimal) -> None:
+    """Everything ``validate_bracket`` checks, plus a stop to size against"""
+    if order.stop_loss_price is None:
+        raise BracketOrderValidationError("Stop loss price is required for position sizing")
+    validate_bracket(order, entry)
+    if order.stop_loss_price == entry:
+        raise BracketOrderValidationError("Stop loss must differ from the entry price")
+
+# One sized bracket as integer multiples of its increments: quantity and
+# take profit quantities in base steps, value / risk / rewards in quote steps
+class _Steps(NamedTuple):
+    quantity: int
+    levels: Tuple[int, ...]
+    value: int
+    risk: int
+    rewards: Tuple[int, ...]
+
+def _level_steps(order: BracketOrderCreate, steps: int) -> List[int]:
+    levels = [_floor_div(_EXACT.multiply(steps, tp.quantity), order.quantity) for tp in order.take_profit_levels]
+    if levels and sum(tp.quantity for tp in order.take_profit_levels) == order.quantity:
+        # Fully allocated: the last level takes what flooring left over
+        levels[-1] = steps - sum(levels[:-1])
+    return levels
+
+def _steps_exact(order: BracketOrderCreate, entry: Decimal, budget: Decimal, increments: SymbolIncrements) -> _Steps:
+    base, quote = increments
+    distance = abs(entry - order.stop_loss_price)
+    steps = _floor_div(budget, _EXACT.multiply(distance, base))
+    levels = _level_steps(order, steps)
+    size = _EXACT.multiply(steps, base)
+    return _Steps(
+        steps,
+        tuple(levels),
+        _round_div(_EXACT.multiply(size, entry), quote),
+        _round_div(_EXACT.multiply(size, distance), quote),
+        tuple(
+            _round_div(_EXACT.multiply(_EXACT.multiply(count, base), abs(tp.price - entry)), quote)
+            for count, tp in zip(levels, order.take_profit_levels)
+        ),
+    )
+
+def _result(
+    order: BracketOrderCreate, entry: Decimal, budget: Decimal, balance: Decimal,
+    increments: SymbolIncrements, steps: _Steps,
+) -> dict:
+    """Sized bracket as sent to clients (see PositionSize); shared by both paths so they agree exactly"""
+    if steps.quantity <= 0:
+        raise BracketOrderValidationError("Risk budget is smaller than one quantity increment at this stop distance")
+    if any(count <= 0 for count in steps.levels):
+        raise BracketOrderValidationError("Sized position is too small to split across the take profit levels")
+    base, quote = increments
+    stop = order.stop_loss_price
+    # Ratios come from the same float operations on both paths
+    entry_f = float(entry)
+    distance_f = abs(entry_f - float(stop))
+    quantity = _amount(steps.quantity, base)
+    dollar_risk = steps.risk * quote
+    total_reward = sum(steps.rewards) * quote
+    take_profits = [
+        {
+            "price": str(tp.price),
+            "quantity": _amount(count, base),
+            "reward": _amount(reward, quote),
+            "reward_risk": round(abs(float(tp.price) - entry_f) / distance_f, 4),
+        }
+        for tp, count, reward in zip(order.take_profit_levels, steps.levels, steps.rewards)
+    ]
+    side = order.side.value
+    return {
+        "symbol": order.symbol,
+        "side": side,
+        "entry_price": str(entry),
+        "stop_loss_price": str(stop),
+        "risk_budget": f"{budget:f}",
+        "quantity": quantity,
+        "position_value": _amount(steps.value, quote),
+        "dollar_risk": f"{dollar_risk:f}",
+        "risk_percent": round(float(dollar_risk) / float(balance) * 100, 4),
+        "take_profits": take_profits,
+        "total_reward": f"{total_reward:f}",
+        "reward_risk": round(float(total_reward) / float(dollar_risk), 4) if dollar_risk else 0.0,
+        "bracket": {
+            "symbol": order.symbol,
+            "side": side,
+            "quantity": quantity,
+            "entry_type": order.entry_type.value,
+            "entry_price": None if order.entry_price is None else str(order.entry_price),
+            "stop_loss_price": str(stop),
+            "take_profit_levels": [{"price": tp["price"], "quantity": tp["quantity"]} for tp in take_profits],
+        },
+    }
+
+def size_position(
+    order: BracketOrderCreate, entry: Decimal, balance: Decimal, percent: Decimal, increments: SymbolIncrements,
+) -> dict:
+    """Size one bracket with exact Decimal arithmetic.
+
+    The quantity is the largest multiple of the base increment whose loss
+    at the stop stays within the budget; take profit quantities keep the
+    bracket's proportions (rounded down, the last level taking the rest
+    when they cover the whole quantity). Amounts are rounded half-even to
+    the quote increment.
+    """
+    check_sizable(order, entry)
+    budget = risk_budget(balance, percent, increments)
+    return _result(order, entry, budget, balance, increments, _steps_exact(order, entry, budget, increments))
+
+def _near_integer(values: np.ndarray) -> np.ndarray:
+    return np.abs(values - np.rint(values)) <= _EDGE * np.maximum(1.0, np.abs(values))
+
+def _near_half(values: np.ndarray) -> np.ndarray:
+    return np.abs(np.abs(values - np.floor(values)) - 0.5) <= _EDGE * np.maximum(1.0, np.abs(values))
+
+def size_positions(
+    orders: Sequence[BracketOrderCreate],
+    entries: Sequence[Decimal],
+    balance: Decimal,
+    percent: Decimal,
+    increments: Sequence[SymbolIncrements],
+) -> List[Tuple[Optional[dict], Optional[str]]]:
+    """Size many brackets at once; (result, error) per order, identical to ``size_position``.
+
+    The arithmetic runs on float64 arrays over the whole batch. After each
+    rounding step, the quotients too close to a floor or half-even boundary
+    for float error to be ruled out (typically exact integers from round
+    prices) are recomputed one by one with Decimal, so results are exact.
+    """
+    outcomes: List[Tuple[Optional[dict], Optional[str]]] = [(None, None)] * len(orders)
+    budgets: Dict[Decimal, Decimal] = {}
+    rows: List[int] = []
+    row_budgets: List[Decimal] = []
+    for i, (order, entry, inc) in enumerate(zip(orders, entries, increments)):
+        try:
+            check_sizable(order, entry)
+            budget = budgets.get(inc.quote)
+            if budget is None:
+                budget = budgets[inc.quote] = risk_budget(balance, percent, inc)
+        except BracketOrderValidationError as e:
+            outcomes[i] = (None, str(e))
+            continue
+        rows.append(i)
+        row_budgets.append(budget)
+    if not rows:
+        return outcomes
+
+    # Differences are taken in Decimal so every float below is correctly rounded
+    width = MAX_TAKE_PROFIT_LEVELS
+    padding = [0] * width
+    distances: List[Decimal] = []
+    gains: List[List[Decimal]] = []
+    columns: List[list] = [[] for _ in range(5)]  # entry, distance, quantity, base, quote
+    gain_rows, level_rows, counts, full = [], [], [], []
+    for j, i in enumerate(rows):
+        order = orders[i]
+        price = entries[i]
+        levels = order.take_profit_levels
+        distances.append(abs(price - order.stop_loss_price))
+        gains.append([abs(tp.price - price) for tp in levels])
+        for column, value in zip(columns, (price, distances[j], order.quantity, *increments[i])):
+            column.append(value)
+        level_quantities = [tp.quantity for tp in levels]
+        gain_rows.append((gains[j] + padding)[:width])
+        level_rows.append((level_quantities + padding)[:width])
+        counts.append(len(levels))
+        full.append(bool(levels) and sum(level_quantities) == order.quantity)
+    entry, distance, quantity, base, quote = (np.array(column, dtype=np.float64) for column in columns)
+    gain = np.array(gain_rows, dtype=np.float64)
+    tp_quantity = np.array(level_rows, dtype=np.float64)
+    present = np.arange(width) < np.array(counts)[:, None]
+    full = np.array(full)
+    budget = np.array(row_budgets, dtype=np.float64)
+
+    quotients = budget / (distance * base)
+    steps = np.floor(quotients)
+    for j in np.flatnonzero(_near_integer(quotients)):
+        inc = increments[rows[j]]
+        steps[j] = _floor_div(row_budgets[j], _EXACT.multiply(distances[j], inc.base))
+    # Rows with counts too large for float integers are sized entirely with Decimal
+    exact_rows = steps >= _MAX_FLOAT_STEPS
+    steps[exact_rows] = 0.0
+
+    quotients = steps[:, None] * tp_quantity / quantity[:, None]
+    level_steps = np.where(present, np.floor(quotients), 0.0)
+    for j, k in zip(*np.nonzero(_near_integer(quotients) & present)):
+        order = orders[rows[j]]
+        level_steps[j, k] = _floor_div(_EXACT.multiply(int(steps[j]), order.take_profit_levels[k].quantity), order.quantity)
+    # Fully allocated brackets: the last level takes what flooring left over
+    last = present.sum(axis=1) - 1
+    idx = np.flatnonzero(full)
+    level_steps[idx, last[idx]] = 0.0
+    level_steps[idx, last[idx]] = steps[idx] - level_steps[idx].sum(axis=1)
+
+    size = steps * base
+    value_q = size * entry / quote
+    risk_q = size * distance / quote
+    reward_q = level_steps * base[:, None] * gain / quote[:, None]
+    exact_rows |= (value_q >= _MAX_FLOAT_STEPS) | (reward_q >= _MAX_FLOAT_STEPS).any(axis=1)
+    value = np.rint(value_q)
+    risk = np.rint(risk_q)
+    rewards = np.rint(reward_q)
+    for j in np.flatnonzero(_near_half(value_q) & ~exact_rows):
+        inc = increments[rows[j]]
+        value[j] = _round_div(_EXACT.multiply(_EXACT.multiply(int(steps[j]), inc.base), entries[rows[j]]), inc.quote)
+    for j in np.flatnonzero(_near_half(risk_q) & ~exact_rows):
+        inc = increments[rows[j]]
+        risk[j] = _round_div(_EXACT.multiply(_EXACT.multiply(int(steps[j]), inc.base), distances[j]), inc.quote)
+    for j, k in zip(*np.nonzero(_near_half(reward_q) & present & ~exact_rows[:, None])):
+        inc = increments[rows[j]]
+        rewards[j, k] = _round_div(_EXACT.multiply(_EXACT.multiply(int(level_steps[j, k]), inc.base), gains[j][k]), inc.quote)
+
+    steps_i = steps.astype(np.int64).tolist()
+    levels_i = level_steps.astype(np.int64).tolist()
+    value_i = value.astype(np.int64).tolist()
+    risk_i = risk.astype(np.int64).tolist()
+    rewards_i = rewards.astype(np.int64).tolist()
+    for j, i in enumerate(rows):
+        order = orders[i]
+        if exact_rows[j]:
+            computed = _steps_exact(order, entries[i], row_budgets[j], increments[i])
+        else:
+            k = len(order.take_profit_levels)
+            computed = _Steps(steps_i[j], tuple(levels_i[j][:k]), value_i[j], risk_i[j], tuple(rewards_i[j][:k]))
+        try:
+            outcomes[i] = (_result(order, entries[i], row_budgets[j], balance, increments[i], computed), None)
+        except BracketOrderValidationError as e:
+            outcomes[i] = (None, str(e))
+    return outcomes
+
+class RiskCalculator:
+    """Server-side position calculator (risk presets, per-level R:R, dollar risk).
+
+    Increments come from the symbol registry, which also rejects unknown
+    symbols and prices off the tick size; with no symbol list loaded the
+    default increments apply. Market entries are sized at the current ask
+    (buys) or bid (sells) from the market data cache.
+    """
+
+    def __init__(self, symbols: Optional[SymbolRegistry] = None, market_data: Optional[MarketDataCache] = None):
+        self.symbols = symbols
+        self.market_data = market_data
+
+        # Metrics
+        self.sized = 0
+        self.batches = 0
+
+    def _increments(self, order: BracketOrderCreate) -> SymbolIncrements:
+        """Increments of the bracket's symbol, once its prices are known to be on the tick size"""
+        info = self.symbols.rules(order.symbol) if self.symbols is not None else None
+        if info is None:
+            return DEFAULT_INCREMENTS
+        if order.entry_type == EntryType.LIMIT and order.entry_price:
+            info.check_price(order.entry_price, "Entry price")
+        if order.stop_loss_price is not None:
+            info.check_price(order.stop_loss_price, "Stop loss price")
+        for i, tp in enumerate(order.take_profit_levels):
+            info.check_price(tp.price, f"Take profit {i + 1} price")
+        return SymbolIncrements(info.base_increment, info.quote_increment)
+
+    async def _ensure_symbols(self) -> None:
+        if self.symbols is not None:
+            await self.symbols.ensure_loaded()
+
+    async def _entry_prices(self, orders: Sequence[BracketOrderCreate]) -> Dict[Tuple[str, OrderSide], Decimal]:
+        """Current ask (buys) or bid (sells) of every symbol with a market entry"""
+        wanted = {(order.symbol, order.side) for order in orders if order.entry_type == EntryType.MARKET}
+        if not wanted or self.market_data is None:
+            return {}
+        symbols = sorted({symbol for symbol, _ in wanted})
+        quotes = await asyncio.gather(*(self.market_data.get(symbol) for symbol in symbols), return_exceptions=True)
+        by_symbol = dict(zip(symbols, quotes))
+        prices = {}
+        for symbol, side in wanted:
+            quote = by_symbol[symbol]
+            if not isinstance(quote, BaseException):
+                prices[(symbol, side)] = quote.ask if side == OrderSide.BUY else quote.bid
+        return prices
+
+    @staticmethod
+    def _entry(order: BracketOrderCreate, prices: Dict[Tuple[str, OrderSide], Decimal]) -> Decimal:
+        if order.entry_type == EntryType.LIMIT:
+            if not order.entry_price or order.entry_price <= 0:
+                raise BracketOrderValidationError("Entry price is required for limit orders")
+            return order.entry_price
+        price = prices.get((order.symbol, order.side))
+        if price is None:
+            raise MarketDataUnavailable(f"No market price for {order.symbol}")
+        return price
+
+    async def size(
+        self, order: BracketOrderCreate, balance: Decimal, level: RiskLevel, percent: Optional[Decimal] = None,
+    ) -> dict:
+        percent = resolve_risk_percent(level, percent)
+        await self._ensure_symbols()
+        increments = self._increments(order)
+        entry = self._entry(order, await self._entry_prices([order]))
+        result = size_position(order, entry, balance, percent, increments)
+        self.sized += 1
+        return result
+
+    async def size_batch(
+        self, orders: Sequence[BracketOrderCreate], balance: Decimal, level: RiskLevel, percent: Optional[Decimal] = None,
+    ) -> dict:
+        """Per-item results in request order (see PositionSizeBatchResponse)"""
+        if len(orders) > MAX_SIZING_BATCH:
+            raise BracketOrderValidationError(f"At most {MAX_SIZING_BATCH} brackets per batch")
+        percent = resolve_risk_percent(level, percent)
+        await self._ensure_symbols()
+        prices = await self._entry_prices(orders)
+
+        errors: Dict[int, str] = {}
+        sizable, entries, increments, positions = [], [], [], []
+        for i, order in enumerate(orders):
+            try:
+                order_increments = self._increments(order)
+                entry = self._entry(order, prices)
+            except (BracketOrderValidationError, MarketDataUnavailable) as e:
+                errors[i] = str(e)
+                continue
+            sizable.append(order)
+            entries.append(entry)
+            increments.append(order_increments)
+            positions.append(i)
+
+        results: List[dict] = [None] * len(orders)
+        for i, error in errors.items():
+            results[i] = {"index": i, "success": False, "result": None, "error": error}
+        for i, (result, error) in zip(positions, size_positions(sizable, entries, balance, percent, increments)):
+            results[i] = {"index": i, "success": error is None, "result": result, "error": error}
+
+        succeeded = sum(1 for item in results if item["success"])
+        self.sized += succeeded
+        self.batches += 1
+        return {"results": results, "succeeded": succeeded, "failed": len(orders) - succeeded}
+
+    def stats(self) -> dict:
+        return {
+            "sized": self.sized,
+            "batches": self.batches,
+        }
+
+# Global instance
+risk_calculator = RiskCalculator(symbols=symbol_registry, market_data=market_data_cache)
@@ -0,0 +1,242 @@
+from typing import Any, Callable, Dict, List, Mapping, Optional, TextIO, Tuple
+import atexit
+import itertools
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import structlog
+
+from .frame_encoder import _default
+
+# High-frequency events logged 1 in N (warnings and errors are never sampled)
+DEFAULT_SAMPLE_RATES: Dict[str, int] = {
+    "bracket_order_updated": 10,
+    "ws_client_connected": 10,
+    "ws_client_disconnected": 10,
+    "ws_send_failed": 100,
+}
+
+_SAMPLED_LEVELS = frozenset({"debug", "info"})
+
+# Libraries that log every request at info level (the exchange gateway client)
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+class EventSampler:
+    """structlog processor keeping every Nth occurrence of selected events.
+
+    Counter-based rather than random, so it is cheap and a burst of N
+    events always leaves a trace. Kept events carry ``sampled=N``.
+    """
+
+    def __init__(self, rates: Mapping[str, int]):
+        self.rates = {event: rate for event, rate in rates.items() if rate > 1}
+        self._counters = {event: itertools.count() for event in self.rates}
+        self.dropped = 0
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        rate = self.rates.get(event_dict.get("event"))
+        if rate is None or method_name not in _SAMPLED_LEVELS:
+            return event_dict
+        if next(self._counters[event_dict["event"]]) % rate:
+            self.dropped += 1
+            raise structlog.DropEvent
+        event_dict["sampled"] = rate
+        return event_dict
+
+class LogQueue:
+    """Queue to the writer thread that drops (and counts) instead of blocking when full"""
+
+    def __init__(self, maxsize: int):
+        # SimpleQueue: lock-free put from C, far cheaper than queue.Queue
+        self.queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self.maxsize = maxsize
+        self.dropped = 0
+
+    def put(self, item: Any) -> None:
+        if self.queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return
+        self.queue.put(item)
+
+class QueueLogger:
+    """structlog logger that enqueues (created, level, name, event dict), unrendered"""
+
+    def __init__(self, log_queue: LogQueue, name: str):
+        self._put = log_queue.put
+        self.name = name
+
+    def _enqueuer(level: str) -> Callable[["QueueLogger", Dict[str, Any]], None]:
+        def enqueue(self, event_dict: Dict[str, Any]) -> None:
+            self._put((time.time(), level, self.name, event_dict))
+        return enqueue
+
+    debug = _enqueuer("debug")
+    info = msg = _enqueuer("info")
+    warning = _enqueuer("warning")
+    error = exception = _enqueuer("error")
+    critical = _enqueuer("critical")
+    del _enqueuer
+
+class _QueueHandler(logging.Handler):
+    """Routes stdlib logging (uvicorn, libraries) into the same queue, unformatted"""
+
+    def __init__(self, log_queue: LogQueue):
+        super().__init__()
+        self._put = log_queue.put
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._put(record)
+
+def _handoff(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Tuple[Tuple[Dict[str, Any]], Dict[str, Any]]:
+    # Last processor: pass the dict itself to QueueLogger instead of as keywords
+    return (event_dict,), {}
+
+def _resolve_exc_info(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Rendering happens on another thread, where sys.exc_info() is empty
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+def _json_default(obj: Any) -> Any:
+    try:
+        return _default(obj)
+    except TypeError:
+        return repr(obj)
+
+class LogWriter(threading.Thread):
+    """Renders queued events and writes them to the stream, off the event loop"""
+
+    def __init__(self, log_queue: LogQueue, stream: TextIO, fmt: str):
+        super().__init__(name="log-writer", daemon=True)
+        self.log_queue = log_queue
+        self.stream = stream
+        if fmt == "json":
+            self.renderers: List[Callable] = [
+                structlog.processors.format_exc_info,
+                structlog.processors.JSONRenderer(default=_json_default),
+            ]
+        else:
+            self.renderers = [structlog.dev.ConsoleRenderer(colors=False)]
+        self.written = 0
+
+    def _event_dict(self, item: Any) -> Tuple[str, Dict[str, Any]]:
+        if isinstance(item, logging.LogRecord):
+            event_dict = {"event": item.getMessage()}
+            if item.exc_info:
+                event_dict["exc_info"] = item.exc_info
+            created, level, name = item.created, item.levelname.lower(), item.name
+        else:
+            created, level, name, event_dict = item
+        event_dict["level"] = level
+        event_dict["logger"] = name
+        event_dict["timestamp"] = datetime.fromtimestamp(created, timezone.utc).isoformat()
+        return level, event_dict
+
+    def _render(self, item: Any) -> str:
+        level, rendered = self._event_dict(item)
+        for renderer in self.renderers:
+            rendered = renderer(None, level, rendered)
+        return rendered
+
+    def run(self) -> None:
+        get, get_nowait = self.log_queue.queue.get, self.log_queue.queue.get_nowait
+        while True:
+            item = get()
+            if item is None:
+                break
+            lines = [item]
+            # Write whatever has piled up in one go
+            while len(lines) < 1000:
+                try:
+                    item = get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(lines)
+                    return
+                lines.append(item)
+            self._write(lines)
+
+    def _write(self, items: List[Any]) -> None:
+        try:
+            self.stream.write("".join(self._render(item) + "\n" for item in items))
+            self.stream.flush()
+            self.written += len(items)
+        except Exception as e:  # never let a bad record kill the writer
+            sys.stderr.write(f"Log writer failed: {e}\n")
+
+    def stop(self) -> None:
+        self.log_queue.queue.put(None)
+        self.join()
+
+class _State:
+    log_queue: Optional[LogQueue] = None
+    writer: Optional[LogWriter] = None
+    sampler: Optional[EventSampler] = None
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "console",
+    sample_rates: Optional[Mapping[str, int]] = None,
+    queue_size: int = 10_000,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """Route structlog and stdlib logging through a queue to a writer thread.
+
+    On the calling thread a log call below ``level`` is a no-op, and one at
+    or above it only samples and enqueues the event dict; timestamps,
+    rendering (``json`` or ``console``) and the write to ``stream`` (stdout)
+    happen on the writer thread.
+    """
+    stop_logging()
+    sampler = EventSampler(DEFAULT_SAMPLE_RATES if sample_rates is None else sample_rates)
+    log_queue = LogQueue(queue_size)
+    writer = LogWriter(log_queue, stream or sys.stdout, fmt)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level.upper())
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    structlog.configure(
+        processors=[sampler, _resolve_exc_info, _handoff],
+        logger_factory=lambda name=None, *args: QueueLogger(log_queue, name or "root"),
+        wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(level.upper())),
+        cache_logger_on_first_use=True,
+    )
+
+    writer.start()
+    _State.log_queue, _State.writer, _State.sampler = log_queue, writer, sampler
+
+def stop_logging() -> None:
+    """Write out everything still queued and stop the writer thread"""
+    if _State.writer is not None:
+        _State.writer.stop()
+        _State.writer = None
+
+def logging_stats() -> Dict[str, Any]:
+    log_queue, writer, sampler = _State.log_queue, _State.writer, _State.sampler
+    return {
+        "queued": log_queue.queue.qsize() if log_queue is not None else 0,
+        "written": writer.written if writer is not None else 0,
+        "dropped_queue_full": log_queue.dropped if log_queue is not None else 0,
+        "dropped_sampled": sampler.dropped if sampler is not None else 0,
+        "sample_rates": sampler.rates if sampler is not None else {},
+    }
+
+def parse_sample_rates(value: str) -> Dict[str, int]:
+    """``"event=N,other=M"`` (as in LOG_SAMPLE_RATES) to a rate mapping"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = int(rate)
+    return rates
+
+atexit.register(stop_logging)
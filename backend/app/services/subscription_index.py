@@ -0,0 +1,96 @@
+from typing import Dict, Iterable, KeysView, List, Optional, Set, Tuple
+
+_EMPTY: Dict = {}
+
+class SubscriptionIndex:
+    """Bidirectional symbol <-> client subscription index.
+
+    Every operation is O(1) per (client, symbol) pair; removing a client only
+    touches the symbols it was subscribed to. Each subscription carries the
+    client's price cadence so fan-out can address one cadence group directly.
+    """
+
+    def __init__(self):
+        self._by_symbol: Dict[str, Dict[str, int]] = {}  # symbol -> client_id -> interval_ms
+        self._by_client: Dict[str, Set[str]] = {}  # client_id -> symbols
+        self._groups: Dict[str, Dict[int, Set[str]]] = {}  # symbol -> interval_ms -> client_ids
+
+    def add(self, client_id: str, symbol: str, interval_ms: int = 0) -> Tuple[bool, Optional[int]]:
+        """Subscribe or change cadence. Returns (changed, previous interval or None)"""
+        clients = self._by_symbol.setdefault(symbol, {})
+        previous = clients.get(client_id)
+        if previous == interval_ms:
+            return False, previous
+        if previous is not None:
+            self._leave_group(symbol, previous, client_id)
+        clients[client_id] = interval_ms
+        self._by_client.setdefault(client_id, set()).add(symbol)
+        self._groups.setdefault(symbol, {}).setdefault(interval_ms, set()).add(client_id)
+        return True, previous
+
+    def discard(self, client_id: str, symbol: str) -> Optional[int]:
+        """Unsubscribe. Returns the removed subscription's interval, or None"""
+        clients = self._by_symbol.get(symbol)
+        if not clients or client_id not in clients:
+            return None
+        interval_ms = clients.pop(client_id)
+        if not clients:
+            del self._by_symbol[symbol]
+        self._leave_group(symbol, interval_ms, client_id)
+        symbols = self._by_client.get(client_id)
+        if symbols is not None:
+            symbols.discard(symbol)
+            if not symbols:
+                del self._by_client[client_id]
+        return interval_ms
+
+    def remove_client(self, client_id: str) -> List[Tuple[str, int]]:
+        """Drop every subscription of a client. Returns the removed (symbol, interval) pairs"""
+        removed = []
+        for symbol in self._by_client.pop(client_id, ()):
+            clients = self._by_symbol[symbol]
+            interval_ms = clients.pop(client_id)
+            if not clients:
+                del self._by_symbol[symbol]
+            self._leave_group(symbol, interval_ms, client_id)
+            removed.append((symbol, interval_ms))
+        return removed
+
+    def _leave_group(self, symbol: str, interval_ms: int, client_id: str):
+        groups = self._groups[symbol]
+        group = groups[interval_ms]
+        group.discard(client_id)
+        if not group:
+            del groups[interval_ms]
+            if not groups:
+                del self._groups[symbol]
+
+    def subscribers(self, symbol: str) -> Dict[str, int]:
+        """client_id -> interval_ms for a symbol (do not mutate)"""
+        return self._by_symbol.get(symbol, _EMPTY)
+
+    def group(self, symbol: str, interval_ms: int) -> Set[str]:
+        """Clients subscribed to a symbol at one cadence (do not mutate)"""
+        return self._groups.get(symbol, _EMPTY).get(interval_ms, set())
+
+    def intervals(self, symbol: str) -> KeysView:
+        """Cadences with at least one subscriber for a symbol"""
+        return self._groups.get(symbol, _EMPTY).keys()
+
+    def has_group(self, symbol: str, interval_ms: int) -> bool:
+        return interval_ms in self._groups.get(symbol, _EMPTY)
+
+    def symbols_for(self, client_id: str) -> Set[str]:
+        return self._by_client.get(client_id, set())
+
+    def symbols(self) -> Iterable[str]:
+        return self._by_symbol.keys()
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._by_symbol
+
+    def __len__(self) -> int:
+        return len(self._by_symbol)
+
+    def subscription_count(self) -> int:
+        return sum(len(clients) for clients in self._by_symbol.values())
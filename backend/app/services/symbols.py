@@ -0,0 +1,290 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from decimal import Decimal, InvalidOperation, ROUND_FLOOR, ROUND_HALF_EVEN
+import asyncio
+import hashlib
+import json
+import time
+
+from decouple import config
+import structlog
+
+from ..exchange.base import ExchangeError, ExchangeGateway
+from ..exchange.factory import exchange_gateway
+from ..models.bracket_order import BracketOrderCreate, BracketOrderValidationError, EntryType, TakeProfitLevel
+
+logger = structlog.get_logger(__name__)
+
+def _plain(value: Decimal) -> str:
+    """Fixed-point string, as the exchange writes it (no exponent notation)"""
+    return f"{value:f}"
+
+def _is_power_of_ten(step: Decimal) -> bool:
+    return step.as_tuple().digits == (1,)
+
+class SymbolInfo:
+    """Trading rules of one symbol, parsed once from the exchange's symbol list.
+
+    Increments and minimums are kept as Decimals and the rejection messages
+    are formatted up front, so checking an order costs a few Decimal
+    remainders and comparisons.
+    """
+    __slots__ = (
+        "symbol", "base", "quote", "enable_trading",
+        "price_increment", "base_increment", "quote_increment", "base_min_size", "min_notional",
+        "_price_exact", "_base_exact", "_tick_error", "_step_error", "_min_size_error", "_notional_error",
+    )
+
+    def __init__(self, raw: dict):
+        self.symbol: str = raw["symbol"]
+        self.base: str = raw["baseCurrency"]
+        self.quote: str = raw["quoteCurrency"]
+        self.enable_trading: bool = raw.get("enableTrading", True)
+        self.price_increment = Decimal(raw["priceIncrement"])
+        self.base_increment = Decimal(raw["baseIncrement"])
+        self.quote_increment = Decimal(raw["quoteIncrement"])
+        self.base_min_size = Decimal(raw["baseMinSize"])
+        # Smallest order value; KuCoin reports it as minFunds on newer listings
+        self.min_notional = Decimal(raw.get("minFunds") or raw.get("quoteMinSize") or "0")
+        # Power-of-ten steps quantize directly (and keep the step's exponent)
+        self._price_exact = _is_power_of_ten(self.price_increment)
+        self._base_exact = _is_power_of_ten(self.base_increment)
+        self._tick_error = "{} must be a multiple of the %s tick size" % _plain(self.price_increment)
+        self._step_error = "{} must be a multiple of %s" % _plain(self.base_increment)
+        self._min_size_error = "{} must be at least %s" % _plain(self.base_min_size)
+        self._notional_error = "{} value must be at least %s %s" % (_plain(self.min_notional), self.quote)
+
+    # Quantization
+
+    def quantize_price(self, price: Decimal, rounding: str = ROUND_HALF_EVEN) -> Decimal:
+        """Nearest valid price (or per ``rounding``)"""
+        if self._price_exact:
+            return price.quantize(self.price_increment, rounding=rounding)
+        return (price / self.price_increment).to_integral_value(rounding) * self.price_increment
+
+    def quantize_quantity(self, quantity: Decimal, rounding: str = ROUND_FLOOR) -> Decimal:
+        """Largest valid quantity not above ``quantity`` (or per ``rounding``)"""
+        if self._base_exact:
+            return quantity.quantize(self.base_increment, rounding=rounding)
+        return (quantity / self.base_increment).to_integral_value(rounding) * self.base_increment
+
+    # Checks; ``label`` names the field in the error message, and is only
+    # formatted when one fails
+
+    def _off_tick(self, price: Decimal) -> bool:
+        try:
+            return price % self.price_increment != 0
+        except InvalidOperation:
+            return True
+
+    def _off_step(self, quantity: Decimal) -> bool:
+        try:
+            return quantity % self.base_increment != 0
+        except InvalidOperation:
+            return True
+
+    def _tick_rejection(self, price: Decimal, label: str) -> BracketOrderValidationError:
+        try:
+            hint = f" (nearest {_plain(self.quantize_price(price))})"
+        except InvalidOperation:
+            hint = ""
+        return BracketOrderValidationError(self._tick_error.format(label) + hint)
+
+    def _quantity_rejection(self, quantity: Decimal, label: str) -> BracketOrderValidationError:
+        if quantity < self.base_min_size:
+            return BracketOrderValidationError(self._min_size_error.format(label))
+        try:
+            hint = f" (nearest below {_plain(self.quantize_quantity(quantity))})"
+        except InvalidOperation:
+            hint = ""
+        return BracketOrderValidationError(self._step_error.format(label) + hint)
+
+    def check_price(self, price: Decimal, label: str) -> None:
+        if self._off_tick(price):
+            raise self._tick_rejection(price, label)
+
+    def check_quantity(self, quantity: Decimal, label: str) -> None:
+        if quantity < self.base_min_size or self._off_step(quantity):
+            raise self._quantity_rejection(quantity, label)
+
+    def check_notional(self, quantity: Decimal, price: Optional[Decimal], label: str) -> None:
+        if price and quantity * price < self.min_notional:
+            raise BracketOrderValidationError(self._notional_error.format(label))
+
+    def check_take_profit_levels(self, levels: Sequence[TakeProfitLevel]) -> None:
+        min_size, min_notional = self.base_min_size, self.min_notional
+        for i, tp in enumerate(levels):
+            price, quantity = tp.price, tp.quantity
+            if self._off_tick(price):
+                raise self._tick_rejection(price, f"Take profit {i + 1} price")
+            if quantity < min_size or self._off_step(quantity):
+                raise self._quantity_rejection(quantity, f"Take profit {i + 1} quantity")
+            if quantity * price < min_notional:
+                raise BracketOrderValidationError(self._notional_error.format(f"Take profit {i + 1}"))
+
+    def check_bracket(self, order: BracketOrderCreate, reference: Optional[Decimal]) -> None:
+        """Tick size, lot size and minimum order value of every leg.
+
+        ``reference`` is the expected entry price; without one (a market
+        entry with no fresh quote) the entry's value is not checked.
+        """
+        if not self.enable_trading:
+            raise BracketOrderValidationError(f"Trading is disabled for {self.symbol}")
+        self.check_quantity(order.quantity, "Quantity")
+        if order.entry_type == EntryType.LIMIT:
+            self.check_price(order.entry_price, "Entry price")
+        self.check_notional(order.quantity, reference, "Order")
+        if order.stop_loss_price is not None:
+            self.check_price(order.stop_loss_price, "Stop loss price")
+            self.check_notional(order.quantity, order.stop_loss_price, "Stop loss")
+        self.check_take_profit_levels(order.take_profit_levels)
+
+    def to_dict(self) -> dict:
+        return {
+            "symbol": self.symbol,
+            "base": self.base,
+            "quote": self.quote,
+            "price_increment": _plain(self.price_increment),
+            "base_increment": _plain(self.base_increment),
+            "quote_increment": _plain(self.quote_increment),
+            "base_min_size": _plain(self.base_min_size),
+            "min_notional": _plain(self.min_notional),
+        }
+
+class SymbolRegistry:
+    """Exchange trading rules indexed by symbol.
+
+    Loaded at startup and refreshed every ``refresh_interval`` seconds in
+    the background; a failed refresh keeps the previous rules. The JSON
+    body of ``/api/trading/symbols`` and its ETag are built once per load,
+    so serving the list, or a 304 for an unchanged one, costs no
+    serialization. Until the first load succeeds no symbol rules apply and
+    orders are left for the exchange to check.
+    """
+
+    def __init__(self, gateway: Optional[ExchangeGateway] = None, refresh_interval: float = 300.0):
+        self.gateway = gateway
+        self.refresh_interval = refresh_interval
+        self._symbols: Dict[str, SymbolInfo] = {}
+        self._body = b"[]"
+        self._etag = self._tag(self._body)
+        self._loaded_at: Optional[float] = None
+        self._loading: Optional[asyncio.Future] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.loads = 0
+        self.changes = 0
+        self.load_failures = 0
+
+    async def start(self) -> None:
+        if self.gateway is None:
+            return
+        try:
+            await self.refresh()
+        except ExchangeError as e:
+            logger.warning("symbol_load_failed", error=str(e))
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("symbol_refresh_failed", error=str(e))
+
+    async def refresh(self) -> None:
+        """Fetch the symbol list; concurrent callers share one request"""
+        if self._loading is not None:
+            # Waiters get the load's outcome, failure included
+            await asyncio.shield(self._loading)
+            return
+        loading = self._loading = asyncio.get_running_loop().create_future()
+        try:
+            self.load(await self.gateway.get_symbols())
+        except Exception as e:
+            self.load_failures += 1
+            loading.set_exception(e)
+            loading.exception()  # Retrieved here, in case nobody was waiting
+            raise
+        else:
+            loading.set_result(None)
+        finally:
+            self._loading = None
+            if not loading.done():
+                loading.cancel()
+
+    async def ensure_loaded(self) -> None:
+        """Load now if the startup load failed (raises ExchangeError when it fails again,
+        also to callers that joined a load already in flight)"""
+        if self._loaded_at is None and self.gateway is not None:
+            await self.refresh()
+
+    def load(self, raw: Sequence[dict]) -> bool:
+        """Replace the rules with a parsed symbol list; returns whether the listing changed"""
+        symbols = {item["symbol"]: SymbolInfo(item) for item in raw}
+        body = json.dumps(
+            [info.to_dict() for info in symbols.values() if info.enable_trading], separators=(",", ":")
+        ).encode("utf-8")
+        etag = self._tag(body)
+        changed = etag != self._etag
+        self._symbols = symbols
+        self._body, self._etag = body, etag
+        self._loaded_at = time.monotonic()
+        self.loads += 1
+        if changed:
+            self.changes += 1
+            logger.info("symbols_loaded", symbols=len(symbols))
+        return changed
+
+    @staticmethod
+    def _tag(body: bytes) -> str:
+        return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._symbols
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        return self._symbols.get(symbol)
+
+    def rules(self, symbol: str) -> Optional[SymbolInfo]:
+        """Rules to validate an order against; None until the list is loaded"""
+        info = self._symbols.get(symbol)
+        if info is None and self._loaded_at is not None:
+            raise BracketOrderValidationError(f"Unknown symbol: {symbol}")
+        return info
+
+    def listing(self) -> Tuple[str, bytes]:
+        """(ETag, JSON body) of the symbols open for trading"""
+        return self._etag, self._body
+
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._symbols),
+            "etag": self._etag,
+            "age_s": None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1),
+            "loads": self.loads,
+            "changes": self.changes,
+            "load_failures": self.load_failures,
+        }
+
+# Global instance
+symbol_registry = SymbolRegistry(
+    gateway=exchange_gateway,
+    refresh_interval=config("SYMBOL_REFRESH_INTERVAL", default=300.0, cast=float),
+)
@@ -0,0 +1,320 @@
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from bisect import bisect_right, insort
+from decimal import Decimal
+from itertools import count
+import asyncio
+
+import structlog
+
+from ..models.bracket_order import BracketLeg, BracketOrderResponse, EntryType, OrderSide, OrderStatus
+from .market_data import MarketDataCache, Quote, market_data_cache
+
+logger = structlog.get_logger(__name__)
+
+# (leg, take profit level index or None, trigger price)
+FiredLeg = Tuple[BracketLeg, Optional[int], Decimal]
+
+# Called with (order_id, legs) for the legs of one order crossed by a tick;
+# returns the order's new state (None once it is closed or gone)
+TriggerExecutor = Callable[[str, List[FiredLeg]], Awaitable[Optional[BracketOrderResponse]]]
+
+# Reads an order's stored state by id (None once it is gone)
+OrderLoader = Callable[[str], Awaitable[Optional[BracketOrderResponse]]]
+
+_AFTER_ALL = float("inf")
+
+class Trigger:
+    __slots__ = ("order_id", "leg", "level", "price", "book", "key")
+
+    def __init__(self, order_id: str, leg: BracketLeg, level: Optional[int], price: Decimal):
+        self.order_id = order_id
+        self.leg = leg
+        self.level = level
+        self.price = price
+        self.book: Optional["TriggerBook"] = None
+        self.key: Optional[Tuple[Decimal, int]] = None
+
+class TriggerBook:
+    """Triggers of one symbol that fire on one price (bid or ask) in one direction.
+
+    Keys are kept sorted so that the triggers crossed by a price are always
+    a prefix: ``(price, seq)`` for triggers that fire at or above their
+    price, ``(-price, seq)`` for those that fire at or below it. A tick
+    costs one bisect plus the crossed prefix, O(log n + k).
+    """
+    __slots__ = ("falling", "_keys", "_triggers")
+
+    def __init__(self, falling: bool):
+        self.falling = falling  # Fires when the price drops to the trigger price
+        self._keys: List[Tuple[Decimal, int]] = []
+        self._triggers: Dict[int, Trigger] = {}
+
+    def add(self, trigger: Trigger, seq: int) -> None:
+        trigger.key = (-trigger.price if self.falling else trigger.price, seq)
+        trigger.book = self
+        insort(self._keys, trigger.key)
+        self._triggers[seq] = trigger
+
+    def remove(self, trigger: Trigger) -> None:
+        key = trigger.key
+        index = bisect_right(self._keys, key) - 1
+        if index >= 0 and self._keys[index] == key:
+            del self._keys[index]
+            del self._triggers[key[1]]
+        trigger.book = None
+
+    def pop_crossed(self, price: Decimal) -> List[Trigger]:
+        index = bisect_right(self._keys, (-price if self.falling else price, _AFTER_ALL))
+        if not index:
+            return []
+        crossed = self._keys[:index]
+        del self._keys[:index]
+        fired = [self._triggers.pop(seq) for _, seq in crossed]
+        for trigger in fired:
+            trigger.book = None
+        return fired
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+class _SymbolTriggers:
+    """Long exits and sell entries fire on the bid, short exits and buy entries on the ask"""
+    __slots__ = ("bid_falling", "bid_rising", "ask_falling", "ask_rising", "count")
+
+    def __init__(self):
+        self.bid_falling = TriggerBook(falling=True)
+        self.bid_rising = TriggerBook(falling=False)
+        self.ask_falling = TriggerBook(falling=True)
+        self.ask_rising = TriggerBook(falling=False)
+        self.count = 0
+
+    def book_for(self, side: OrderSide, leg: BracketLeg) -> TriggerBook:
+        if leg == BracketLeg.ENTRY:
+            # Resting limit entry: a buy fills once the ask comes down to it
+            return self.ask_falling if side == OrderSide.BUY else self.bid_rising
+        if side == OrderSide.BUY:
+            # Long position, exits sell into the bid
+            return self.bid_falling if leg == BracketLeg.STOP_LOSS else self.bid_rising
+        # Short position, exits buy from the ask
+        return self.ask_rising if leg == BracketLeg.STOP_LOSS else self.ask_falling
+
+def order_triggers(order: BracketOrderResponse) -> List[Trigger]:
+    """Triggers an order should currently have armed, derived from its state.
+
+    A pending limit entry waits for its price; once the entry has filled,
+    the stop loss and every unfilled take profit are armed until the
+    position is closed. Legs with an order working on the exchange are
+    left to it, and a working stop loss closes the whole position.
+    """
+    if order.status not in (OrderStatus.PENDING, OrderStatus.ACTIVE, OrderStatus.PARTIALLY_FILLED):
+        return []
+    if order.status == OrderStatus.PENDING:
+        # A market entry is armed once its fill is recorded
+        if order.entry_type == EntryType.LIMIT and order.entry_price and not order.entry_order_id:
+            return [Trigger(order.id, BracketLeg.ENTRY, None, order.entry_price)]
+        return []
+    if order.entry_filled_quantity <= order.total_filled_quantity or order.stop_loss_order_id:
+        return []
+    triggers = []
+    if order.stop_loss_price is not None:
+        triggers.append(Trigger(order.id, BracketLeg.STOP_LOSS, None, order.stop_loss_price))
+    for level, tp in enumerate(order.take_profit_levels):
+        if tp.filled_quantity < tp.quantity and not tp.order_id:
+            triggers.append(Trigger(order.id, BracketLeg.TAKE_PROFIT, level, tp.price))
+    return triggers
+
+class TriggerEngine:
+    """Server-side stop loss / take profit monitoring for open bracket orders.
+
+    Armed triggers are indexed per symbol in sorted books (see
+    ``TriggerBook``), so a tick only touches the triggers it crosses no
+    matter how many are resting. Crossed triggers are removed before they
+    are handed to the executor, one task per order at a time, and the order
+    is re-armed from the state the executor returns. When the executor
+    raises (e.g. the exchange rejects an exit) the order is parked for
+    ``retry_delay`` seconds, doubling with every consecutive failure up to
+    ``max_retry_delay``, and then re-armed from the store via ``loader``,
+    so a rejected exit is not re-sent on every crossing tick. Other order
+    changes arrive through
+    ``on_order_event``. Symbols with armed triggers are held open on the
+    market data stream.
+    """
+
+    def __init__(
+        self,
+        market_data: Optional[MarketDataCache] = None,
+        executor: Optional[TriggerExecutor] = None,
+        loader: Optional[OrderLoader] = None,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0,
+    ):
+        self.market_data = market_data
+        self.executor = executor
+        self.loader = loader
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.symbols: Dict[str, _SymbolTriggers] = {}
+        self._orders: Dict[str, Tuple[str, List[Trigger]]] = {}  # order id -> (symbol, armed triggers)
+        self._pending: Dict[str, List[FiredLeg]] = {}            # order id -> legs awaiting execution
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._failures: Dict[str, int] = {}                      # order id -> consecutive failed executions
+        self._parked: Set[str] = set()                           # orders waiting out a retry delay
+        self._seq = count()
+
+        # Metrics
+        self.ticks = 0
+        self.fired = 0
+        self.execution_failures = 0
+
+    def load(self, orders: Iterable[BracketOrderResponse]) -> int:
+        """Arm the triggers of already stored open orders (on startup)"""
+        for order in orders:
+            self.sync(order)
+        return len(self._orders)
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Index maintenance
+
+    def sync(self, order: BracketOrderResponse) -> None:
+        """Re-arm an order's triggers from its current state"""
+        self.remove(order.id)
+        if order.id in self._parked:
+            return
+        triggers = order_triggers(order)
+        if not triggers:
+            self._failures.pop(order.id, None)
+            return
+        entry = self.symbols.get(order.symbol)
+        if entry is None:
+            entry = self.symbols[order.symbol] = _SymbolTriggers()
+            if self.market_data is not None:
+                self.market_data.acquire(order.symbol)
+        for trigger in triggers:
+            entry.book_for(order.side, trigger.leg).add(trigger, next(self._seq))
+        entry.count += len(triggers)
+        self._orders[order.id] = (order.symbol, triggers)
+
+    def remove(self, order_id: str) -> None:
+        armed = self._orders.pop(order_id, None)
+        if armed is None:
+            return
+        symbol, triggers = armed
+        for trigger in triggers:
+            if trigger.book is not None:
+                trigger.book.remove(trigger)
+        self._release(symbol, len(triggers))
+
+    def _release(self, symbol: str, removed: int) -> None:
+        entry = self.symbols[symbol]
+        entry.count -= removed
+        if entry.count <= 0:
+            del self.symbols[symbol]
+            if self.market_data is not None:
+                self.market_data.release(symbol)
+
+    def on_order_event(self, event: str, order: BracketOrderResponse) -> None:
+        """Bracket order listener: keep the index in step with order changes"""
+        self.sync(order)
+
+    # Ticks
+
+    def on_quote(self, symbol: str, quote: Quote) -> None:
+        self.check(symbol, quote.bid, quote.ask)
+
+    def check(self, symbol: str, bid: Decimal, ask: Decimal) -> int:
+        """Fire every trigger crossed by a top-of-book tick; returns how many fired"""
+        entry = self.symbols.get(symbol)
+        if entry is None:
+            return 0
+        self.ticks += 1
+        fired = entry.bid_falling.pop_crossed(bid)
+        fired += entry.bid_rising.pop_crossed(bid)
+        fired += entry.ask_falling.pop_crossed(ask)
+        fired += entry.ask_rising.pop_crossed(ask)
+        if not fired:
+            return 0
+
+        self.fired += len(fired)
+        by_order: Dict[str, List[FiredLeg]] = {}
+        for trigger in fired:
+            by_order.setdefault(trigger.order_id, []).append((trigger.leg, trigger.level, trigger.price))
+            _, armed = self._orders[trigger.order_id]
+            armed.remove(trigger)
+            if not armed:
+                del self._orders[trigger.order_id]
+        self._release(symbol, len(fired))
+        for order_id, legs in by_order.items():
+            self._dispatch(order_id, legs)
+        return len(fired)
+
+    def _dispatch(self, order_id: str, legs: List[FiredLeg]) -> None:
+        if self.executor is None:
+            return
+        self._pending.setdefault(order_id, []).extend(legs)
+        if order_id not in self._tasks:
+            self._tasks[order_id] = asyncio.get_running_loop().create_task(self._execute(order_id))
+
+    async def _execute(self, order_id: str):
+        # Legs fired while an order's execution is in flight run after it, in order
+        try:
+            while order_id in self._pending:
+                legs = self._pending.pop(order_id)
+                try:
+                    order = await self.executor(order_id, legs)
+                except Exception as e:
+                    self.execution_failures += 1
+                    failures = self._failures[order_id] = self._failures.get(order_id, 0) + 1
+                    delay = min(self.retry_delay * 2 ** (failures - 1), self.max_retry_delay)
+                    logger.error("trigger_execution_failed", order_id=order_id, error=str(e), retry_in=delay)
+                    await self._park(order_id, delay)
+                    continue
+                self._failures.pop(order_id, None)
+                if order is not None:
+                    self.sync(order)
+        finally:
+            self._tasks.pop(order_id, None)
+
+    async def _park(self, order_id: str, delay: float) -> None:
+        """Keep an order disarmed for ``delay`` seconds, then re-arm it from the store"""
+        self.remove(order_id)
+        self._parked.add(order_id)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._parked.discard(order_id)
+        await self._resync(order_id)
+
+    async def _resync(self, order_id: str) -> None:
+        """Re-arm an order from its stored state after a failed execution"""
+        if self.loader is None:
+            return
+        try:
+            order = await self.loader(order_id)
+        except Exception as e:
+            logger.error("trigger_resync_failed", order_id=order_id, error=str(e))
+            return
+        if order is None:
+            self.remove(order_id)
+            self._failures.pop(order_id, None)
+        else:
+            self.sync(order)
+
+    def stats(self) -> dict:
+        return {
+            "orders": len(self._orders),
+            "triggers": sum(entry.count for entry in self.symbols.values()),
+            "symbols": len(self.symbols),
+            "ticks": self.ticks,
+            "fired": self.fired,
+            "executing": len(self._tasks),
+            "execution_failures": self.execution_failures,
+            "parked": len(self._parked),
+        }
+
+# Global instance
+trigger_engine = TriggerEngine(market_data_cache)
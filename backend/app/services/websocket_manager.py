@@ -1,82 +1,742 @@
 from fastapi import WebSocket
-from typing import Dict, List
-import json
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Union
+from collections import deque
+from enum import Enum
 import asyncio
+import time
+import uuid
+
+import structlog
+
+from .frame_encoder import Frame, FrameCache, FrameFormat, decode_message, encode_frame
+from .backplane import Backplane, BROADCAST_CHANNEL, ORDER_CHANNEL
+from .conflation import TickConflator
+from .subscription_index import SubscriptionIndex
+from .candles import TIMEFRAME_NAMES
+from .metrics import FANOUT_BROADCAST, FANOUT_CANDLE, FANOUT_DEPTH, FANOUT_ORDER, FANOUT_PRICE
+
+logger = structlog.get_logger(__name__)
+
+class OverflowPolicy(str, Enum):
+    """What to do when a client's outbound queue is full"""
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+# Close code sent to clients that cannot keep up (RFC 6455 "Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Close code sent to clients that stopped answering heartbeats
+IDLE_CLOSE_CODE = 1001
+
+class ClientConnection:
+    """A WebSocket connection with its own bounded outbound queue and writer task.
+
+    Producers call ``enqueue`` which never awaits; the writer task drains the
+    queue to the socket, so a slow client only delays its own messages.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        max_queue_size: int,
+        overflow_policy: OverflowPolicy,
+        on_closed: Callable[["ClientConnection", bool], None],
+        frame_format: FrameFormat = FrameFormat.JSON,
+    ):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.frame_format = frame_format
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self._on_closed = on_closed
+
+        # Entries are [key, frame]; keyed entries may be coalesced in place
+        self._queue: Deque[list] = deque()
+        self._pending: Dict[str, list] = {}  # key -> queued entry
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.last_seen = time.monotonic()
+
+        # Slow-consumer counters
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.overflows = 0
+        self.max_depth = 0
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def stop(self):
+        self.closed = True
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._queue.clear()
+        self._pending.clear()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, frame: Frame, key: Optional[str] = None) -> bool:
+        """Queue a frame without blocking. Returns False if the client was dropped."""
+        if self.closed:
+            return False
+
+        if key is not None and self.overflow_policy == OverflowPolicy.COALESCE:
+            entry = self._pending.get(key)
+            if entry is not None:
+                # A newer update for the same key supersedes the unsent one
+                entry[1] = frame
+                self.coalesced += 1
+                return True
+
+        if len(self._queue) >= self.max_queue_size:
+            self.overflows += 1
+            if self.overflow_policy == OverflowPolicy.DISCONNECT:
+                self._close_slow_consumer()
+                return False
+            oldest = self._queue.popleft()
+            if oldest[0] is not None and self._pending.get(oldest[0]) is oldest:
+                del self._pending[oldest[0]]
+            self.dropped += 1
+
+        entry = [key, frame]
+        self._queue.append(entry)
+        if key is not None:
+            self._pending[key] = entry
+        if len(self._queue) > self.max_depth:
+            self.max_depth = len(self._queue)
+        self._wakeup.set()
+        return True
+
+    async def _write_loop(self):
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                key, frame = entry = self._queue.popleft()
+                if key is not None and self._pending.get(key) is entry:
+                    del self._pending[key]
+                if frame.binary:
+                    await self.websocket.send_bytes(frame.data)
+                else:
+                    await self.websocket.send_text(frame.text)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info("ws_send_failed", client_id=self.client_id, error=str(e))
+            self._on_closed(self, False)
+
+    def _close_slow_consumer(self):
+        logger.warning("ws_slow_consumer_disconnected", client_id=self.client_id, queue_depth=len(self._queue))
+        self._on_closed(self, True)
+        asyncio.create_task(self.close(SLOW_CONSUMER_CLOSE_CODE))
+
+    async def close(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "overflows": self.overflows,
+        }
 
 class WebSocketManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.price_subscribers: Dict[str, List[str]] = {}  # symbol -> list of client_ids
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.COALESCE,
+        default_interval_ms: int = 0,
+        max_staleness_ms: int = 1000,
+        heartbeat_interval: float = 15.0,
+        idle_timeout: float = 45.0,
+    ):
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.active_connections: Dict[str, ClientConnection] = {}
+        # symbol <-> client_id index; each subscription carries the client's cadence
+        self.price_subscribers = SubscriptionIndex()
 
-    async def connect(self, websocket: WebSocket, client_id: str):
-        await websocket.accept()
-        self.active_connections[client_id] = websocket
-        print(f"Client {client_id} connected. Total connections: {len(self.active_connections)}")
+        # Per-client price cadence; 0 means every tick, otherwise conflated
+        self.default_interval_ms = default_interval_ms
+        self.max_staleness_ms = max_staleness_ms
+        self.conflator = TickConflator(self._deliver_conflated)
+        # Latest price per symbol, sent as a snapshot to new subscribers
+        self.last_prices: Dict[str, dict] = {}
 
-    def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-            # Remove from all price subscriptions
-            for symbol in self.price_subscribers:
-                if client_id in self.price_subscribers[symbol]:
-                    self.price_subscribers[symbol].remove(client_id)
-        print(f"Client {client_id} disconnected. Total connections: {len(self.active_connections)}")
-
-    async def send_personal_message(self, message: str, client_id: str):
-        if client_id in self.active_connections:
-            try:
-                await self.active_connections[client_id].send_text(message)
-            except Exception as e:
-                print(f"Error sending message to {client_id}: {e}")
-                self.disconnect(client_id)
+        # Depth streams: symbol <-> client_id, each subscription carrying its number of levels
+        self.depth_subscribers = SubscriptionIndex()
+        self._depth_demand_listeners: List[Callable[[str, int, bool], None]] = []
 
-    async def broadcast(self, message: str):
-        disconnected_clients = []
-        for client_id, connection in self.active_connections.items():
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                print(f"Error broadcasting to {client_id}: {e}")
-                disconnected_clients.append(client_id)
-        
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
+        # Candle streams: symbol <-> client_id, each subscription carrying its timeframe in seconds
+        self.candle_subscribers = SubscriptionIndex()
+        self._candle_demand_listeners: List[Callable[[str, bool], None]] = []
+
+        # Bracket order event streams: client_id -> symbol filter (None = all symbols)
+        self.order_subscribers: Dict[str, Optional[str]] = {}
+        # Events held for subscribers whose order_snapshot has not been sent yet
+        self._order_backlog: Dict[str, List[FrameCache]] = {}
+
+        # Heartbeats: ping every interval, reap clients silent for idle_timeout (0 disables)
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.reaped_idle = 0
+
+        # Called with (symbol, wanted) when a symbol gains its first or loses its last local subscriber
+        self._demand_listeners: List[Callable[[str, bool], None]] = []
+        self._demanded_symbols: Set[str] = set()
+
+        # Optional cross-node pub/sub; None keeps fan-out process-local
+        self.backplane: Optional[Backplane] = None
+        self._backplane_channels: Set[str] = set()
+        self._backplane_tasks: Set[asyncio.Task] = set()
+        # Latest subscribe/unsubscribe per channel, awaited before a snapshot is read
+        self._channel_tasks: Dict[str, asyncio.Task] = {}
+        # Tags this node's publishes so it can skip their echo
+        self.node_id = uuid.uuid4().hex
+
+        # Totals that survive individual connections
+        self.slow_consumer_disconnects = 0
+        self.total_dropped = 0
+        self.total_coalesced = 0
+
+    async def start(self, backplane: Optional[Backplane] = None):
+        """Start heartbeats and attach a backplane so updates published on any node reach local clients"""
+        if self.heartbeat_interval > 0 and self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        self.backplane = backplane
+        if backplane is None:
+            return
+        await backplane.start(self._on_backplane_message)
+        await backplane.subscribe(BROADCAST_CHANNEL)
+        self._backplane_channels.add(BROADCAST_CHANNEL)
+        self._sync_order_channel()
+
+    async def stop(self):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        self.conflator.close()
+        for client_id in list(self.active_connections):
+            self.disconnect(client_id)
+        if self.backplane is not None:
+            await self.backplane.stop()
+            self.backplane = None
+            self._backplane_channels.clear()
+            self._channel_tasks.clear()
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        frame_format: FrameFormat = FrameFormat.JSON,
+        subprotocol: Optional[str] = None,
+    ):
+        await websocket.accept(subprotocol=subprotocol)
+        if client_id in self.active_connections:
             self.disconnect(client_id)
+        connection = ClientConnection(
+            websocket,
+            client_id,
+            max_queue_size=self.max_queue_size,
+            overflow_policy=self.overflow_policy,
+            on_closed=self._on_connection_closed,
+            frame_format=frame_format,
+        )
+        self.active_connections[client_id] = connection
+        connection.start()
+        logger.info("ws_client_connected", client_id=client_id, connections=len(self.active_connections))
+
+    def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None):
+        connection = self.active_connections.get(client_id)
+        if connection is not None and websocket is not None and connection.websocket is not websocket:
+            # A newer connection already took over this client_id
+            return
+        self.active_connections.pop(client_id, None)
+        if connection is not None:
+            connection.stop()
+            self._order_backlog.pop(client_id, None)
+            if self.order_subscribers.pop(client_id, False) is not False:
+                self._sync_order_channel()
+            self.total_dropped += connection.dropped
+            self.total_coalesced += connection.coalesced
+            # Remove from the client's own price subscriptions only
+            for symbol, interval_ms in self.price_subscribers.remove_client(client_id):
+                self._release_interval(symbol, interval_ms)
+            for symbol, depth in self.depth_subscribers.remove_client(client_id):
+                self._release_depth(symbol, depth)
+            for symbol, _ in self.candle_subscribers.remove_client(client_id):
+                self._release_candles(symbol)
+        logger.info("ws_client_disconnected", client_id=client_id, connections=len(self.active_connections))
+
+    def _on_connection_closed(self, connection: ClientConnection, slow_consumer: bool):
+        if slow_consumer:
+            self.slow_consumer_disconnects += 1
+        # Ignore late callbacks from a connection already replaced by a reconnect
+        if self.active_connections.get(connection.client_id) is connection:
+            self.disconnect(connection.client_id)
+
+    async def send_personal_message(self, message: Union[str, Dict[str, Any]], client_id: str):
+        connection = self.active_connections.get(client_id)
+        if connection is not None:
+            if isinstance(message, str):
+                connection.enqueue(Frame.from_text(message))
+            else:
+                connection.enqueue(FrameCache(message).get(connection.frame_format))
+
+    async def broadcast(self, message: Union[str, Dict[str, Any]]):
+        if self.backplane is not None:
+            envelope = {"text": message} if isinstance(message, str) else {"payload": message}
+            await self.backplane.publish(BROADCAST_CHANNEL, encode_frame(envelope).data)
+            return
+        self._broadcast_local(message)
+
+    def _broadcast_local(self, message: Union[str, Dict[str, Any]]):
+        # Encode once per format and share the frame across all clients
+        started = time.perf_counter()
+        if isinstance(message, str):
+            frame = Frame.from_text(message)
+            for connection in list(self.active_connections.values()):
+                connection.enqueue(frame)
+        else:
+            frames = FrameCache(message)
+            for connection in list(self.active_connections.values()):
+                connection.enqueue(frames.get(connection.frame_format))
+        FANOUT_BROADCAST.observe(time.perf_counter() - started)
+
+    def _resolve_interval(self, interval_ms: Optional[int]) -> int:
+        if interval_ms is None:
+            interval_ms = self.default_interval_ms
+        # Slower cadences are capped so no client sees prices older than max staleness
+        return max(0, min(int(interval_ms), self.max_staleness_ms))
+
+    def _release_interval(self, symbol: str, interval_ms: Optional[int]):
+        if interval_ms and not self.price_subscribers.has_group(symbol, interval_ms):
+            self.conflator.discard(symbol, interval_ms)
+        self._sync_price_demand(symbol)
+
+    def _subscribe(self, client_id: str, symbol: str, interval_ms: int) -> bool:
+        changed, previous = self.price_subscribers.add(client_id, symbol, interval_ms)
+        if changed:
+            self._release_interval(symbol, previous)
+        return changed
+
+    def add_demand_listener(self, listener: Callable[[str, bool], None]):
+        """Register a callback for symbols gaining or losing local subscribers (e.g. market data streams)"""
+        self._demand_listeners.append(listener)
+
+    def _sync_price_demand(self, symbol: str):
+        """Tell demand listeners when a symbol gains its first or loses its last local subscriber.
+
+        Prices never cross the backplane: every node streams the symbols its
+        own clients want.
+        """
+        wanted = symbol in self.price_subscribers
+        if wanted != (symbol in self._demanded_symbols):
+            if wanted:
+                self._demanded_symbols.add(symbol)
+            else:
+                self._demanded_symbols.discard(symbol)
+            for listener in self._demand_listeners:
+                try:
+                    listener(symbol, wanted)
+                except Exception as e:
+                    logger.error("price_demand_listener_failed", symbol=symbol, error=str(e))
+
+    def _sync_order_channel(self):
+        self._sync_channel(ORDER_CHANNEL, bool(self.order_subscribers))
+
+    def _sync_channel(self, channel: str, wanted: bool):
+        if self.backplane is None:
+            return
+        if wanted == (channel in self._backplane_channels):
+            return
+        if wanted:
+            self._backplane_channels.add(channel)
+            task = self._spawn(self.backplane.subscribe(channel), "backplane_subscribe_failed", channel)
+        else:
+            self._backplane_channels.discard(channel)
+            task = self._spawn(self.backplane.unsubscribe(channel), "backplane_unsubscribe_failed", channel)
+        self._channel_tasks[channel] = task
 
-    async def subscribe_to_prices(self, client_id: str, symbol: str):
-        if symbol not in self.price_subscribers:
-            self.price_subscribers[symbol] = []
-        if client_id not in self.price_subscribers[symbol]:
-            self.price_subscribers[symbol].append(client_id)
+    def _spawn(self, coro, failure: str, channel: str) -> asyncio.Task:
+        """Run a backplane call in the background, logging its failure"""
+        task = asyncio.create_task(coro)
+        self._backplane_tasks.add(task)
+        task.add_done_callback(lambda done: self._backplane_done(done, failure, channel))
+        return task
+
+    def _backplane_done(self, task: asyncio.Task, failure: str, channel: str):
+        self._backplane_tasks.discard(task)
+        if self._channel_tasks.get(channel) is task:
+            del self._channel_tasks[channel]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(failure, channel=channel, error=str(task.exception()))
+
+    async def _channel_ready(self, channel: str):
+        """Wait for a pending subscribe, so messages published from here on arrive"""
+        task = self._channel_tasks.get(channel)
+        if task is not None:
+            # Failures are logged by the task's callback; local events still flow
+            await asyncio.wait([task])
+
+    async def _on_backplane_message(self, channel: str, data: bytes):
+        if channel == ORDER_CHANNEL:
+            envelope = decode_message(data)
+            # This node's own events were delivered locally before publishing
+            if envelope["node"] != self.node_id:
+                self._publish_local_order(envelope["payload"])
+        elif channel == BROADCAST_CHANNEL:
+            envelope = decode_message(data)
+            self._broadcast_local(envelope["text"] if "text" in envelope else envelope["payload"])
+
+    def _unsubscribe(self, client_id: str, symbol: str) -> bool:
+        interval_ms = self.price_subscribers.discard(client_id, symbol)
+        if interval_ms is None:
+            return False
+        self._release_interval(symbol, interval_ms)
+        return True
+
+    async def subscribe_to_prices(self, client_id: str, symbol: str, interval_ms: Optional[int] = None):
+        interval_ms = self._resolve_interval(interval_ms)
+        if self._subscribe(client_id, symbol, interval_ms):
             await self.send_personal_message(
-                json.dumps({"type": "subscription", "symbol": symbol, "status": "subscribed"}),
+                {"type": "subscription", "symbol": symbol, "status": "subscribed", "interval_ms": interval_ms},
                 client_id
             )
+            self._send_price_snapshot(client_id, [symbol])
 
     async def unsubscribe_from_prices(self, client_id: str, symbol: str):
-        if symbol in self.price_subscribers and client_id in self.price_subscribers[symbol]:
-            self.price_subscribers[symbol].remove(client_id)
+        if self._unsubscribe(client_id, symbol):
+            await self.send_personal_message(
+                {"type": "subscription", "symbol": symbol, "status": "unsubscribed"},
+                client_id
+            )
+
+    async def bulk_subscribe_to_prices(
+        self, client_id: str, symbols: Iterable[str], interval_ms: Optional[int] = None
+    ) -> List[str]:
+        """Subscribe to many symbols with a single acknowledgement"""
+        interval_ms = self._resolve_interval(interval_ms)
+        subscribed = [symbol for symbol in dict.fromkeys(symbols) if self._subscribe(client_id, symbol, interval_ms)]
+        if subscribed:
+            await self.send_personal_message(
+                {"type": "subscription", "symbols": subscribed, "status": "subscribed", "interval_ms": interval_ms},
+                client_id
+            )
+            self._send_price_snapshot(client_id, subscribed)
+        return subscribed
+
+    def _send_price_snapshot(self, client_id: str, symbols: Iterable[str]):
+        """Latest known state for newly subscribed symbols; price_update deltas follow"""
+        connection = self.active_connections.get(client_id)
+        if connection is None:
+            return
+        prices = {symbol: self.last_prices[symbol] for symbol in symbols if symbol in self.last_prices}
+        if prices:
+            connection.enqueue(FrameCache({"type": "price_snapshot", "prices": prices}).get(connection.frame_format))
+
+    async def bulk_unsubscribe_from_prices(self, client_id: str, symbols: Iterable[str]) -> List[str]:
+        """Unsubscribe from many symbols with a single acknowledgement"""
+        unsubscribed = [symbol for symbol in dict.fromkeys(symbols) if self._unsubscribe(client_id, symbol)]
+        if unsubscribed:
             await self.send_personal_message(
-                json.dumps({"type": "subscription", "symbol": symbol, "status": "unsubscribed"}),
+                {"type": "subscription", "symbols": unsubscribed, "status": "unsubscribed"},
                 client_id
             )
+        return unsubscribed
+
+    def publish_local_price(self, symbol: str, price_data: dict):
+        """Fan out a tick from this node's own market data stream.
 
-    async def broadcast_price_update(self, symbol: str, price_data: dict):
+        Every node streams the symbols its clients need, so ticks never go
+        through the backplane.
+        """
+        self.last_prices[symbol] = price_data
         if symbol in self.price_subscribers:
-            message = json.dumps({
+            payload = {
                 "type": "price_update",
                 "symbol": symbol,
                 "data": price_data
+            }
+            # Real-time subscribers get every tick; the rest go through the conflator
+            for interval_ms in list(self.price_subscribers.intervals(symbol)):
+                if interval_ms:
+                    self.conflator.submit(symbol, interval_ms, payload)
+                else:
+                    self._fan_out(symbol, payload, 0)
+
+    def _deliver_conflated(self, symbol: str, interval_ms: int, payload: dict):
+        self._fan_out(symbol, payload, interval_ms)
+
+    def _fan_out(self, symbol: str, payload: dict, interval_ms: int):
+        started = time.perf_counter()
+        frames = FrameCache(payload)
+        key = f"price:{symbol}"
+        # Enqueue only; each client's writer task does the actual send
+        for client_id in list(self.price_subscribers.group(symbol, interval_ms)):
+            connection = self.active_connections.get(client_id)
+            if connection is not None:
+                connection.enqueue(frames.get(connection.frame_format), key=key)
+        FANOUT_PRICE.observe(time.perf_counter() - started)
+
+    async def subscribe_to_orders(self, client_id: str, symbol: Optional[str] = None) -> bool:
+        """Register for bracket order updates. The caller reads the order
+        snapshot afterwards and passes it to ``send_order_snapshot``; events
+        published in between (on any node, once the backplane subscription
+        is in place) are held and follow the snapshot"""
+        if client_id not in self.active_connections:
+            return False
+        self.order_subscribers[client_id] = symbol
+        self._order_backlog[client_id] = []
+        self._sync_order_channel()
+        await self._channel_ready(ORDER_CHANNEL)
+        # Gone if the client disconnected or unsubscribed meanwhile
+        return client_id in self._order_backlog
+
+    def send_order_snapshot(self, client_id: str, symbol: Optional[str], orders: List[dict], more: bool = False):
+        """Send the snapshot, then release the events held since subscribing"""
+        backlog = self._order_backlog.pop(client_id, None)
+        connection = self.active_connections.get(client_id)
+        if backlog is None or connection is None:
+            return
+        connection.enqueue(FrameCache({
+            "type": "order_snapshot",
+            "symbol": symbol,
+            "orders": orders,
+            "more": more,
+        }).get(connection.frame_format))
+        for frames in backlog:
+            connection.enqueue(frames.get(connection.frame_format))
+
+    async def unsubscribe_from_orders(self, client_id: str, notify: bool = True):
+        self._order_backlog.pop(client_id, None)
+        if self.order_subscribers.pop(client_id, False) is not False:
+            self._sync_order_channel()
+            if notify:
+                await self.send_personal_message({"type": "order_subscription", "status": "unsubscribed"}, client_id)
+
+    def notify_order_update(self, event: str, order: dict):
+        """Push a bracket order status change; safe to call from sync service code.
+
+        Local subscribers get it right away, other nodes through the
+        backplane (a failed publish is logged and only costs remote nodes).
+        """
+        payload = {"type": "order_update", "event": event, "order": order}
+        self._publish_local_order(payload)
+        if self.backplane is not None:
+            envelope = {"node": self.node_id, "payload": payload}
+            self._spawn(
+                self.backplane.publish(ORDER_CHANNEL, encode_frame(envelope).data),
+                "backplane_publish_failed",
+                ORDER_CHANNEL,
+            )
+
+    def _publish_local_order(self, payload: dict):
+        if not self.order_subscribers:
+            return
+        started = time.perf_counter()
+        symbol = payload["order"].get("symbol")
+        frames = FrameCache(payload)
+        for client_id, symbol_filter in list(self.order_subscribers.items()):
+            if symbol_filter is not None and symbol_filter != symbol:
+                continue
+            backlog = self._order_backlog.get(client_id)
+            if backlog is not None:
+                backlog.append(frames)
+                continue
+            connection = self.active_connections.get(client_id)
+            if connection is not None:
+                connection.enqueue(frames.get(connection.frame_format))
+        FANOUT_ORDER.observe(time.perf_counter() - started)
+
+    def add_depth_demand_listener(self, listener: Callable[[str, int, bool], None]):
+        """Register a callback for (symbol, depth) groups gaining their first or losing their last subscriber"""
+        self._depth_demand_listeners.append(listener)
+
+    def _notify_depth_demand(self, symbol: str, depth: int, wanted: bool):
+        for listener in self._depth_demand_listeners:
+            try:
+                listener(symbol, depth, wanted)
+            except Exception as e:
+                logger.error("depth_demand_listener_failed", symbol=symbol, error=str(e))
+
+    def _release_depth(self, symbol: str, depth: Optional[int]):
+        if depth is not None and not self.depth_subscribers.has_group(symbol, depth):
+            self._notify_depth_demand(symbol, depth, False)
+
+    def subscribe_to_depth(self, client_id: str, symbol: str, depth: int) -> bool:
+        """Join a (symbol, depth) group. The caller sends the group's snapshot"""
+        if client_id not in self.active_connections:
+            return False
+        is_new_group = not self.depth_subscribers.has_group(symbol, depth)
+        changed, previous = self.depth_subscribers.add(client_id, symbol, depth)
+        if not changed:
+            return False
+        if is_new_group:
+            self._notify_depth_demand(symbol, depth, True)
+        self._release_depth(symbol, previous)
+        return True
+
+    def unsubscribe_from_depth(self, client_id: str, symbol: str) -> bool:
+        depth = self.depth_subscribers.discard(client_id, symbol)
+        if depth is None:
+            return False
+        self._release_depth(symbol, depth)
+        return True
+
+    def publish_depth(self, symbol: str, depth: int, payload: dict):
+        """Fan a depth delta out to one (symbol, depth) group.
+
+        Deltas build on each other, so they are never coalesced; a client
+        that sees a sequence gap should re-subscribe for a fresh snapshot.
+        """
+        started = time.perf_counter()
+        frames = FrameCache(payload)
+        for client_id in list(self.depth_subscribers.group(symbol, depth)):
+            connection = self.active_connections.get(client_id)
+            if connection is not None:
+                connection.enqueue(frames.get(connection.frame_format))
+        FANOUT_DEPTH.observe(time.perf_counter() - started)
+
+    def add_candle_demand_listener(self, listener: Callable[[str, bool], None]):
+        """Register a callback for symbols gaining their first or losing their last candle subscriber"""
+        self._candle_demand_listeners.append(listener)
+
+    def _notify_candle_demand(self, symbol: str, wanted: bool):
+        for listener in self._candle_demand_listeners:
+            try:
+                listener(symbol, wanted)
+            except Exception as e:
+                logger.error("candle_demand_listener_failed", symbol=symbol, error=str(e))
+
+    def _release_candles(self, symbol: str):
+        if symbol not in self.candle_subscribers:
+            self._notify_candle_demand(symbol, False)
+
+    def subscribe_to_candles(self, client_id: str, symbol: str, seconds: int) -> bool:
+        """Follow one timeframe of a symbol's bars. The caller sends the history snapshot"""
+        if client_id not in self.active_connections:
+            return False
+        is_new_symbol = symbol not in self.candle_subscribers
+        changed, _ = self.candle_subscribers.add(client_id, symbol, seconds)
+        if changed and is_new_symbol:
+            self._notify_candle_demand(symbol, True)
+        return changed
+
+    def unsubscribe_from_candles(self, client_id: str, symbol: str) -> bool:
+        if self.candle_subscribers.discard(client_id, symbol) is None:
+            return False
+        self._release_candles(symbol)
+        return True
+
+    def publish_candles(self, symbol: str, bars: Dict[int, Any]):
+        """Fan updated bars (timeframe seconds -> bar) out to each timeframe's subscribers.
+
+        Every node aggregates the ticks it streams itself, so bars skip the
+        backplane. Unsent updates of the same bar are coalesced; a bar's
+        last update is never replaced by the next bar's first.
+        """
+        if symbol not in self.candle_subscribers:
+            return
+        started = time.perf_counter()
+        for seconds in list(self.candle_subscribers.intervals(symbol)):
+            bar = bars.get(seconds)
+            if bar is None:
+                continue
+            frames = FrameCache({
+                "type": "candle_update",
+                "symbol": symbol,
+                "timeframe": TIMEFRAME_NAMES[seconds],
+                "candle": bar.to_dict(),
             })
-            disconnected_clients = []
-            for client_id in self.price_subscribers[symbol]:
-                if client_id in self.active_connections:
-                    try:
-                        await self.active_connections[client_id].send_text(message)
-                    except Exception as e:
-                        print(f"Error sending price update to {client_id}: {e}")
-                        disconnected_clients.append(client_id)
-            
-            # Clean up disconnected clients
-            for client_id in disconnected_clients:
-                self.disconnect(client_id)
\ No newline at end of file
+            key = f"candle:{symbol}:{seconds}:{bar.time}"
+            for client_id in list(self.candle_subscribers.group(symbol, seconds)):
+                connection = self.active_connections.get(client_id)
+                if connection is not None:
+                    connection.enqueue(frames.get(connection.frame_format), key=key)
+        FANOUT_CANDLE.observe(time.perf_counter() - started)
+
+    def touch(self, client_id: str):
+        """Record client activity for idle reaping"""
+        connection = self.active_connections.get(client_id)
+        if connection is not None:
+            connection.last_seen = time.monotonic()
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self._heartbeat()
+            except Exception as e:
+                logger.error("ws_heartbeat_failed", error=str(e))
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        ping = FrameCache({"type": "ping", "ts": int(time.time() * 1000)})
+        for client_id, connection in list(self.active_connections.items()):
+            if self.idle_timeout > 0 and now - connection.last_seen > self.idle_timeout:
+                logger.info("ws_idle_client_reaped", client_id=client_id)
+                self.reaped_idle += 1
+                self.disconnect(client_id)
+                asyncio.create_task(connection.close(IDLE_CLOSE_CODE))
+            else:
+                connection.enqueue(ping.get(connection.frame_format))
+
+    def health(self) -> dict:
+        """Health probe detail; raises if the heartbeat loop has died"""
+        task = self._heartbeat_task
+        if task is not None and task.done():
+            error = None if task.cancelled() else task.exception()
+            raise RuntimeError(f"heartbeat loop stopped: {error!r}")
+        return {
+            "connections": len(self.active_connections),
+            "heartbeats": task is not None,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "backplane": type(self.backplane).__name__ if self.backplane else None,
+        }
+
+    def get_stats(self) -> dict:
+        """Queue depth and slow-consumer counters across all connections"""
+        clients = {client_id: conn.stats() for client_id, conn in self.active_connections.items()}
+        return {
+            "active_connections": len(self.active_connections),
+            "max_queue_size": self.max_queue_size,
+            "overflow_policy": self.overflow_policy.value,
+            "formats": {
+                fmt.value: sum(1 for c in self.active_connections.values() if c.frame_format == fmt)
+                for fmt in FrameFormat
+            },
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "dropped": self.total_dropped + sum(c["dropped"] for c in clients.values()),
+            "coalesced": self.total_coalesced + sum(c["coalesced"] for c in clients.values()),
+            "slow_consumers": sorted(
+                client_id for client_id, c in clients.items() if c["overflows"] > 0
+            ),
+            "subscribed_symbols": len(self.price_subscribers),
+            "subscriptions": self.price_subscribers.subscription_count(),
+            "order_subscribers": len(self.order_subscribers),
+            "depth_symbols": len(self.depth_subscribers),
+            "depth_subscriptions": self.depth_subscribers.subscription_count(),
+            "candle_symbols": len(self.candle_subscribers),
+            "candle_subscriptions": self.candle_subscribers.subscription_count(),
+            "reaped_idle": self.reaped_idle,
+            "conflation": self.conflator.stats(),
+            "backplane": type(self.backplane).__name__ if self.backplane else None,
+            "backplane_channels": len(self._backplane_channels),
+            "clients": clients,
+        }
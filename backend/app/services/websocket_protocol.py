@@ -0,0 +1,201 @@
+from typing import Any, Dict, Optional
+import time
+
+import structlog
+
+from .frame_encoder import FrameFormat, decode_message
+from .websocket_manager import WebSocketManager
+from .bracket_order_service import BracketOrderService, OPEN_STATUSES
+from .order_book_service import OrderBookService
+from .candles import TIMEFRAMES, CandleAggregator
+
+logger = structlog.get_logger(__name__)
+
+# Upper bound on symbols per subscribe/unsubscribe request
+MAX_SYMBOLS_PER_REQUEST = 100
+
+# Order book levels per side for depth streams
+DEFAULT_DEPTH = 20
+MAX_DEPTH = 100
+
+# Bars sent in a candle_snapshot
+DEFAULT_CANDLE_LIMIT = 500
+MAX_CANDLE_LIMIT = 1000
+
+# Open orders sent in an order_snapshot, newest first
+ORDER_SNAPSHOT_LIMIT = 500
+
+class WebSocketProtocol:
+    """Client message protocol for /ws/{client_id}.
+
+    Messages are JSON objects (or msgpack maps for msgpack clients) with an
+    ``op`` field:
+
+    - ``{"op": "subscribe", "symbols": [...], "interval_ms": 100}``
+      acknowledges, sends a ``price_snapshot`` and then ``price_update`` deltas
+    - ``{"op": "unsubscribe", "symbols": [...]}``
+    - ``{"op": "subscribe_orders", "symbol": null}`` sends an
+      ``order_snapshot`` of the newest open orders (``more`` is true when
+      it was cut at the limit) followed by ``order_update`` events
+    - ``{"op": "unsubscribe_orders"}``
+    - ``{"op": "subscribe_depth", "symbols": [...], "depth": 20}`` sends a
+      ``depth_snapshot`` per symbol, then ``depth_update`` deltas (levels
+      with size "0" are removed; a gap in ``sequence`` means re-subscribe)
+    - ``{"op": "unsubscribe_depth", "symbols": [...]}``
+    - ``{"op": "subscribe_candles", "symbols": [...], "timeframe": "1m", "limit": 500}``
+      sends a ``candle_snapshot`` per symbol, then a ``candle_update`` with
+      the open bar on every tick (one timeframe per symbol; subscribing
+      again switches it)
+    - ``{"op": "unsubscribe_candles", "symbols": [...]}``
+    - ``{"op": "ping"}`` is answered with ``pong``; ``{"op": "pong"}``
+      answers the server's heartbeat ``ping``
+
+    Any message counts as activity for idle reaping.
+    """
+
+    def __init__(
+        self,
+        manager: WebSocketManager,
+        order_service: BracketOrderService,
+        order_books: Optional[OrderBookService] = None,
+        candles: Optional[CandleAggregator] = None,
+    ):
+        self.manager = manager
+        self.order_service = order_service
+        self.order_books = order_books
+        self.candles = candles
+        self._handlers = {
+            "subscribe": self._subscribe,
+            "unsubscribe": self._unsubscribe,
+            "subscribe_orders": self._subscribe_orders,
+            "unsubscribe_orders": self._unsubscribe_orders,
+            "subscribe_depth": self._subscribe_depth,
+            "unsubscribe_depth": self._unsubscribe_depth,
+            "subscribe_candles": self._subscribe_candles,
+            "unsubscribe_candles": self._unsubscribe_candles,
+            "ping": self._ping,
+            "pong": self._pong,
+        }
+
+    async def handle_raw(self, client_id: str, text: Optional[str] = None, data: Optional[bytes] = None):
+        """Decode an incoming frame and dispatch it"""
+        self.manager.touch(client_id)
+        connection = self.manager.active_connections.get(client_id)
+        frame_format = connection.frame_format if connection else FrameFormat.JSON
+        try:
+            message = decode_message(data if data is not None else text, frame_format)
+        except Exception:
+            await self._error(client_id, "Invalid message encoding")
+            return
+        if not isinstance(message, dict):
+            await self._error(client_id, "Message must be an object")
+            return
+        await self.handle(client_id, message)
+
+    async def handle(self, client_id: str, message: Dict[str, Any]):
+        handler = self._handlers.get(message.get("op"))
+        if handler is None:
+            await self._error(client_id, f"Unknown op: {message.get('op')}")
+            return
+        try:
+            await handler(client_id, message)
+        except (TypeError, ValueError) as e:
+            await self._error(client_id, str(e), message.get("op"))
+        except Exception as e:
+            # A failing dependency (e.g. the order store) fails the op, not the socket
+            logger.error("ws_op_failed", client_id=client_id, op=message.get("op"), error=str(e))
+            await self._error(client_id, "Internal error", message.get("op"))
+
+    def _symbols(self, message: Dict[str, Any]) -> list:
+        symbols = message.get("symbols")
+        if symbols is None and message.get("symbol"):
+            symbols = [message["symbol"]]
+        if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+            raise ValueError("symbols must be a list of strings")
+        if len(symbols) > MAX_SYMBOLS_PER_REQUEST:
+            raise ValueError(f"At most {MAX_SYMBOLS_PER_REQUEST} symbols per request")
+        return symbols
+
+    async def _subscribe(self, client_id: str, message: Dict[str, Any]):
+        interval_ms = message.get("interval_ms")
+        if interval_ms is not None and not isinstance(interval_ms, int):
+            raise ValueError("interval_ms must be an integer")
+        await self.manager.bulk_subscribe_to_prices(client_id, self._symbols(message), interval_ms)
+
+    async def _unsubscribe(self, client_id: str, message: Dict[str, Any]):
+        await self.manager.bulk_unsubscribe_from_prices(client_id, self._symbols(message))
+
+    async def _subscribe_orders(self, client_id: str, message: Dict[str, Any]):
+        symbol = message.get("symbol")
+        if symbol is not None and not isinstance(symbol, str):
+            raise ValueError("symbol must be a string")
+        # Register first so no update between the read and the snapshot is lost
+        if not await self.manager.subscribe_to_orders(client_id, symbol):
+            return
+        try:
+            orders, next_cursor = await self.order_service.query_bracket_orders(
+                symbol=symbol, statuses=OPEN_STATUSES, limit=ORDER_SNAPSHOT_LIMIT
+            )
+        except BaseException:
+            await self.manager.unsubscribe_from_orders(client_id, notify=False)
+            raise
+        self.manager.send_order_snapshot(
+            client_id, symbol, [order.dict() for order in orders], more=next_cursor is not None
+        )
+
+    async def _unsubscribe_orders(self, client_id: str, message: Dict[str, Any]):
+        await self.manager.unsubscribe_from_orders(client_id)
+
+    async def _subscribe_depth(self, client_id: str, message: Dict[str, Any]):
+        if self.order_books is None:
+            raise ValueError("Order books are not available")
+        depth = message.get("depth", DEFAULT_DEPTH)
+        if not isinstance(depth, int) or not 1 <= depth <= MAX_DEPTH:
+            raise ValueError(f"depth must be an integer between 1 and {MAX_DEPTH}")
+        for symbol in dict.fromkeys(self._symbols(message)):
+            if self.manager.subscribe_to_depth(client_id, symbol, depth):
+                snapshot = self.order_books.depth_snapshot(symbol, depth)
+                if snapshot is not None:
+                    await self.manager.send_personal_message(snapshot, client_id)
+
+    async def _unsubscribe_depth(self, client_id: str, message: Dict[str, Any]):
+        for symbol in self._symbols(message):
+            self.manager.unsubscribe_from_depth(client_id, symbol)
+
+    async def _subscribe_candles(self, client_id: str, message: Dict[str, Any]):
+        if self.candles is None:
+            raise ValueError("Candles are not available")
+        timeframe = message.get("timeframe", "1m")
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"timeframe must be one of {', '.join(TIMEFRAMES)}")
+        limit = message.get("limit", DEFAULT_CANDLE_LIMIT)
+        if not isinstance(limit, int) or not 1 <= limit <= MAX_CANDLE_LIMIT:
+            raise ValueError(f"limit must be an integer between 1 and {MAX_CANDLE_LIMIT}")
+        for symbol in dict.fromkeys(self._symbols(message)):
+            bars = await self.candles.history(symbol, timeframe, limit)
+            # No await between reading the bars and subscribing, so no update is missed
+            if self.manager.subscribe_to_candles(client_id, symbol, TIMEFRAMES[timeframe]):
+                await self.manager.send_personal_message({
+                    "type": "candle_snapshot",
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "candles": [bar.to_dict() for bar in bars],
+                }, client_id)
+
+    async def _unsubscribe_candles(self, client_id: str, message: Dict[str, Any]):
+        for symbol in self._symbols(message):
+            self.manager.unsubscribe_from_candles(client_id, symbol)
+
+    async def _ping(self, client_id: str, message: Dict[str, Any]):
+        await self.manager.send_personal_message(
+            {"type": "pong", "ts": int(time.time() * 1000)}, client_id
+        )
+
+    async def _pong(self, client_id: str, message: Dict[str, Any]):
+        # Activity is already recorded by handle_raw
+        pass
+
+    async def _error(self, client_id: str, detail: str, op: Optional[str] = None):
+        await self.manager.send_personal_message(
+            {"type": "error", "op": op, "message": detail}, client_id
+        )
@@ -0,0 +1,66 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+from ..models.bracket_order import BracketOrderResponse, OrderSide, OrderStatus
+
+class BracketOrderStore(ABC):
+    """Persistence for bracket orders.
+
+    Pages are returned newest first and cursored by the store's insertion
+    sequence number (``before`` is exclusive).
+    """
+
+    # Bumped by every successful write, so callers can tell whether
+    # anything changed since they last looked
+    version: int = 0
+    # Whether writes survive a restart on their own; order state of other
+    # stores is snapshotted next to the fill log
+    persistent: bool = False
+
+    async def start(self) -> None:
+        """Open connections / create schema"""
+
+    async def close(self) -> None:
+        """Release connections"""
+
+    @abstractmethod
+    async def add(self, order: BracketOrderResponse) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, order_id: str) -> Optional[BracketOrderResponse]:
+        ...
+
+    @abstractmethod
+    async def update(self, order: BracketOrderResponse) -> None:
+        """Persist every mutable field of an existing order, take profit levels included"""
+
+    @abstractmethod
+    async def get_many(self, order_ids: Sequence[str]) -> List[BracketOrderResponse]:
+        """Orders for the ids that exist, in request order"""
+
+    @abstractmethod
+    async def save_batch(
+        self,
+        added: Sequence[BracketOrderResponse] = (),
+        updated: Sequence[BracketOrderResponse] = (),
+    ) -> None:
+        """Insert and update many orders in one transaction"""
+
+    @abstractmethod
+    async def query(
+        self,
+        symbol: Optional[str] = None,
+        statuses: Optional[Sequence[OrderStatus]] = None,
+        side: Optional[OrderSide] = None,
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Tuple[List[BracketOrderResponse], Optional[int]]:
+        """Newest-first page of orders and the cursor for the next page (None when exhausted)"""
+
+    async def changed_since(self, version: int) -> List[BracketOrderResponse]:
+        """Orders written after the store was at ``version`` (non-persistent stores only)"""
+        raise NotImplementedError
+
+    async def ping(self) -> bool:
+        return True
@@ -0,0 +1,215 @@
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+import os
+import re
+
+import numpy as np
+
+# Column name and little-endian dtype; the first column is the timestamp
+ColumnSchema = Sequence[Tuple[str, str]]
+
+CANDLE_COLUMNS: ColumnSchema = (
+    ("time", "<i8"),  # Bar open, seconds since epoch
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+)
+TICK_COLUMNS: ColumnSchema = (
+    ("time", "<i8"),  # Milliseconds since epoch
+    ("price", "<f8"),
+    ("size", "<f8"),
+)
+
+TICKS = "ticks"
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+class ColumnarSeries:
+    """Append-only time series stored as one fixed-width file per column.
+
+    Rows are ordered by the first (timestamp) column. Reads memory-map the
+    column files, find a time range with a binary search on the timestamp
+    column and return NumPy views into the maps, so nothing is copied or
+    parsed. The row count is the length of the shortest column: a write
+    torn by a crash leaves some columns a row ahead, and those trailing
+    bytes are ignored and truncated before the next append.
+
+    ``strict`` series (candles) reject a timestamp equal to the last one;
+    tick series accept repeats. Each series has a single writer; any number
+    of processes may read it.
+    """
+
+    def __init__(self, path: str, columns: ColumnSchema, strict: bool = True):
+        self.path = path
+        self.dtypes: Dict[str, np.dtype] = {name: np.dtype(dtype) for name, dtype in columns}
+        self.time_column = columns[0][0]
+        self.strict = strict
+        self._maps: Dict[str, np.ndarray] = {}
+        self._mapped_size = -1  # Size of the timestamp file when last mapped
+        self._last: Optional[int] = None
+        self._repaired = False
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.dtypes)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def __len__(self) -> int:
+        rows = None
+        for name, dtype in self.dtypes.items():
+            try:
+                count = os.path.getsize(self._file(name)) // dtype.itemsize
+            except FileNotFoundError:
+                return 0
+            rows = count if rows is None else min(rows, count)
+        return rows or 0
+
+    def _view(self) -> Dict[str, np.ndarray]:
+        """Maps of every column covering all complete rows.
+
+        Appends write the timestamp column last, so once it grows every
+        other column already holds the new rows: its size alone tells
+        whether the series grew, and only then are the columns remapped.
+        """
+        try:
+            size = os.path.getsize(self._file(self.time_column))
+        except FileNotFoundError:
+            size = 0
+        if size != self._mapped_size:
+            rows = len(self)
+            if rows == 0:
+                self._maps = {name: np.empty(0, dtype) for name, dtype in self.dtypes.items()}
+            else:
+                self._maps = {
+                    name: np.memmap(self._file(name), dtype=dtype, mode="r", shape=(rows,))
+                    for name, dtype in self.dtypes.items()
+                }
+            self._mapped_size = size
+            self._last = None
+        return self._maps
+
+    # Reads
+
+    def last_time(self) -> Optional[int]:
+        if self._last is None:
+            times = self._view()[self.time_column]
+            self._last = int(times[-1]) if len(times) else None
+        return self._last
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Views of the rows with ``start <= time < end`` (either bound may be open)"""
+        columns = self._view()
+        times = columns[self.time_column]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def tail(self, limit: int, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Views of up to ``limit`` most recent rows with ``time < end``"""
+        columns = self._view()
+        times = columns[self.time_column]
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+        lo = max(0, hi - limit)
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    # Writes
+
+    def append(self, rows: Mapping[str, Sequence]) -> int:
+        """Append rows given as one array per column, timestamps ascending; returns the row count"""
+        missing = set(self.dtypes) - set(rows)
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+        arrays = {name: np.ascontiguousarray(rows[name], dtype=dtype) for name, dtype in self.dtypes.items()}
+        times = arrays[self.time_column]
+        count = len(times)
+        if any(len(array) != count for array in arrays.values()):
+            raise ValueError("Columns must have the same length")
+        if count == 0:
+            return 0
+
+        steps = np.diff(times)
+        last = self.last_time()
+        if self.strict:
+            ordered = (steps > 0).all() and (last is None or times[0] > last)
+        else:
+            ordered = (steps >= 0).all() and (last is None or times[0] >= last)
+        if not ordered:
+            raise ValueError(f"Timestamps must increase past {last}")
+
+        if not self._repaired:
+            self._repair()
+        # Timestamps last: readers take their growth as the rows being complete
+        for name in sorted(arrays, key=lambda name: name == self.time_column):
+            with open(self._file(name), "ab") as f:
+                f.write(arrays[name].tobytes())
+        self._last = int(times[-1])
+        return count
+
+    def _repair(self) -> None:
+        """Create the directory and drop trailing rows left by a torn write"""
+        os.makedirs(self.path, exist_ok=True)
+        rows = len(self)
+        for name, dtype in self.dtypes.items():
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) != rows * dtype.itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * dtype.itemsize)
+        self._repaired = True
+
+class ColumnarStore:
+    """Per-symbol candle and tick series under one directory.
+
+    Layout: ``<root>/<symbol>/<timeframe>/`` for candles (``1m``, ``1h``,
+    ...) and ``<root>/<symbol>/ticks/`` for ticks, each holding one
+    ``<column>.bin`` file per column. Files are plain little-endian arrays,
+    so offline tools can also open them with ``np.memmap`` directly.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._series: Dict[Tuple[str, str], ColumnarSeries] = {}
+
+    def series(self, symbol: str, kind: str) -> ColumnarSeries:
+        key = (symbol, kind)
+        series = self._series.get(key)
+        if series is None:
+            if not _SAFE_NAME.match(symbol) or not _SAFE_NAME.match(kind):
+                raise ValueError(f"Invalid series name: {symbol}/{kind}")
+            if kind == TICKS:
+                series = ColumnarSeries(os.path.join(self.root, symbol, kind), TICK_COLUMNS, strict=False)
+            else:
+                series = ColumnarSeries(os.path.join(self.root, symbol, kind), CANDLE_COLUMNS)
+            self._series[key] = series
+        return series
+
+    def candles(self, symbol: str, timeframe: str) -> ColumnarSeries:
+        return self.series(symbol, timeframe)
+
+    def ticks(self, symbol: str) -> ColumnarSeries:
+        return self.series(symbol, TICKS)
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(entry for entry in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, entry)))
+
+    def kinds(self, symbol: str) -> List[str]:
+        path = os.path.join(self.root, symbol)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def __iter__(self) -> Iterator[ColumnarSeries]:
+        for symbol in self.symbols():
+            for kind in self.kinds(symbol):
+                yield self.series(symbol, kind)
+
+    def stats(self) -> dict:
+        series = list(self)
+        return {
+            "root": self.root,
+            "symbols": len(self.symbols()),
+            "series": len(series),
+            "rows": sum(len(s) for s in series),
+        }
@@ -0,0 +1,35 @@
+from decouple import config
+
+from .base import BracketOrderStore
+from .fill_log import FileFillLog, FillLog, InMemoryFillLog
+from .memory import InMemoryBracketOrderStore
+
+def create_bracket_order_store(kind: str = None, database_url: str = None) -> BracketOrderStore:
+    """Build the store selected by BRACKET_ORDER_STORE ('memory' or 'sql')"""
+    kind = (kind or config("BRACKET_ORDER_STORE", default="memory")).lower()
+    if kind == "memory":
+        return InMemoryBracketOrderStore()
+    if kind == "sql":
+        from .sql import SQLAlchemyBracketOrderStore, create_engine
+
+        engine = create_engine(
+            database_url or config("DATABASE_URL"),
+            pool_size=config("DB_POOL_SIZE", default=10, cast=int),
+            max_overflow=config("DB_MAX_OVERFLOW", default=20, cast=int),
+            pool_timeout=config("DB_POOL_TIMEOUT", default=30.0, cast=float),
+            pool_recycle=config("DB_POOL_RECYCLE", default=1800, cast=int),
+        )
+        return SQLAlchemyBracketOrderStore(engine)
+    raise ValueError(f"Unknown bracket order store: {kind}")
+
+def create_fill_log(kind: str = None, path: str = None) -> FillLog:
+    """Build the fill log selected by FILL_LOG ('memory' or 'file')"""
+    kind = (kind or config("FILL_LOG", default="memory")).lower()
+    if kind == "memory":
+        return InMemoryFillLog()
+    if kind == "file":
+        return FileFillLog(
+            path or config("FILL_LOG_PATH", default="data/fills.log"),
+            fsync=config("FILL_LOG_FSYNC", default=False, cast=bool),
+        )
+    raise ValueError(f"Unknown fill log: {kind}")
@@ -0,0 +1,284 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+import asyncio
+import json
+import os
+
+from ..models.bracket_order import BracketOrderResponse, FillEvent
+
+class LogPosition(NamedTuple):
+    """Last sequence number in the log and where the next record starts"""
+    seq: int
+    offset: int
+
+class FillSnapshot(NamedTuple):
+    position: LogPosition
+    orders: List[BracketOrderResponse]
+
+# A fill, or the full state of an order after a create, cancel or amend
+LogRecord = Union[FillEvent, BracketOrderResponse]
+
+class FillLog(ABC):
+    """Append-only log of bracket order fills.
+
+    Stores that do not persist orders themselves also log the state an
+    order is left in by a create, cancel or amend, so those survive a
+    crash between snapshots. Records get consecutive sequence numbers on
+    append; an order's ``fill_seq`` is the last record it reflects. Snapshots of order
+    state are tagged with the log position they cover, so recovery only
+    has to replay the records after it. A snapshot is updated with the
+    orders changed since the previous one; the others keep their state.
+    """
+
+    async def start(self) -> None:
+        """Open the log"""
+
+    async def close(self) -> None:
+        """Flush and close the log"""
+
+    @abstractmethod
+    def position(self) -> LogPosition:
+        ...
+
+    @abstractmethod
+    async def append(self, fills: Sequence[FillEvent]) -> None:
+        """Durably append fills, assigning their ``seq``"""
+
+    @abstractmethod
+    async def append_orders(self, orders: Sequence[BracketOrderResponse]) -> None:
+        """Durably append order states, assigning each a ``seq`` that becomes its ``fill_seq``"""
+
+    @abstractmethod
+    async def read(self, after: Optional[LogPosition] = None, order_id: Optional[str] = None) -> List[FillEvent]:
+        """Fills after a position (all when None), optionally for one order, in log order"""
+
+    @abstractmethod
+    async def replay(self, after: Optional[LogPosition] = None) -> List[LogRecord]:
+        """Every record after a position (all when None), fills and order states, in log order"""
+
+    @abstractmethod
+    async def save_snapshot(self, position: LogPosition, orders: Sequence[BracketOrderResponse]) -> None:
+        """Move the snapshot to ``position``, replacing the state of ``orders`` in it"""
+
+    @abstractmethod
+    async def load_snapshot(self) -> Optional[FillSnapshot]:
+        ...
+
+class InMemoryFillLog(FillLog):
+    """Process-local log for development, tests and benchmarks"""
+
+    def __init__(self):
+        self.fills: List[FillEvent] = []
+        self.records: List[LogRecord] = []
+        self._by_order: Dict[str, List[FillEvent]] = {}
+        self._snapshot: Optional[FillSnapshot] = None
+        self._snapshot_orders: Dict[str, BracketOrderResponse] = {}
+
+    def position(self) -> LogPosition:
+        return LogPosition(len(self.records), len(self.records))
+
+    async def append(self, fills: Sequence[FillEvent]) -> None:
+        for fill in fills:
+            fill.seq = len(self.records) + 1
+            self.records.append(fill)
+            self.fills.append(fill)
+            self._by_order.setdefault(fill.order_id, []).append(fill)
+
+    async def append_orders(self, orders: Sequence[BracketOrderResponse]) -> None:
+        for order in orders:
+            order.fill_seq = len(self.records) + 1
+            self.records.append(order.copy(deep=True))
+
+    async def read(self, after: Optional[LogPosition] = None, order_id: Optional[str] = None) -> List[FillEvent]:
+        fills = self._by_order.get(order_id, []) if order_id is not None else self.fills
+        if after is None:
+            return list(fills)
+        return [fill for fill in fills if fill.seq > after.seq]
+
+    async def replay(self, after: Optional[LogPosition] = None) -> List[LogRecord]:
+        return self.records[after.offset if after is not None else 0:]
+
+    async def save_snapshot(self, position: LogPosition, orders: Sequence[BracketOrderResponse]) -> None:
+        for order in orders:
+            self._snapshot_orders[order.id] = order.copy(deep=True)
+        self._snapshot = FillSnapshot(position, list(self._snapshot_orders.values()))
+
+    async def load_snapshot(self) -> Optional[FillSnapshot]:
+        return self._snapshot
+
+class FileFillLog(FillLog):
+    """JSON-lines log file with a snapshot file next to it (``<path>.snapshot``).
+
+    A fill is logged as the FillEvent's JSON, an order state as
+    ``{"seq": ..., "order": {...}}``. Records are appended and flushed on
+    every write (fsynced when ``fsync`` is set). The snapshot stores the
+    byte offset of the position it covers, so startup and recovery read
+    only the tail of the log. The snapshot is written to a temporary file
+    and renamed into place; orders are kept serialized in memory, so an
+    update only encodes the changed ones. One order's fills are read
+    through an index of their offsets, built by the first such read.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.fsync = fsync
+        self._file = None
+        self._position = LogPosition(0, 0)
+        self._lock = asyncio.Lock()
+        self._snapshot_orders: Dict[str, str] = {}  # order id -> JSON
+        self._fill_offsets: Optional[Dict[str, List[int]]] = None  # order id -> offsets of its fills
+
+    async def start(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        snapshot = await self.load_snapshot()
+        start = snapshot.position if snapshot is not None else LogPosition(0, 0)
+        self._position = await asyncio.to_thread(self._scan_tail, start)
+        self._file = open(self.path, "ab")
+
+    async def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _scan_tail(self, start: LogPosition) -> LogPosition:
+        if not os.path.exists(self.path):
+            return LogPosition(0, 0)
+        seq, offset = start
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn write from a crash: drop the partial record
+                    break
+                seq = json.loads(line)["seq"]
+                offset += len(line)
+        if offset < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+        return LogPosition(seq, offset)
+
+    def position(self) -> LogPosition:
+        return self._position
+
+    async def append(self, fills: Sequence[FillEvent]) -> None:
+        await self._append(fills, self._fill_line)
+
+    async def append_orders(self, orders: Sequence[BracketOrderResponse]) -> None:
+        await self._append(orders, self._order_line)
+
+    @staticmethod
+    def _fill_line(fill: FillEvent, seq: int) -> bytes:
+        fill.seq = seq
+        return fill.json().encode()
+
+    @staticmethod
+    def _order_line(order: BracketOrderResponse, seq: int) -> bytes:
+        order.fill_seq = seq
+        return b'{"seq": %d, "order": %s}' % (seq, order.json().encode())
+
+    async def _append(self, records: Sequence[LogRecord], encode) -> None:
+        if not records:
+            return
+        async with self._lock:
+            seq, offset = self._position
+            lines = []
+            end = offset
+            for record in records:
+                seq += 1
+                line = encode(record, seq) + b"\n"
+                if self._fill_offsets is not None and isinstance(record, FillEvent):
+                    self._fill_offsets.setdefault(record.order_id, []).append(end)
+                lines.append(line)
+                end += len(line)
+            data = b"".join(lines)
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                await asyncio.to_thread(os.fsync, self._file.fileno())
+            self._position = LogPosition(seq, offset + len(data))
+
+    async def read(self, after: Optional[LogPosition] = None, order_id: Optional[str] = None) -> List[FillEvent]:
+        if order_id is not None:
+            return await self._read_order(order_id, after.offset if after is not None else 0)
+        records = await asyncio.to_thread(self._read, after, self._position.offset)
+        return [record for record in records if isinstance(record, FillEvent)]
+
+    async def _read_order(self, order_id: str, start: int) -> List[FillEvent]:
+        if self._fill_offsets is None:
+            async with self._lock:
+                if self._fill_offsets is None:
+                    self._fill_offsets = await asyncio.to_thread(self._index_fills, self._position.offset)
+        offsets = [offset for offset in self._fill_offsets.get(order_id, ()) if offset >= start]
+        if not offsets:
+            return []
+        return await asyncio.to_thread(self._read_at, offsets)
+
+    def _index_fills(self, end: int) -> Dict[str, List[int]]:
+        index: Dict[str, List[int]] = {}
+        if not os.path.exists(self.path):
+            return index
+        offset = 0
+        with open(self.path, "rb") as f:
+            while offset < end:
+                line = f.readline()
+                data = json.loads(line)
+                if "order" not in data:
+                    index.setdefault(data["order_id"], []).append(offset)
+                offset += len(line)
+        return index
+
+    def _read_at(self, offsets: List[int]) -> List[FillEvent]:
+        fills = []
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                fills.append(FillEvent.parse_obj(json.loads(f.readline())))
+        return fills
+
+    async def replay(self, after: Optional[LogPosition] = None) -> List[LogRecord]:
+        return await asyncio.to_thread(self._read, after, self._position.offset)
+
+    @staticmethod
+    def _parse(line: bytes) -> LogRecord:
+        data = json.loads(line)
+        if "order" in data:
+            return BracketOrderResponse.parse_obj(data["order"])
+        return FillEvent.parse_obj(data)
+
+    def _read(self, after: Optional[LogPosition], end: int) -> List[LogRecord]:
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "rb") as f:
+            f.seek(after.offset if after is not None else 0)
+            while f.tell() < end:
+                records.append(self._parse(f.readline()))
+        return records
+
+    async def save_snapshot(self, position: LogPosition, orders: Sequence[BracketOrderResponse]) -> None:
+        for order in orders:
+            self._snapshot_orders[order.id] = order.json()
+        data = '{"seq": %d, "offset": %d, "orders": [%s]}' % (
+            position.seq, position.offset, ", ".join(self._snapshot_orders.values())
+        )
+        await asyncio.to_thread(self._write_snapshot, data)
+
+    def _write_snapshot(self, data: str) -> None:
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    async def load_snapshot(self) -> Optional[FillSnapshot]:
+        if not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.snapshot_path) as f:
+            data = json.load(f)
+        orders = [BracketOrderResponse.parse_obj(order) for order in data["orders"]]
+        self._snapshot_orders = {order.id: order.json() for order in orders}
+        return FillSnapshot(LogPosition(data["seq"], data["offset"]), orders)
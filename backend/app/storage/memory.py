@@ -0,0 +1,104 @@
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from ..models.bracket_order import BracketOrderResponse, OrderSide, OrderStatus
+from .base import BracketOrderStore
+from .order_index import OrderIndex
+
+def _status_keys(order: BracketOrderResponse, status: OrderStatus) -> List[Hashable]:
+    """Index keys that depend on an order's status"""
+    return [
+        ("status", status),
+        ("symbol_status", order.symbol, status),
+        ("symbol_side_status", order.symbol, order.side, status),
+    ]
+
+class InMemoryBracketOrderStore(BracketOrderStore):
+    """Process-local store; orders are kept as live objects.
+
+    Used for development, tests and benchmarks. State is lost on restart.
+    """
+
+    def __init__(self):
+        self.orders: Dict[str, BracketOrderResponse] = {}
+        # Per-symbol / per-status indexes in creation order
+        self._index = OrderIndex()
+        self._indexed_status: Dict[str, OrderStatus] = {}
+        # order id -> version of its last write, oldest write first
+        self._written: Dict[str, int] = {}
+
+    @staticmethod
+    def _index_keys(order: BracketOrderResponse) -> List[Hashable]:
+        return [("all",), ("symbol", order.symbol)] + _status_keys(order, order.status)
+
+    async def add(self, order: BracketOrderResponse) -> None:
+        self.orders[order.id] = order
+        self._indexed_status[order.id] = order.status
+        self._index.add(order.id, self._index_keys(order))
+        self._written_at(order.id)
+
+    async def get(self, order_id: str) -> Optional[BracketOrderResponse]:
+        return self.orders.get(order_id)
+
+    async def update(self, order: BracketOrderResponse) -> None:
+        self.orders[order.id] = order
+        previous = self._indexed_status.get(order.id)
+        if previous is not None and previous != order.status:
+            self._index.move(
+                order.id,
+                _status_keys(order, previous),
+                _status_keys(order, order.status),
+            )
+            self._indexed_status[order.id] = order.status
+        self._written_at(order.id)
+
+    def _written_at(self, order_id: str) -> None:
+        self.version += 1
+        self._written.pop(order_id, None)
+        self._written[order_id] = self.version
+
+    async def changed_since(self, version: int) -> List[BracketOrderResponse]:
+        changed = []
+        for order_id, written in reversed(self._written.items()):
+            if written <= version:
+                break
+            changed.append(self.orders[order_id])
+        changed.reverse()
+        return changed
+
+    async def get_many(self, order_ids: Sequence[str]) -> List[BracketOrderResponse]:
+        return [self.orders[order_id] for order_id in order_ids if order_id in self.orders]
+
+    async def save_batch(
+        self,
+        added: Sequence[BracketOrderResponse] = (),
+        updated: Sequence[BracketOrderResponse] = (),
+    ) -> None:
+        for order in added:
+            await self.add(order)
+        for order in updated:
+            await self.update(order)
+
+    async def query(
+        self,
+        symbol: Optional[str] = None,
+        statuses: Optional[Sequence[OrderStatus]] = None,
+        side: Optional[OrderSide] = None,
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Tuple[List[BracketOrderResponse], Optional[int]]:
+        if side is not None and symbol and statuses:
+            keys = [("symbol_side_status", symbol, side, st) for st in statuses]
+        elif side is not None:
+            raise ValueError("Filtering by side requires a symbol and statuses")
+        elif statuses:
+            if symbol:
+                keys = [("symbol_status", symbol, st) for st in statuses]
+            else:
+                keys = [("status", st) for st in statuses]
+        elif symbol:
+            keys = [("symbol", symbol)]
+        else:
+            keys = [("all",)]
+
+        order_ids, next_seq = self._index.page(keys, limit=limit, before=before)
+        return [self.orders[order_id] for order_id in order_ids], next_seq
@@ -0,0 +1,82 @@
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from bisect import bisect_left
+import heapq
+
+class OrderIndex:
+    """Secondary indexes over orders, each kept in creation order.
+
+    Every order gets a monotonically increasing sequence number when it is
+    added. Each index bucket is a sorted list of sequence numbers, so a page
+    of the newest orders costs O(log n + page size) and needs no sorting.
+    """
+
+    def __init__(self):
+        self._next_seq = 1
+        self._seq_by_id: Dict[str, int] = {}
+        self._id_by_seq: Dict[int, str] = {}
+        self._buckets: Dict[Hashable, List[int]] = {}
+
+    def add(self, order_id: str, keys: Iterable[Hashable]) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seq_by_id[order_id] = seq
+        self._id_by_seq[seq] = order_id
+        for key in keys:
+            # New sequence numbers are always the largest, so append keeps order
+            self._buckets.setdefault(key, []).append(seq)
+        return seq
+
+    def move(self, order_id: str, old_keys: Iterable[Hashable], new_keys: Iterable[Hashable]):
+        """Re-bucket an order whose indexed attributes changed (e.g. status)"""
+        seq = self._seq_by_id[order_id]
+        for key in old_keys:
+            bucket = self._buckets.get(key)
+            if bucket:
+                i = bisect_left(bucket, seq)
+                if i < len(bucket) and bucket[i] == seq:
+                    del bucket[i]
+                if not bucket:
+                    del self._buckets[key]
+        for key in new_keys:
+            bucket = self._buckets.setdefault(key, [])
+            i = bisect_left(bucket, seq)
+            if i == len(bucket) or bucket[i] != seq:
+                bucket.insert(i, seq)
+
+    def seq(self, order_id: str) -> Optional[int]:
+        return self._seq_by_id.get(order_id)
+
+    def count(self, key: Hashable) -> int:
+        return len(self._buckets.get(key, ()))
+
+    def _newest_first(self, key: Hashable, before: Optional[int]) -> Iterator[int]:
+        bucket = self._buckets.get(key)
+        if not bucket:
+            return iter(())
+        end = len(bucket) if before is None else bisect_left(bucket, before)
+        return (-bucket[i] for i in range(end - 1, -1, -1))
+
+    def page(
+        self,
+        keys: List[Hashable],
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Tuple[List[str], Optional[int]]:
+        """Newest-first order ids from the union of buckets.
+
+        ``before`` is an exclusive sequence cursor. Returns the ids and the
+        cursor for the next page (None when exhausted).
+        """
+        if len(keys) == 1:
+            stream = self._newest_first(keys[0], before)
+        else:
+            # Buckets are disjoint for the keys we merge (one per status)
+            stream = heapq.merge(*(self._newest_first(key, before) for key in keys))
+        ids: List[str] = []
+        last_seq = None
+        for neg_seq in stream:
+            if limit is not None and len(ids) == limit:
+                return ids, last_seq
+            last_seq = -neg_seq
+            ids.append(self._id_by_seq[last_seq])
+        return ids, None
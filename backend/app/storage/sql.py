@@ -0,0 +1,255 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from ..models.bracket_order import (
+    BracketOrderResponse,
+    EntryType,
+    OrderSide,
+    OrderStatus,
+    TakeProfitLevel,
+)
+from ..models.orm import Base, BracketOrderRow, TakeProfitRow
+from .base import BracketOrderStore
+
+# Sync driver URLs from DATABASE_URL are mapped to their async drivers
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is not None:
+        parsed = parsed.set(drivername=driver)
+    return parsed.render_as_string(hide_password=False)
+
+def create_engine(
+    url: str,
+    pool_size: int = 10,
+    max_overflow: int = 20,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = 1800,
+    echo: bool = False,
+) -> AsyncEngine:
+    """Async engine with a bounded, pre-pinged connection pool"""
+    url = async_database_url(url)
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite picks its own pool (StaticPool for :memory:); sizing options do not apply
+        return create_async_engine(url, echo=echo)
+    return create_async_engine(
+        url,
+        echo=echo,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=True,
+    )
+
+def _order_values(order: BracketOrderResponse) -> Dict[str, Any]:
+    return {
+        "symbol": order.symbol,
+        "side": order.side.value,
+        "quantity": order.quantity,
+        "status": order.status.value,
+        "created_at": order.created_at,
+        "entry_type": order.entry_type.value,
+        "entry_price": order.entry_price,
+        "entry_order_id": order.entry_order_id,
+        "entry_filled_quantity": order.entry_filled_quantity,
+        "entry_average_price": order.entry_average_price,
+        "stop_loss_price": order.stop_loss_price,
+        "stop_loss_order_id": order.stop_loss_order_id,
+        "total_filled_quantity": order.total_filled_quantity,
+        "remaining_quantity": order.remaining_quantity,
+        "total_pnl": order.total_pnl,
+        "fill_seq": order.fill_seq,
+    }
+
+def _take_profit_values(order: BracketOrderResponse) -> List[Dict[str, Any]]:
+    return [
+        {
+            "bracket_order_id": order.id,
+            "level": level,
+            "price": tp.price,
+            "quantity": tp.quantity,
+            "order_id": tp.order_id,
+            "filled_quantity": tp.filled_quantity,
+        }
+        for level, tp in enumerate(order.take_profit_levels)
+    ]
+
+def _to_response(row: BracketOrderRow) -> BracketOrderResponse:
+    return BracketOrderResponse(
+        id=row.id,
+        symbol=row.symbol,
+        side=OrderSide(row.side),
+        quantity=row.quantity,
+        status=OrderStatus(row.status),
+        created_at=row.created_at,
+        entry_type=EntryType(row.entry_type),
+        entry_price=row.entry_price,
+        entry_order_id=row.entry_order_id,
+        entry_filled_quantity=row.entry_filled_quantity,
+        entry_average_price=row.entry_average_price,
+        stop_loss_price=row.stop_loss_price,
+        stop_loss_order_id=row.stop_loss_order_id,
+        take_profit_levels=[
+            TakeProfitLevel(
+                price=tp.price,
+                quantity=tp.quantity,
+                order_id=tp.order_id,
+                filled_quantity=tp.filled_quantity,
+            )
+            for tp in row.take_profit_levels
+        ],
+        total_filled_quantity=row.total_filled_quantity,
+        remaining_quantity=row.remaining_quantity,
+        total_pnl=row.total_pnl,
+        fill_seq=row.fill_seq,
+    )
+
+class SQLAlchemyBracketOrderStore(BracketOrderStore):
+    """Async SQLAlchemy store (PostgreSQL via asyncpg, SQLite via aiosqlite).
+
+    Take profit levels are written with one executemany per order and read
+    with a joined eager load, so every read is a single round trip.
+    """
+
+    persistent = True
+
+    def __init__(self, engine: AsyncEngine, create_schema: bool = True):
+        self.engine = engine
+        self.create_schema = create_schema
+        self._session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def start(self) -> None:
+        if self.create_schema:
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+    async def close(self) -> None:
+        await self.engine.dispose()
+
+    async def ping(self) -> bool:
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+
+    async def add(self, order: BracketOrderResponse) -> None:
+        async with self._session() as session, session.begin():
+            await session.execute(insert(BracketOrderRow).values(id=order.id, **_order_values(order)))
+            take_profits = _take_profit_values(order)
+            if take_profits:
+                await session.execute(insert(TakeProfitRow), take_profits)
+        self.version += 1
+
+    async def get(self, order_id: str) -> Optional[BracketOrderResponse]:
+        async with self._session() as session:
+            result = await session.execute(
+                select(BracketOrderRow)
+                .options(joinedload(BracketOrderRow.take_profit_levels))
+                .where(BracketOrderRow.id == order_id)
+            )
+            row = result.unique().scalar_one_or_none()
+            return _to_response(row) if row is not None else None
+
+    async def update(self, order: BracketOrderResponse) -> None:
+        async with self._session() as session, session.begin():
+            values = _order_values(order)
+            del values["created_at"]
+            await session.execute(
+                update(BracketOrderRow).where(BracketOrderRow.id == order.id).values(**values)
+            )
+            await session.execute(delete(TakeProfitRow).where(TakeProfitRow.bracket_order_id == order.id))
+            take_profits = _take_profit_values(order)
+            if take_profits:
+                await session.execute(insert(TakeProfitRow), take_profits)
+        self.version += 1
+
+    async def get_many(self, order_ids: Sequence[str]) -> List[BracketOrderResponse]:
+        if not order_ids:
+            return []
+        async with self._session() as session:
+            result = await session.execute(
+                select(BracketOrderRow)
+                .options(joinedload(BracketOrderRow.take_profit_levels))
+                .where(BracketOrderRow.id.in_(list(order_ids)))
+            )
+            rows = {row.id: row for row in result.unique().scalars()}
+        return [_to_response(rows[order_id]) for order_id in order_ids if order_id in rows]
+
+    async def save_batch(
+        self,
+        added: Sequence[BracketOrderResponse] = (),
+        updated: Sequence[BracketOrderResponse] = (),
+    ) -> None:
+        if not added and not updated:
+            return
+        async with self._session() as session, session.begin():
+            if added:
+                await session.execute(
+                    insert(BracketOrderRow),
+                    [dict(id=order.id, **_order_values(order)) for order in added],
+                )
+            if updated:
+                rows = []
+                for order in updated:
+                    values = _order_values(order)
+                    del values["created_at"]
+                    values["order_id"] = order.id
+                    rows.append(values)
+                table = BracketOrderRow.__table__
+                await session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("order_id"))
+                    .values({column: bindparam(column) for column in rows[0] if column != "order_id"}),
+                    rows,
+                )
+                await session.execute(
+                    delete(TakeProfitRow).where(
+                        TakeProfitRow.bracket_order_id.in_([order.id for order in updated])
+                    )
+                )
+            take_profits = [tp for order in (*added, *updated) for tp in _take_profit_values(order)]
+            if take_profits:
+                await session.execute(insert(TakeProfitRow), take_profits)
+        self.version += 1
+
+    async def query(
+        self,
+        symbol: Optional[str] = None,
+        statuses: Optional[Sequence[OrderStatus]] = None,
+        side: Optional[OrderSide] = None,
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Tuple[List[BracketOrderResponse], Optional[int]]:
+        stmt = select(BracketOrderRow).options(joinedload(BracketOrderRow.take_profit_levels))
+        if symbol:
+            stmt = stmt.where(BracketOrderRow.symbol == symbol)
+        if statuses:
+            stmt = stmt.where(BracketOrderRow.status.in_([OrderStatus(st).value for st in statuses]))
+        if side is not None:
+            stmt = stmt.where(BracketOrderRow.side == OrderSide(side).value)
+        if before is not None:
+            stmt = stmt.where(BracketOrderRow.seq < before)
+        stmt = stmt.order_by(BracketOrderRow.seq.desc())
+        if limit is not None:
+            # One extra row tells us whether another page exists
+            stmt = stmt.limit(limit + 1)
+
+        async with self._session() as session:
+            result = await session.execute(stmt)
+            rows = list(result.unique().scalars())
+
+        next_seq = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_seq = rows[-1].seq
+        return [_to_response(row) for row in rows], next_seq
@@ -0,0 +1,107 @@
+"""Exchange requests caused by chart drags, with and without amend coalescing.
+
+Drags the stop loss of several pending limit brackets concurrently (one
+edit every ``--interval-ms`` per order, as a throttled chart sends them)
+through the in-process mock exchange with exits resting on the exchange,
+so every committed amendment cancels and resubmits all legs. Reports
+exchange requests, rate limit rejections, commits and the latency until
+each edit is acknowledged.
+
+    python -m benchmarks.bench_amend_coalescer [--orders 5] [--edits 60] [--interval-ms 16] [--window-ms 150]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from decimal import Decimal
+
+from app.exchange.base import ExchangeError
+from app.exchange.factory import create_exchange_gateway
+from app.models.bracket_order import (
+    BracketOrderCreate,
+    BracketOrderUpdate,
+    EntryType,
+    OrderSide,
+    TakeProfitLevel,
+)
+from app.services.amend_coalescer import AmendCoalescer
+from app.services.bracket_order_service import BracketOrderService
+from app.storage.memory import InMemoryBracketOrderStore
+
+async def _drag(coalescer: AmendCoalescer, order_id: str, edits: int, interval: float, latencies: list, failed: list):
+    for i in range(edits):
+        update = BracketOrderUpdate(stop_loss_price=Decimal(44000 - i))
+        start = time.perf_counter()
+        try:
+            await coalescer.submit(order_id, update)
+        except ExchangeError:
+            failed.append(i)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+async def _run_one(orders: int, edits: int, interval_ms: int, window_ms: int) -> dict:
+    gateway = create_exchange_gateway("mock")
+    service = BracketOrderService(InMemoryBracketOrderStore(), gateway=gateway)
+    coalescer = AmendCoalescer(service, window_ms=window_ms)
+    with contextlib.redirect_stdout(io.StringIO()):
+        created = [
+            await service.create_bracket_order(BracketOrderCreate(
+                symbol="BTC-USDT",
+                side=OrderSide.BUY,
+                quantity=Decimal("1"),
+                entry_type=EntryType.LIMIT,
+                entry_price=Decimal("45000"),
+                stop_loss_price=Decimal("44000"),
+                take_profit_levels=[
+                    TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("0.5")),
+                    TakeProfitLevel(price=Decimal("47000"), quantity=Decimal("0.5")),
+                ],
+            ))
+            for _ in range(orders)
+        ]
+        requests_before = gateway.stats()["requests"]
+        latencies, failed = [], []
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _drag(coalescer, order.id, edits, interval_ms / 1000, latencies, failed) for order in created
+        ))
+        await coalescer.flush()
+        elapsed = time.perf_counter() - start
+    stats = gateway.stats()
+    await gateway.close()
+    return {
+        "edits": orders * edits,
+        "commits": coalescer.commits if window_ms > 0 else orders * edits - len(failed),
+        "requests": stats["requests"] - requests_before,
+        "rate_limited": stats["rate_limited"],
+        "ack_p50_ms": statistics.median(latencies) * 1000,
+        "ack_max_ms": max(latencies) * 1000,
+        "elapsed_s": elapsed,
+    }
+
+async def run(orders: int = 5, edits: int = 60, interval_ms: int = 16, window_ms: int = 150) -> dict:
+    return {
+        "direct": await _run_one(orders, edits, interval_ms, 0),
+        "coalesced": await _run_one(orders, edits, interval_ms, window_ms),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=60)
+    parser.add_argument("--interval-ms", type=int, default=16)
+    parser.add_argument("--window-ms", type=int, default=150)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.orders, args.edits, args.interval_ms, args.window_ms))
+    for name, r in results.items():
+        print(f"  {name:10} {r['edits']:5} edits  {r['commits']:5} commits  {r['requests']:6} exchange requests"
+              f"  {r['rate_limited']:4} rate limited  ack p50 {r['ack_p50_ms']:7.2f} ms  max {r['ack_max_ms']:7.2f} ms  ({r['elapsed_s']:.2f}s)")
+    direct, coalesced = results["direct"]["requests"], results["coalesced"]["requests"]
+    if coalesced:
+        print(f"  {direct / coalesced:.0f}x fewer exchange requests")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Bracket order amendment throughput for one order (a chart drag).
+
+Compares the incremental path (changed fields checked against cached
+invariants, then a single copy) with full re-validation through a rebuilt
+BracketOrderCreate, and measures end-to-end update_bracket_order on the
+in-memory store without an exchange.
+
+    python -m benchmarks.bench_amend_validation [--updates 20000]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from decimal import Decimal
+
+from app.models.bracket_order import (
+    BracketOrderCreate,
+    BracketOrderUpdate,
+    EntryType,
+    OrderSide,
+    TakeProfitLevel,
+)
+from app.services.bracket_order_service import BracketOrderService
+from app.storage.memory import InMemoryBracketOrderStore
+
+def _full_revalidation(service: BracketOrderService, order, updates: BracketOrderUpdate):
+    # What every amendment used to cost: deep copy, a new create model, every check
+    amended = order.copy(deep=True)
+    for field, value in updates.dict(exclude_unset=True).items():
+        setattr(amended, field, value)
+    service.validate_bracket_order(BracketOrderCreate(
+        symbol=amended.symbol,
+        side=amended.side,
+        quantity=amended.quantity,
+        entry_type=amended.entry_type,
+        entry_price=amended.entry_price,
+        stop_loss_price=amended.stop_loss_price,
+        take_profit_levels=amended.take_profit_levels,
+    ))
+    return amended
+
+async def run(updates: int = 20_000) -> dict:
+    service = BracketOrderService(InMemoryBracketOrderStore())
+    with contextlib.redirect_stdout(io.StringIO()):
+        order = await service.create_bracket_order(BracketOrderCreate(
+            symbol="BTC-USDT",
+            side=OrderSide.BUY,
+            quantity=Decimal("1"),
+            entry_type=EntryType.LIMIT,
+            entry_price=Decimal("45000"),
+            stop_loss_price=Decimal("44000"),
+            take_profit_levels=[
+                TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("0.3")),
+                TakeProfitLevel(price=Decimal("47000"), quantity=Decimal("0.3")),
+                TakeProfitLevel(price=Decimal("48000"), quantity=Decimal("0.4")),
+            ],
+        ))
+    # A stop loss dragged tick by tick
+    drags = [BracketOrderUpdate(stop_loss_price=Decimal(44000 - i % 500)) for i in range(updates)]
+    results = {}
+
+    start = time.perf_counter()
+    for update in drags:
+        _full_revalidation(service, order, update)
+    results["full_per_sec"] = updates / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    amended = order
+    for update in drags:
+        amended = service._amended(amended, update)
+    results["incremental_per_sec"] = updates / (time.perf_counter() - start)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for update in drags:
+            await service.update_bracket_order(order.id, update)
+        results["update_per_sec"] = updates / (time.perf_counter() - start)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=20_000)
+    args = parser.parse_args()
+
+    r = asyncio.run(run(args.updates))
+    print(f"  full re-validation  {r['full_per_sec']:10,.0f} updates/s")
+    print(f"  incremental         {r['incremental_per_sec']:10,.0f} updates/s"
+          f"  ({r['incremental_per_sec'] / r['full_per_sec']:.1f}x)")
+    print(f"  update_bracket_order {r['update_per_sec']:9,.0f} updates/s (memory store, no exchange)")
+
+if __name__ == "__main__":
+    main()
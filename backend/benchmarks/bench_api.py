@@ -0,0 +1,150 @@
+"""In-process load test of the bracket order REST API.
+
+Drives the /api/bracket-orders router through httpx.ASGITransport (no
+sockets) with ``--concurrency`` concurrent clients, in four phases: create
+``--orders`` brackets, page through them, move every stop loss once, and
+cancel them all. Runs against a fresh service on the in-memory store,
+optionally with the in-process mock exchange (rate limits off) behind it.
+Amendments are committed per request (no coalescing window). Reports
+requests/sec and latency percentiles per phase.
+
+    python -m benchmarks.bench_api [--orders 2000] [--concurrency 20] [--gateway none]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api import bracket_orders as bracket_orders_api
+from app.services.amend_coalescer import AmendCoalescer
+from app.services.bracket_order_service import BracketOrderService
+from app.storage.memory import InMemoryBracketOrderStore
+
+def _gateway(kind: str):
+    if kind == "none":
+        return None
+    from app.exchange.kucoin import KuCoinGateway
+    from app.exchange.mock_server import MOCK_API_KEY, MOCK_API_SECRET, MOCK_PASSPHRASE, create_mock_exchange_app
+
+    return KuCoinGateway(
+        MOCK_API_KEY,
+        MOCK_API_SECRET,
+        MOCK_PASSPHRASE,
+        base_url="http://mock-exchange",
+        transport=httpx.ASGITransport(app=create_mock_exchange_app(enforce_rate_limits=False)),
+    )
+
+def _order(i: int) -> dict:
+    price = 45000 + i % 100
+    return {
+        "symbol": ("BTC-USDT", "ETH-USDT", "SOL-USDT")[i % 3],
+        "side": "buy",
+        "quantity": "1",
+        "entry_type": "limit",
+        "entry_price": str(price),
+        "stop_loss_price": str(price - 1000),
+        "take_profit_levels": [
+            {"price": str(price + 1000), "quantity": "0.5"},
+            {"price": str(price + 2000), "quantity": "0.5"},
+        ],
+    }
+
+async def _phase(requests, concurrency: int) -> dict:
+    """Run request factories with at most ``concurrency`` in flight; returns throughput and latency"""
+    latencies, failures = [], 0
+    queue = iter(requests)
+
+    async def worker():
+        nonlocal failures
+        for request in queue:
+            start = time.perf_counter()
+            response = await request()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "failures": failures,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+async def run(orders: int = 2000, concurrency: int = 20, gateway: str = "none", page_size: int = 50) -> dict:
+    exchange = _gateway(gateway)
+    service = BracketOrderService(InMemoryBracketOrderStore(), gateway=exchange)
+    # The router resolves these module globals per request
+    saved = bracket_orders_api.bracket_order_service, bracket_orders_api.amend_coalescer
+    bracket_orders_api.bracket_order_service = service
+    bracket_orders_api.amend_coalescer = AmendCoalescer(service, window_ms=0)
+    app = FastAPI()
+    app.include_router(bracket_orders_api.router, prefix="/api/bracket-orders")
+    results = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+                ids = []
+
+                async def create(i):
+                    response = await client.post("/api/bracket-orders/", json=_order(i))
+                    if response.status_code == 200:
+                        ids.append(response.json()["id"])
+                    return response
+
+                results["create"] = await _phase((lambda i=i: create(i) for i in range(orders)), concurrency)
+
+                pages = max(1, orders // page_size)
+                results["list"] = await _phase(
+                    (
+                        lambda i=i: client.get(
+                            "/api/bracket-orders/",
+                            params={"symbol": ("BTC-USDT", "ETH-USDT", "SOL-USDT")[i % 3], "limit": page_size},
+                        )
+                        for i in range(pages)
+                    ),
+                    concurrency,
+                )
+                results["update"] = await _phase(
+                    (
+                        lambda order_id=order_id: client.put(
+                            f"/api/bracket-orders/{order_id}", json={"stop_loss_price": "43500"}
+                        )
+                        for order_id in ids
+                    ),
+                    concurrency,
+                )
+                results["cancel"] = await _phase(
+                    (lambda order_id=order_id: client.delete(f"/api/bracket-orders/{order_id}") for order_id in ids),
+                    concurrency,
+                )
+    finally:
+        bracket_orders_api.bracket_order_service, bracket_orders_api.amend_coalescer = saved
+        if exchange is not None:
+            await exchange.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--gateway", choices=["none", "mock"], default="none")
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.orders, args.concurrency, args.gateway, args.page_size))
+    for phase, r in results.items():
+        print(f"  {phase:7} {r['requests']:6} requests  {r['requests_per_sec']:8.0f} req/s"
+              f"  p50 {r['p50_ms']:6.2f} ms  p99 {r['p99_ms']:6.2f} ms  {r['failures']} failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Tick replay backtester throughput over a bracket parameter grid.
+
+Writes seeded random-walk ticks for ``--symbols`` symbols to a temporary
+columnar archive, then replays a grid of buy and sell brackets (market and
+limit entries, 1 to 3 take profits) on every symbol, in process and with
+a process pool, and checks that both give identical results.
+
+    python -m benchmarks.bench_backtest [--ticks 500000] [--symbols 4] [--workers 4]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from app.models.bracket_order import OrderSide
+from app.services.backtest import bracket_grid, replay, run_backtest
+from app.storage.columnar import ColumnarStore
+
+TAKE_PROFITS = [(1.0,), (2.0,), (3.0,), (1.0, 2.0), (1.0, 3.0), (2.0, 4.0), (1.0, 2.0, 3.0), (1.0, 2.0, 4.0), (2.0, 3.0, 5.0)]
+SPLITS = [(1.0,), (0.5, 0.5), (0.3, 0.7), (0.3, 0.3, 0.4), (0.5, 0.25, 0.25)]
+
+def _grid():
+    return bracket_grid(
+        sides=(OrderSide.BUY, OrderSide.SELL),
+        stops_pct=(0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0),
+        take_profits_pct=TAKE_PROFITS,
+        splits=SPLITS,
+        entry_offsets_pct=(0.0, 0.1, 0.25, 0.5),
+    )
+
+def _write_ticks(root: str, symbols: int, ticks: int) -> list:
+    store = ColumnarStore(root)
+    names = [f"SYM{i}-USDT" for i in range(symbols)]
+    for i, name in enumerate(names):
+        rng = np.random.default_rng(i)
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.0004, ticks)))
+        store.ticks(name).append({
+            "time": np.arange(ticks, dtype=np.int64) * 500,
+            "price": prices,
+            "size": np.zeros(ticks),
+        })
+    return names
+
+def _same(a: dict, b: dict) -> bool:
+    for symbol in a:
+        for field, value in a[symbol].items():
+            other = b[symbol][field]
+            if isinstance(value, dict):
+                if value != other:
+                    return False
+            elif not np.array_equal(value, other, equal_nan=value.dtype.kind == "f"):
+                return False
+    return True
+
+def run(ticks: int = 500_000, symbols: int = 4, workers: int = 0) -> dict:
+    # At least two, so the pool path is exercised even on one CPU
+    workers = max(workers or os.cpu_count() or 1, 2)
+    variants = _grid()
+    root = tempfile.mkdtemp(prefix="backtest-")
+    try:
+        names = _write_ticks(root, symbols, ticks)
+        series = ColumnarStore(root).ticks(names[0]).range()
+        start = time.perf_counter()
+        replay(names[0], series["time"], series["price"], variants)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        serial = run_backtest(root, names, variants, workers=1)
+        serial_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pooled = run_backtest(root, names, variants, workers=workers)
+        pooled_elapsed = time.perf_counter() - start
+
+        evaluations = len(variants) * len(names)
+        return {
+            "variants": len(variants),
+            "symbols": len(names),
+            "ticks": ticks,
+            "workers": workers,
+            "single_symbol_s": single,
+            "serial_s": serial_elapsed,
+            "pool_s": pooled_elapsed,
+            "serial_variants_per_min": evaluations / serial_elapsed * 60,
+            "pool_variants_per_min": evaluations / pooled_elapsed * 60,
+            "deterministic": _same(serial, pooled),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=500_000, help="ticks per symbol")
+    parser.add_argument("--symbols", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=0, help="pool size, 0 = CPU count (at least 2)")
+    args = parser.parse_args()
+
+    r = run(args.ticks, args.symbols, args.workers)
+    print(f"  {r['variants']} variants x {r['symbols']} symbols, {r['ticks']:,} ticks each")
+    print(f"  {'one symbol':28}{r['single_symbol_s']:8.2f} s")
+    print(f"  {'all symbols, in process':28}{r['serial_s']:8.2f} s  {r['serial_variants_per_min']:12,.0f} variant-symbols/min")
+    pool = f"all symbols, {r['workers']} workers"
+    print(f"  {pool:28}{r['pool_s']:8.2f} s  {r['pool_variants_per_min']:12,.0f} variant-symbols/min")
+    print(f"  {'identical results':28}{r['deterministic']}")
+
+if __name__ == "__main__":
+    main()
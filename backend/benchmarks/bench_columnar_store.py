@@ -0,0 +1,125 @@
+"""Columnar candle/tick store: ingest throughput and range-read latency.
+
+Ingests ``--rows`` 1m bars in batches, minute-sized tick batches and
+single bars (the live archive path), then times random ``--window``-bar
+range reads (binary search plus NumPy views), the same reads converted to
+Candle objects as the candle endpoint does, and, for comparison, a full
+read of the timestamp column.
+
+    python -m benchmarks.bench_columnar_store [--rows 1000000] [--window 500] [--dir /tmp/bench]
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.candles import candles_from_columns
+from app.storage.columnar import ColumnarStore
+
+BATCH = 10_000
+TICKS_PER_MINUTE = 120
+
+def _bars(start: int, count: int) -> dict:
+    times = start + np.arange(count, dtype=np.int64) * 60
+    rng = np.random.default_rng(start)
+    close = 45000 + np.cumsum(rng.normal(0, 20, count))
+    return {
+        "time": times,
+        "open": close - 5,
+        "high": close + 15,
+        "low": close - 15,
+        "close": close,
+        "volume": rng.uniform(0, 10, count),
+    }
+
+def run(rows: int = 1_000_000, window: int = 500, reads: int = 2_000, directory: str = None) -> dict:
+    root = tempfile.mkdtemp(prefix="columnar-", dir=directory)
+    try:
+        store = ColumnarStore(root)
+        candles = store.candles("BTC-USDT", "1m")
+        results = {}
+
+        start = time.perf_counter()
+        for offset in range(0, rows, BATCH):
+            candles.append(_bars(offset * 60, min(BATCH, rows - offset)))
+        results["ingest_rows_per_sec"] = rows / (time.perf_counter() - start)
+
+        ticks = store.ticks("BTC-USDT")
+        minutes = 500
+        batches = [
+            {
+                "time": minute * 60_000 + np.arange(TICKS_PER_MINUTE, dtype=np.int64) * 500,
+                "price": np.full(TICKS_PER_MINUTE, 45000.0),
+                "size": np.zeros(TICKS_PER_MINUTE),
+            }
+            for minute in range(minutes)
+        ]
+        start = time.perf_counter()
+        for batch in batches:
+            ticks.append(batch)
+        results["tick_ingest_rows_per_sec"] = minutes * TICKS_PER_MINUTE / (time.perf_counter() - start)
+
+        singles = 1_000
+        live = store.candles("BTC-USDT", "5m")
+        one_bar = [_bars(i * 300, 1) for i in range(singles)]
+        for bar in one_bar:
+            bar["time"] = bar["time"] * 5
+        start = time.perf_counter()
+        for bar in one_bar:
+            live.append(bar)
+        results["single_bar_appends_per_sec"] = singles / (time.perf_counter() - start)
+
+        span = rows * 60
+        rng = random.Random(7)
+        starts = [rng.randrange(0, span - window * 60) // 60 * 60 for _ in range(reads)]
+
+        candles.range()  # map once, as a long-running reader would be
+        start = time.perf_counter()
+        for lo in starts:
+            view = candles.range(lo, lo + window * 60)
+        results["range_read_us"] = (time.perf_counter() - start) / reads * 1e6
+        assert len(view["time"]) == window and not view["close"].flags.owndata
+
+        start = time.perf_counter()
+        for lo in starts:
+            candles.tail(window, end=lo)
+        results["tail_read_us"] = (time.perf_counter() - start) / reads * 1e6
+
+        conversions = min(reads, 200)
+        start = time.perf_counter()
+        for lo in starts[:conversions]:
+            candles_from_columns(candles.range(lo, lo + window * 60))
+        results["range_to_candles_us"] = (time.perf_counter() - start) / conversions * 1e6
+
+        start = time.perf_counter()
+        full = np.fromfile(f"{candles.path}/time.bin", dtype="<i8")
+        full[(full >= starts[0]) & (full < starts[0] + window * 60)]
+        results["full_scan_ms"] = (time.perf_counter() - start) * 1000
+        results["rows"] = rows
+        results["window"] = window
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--window", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=2_000)
+    parser.add_argument("--dir", default=None, help="where to create the temporary store")
+    args = parser.parse_args()
+
+    r = run(args.rows, args.window, args.reads, args.dir)
+    print(f"  {'ingest (1m bars, batched)':32}{r['ingest_rows_per_sec']:14,.0f} rows/s")
+    print(f"  {'ingest (ticks, minute batches)':32}{r['tick_ingest_rows_per_sec']:14,.0f} rows/s")
+    print(f"  {'single bar appends':32}{r['single_bar_appends_per_sec']:14,.0f} /s")
+    print(f"  {f'range read ({args.window} bars, views)':32}{r['range_read_us']:14.1f} us")
+    print(f"  {f'tail read ({args.window} bars, views)':32}{r['tail_read_us']:14.1f} us")
+    print(f"  {'range read -> Candle objects':32}{r['range_to_candles_us']:14.1f} us")
+    print(f"  {'full timestamp scan':32}{r['full_scan_ms']:14.1f} ms ({args.rows:,} rows)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Load test of the exchange gateway against the local mock exchange.
+
+Starts the mock KuCoin server in a subprocess on a loopback port (real TCP,
+no external network) and submits bracket orders through KuCoinGateway, comparing:
+
+- concurrent vs sequential submission of a bracket's legs
+- a pooled keep-alive client vs a fresh connection per request
+
+    python -m benchmarks.bench_exchange_gateway [--brackets 400] [--concurrency 50] [--pool-size 10] [--latency-ms 5]
+
+Client and server share the machine, so on small hosts the numbers are CPU
+bound; compare rows against each other rather than with production.
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import httpx
+
+from app.exchange.kucoin import KuCoinGateway
+from app.exchange.mock_server import MOCK_API_KEY, MOCK_API_SECRET, MOCK_PASSPHRASE
+from app.exchange.rate_limit import EndpointRateLimiter
+from app.models.bracket_order import (
+    BracketOrderResponse,
+    EntryType,
+    OrderSide,
+    OrderStatus,
+    TakeProfitLevel,
+)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _start_mock(port: int, latency_ms: float) -> subprocess.Popen:
+    """Run the mock exchange in its own process so it doesn't share our GIL"""
+    process = subprocess.Popen([
+        sys.executable, "-m", "app.exchange.mock_server",
+        "--port", str(port), "--latency-ms", str(latency_ms), "--no-rate-limits",
+    ])
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/v1/timestamp")
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock exchange did not start")
+
+def _bracket() -> BracketOrderResponse:
+    return BracketOrderResponse(
+        id=str(uuid.uuid4()),
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        status=OrderStatus.PENDING,
+        created_at=datetime.utcnow(),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal("44000"),
+        take_profit_levels=[
+            TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("0.5")),
+            TakeProfitLevel(price=Decimal("47000"), quantity=Decimal("0.5")),
+        ],
+        remaining_quantity=Decimal("1"),
+    )
+
+async def _submit_sequential(gateway: KuCoinGateway, order: BracketOrderResponse):
+    for leg in gateway.bracket_leg_requests(order):
+        await gateway.place_order(leg)
+
+async def _run(
+    base_url: str, brackets: int, concurrency: int, pool_size: int, sequential_legs: bool, keepalive: bool
+) -> dict:
+    gateway = KuCoinGateway(
+        MOCK_API_KEY,
+        MOCK_API_SECRET,
+        MOCK_PASSPHRASE,
+        base_url=base_url,
+        # The mock does not enforce quotas here; keep the client limiter out of the measurement
+        rate_limiter=EndpointRateLimiter(pools={}),
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size if keepalive else 0,
+    )
+    orders = [_bracket() for _ in range(brackets)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def submit(order):
+        async with semaphore:
+            started = time.perf_counter()
+            if sequential_legs:
+                await _submit_sequential(gateway, order)
+            else:
+                await gateway.submit_bracket(order)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(submit(order) for order in orders))
+    elapsed = time.perf_counter() - started
+    await gateway.close()
+
+    latencies.sort()
+    return {
+        "brackets_per_sec": brackets / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": gateway.errors,
+    }
+
+def run(brackets: int = 400, concurrency: int = 50, pool_size: int = 10, latency_ms: float = 5) -> dict:
+    port = _free_port()
+    server = _start_mock(port, latency_ms)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        return {
+            "concurrent legs, pooled": asyncio.run(_run(base_url, brackets, concurrency, pool_size, False, True)),
+            "sequential legs, pooled": asyncio.run(_run(base_url, brackets, concurrency, pool_size, True, True)),
+            "concurrent legs, no keep-alive": asyncio.run(
+                _run(base_url, brackets, concurrency, pool_size, False, False)
+            ),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+def _bench_signing(iterations: int = 100_000) -> float:
+    gateway = KuCoinGateway(MOCK_API_KEY, MOCK_API_SECRET, MOCK_PASSPHRASE)
+    body = b'{"clientOid":"abc","symbol":"BTC-USDT","side":"buy","type":"limit","size":"1","price":"45000"}'
+    started = time.perf_counter()
+    for _ in range(iterations):
+        gateway.sign("1721815200000", "POST", "/api/v1/orders", body)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--brackets", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"signing: {_bench_signing():.2f} us/request")
+    print(f"{args.brackets} brackets (4 legs each), concurrency {args.concurrency}, "
+          f"pool {args.pool_size}, mock latency {args.latency_ms}ms")
+    for name, r in run(args.brackets, args.concurrency, args.pool_size, args.latency_ms).items():
+        print(f"  {name:<32} {r['brackets_per_sec']:8,.0f} brackets/s  p50 {r['p50_ms']:7.1f}ms"
+              f"  p99 {r['p99_ms']:7.1f}ms  errors {r['errors']}")
+
+if __name__ == "__main__":
+    main()
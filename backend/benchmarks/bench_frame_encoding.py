@@ -0,0 +1,76 @@
+"""Throughput of price-update encoding for multi-subscriber broadcast.
+
+Compares the legacy path (stdlib json.dumps + str send per subscriber) with
+encode-once frames for each available format.
+
+    python -m benchmarks.bench_frame_encoding [--subscribers 200] [--updates 2000]
+"""
+import argparse
+import json
+import time
+from decimal import Decimal
+
+from app.services import frame_encoder
+from app.services.frame_encoder import FrameCache, FrameFormat, available_formats
+
+def _price_payload(i: int) -> dict:
+    return {
+        "type": "price_update",
+        "symbol": "BTC-USDT",
+        "data": {
+            "price": str(Decimal("45000.10") + i),
+            "bid": str(Decimal("45000.00") + i),
+            "ask": str(Decimal("45000.20") + i),
+            "volume": "1234.5678",
+            "timestamp": 1721815200000 + i,
+        },
+    }
+
+def _bench_legacy(subscribers: int, updates: int) -> float:
+    payloads = [_price_payload(i) for i in range(updates)]
+    sink = []
+    start = time.perf_counter()
+    for payload in payloads:
+        message = json.dumps(payload)
+        for _ in range(subscribers):
+            sink.append(message)
+        sink.clear()
+    return time.perf_counter() - start
+
+def _bench_frames(frame_format: FrameFormat, subscribers: int, updates: int) -> float:
+    payloads = [_price_payload(i) for i in range(updates)]
+    sink = []
+    start = time.perf_counter()
+    for payload in payloads:
+        frames = FrameCache(payload)
+        for _ in range(subscribers):
+            sink.append(frames.get(frame_format))
+        sink.clear()
+    return time.perf_counter() - start
+
+def run(subscribers: int = 200, updates: int = 2000) -> dict:
+    results = {"legacy_json": (_bench_legacy(subscribers, updates),
+                               len(json.dumps(_price_payload(0)).encode("utf-8")))}
+    for fmt in available_formats():
+        results[f"frame_{fmt.value}"] = (_bench_frames(fmt, subscribers, updates),
+                                         len(FrameCache(_price_payload(0)).get(fmt).data))
+    return {
+        name: {"seconds": elapsed, "updates_per_sec": updates / elapsed, "frame_bytes": size}
+        for name, (elapsed, size) in results.items()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"json backend: {'orjson' if frame_encoder.orjson else 'stdlib'}, "
+          f"msgpack: {'yes' if frame_encoder.msgpack else 'no'}")
+    print(f"{args.updates} updates x {args.subscribers} subscribers")
+    for name, result in run(args.subscribers, args.updates).items():
+        print(f"  {name:<16} {result['seconds']:8.3f}s  {result['updates_per_sec']:12,.0f} updates/s"
+              f"  {result['frame_bytes']:5d} bytes/frame")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Event-loop cost of logging: print() versus queued structured logging.
+
+Measures, on the calling thread, a print() of the old update message, a
+structlog event handed to the writer thread, a sampled-out event and a
+disabled debug call, all writing to the same sink. ``--write-latency-us``
+makes every write to the sink that slow (a busy terminal, a pipe to a log
+collector): print() pays it on the event loop, the writer thread pays it
+for the queued logger. While the queued calls are timed the sink is held
+stalled, so the writer thread's rendering is measured separately. Then
+measures update_bracket_order with its log calls enabled and disabled.
+
+    python -m benchmarks.bench_logging [--calls 50000] [--write-latency-us 0] [--format console] [--updates 5000]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import threading
+import time
+from decimal import Decimal
+
+import structlog
+
+from app.models.bracket_order import (
+    BracketOrderCreate,
+    BracketOrderUpdate,
+    EntryType,
+    OrderSide,
+    TakeProfitLevel,
+)
+from app.services import bracket_order_service as service_module
+from app.services.bracket_order_service import BracketOrderService
+from app.services.structured_logging import configure_logging, logging_stats, stop_logging
+from app.storage.memory import InMemoryBracketOrderStore
+
+class _Sink(io.TextIOBase):
+    """Discards output, taking ``latency`` seconds per write; writes wait while closed"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.open = threading.Event()
+        self.open.set()
+
+    def write(self, data: str) -> int:
+        self.open.wait()
+        if self.latency:
+            deadline = time.perf_counter() + self.latency
+            while time.perf_counter() < deadline:
+                pass
+        return len(data)
+
+def _per_call(calls: int, fn) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+def _drained(count: int) -> None:
+    while logging_stats()["written"] < count:
+        time.sleep(0.001)
+
+async def _update_cost(updates: int) -> float:
+    service = BracketOrderService(InMemoryBracketOrderStore())
+    order = await service.create_bracket_order(BracketOrderCreate(
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal("44000"),
+        take_profit_levels=[TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("1"))],
+    ))
+    drags = [BracketOrderUpdate(stop_loss_price=Decimal(44000 - i % 500)) for i in range(updates)]
+    start = time.perf_counter()
+    for update in drags:
+        await service.update_bracket_order(order.id, update)
+    return (time.perf_counter() - start) / updates * 1e6
+
+def run(calls: int = 50_000, write_latency_us: float = 0, fmt: str = "console", updates: int = 5_000) -> dict:
+    sink = _Sink(write_latency_us / 1e6)
+    configure_logging(level="INFO", fmt=fmt, sample_rates={"sampled_event": 100}, queue_size=calls * 2, stream=sink)
+    logger = structlog.get_logger("bench")
+    order_id = "6be73b36-5ee0-4cb8-b6a0-c9e382382a43"
+    results = {}
+
+    with contextlib.redirect_stdout(sink):
+        results["print_us"] = _per_call(calls, lambda i: print(f"Updated bracket order: {order_id}"))
+
+    results["sampled_out_us"] = _per_call(calls, lambda i: logger.info("sampled_event", order_id=order_id))
+    results["disabled_us"] = _per_call(calls, lambda i: logger.debug("bracket_order_updated", order_id=order_id))
+
+    sink.open.clear()
+    results["queued_us"] = _per_call(calls, lambda i: logger.info("bracket_order_updated", order_id=order_id))
+    written = logging_stats()["written"]
+    start = time.perf_counter()
+    sink.open.set()
+    _drained(written + calls)
+    results["writer_us"] = (time.perf_counter() - start) / calls * 1e6
+
+    # update_bracket_order logs bracket_order_updated (sampled 1 in 10 by default)
+    configured = service_module.logger
+    silent = structlog.wrap_logger(None, wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+    logged_runs, silent_runs = [], []
+    for _ in range(3):  # interleaved, best of three
+        service_module.logger = configured
+        logged_runs.append(asyncio.run(_update_cost(updates)))
+        service_module.logger = silent
+        silent_runs.append(asyncio.run(_update_cost(updates)))
+    service_module.logger = configured
+    results["update_logged_us"], results["update_silent_us"] = min(logged_runs), min(silent_runs)
+
+    results["dropped"] = logging_stats()["dropped_queue_full"]
+    stop_logging()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50_000)
+    parser.add_argument("--write-latency-us", type=float, default=0)
+    parser.add_argument("--format", choices=["console", "json"], default="console")
+    parser.add_argument("--updates", type=int, default=5_000)
+    args = parser.parse_args()
+
+    r = run(args.calls, args.write_latency_us, args.format, args.updates)
+    print(f"  print()                 {r['print_us']:7.2f} us/call on the event loop")
+    print(f"  structlog, queued       {r['queued_us']:7.2f} us/call on the event loop"
+          f" + {r['writer_us']:.2f} us/event on the writer thread")
+    print(f"  structlog, sampled out  {r['sampled_out_us']:7.2f} us/call")
+    print(f"  structlog, level off    {r['disabled_us']:7.2f} us/call")
+    print(f"  update_bracket_order    {r['update_logged_us']:7.2f} us logged, {r['update_silent_us']:.2f} us silent"
+          f" ({r['update_logged_us'] - r['update_silent_us']:.2f} us logging overhead per request)")
+    if r["dropped"]:
+        print(f"  {r['dropped']} records dropped with the queue full")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Overhead of the Prometheus instrumentation.
+
+Measures the metric primitives, an HTTP request through a minimal ASGI
+app with and without MetricsMiddleware (called directly, no network),
+bracket validation with and without its histogram, and a /metrics
+scrape with many WebSocket clients and subscribed symbols.
+
+    python -m benchmarks.bench_metrics [--requests 20000] [--clients 10000] [--symbols 500]
+"""
+import argparse
+import asyncio
+import time
+from decimal import Decimal
+
+from fastapi import FastAPI
+from prometheus_client import CollectorRegistry, Histogram, generate_latest
+
+from app.models.bracket_order import BracketOrderCreate, EntryType, OrderSide, TakeProfitLevel
+from app.services.bracket_order_service import BracketOrderService
+from app.services.bracket_validation import validate_bracket
+from app.services.metrics import MetricsMiddleware, WebSocketCollector
+from app.services.websocket_manager import WebSocketManager
+from app.storage.memory import InMemoryBracketOrderStore
+
+def _per_call(calls: int, fn) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+def _app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+async def _request_cost(app: FastAPI, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i: int) -> dict:
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/items/{i}", "raw_path": f"/items/{i}".encode(), "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+        }
+
+    for i in range(100):  # warm-up
+        await app(scope(i), receive, send)
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scope(i), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+class _Connection:
+    def __init__(self, depth: int):
+        self.depth = depth
+        self.dropped = 0
+        self.coalesced = 0
+
+def _manager(clients: int, symbols: int) -> WebSocketManager:
+    manager = WebSocketManager()
+    for i in range(clients):
+        client_id = f"client-{i}"
+        manager.active_connections[client_id] = _Connection(i % 7)
+        for k in range(5):
+            manager.price_subscribers.add(client_id, f"SYM{(i * 5 + k) % symbols}-USDT")
+    return manager
+
+def run(requests: int = 20_000, clients: int = 10_000, symbols: int = 500) -> dict:
+    results = {}
+    histogram = Histogram("bench_seconds", "", ["kind"], registry=CollectorRegistry())
+    child = histogram.labels("a")
+    results["observe_us"] = _per_call(200_000, lambda: child.observe(1e-5))
+    results["labels_observe_us"] = _per_call(200_000, lambda: histogram.labels("a").observe(1e-5))
+    results["perf_counter_us"] = _per_call(200_000, time.perf_counter)
+
+    results["request_plain_us"] = asyncio.run(_request_cost(_app(False), requests))
+    results["request_metrics_us"] = asyncio.run(_request_cost(_app(True), requests))
+
+    service = BracketOrderService(InMemoryBracketOrderStore())
+    order = BracketOrderCreate(
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal("44000"),
+        take_profit_levels=[
+            TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("0.5")),
+            TakeProfitLevel(price=Decimal("47000"), quantity=Decimal("0.5")),
+        ],
+    )
+    results["validate_plain_us"] = _per_call(50_000, lambda: validate_bracket(order, order.entry_price))
+    results["validate_metrics_us"] = _per_call(50_000, lambda: service.validate_bracket_order(order))
+
+    registry = CollectorRegistry()
+    registry.register(WebSocketCollector(_manager(clients, symbols)))
+    start = time.perf_counter()
+    body = generate_latest(registry)
+    results["scrape_ms"] = (time.perf_counter() - start) * 1000
+    results["scrape_series"] = sum(1 for line in body.splitlines() if line and not line.startswith(b"#"))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    args = parser.parse_args()
+
+    r = run(args.requests, args.clients, args.symbols)
+    print(f"  histogram observe        {r['observe_us']:7.2f} us  (labels() + observe {r['labels_observe_us']:.2f} us,"
+          f" perf_counter {r['perf_counter_us']:.2f} us)")
+    print(f"  ASGI request             {r['request_plain_us']:7.2f} us plain, {r['request_metrics_us']:.2f} us instrumented"
+          f"  (+{r['request_metrics_us'] - r['request_plain_us']:.2f} us)")
+    print(f"  bracket validation       {r['validate_plain_us']:7.2f} us plain, {r['validate_metrics_us']:.2f} us instrumented"
+          f"  (+{r['validate_metrics_us'] - r['validate_plain_us']:.2f} us)")
+    print(f"  scrape, {args.clients} clients on {args.symbols} symbols  {r['scrape_ms']:.1f} ms for the WebSocket collector"
+          f" ({r['scrape_series']} series)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Level 2 order book: incremental update throughput, queries and memory.
+
+Replays a synthetic KuCoin-format level2 stream against books with
+thousands of levels per side.
+
+    python -m benchmarks.bench_order_book [--levels 5000] [--updates 200000] [--books 10]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.services.order_book import OrderBook
+
+MID = 45000.0
+TICK = 0.5
+
+def _snapshot(levels: int):
+    bids = [[f"{MID - (i + 1) * TICK:.1f}", "1.0"] for i in range(levels)]
+    asks = [[f"{MID + (i + 1) * TICK:.1f}", "1.0"] for i in range(levels)]
+    return bids, asks
+
+def _stream(levels: int, updates: int, seed: int = 7):
+    """Updates clustered near the touch; ~20% remove a level, which is re-added later"""
+    rng = random.Random(seed)
+    stream = []
+    sequence = 1
+    for _ in range(updates):
+        offset = int(rng.expovariate(1 / 20)) % levels + 1
+        side = "bids" if rng.random() < 0.5 else "asks"
+        price = MID - offset * TICK if side == "bids" else MID + offset * TICK
+        size = "0" if rng.random() < 0.2 else f"{rng.uniform(0.01, 5):.4f}"
+        sequence += 1
+        stream.append({
+            "sequenceStart": sequence,
+            "sequenceEnd": sequence,
+            "changes": {side: [[f"{price:.1f}", size, str(sequence)]]},
+        })
+    return stream
+
+def run(levels: int = 5000, updates: int = 200_000, books: int = 10) -> dict:
+    bids, asks = _snapshot(levels)
+    stream = _stream(levels, updates)
+    results = {}
+
+    book = OrderBook("BTC-USDT")
+    book.load_snapshot(1, bids, asks)
+    start = time.perf_counter()
+    for update in stream:
+        book.apply(update)
+    results["updates_per_sec"] = updates / (time.perf_counter() - start)
+
+    queries = 200_000
+    start = time.perf_counter()
+    for _ in range(queries):
+        book.best_bid()
+        book.best_ask()
+    results["best_per_sec"] = queries / (time.perf_counter() - start)
+
+    queries = 20_000
+    start = time.perf_counter()
+    for _ in range(queries):
+        book.top(20)
+    results["top20_per_sec"] = queries / (time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = []
+    for i in range(books):
+        book = OrderBook(f"SYM{i}-USDT")
+        book.load_snapshot(1, bids, asks)
+        held.append(book)
+    results["bytes_per_book"] = (tracemalloc.get_traced_memory()[0] - before) / books
+    tracemalloc.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, default=5000, help="levels per side")
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--books", type=int, default=10, help="books to load for the memory estimate")
+    args = parser.parse_args()
+
+    r = run(args.levels, args.updates, args.books)
+    print(f"  {args.levels} levels/side: updates {r['updates_per_sec']:10,.0f}/s"
+          f"  best bid+ask {r['best_per_sec']:10,.0f}/s  top(20) {r['top20_per_sec']:10,.0f}/s"
+          f"  memory {r['bytes_per_book'] / 1024:,.0f} KiB/book")
+
+if __name__ == "__main__":
+    main()
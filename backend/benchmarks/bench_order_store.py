@@ -0,0 +1,90 @@
+"""Bracket order store throughput: create, page reads and updates.
+
+Runs against the in-memory store and an async SQLAlchemy store (SQLite by
+default; pass --database-url for PostgreSQL).
+
+    python -m benchmarks.bench_order_store [--orders 2000] [--database-url sqlite+aiosqlite:///:memory:]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.bracket_order import (
+    BracketOrderResponse,
+    EntryType,
+    OrderSide,
+    OrderStatus,
+    TakeProfitLevel,
+)
+from app.storage.base import BracketOrderStore
+from app.storage.memory import InMemoryBracketOrderStore
+
+SYMBOLS = ["BTC-USDT", "ETH-USDT", "SOL-USDT", "LINK-USDT"]
+
+def _order(i: int) -> BracketOrderResponse:
+    return BracketOrderResponse(
+        id=str(uuid.uuid4()),
+        symbol=SYMBOLS[i % len(SYMBOLS)],
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        status=OrderStatus.PENDING,
+        created_at=datetime.utcnow(),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("100"),
+        stop_loss_price=Decimal("90"),
+        take_profit_levels=[
+            TakeProfitLevel(price=Decimal("110"), quantity=Decimal("0.3")),
+            TakeProfitLevel(price=Decimal("120"), quantity=Decimal("0.3")),
+            TakeProfitLevel(price=Decimal("130"), quantity=Decimal("0.4")),
+        ],
+        remaining_quantity=Decimal("1"),
+    )
+
+async def _bench(store: BracketOrderStore, orders: int) -> dict:
+    await store.start()
+    batch = [_order(i) for i in range(orders)]
+    results = {}
+
+    start = time.perf_counter()
+    for order in batch:
+        await store.add(order)
+    results["creates_per_sec"] = orders / (time.perf_counter() - start)
+
+    pages = 200
+    start = time.perf_counter()
+    for i in range(pages):
+        await store.query(symbol=SYMBOLS[i % len(SYMBOLS)], statuses=[OrderStatus.PENDING], limit=50)
+    results["pages_per_sec"] = pages / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for order in batch[: orders // 2]:
+        order.status = OrderStatus.CANCELLED
+        await store.update(order)
+    results["updates_per_sec"] = (orders // 2) / (time.perf_counter() - start)
+
+    await store.close()
+    return results
+
+async def run(orders: int = 2000, database_url: str = "sqlite+aiosqlite:///:memory:") -> dict:
+    from app.storage.sql import SQLAlchemyBracketOrderStore, create_engine
+
+    return {
+        "memory": await _bench(InMemoryBracketOrderStore(), orders),
+        "sql": await _bench(SQLAlchemyBracketOrderStore(create_engine(database_url)), orders),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///:memory:")
+    args = parser.parse_args()
+
+    for name, r in asyncio.run(run(args.orders, args.database_url)).items():
+        print(f"  {name:<8} creates {r['creates_per_sec']:10,.0f}/s  pages(50) {r['pages_per_sec']:10,.0f}/s"
+              f"  updates {r['updates_per_sec']:10,.0f}/s")
+
+if __name__ == "__main__":
+    main()
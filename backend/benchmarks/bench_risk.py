@@ -0,0 +1,121 @@
+"""Position sizing throughput, vectorized batch vs one bracket at a time.
+
+Sizes seeded random buy and sell brackets (1 to 3 take profits, prices
+and stops across several magnitudes) with ``size_positions`` and with
+``size_position`` per bracket, and checks that both give identical
+results. Also reports how many quotients the batch path recomputed with
+Decimal because they sat too close to a rounding boundary.
+
+    python -m benchmarks.bench_risk [--brackets 10000] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+import app.services.risk as risk
+from app.models.bracket_order import BracketOrderCreate, BracketOrderValidationError, EntryType, OrderSide, TakeProfitLevel
+from app.services.risk import DEFAULT_INCREMENTS, size_position, size_positions
+
+BALANCE = Decimal("25000")
+PERCENT = Decimal("0.5")
+
+def _brackets(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(count):
+        side = rng.choice((OrderSide.BUY, OrderSide.SELL))
+        sign = 1 if side == OrderSide.BUY else -1
+        entry = Decimal(str(round(10 ** rng.uniform(-1, 5), 2))) + Decimal("0.01")
+        stop_pct = Decimal(rng.choice(("0.5", "1", "1.5", "2", "3", "5"))) / 100
+        stop = (entry * (1 - sign * stop_pct)).quantize(Decimal("0.01"))
+        levels = rng.randint(1, 3)
+        take_profits = [
+            TakeProfitLevel(
+                price=(entry * (1 + sign * stop_pct * (k + 1))).quantize(Decimal("0.01")),
+                quantity=Decimal(1) / levels if levels != 3 else Decimal("0.3") + (k == 2) * Decimal("0.1"),
+            )
+            for k in range(levels)
+        ]
+        orders.append(BracketOrderCreate(
+            symbol="BTC-USDT",
+            side=side,
+            quantity=sum(tp.quantity for tp in take_profits),
+            entry_type=EntryType.LIMIT,
+            entry_price=entry,
+            stop_loss_price=stop,
+            take_profit_levels=take_profits,
+        ))
+    return orders
+
+def _scalar(orders: list) -> list:
+    outcomes = []
+    for order in orders:
+        try:
+            outcomes.append((size_position(order, order.entry_price, BALANCE, PERCENT, DEFAULT_INCREMENTS), None))
+        except BracketOrderValidationError as e:
+            outcomes.append((None, str(e)))
+    return outcomes
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(brackets: int = 10_000, repeat: int = 5) -> dict:
+    orders = _brackets(brackets)
+    entries = [order.entry_price for order in orders]
+    increments = [DEFAULT_INCREMENTS] * len(orders)
+
+    def batch():
+        return size_positions(orders, entries, BALANCE, PERCENT, increments)
+
+    # Count the quotients the batch path recomputed with Decimal
+    divisions = {name: getattr(risk, name) for name in ("_floor_div", "_round_div")}
+    recomputed = 0
+    def counting(fn):
+        def wrapper(*args):
+            nonlocal recomputed
+            recomputed += 1
+            return fn(*args)
+        return wrapper
+    for name, fn in divisions.items():
+        setattr(risk, name, counting(fn))
+    try:
+        vectorized = batch()
+    finally:
+        for name, fn in divisions.items():
+            setattr(risk, name, fn)
+
+    scalar = _scalar(orders)
+    batch_s = _best(batch, repeat)
+    scalar_s = _best(lambda: _scalar(orders), max(1, repeat // 2))
+    return {
+        "brackets": len(orders),
+        "sized": sum(1 for result, _ in vectorized if result is not None),
+        "batch_s": batch_s,
+        "scalar_s": scalar_s,
+        "batch_per_s": len(orders) / batch_s,
+        "scalar_per_s": len(orders) / scalar_s,
+        "recomputed": recomputed,
+        "identical": vectorized == scalar,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--brackets", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    r = run(args.brackets, args.repeat)
+    print(f"  {r['brackets']:,} brackets, {r['sized']:,} sized")
+    print(f"  {'vectorized batch':24}{r['batch_s'] * 1000:9.1f} ms  {r['batch_per_s']:12,.0f} brackets/s")
+    print(f"  {'one at a time':24}{r['scalar_s'] * 1000:9.1f} ms  {r['scalar_per_s']:12,.0f} brackets/s")
+    print(f"  {'Decimal recomputations':24}{r['recomputed']:9,}")
+    print(f"  {'identical results':24}{r['identical']}")
+
+if __name__ == "__main__":
+    main()
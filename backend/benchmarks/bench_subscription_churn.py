@@ -0,0 +1,84 @@
+"""Reconnect-storm churn on the price subscription index.
+
+Simulates N clients each subscribed to K of M symbols, then disconnects and
+resubscribes every client. Compares the previous list-based layout
+(Dict[str, List[str]] scanned on disconnect) with SubscriptionIndex.
+
+    python -m benchmarks.bench_subscription_churn [--clients 10000] [--symbols 500] [--per-client 20]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from app.services.subscription_index import SubscriptionIndex
+
+class _ListSubscribers:
+    """The layout WebSocketManager used before SubscriptionIndex"""
+
+    def __init__(self):
+        self.price_subscribers: Dict[str, List[str]] = {}
+
+    def subscribe(self, client_id: str, symbol: str):
+        if symbol not in self.price_subscribers:
+            self.price_subscribers[symbol] = []
+        if client_id not in self.price_subscribers[symbol]:
+            self.price_subscribers[symbol].append(client_id)
+
+    def disconnect(self, client_id: str):
+        for symbol in self.price_subscribers:
+            if client_id in self.price_subscribers[symbol]:
+                self.price_subscribers[symbol].remove(client_id)
+
+def _plan(clients: int, symbols: int, per_client: int, seed: int = 7):
+    rng = random.Random(seed)
+    names = [f"SYM{i}-USDT" for i in range(symbols)]
+    return {f"client-{c}": rng.sample(names, per_client) for c in range(clients)}
+
+def _churn(subscribe, disconnect, plan) -> dict:
+    start = time.perf_counter()
+    for client_id, wanted in plan.items():
+        for symbol in wanted:
+            subscribe(client_id, symbol)
+    subscribed = time.perf_counter()
+    for client_id in plan:
+        disconnect(client_id)
+    disconnected = time.perf_counter()
+    for client_id, wanted in plan.items():
+        for symbol in wanted:
+            subscribe(client_id, symbol)
+    resubscribed = time.perf_counter()
+    return {
+        "subscribe_s": subscribed - start,
+        "disconnect_s": disconnected - subscribed,
+        "resubscribe_s": resubscribed - disconnected,
+        "disconnects_per_sec": len(plan) / (disconnected - subscribed),
+    }
+
+def run(clients: int = 10000, symbols: int = 500, per_client: int = 20, include_legacy: bool = True) -> dict:
+    plan = _plan(clients, symbols, per_client)
+    results = {}
+    if include_legacy:
+        legacy = _ListSubscribers()
+        results["list_scan"] = _churn(legacy.subscribe, legacy.disconnect, plan)
+    index = SubscriptionIndex()
+    results["subscription_index"] = _churn(
+        lambda c, s: index.add(c, s, 0), index.remove_client, plan
+    )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--per-client", type=int, default=20)
+    parser.add_argument("--skip-legacy", action="store_true", help="only run SubscriptionIndex")
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.per_client} of {args.symbols} symbols")
+    for name, r in run(args.clients, args.symbols, args.per_client, not args.skip_legacy).items():
+        print(f"  {name:<20} subscribe {r['subscribe_s']:7.3f}s  disconnect {r['disconnect_s']:7.3f}s"
+              f"  resubscribe {r['resubscribe_s']:7.3f}s  ({r['disconnects_per_sec']:,.0f} disconnects/s)")
+
+if __name__ == "__main__":
+    main()
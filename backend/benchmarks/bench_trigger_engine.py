@@ -0,0 +1,134 @@
+"""Trigger engine per-tick cost with many resting stop loss / take profit triggers.
+
+Arms active long and short brackets (one stop loss and two take profits
+each) spread over several symbols, then measures the cost of a tick that
+crosses nothing, a tick that fires a handful of triggers, and the naive
+alternative of rechecking every order of the symbol on each tick.
+
+    python -m benchmarks.bench_trigger_engine [--triggers 100000] [--symbols 10] [--ticks 20000]
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.bracket_order import (
+    BracketOrderResponse,
+    EntryType,
+    OrderSide,
+    OrderStatus,
+    TakeProfitLevel,
+)
+from app.services.trigger_engine import TriggerEngine
+
+MID = 45000
+
+def _orders(triggers: int, symbols: int, seed: int = 11):
+    rng = random.Random(seed)
+    orders = []
+    for i in range(triggers // 3):
+        side = OrderSide.BUY if i % 2 == 0 else OrderSide.SELL
+        sign = 1 if side == OrderSide.BUY else -1
+        entry = MID + rng.randint(-2000, 2000)
+        stop = entry - sign * rng.randint(200, 3000)
+        orders.append(BracketOrderResponse(
+            id=str(uuid.uuid4()),
+            symbol=f"SYM{i % symbols}-USDT",
+            side=side,
+            quantity=Decimal("1"),
+            status=OrderStatus.ACTIVE,
+            created_at=datetime.utcnow(),
+            entry_type=EntryType.LIMIT,
+            entry_price=Decimal(entry),
+            stop_loss_price=Decimal(stop),
+            take_profit_levels=[
+                TakeProfitLevel(price=Decimal(entry + sign * rng.randint(200, 1500)), quantity=Decimal("0.5")),
+                TakeProfitLevel(price=Decimal(entry + sign * rng.randint(1600, 4000)), quantity=Decimal("0.5")),
+            ],
+            entry_filled_quantity=Decimal("1"),
+            remaining_quantity=Decimal("1"),
+        ))
+    return orders
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50_us": statistics.median(samples) * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99)] * 1e6,
+    }
+
+def _naive_crossed(orders, bid: Decimal, ask: Decimal) -> int:
+    # What a scan would do: check every leg of every open order on the symbol
+    crossed = 0
+    for order in orders:
+        if order.side == OrderSide.BUY:
+            crossed += order.stop_loss_price >= bid
+            crossed += sum(tp.price <= bid for tp in order.take_profit_levels)
+        else:
+            crossed += order.stop_loss_price <= ask
+            crossed += sum(tp.price >= ask for tp in order.take_profit_levels)
+    return crossed
+
+def run(triggers: int = 100_000, symbols: int = 10, ticks: int = 20_000) -> dict:
+    orders = _orders(triggers, symbols)
+    engine = TriggerEngine()
+    results = {}
+
+    start = time.perf_counter()
+    engine.load(orders)
+    elapsed = time.perf_counter() - start
+    results["armed"] = engine.stats()["triggers"]
+    results["arm_per_sec"] = results["armed"] / elapsed
+
+    # Quiet ticks around the mid: nothing rests this close, nothing fires
+    quiet = []
+    for i in range(ticks):
+        bid = Decimal(MID + (i % 7) - 3)
+        start = time.perf_counter()
+        engine.check(f"SYM{i % symbols}-USDT", bid, bid + 1)
+        quiet.append(time.perf_counter() - start)
+    results["quiet"] = _percentiles(quiet)
+
+    # A slow walk up and down that keeps firing the triggers it reaches
+    rng = random.Random(3)
+    price = {f"SYM{i}-USDT": MID for i in range(symbols)}
+    firing, fired = [], 0
+    for i in range(ticks):
+        symbol = f"SYM{i % symbols}-USDT"
+        price[symbol] += rng.choice((-1, 1)) * rng.randint(0, 3)
+        bid = Decimal(price[symbol])
+        start = time.perf_counter()
+        fired += engine.check(symbol, bid, bid + 1)
+        firing.append(time.perf_counter() - start)
+    results["walk"] = _percentiles(firing)
+    results["walk_fired"] = fired
+
+    by_symbol = [order for order in orders if order.symbol == "SYM0-USDT"]
+    samples = []
+    for i in range(min(ticks, 200)):
+        bid = Decimal(MID + (i % 7) - 3)
+        start = time.perf_counter()
+        _naive_crossed(by_symbol, bid, bid + 1)
+        samples.append(time.perf_counter() - start)
+    results["naive"] = _percentiles(samples)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triggers", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--ticks", type=int, default=20_000)
+    args = parser.parse_args()
+
+    r = run(args.triggers, args.symbols, args.ticks)
+    print(f"  armed {r['armed']:,} triggers over {args.symbols} symbols at {r['arm_per_sec']:,.0f}/s")
+    print(f"  quiet tick      p50 {r['quiet']['p50_us']:8.1f}us  p99 {r['quiet']['p99_us']:8.1f}us")
+    print(f"  walking ticks   p50 {r['walk']['p50_us']:8.1f}us  p99 {r['walk']['p99_us']:8.1f}us"
+          f"  ({r['walk_fired']:,} fired)")
+    print(f"  naive rescan    p50 {r['naive']['p50_us']:8.1f}us  p99 {r['naive']['p99_us']:8.1f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Microbenchmarks for BracketOrderService.validate_bracket_order.
+
+Times validation of an already parsed limit bracket with 1, 2 and 3 (the
+maximum) take profit levels, the 3-level bracket again with exchange
+symbol rules (tick size, lot size, minimum value), a rejected bracket
+(stop loss on the wrong side), and the whole request path up to storage:
+parsing the JSON body into BracketOrderCreate, then validating it.
+
+    python -m benchmarks.bench_validation [--calls 20000]
+"""
+import argparse
+import contextlib
+import io
+import time
+from decimal import Decimal
+
+from app.models.bracket_order import (
+    BracketOrderCreate,
+    BracketOrderValidationError,
+    EntryType,
+    OrderSide,
+    TakeProfitLevel,
+)
+from app.services.bracket_order_service import BracketOrderService
+from app.services.symbols import SymbolRegistry
+from app.storage.memory import InMemoryBracketOrderStore
+
+# Take profit quantities splitting a quantity of 1
+_SPLITS = {1: ["1"], 2: ["0.5", "0.5"], 3: ["0.3", "0.3", "0.4"]}
+
+# As listed by GET /api/v2/symbols
+_SYMBOL = {
+    "symbol": "BTC-USDT",
+    "baseCurrency": "BTC",
+    "quoteCurrency": "USDT",
+    "baseMinSize": "0.00001",
+    "quoteMinSize": "0.1",
+    "baseIncrement": "0.00000001",
+    "quoteIncrement": "0.000001",
+    "priceIncrement": "0.01",
+    "enableTrading": True,
+}
+
+def _order(levels: int, stop_loss: str = "44000") -> BracketOrderCreate:
+    return BracketOrderCreate(
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal(stop_loss),
+        take_profit_levels=[
+            TakeProfitLevel(price=Decimal(46000 + 1000 * i), quantity=Decimal(quantity))
+            for i, quantity in enumerate(_SPLITS[levels])
+        ],
+    )
+
+def _payload(levels: int) -> dict:
+    # As decoded from a POST /api/bracket-orders body
+    return {
+        "symbol": "BTC-USDT",
+        "side": "buy",
+        "quantity": "1",
+        "entry_type": "limit",
+        "entry_price": "45000",
+        "stop_loss_price": "44000",
+        "take_profit_levels": [
+            {"price": str(46000 + 1000 * i), "quantity": quantity} for i, quantity in enumerate(_SPLITS[levels])
+        ],
+    }
+
+def _per_call(calls: int, fn) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+def run(calls: int = 20_000) -> dict:
+    service = BracketOrderService(InMemoryBracketOrderStore())
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for levels in (1, 2, 3):
+            order = _order(levels)
+            results[f"valid_{levels}tp_us"] = _per_call(calls, lambda: service.validate_bracket_order(order))
+
+        symbols = SymbolRegistry()
+        symbols.load([_SYMBOL])
+        with_rules = BracketOrderService(InMemoryBracketOrderStore(), symbols=symbols)
+        order = _order(3)
+        results["valid_3tp_symbol_rules_us"] = _per_call(calls, lambda: with_rules.validate_bracket_order(order))
+
+        rejected = _order(3, stop_loss="46000")
+
+        def reject():
+            try:
+                service.validate_bracket_order(rejected)
+            except BracketOrderValidationError:
+                pass
+            else:
+                raise AssertionError("stop loss above a buy entry was accepted")
+
+        results["rejected_us"] = _per_call(calls, reject)
+
+        payload = _payload(3)
+        results["parse_and_validate_us"] = _per_call(
+            calls, lambda: service.validate_bracket_order(BracketOrderCreate(**payload))
+        )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    r = run(args.calls)
+    for levels in (1, 2, 3):
+        print(f"  {f'valid, {levels} take profits':24}{r[f'valid_{levels}tp_us']:7.2f} us")
+    print(f"  {'  + symbol rules':24}{r['valid_3tp_symbol_rules_us']:7.2f} us")
+    print(f"  {'rejected':24}{r['rejected_us']:7.2f} us")
+    print(f"  {'parse + validate':24}{r['parse_and_validate_us']:7.2f} us (3 take profits)")
+
+if __name__ == "__main__":
+    main()
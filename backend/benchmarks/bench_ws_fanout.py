@@ -0,0 +1,111 @@
+"""WebSocket price fan-out through WebSocketManager with synthetic clients.
+
+Connects ``--clients`` in-process stand-in sockets (send only counts the
+frame), subscribes each to ``--per-client`` of ``--symbols`` symbols, then
+publishes ``--rounds`` rounds of one tick per symbol. After each round the
+loop runs until every send queue has drained, so the figures cover both
+the enqueue done by the publisher and the per-client writer tasks.
+Reports the publisher's cost per tick, frames delivered per second end to
+end, and frames coalesced or dropped on the way.
+
+    python -m benchmarks.bench_ws_fanout [--clients 1000] [--symbols 50] [--per-client 5] [--rounds 50] [--format json]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from app.services.frame_encoder import FrameFormat, available_formats
+from app.services.websocket_manager import WebSocketManager
+
+class _Socket:
+    """Stand-in for a Starlette WebSocket that accepts and counts frames"""
+
+    def __init__(self):
+        self.frames = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        self.frames += 1
+
+    async def send_bytes(self, data: bytes):
+        self.frames += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+def _tick(symbol: str, i: int) -> dict:
+    return {
+        "symbol": symbol,
+        "price": f"{45000 + i % 500}.10",
+        "bid": f"{45000 + i % 500}.00",
+        "ask": f"{45000 + i % 500}.20",
+        "volume": "1234.5678",
+        "timestamp": 1721815200000 + i,
+    }
+
+async def _drained(manager: WebSocketManager):
+    while any(connection.depth for connection in manager.active_connections.values()):
+        await asyncio.sleep(0)
+
+async def run(
+    clients: int = 1000, symbols: int = 50, per_client: int = 5, rounds: int = 50, frame_format: str = "json"
+) -> dict:
+    manager = WebSocketManager(heartbeat_interval=0)
+    names = [f"SYM{i}-USDT" for i in range(symbols)]
+    sockets = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(clients):
+            socket = _Socket()
+            sockets.append(socket)
+            client_id = f"client-{i}"
+            await manager.connect(socket, client_id, FrameFormat(frame_format))
+            await manager.bulk_subscribe_to_prices(client_id, [names[(i + k) % symbols] for k in range(per_client)])
+        await _drained(manager)
+        baseline = sum(socket.frames for socket in sockets)
+
+        publish_seconds = 0.0
+        start = time.perf_counter()
+        for i in range(rounds):
+            started = time.perf_counter()
+            for symbol in names:
+                manager.publish_local_price(symbol, _tick(symbol, i))
+            publish_seconds += time.perf_counter() - started
+            await _drained(manager)
+        elapsed = time.perf_counter() - start
+
+        stats = manager.get_stats()
+        await manager.stop()
+    delivered = sum(socket.frames for socket in sockets) - baseline
+    ticks = rounds * symbols
+    return {
+        "ticks": ticks,
+        "subscriptions": clients * min(per_client, symbols),
+        "delivered": delivered,
+        "publish_us_per_tick": publish_seconds / ticks * 1e6,
+        "frames_per_sec": delivered / elapsed,
+        "elapsed_s": elapsed,
+        "coalesced": stats["coalesced"],
+        "dropped": stats["dropped"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--per-client", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--format", choices=[fmt.value for fmt in available_formats()], default="json")
+    args = parser.parse_args()
+
+    r = asyncio.run(run(args.clients, args.symbols, args.per_client, args.rounds, args.format))
+    print(f"  {r['ticks']} ticks to {r['subscriptions']} subscriptions: {r['delivered']} frames in {r['elapsed_s']:.2f}s")
+    print(f"  publish   {r['publish_us_per_tick']:8.1f} us/tick (encode once, enqueue per subscriber)")
+    print(f"  delivery  {r['frames_per_sec']:8.0f} frames/s end to end")
+    print(f"  coalesced {r['coalesced']}, dropped {r['dropped']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Benchmark regression gate against stored baselines.
+
+Runs reduced versions of the API load test, the WebSocket fan-out
+benchmark and the validation microbenchmarks (best of ``--repeat`` runs),
+and compares each tracked metric with benchmarks/baselines.json. Exits
+with status 1 if any metric is worse than its baseline by more than
+``--tolerance``.
+
+Every run is normalised by a fixed pure-Python calibration loop timed
+right before and after it, and values are stored as if that loop took
+REFERENCE_CALIBRATION. A baseline recorded on one machine therefore stays
+usable on a faster or slower one, and on hosts whose speed drifts (shared
+or throttled CPUs); ``--no-normalize`` compares raw numbers. After an
+intended performance change, record new baselines with ``--update``.
+
+    python -m benchmarks.regression [--tolerance 0.25] [--repeat 5] [--only api,ws_fanout,validation] [--update]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+from . import bench_api, bench_validation, bench_ws_fanout
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+# Seconds the calibration loop is scaled to
+REFERENCE_CALIBRATION = 0.02
+
+class Metric(NamedTuple):
+    name: str
+    extract: Callable[[dict], float]
+    higher_is_better: bool
+
+def _scenario_api() -> dict:
+    return asyncio.run(bench_api.run(orders=500, concurrency=20))
+
+def _scenario_ws_fanout() -> dict:
+    return asyncio.run(bench_ws_fanout.run(clients=500, symbols=50, per_client=5, rounds=20))
+
+def _scenario_validation() -> dict:
+    return bench_validation.run(calls=5_000)
+
+SCENARIOS: Dict[str, Callable[[], dict]] = {
+    "api": _scenario_api,
+    "ws_fanout": _scenario_ws_fanout,
+    "validation": _scenario_validation,
+}
+
+METRICS: Dict[str, List[Metric]] = {
+    "api": [
+        Metric(f"{phase}_requests_per_sec", lambda r, phase=phase: r[phase]["requests_per_sec"], True)
+        for phase in ("create", "list", "update", "cancel")
+    ],
+    "ws_fanout": [
+        Metric("publish_us_per_tick", lambda r: r["publish_us_per_tick"], False),
+        Metric("frames_per_sec", lambda r: r["frames_per_sec"], True),
+    ],
+    "validation": [
+        Metric(name, lambda r, name=name: r[name], False)
+        for name in ("valid_1tp_us", "valid_3tp_us", "rejected_us", "parse_and_validate_us")
+    ],
+}
+
+def calibrate(rounds: int = 3) -> float:
+    """Seconds for a fixed mix of dict, string and Decimal work (best of ``rounds``)"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        table, total = {}, Decimal("0")
+        for i in range(20_000):
+            key = f"order-{i % 512}"
+            table[key] = table.get(key, 0) + i
+            total += Decimal(i) * Decimal("0.01")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def measure(names: List[str], repeat: int, normalize: bool = True) -> Dict[str, Dict[str, float]]:
+    """Best normalised value of every tracked metric over ``repeat`` runs of each scenario"""
+    measured = {}
+    for name in names:
+        best: Dict[str, float] = {}
+        for _ in range(repeat):
+            before = calibrate() if normalize else REFERENCE_CALIBRATION
+            result = SCENARIOS[name]()
+            after = calibrate() if normalize else REFERENCE_CALIBRATION
+            # How much slower than the reference this run's machine state was
+            slowdown = (before + after) / 2 / REFERENCE_CALIBRATION
+            for metric in METRICS[name]:
+                value = metric.extract(result)
+                value = value * slowdown if metric.higher_is_better else value / slowdown
+                previous = best.get(metric.name)
+                if previous is not None:
+                    value = max(previous, value) if metric.higher_is_better else min(previous, value)
+                best[metric.name] = value
+        measured[name] = best
+    return measured
+
+def compare(measured: Dict[str, Dict[str, float]], baselines: dict, tolerance: float) -> List[tuple]:
+    """Rows of (scenario, metric, baseline, current, change, regressed).
+
+    ``change`` is the relative slowdown (positive is worse).
+    """
+    rows = []
+    for name, values in measured.items():
+        for metric in METRICS[name]:
+            current = values[metric.name]
+            baseline = baselines.get("scenarios", {}).get(name, {}).get(metric.name)
+            if baseline is None:
+                rows.append((name, metric.name, None, current, None, False))
+                continue
+            if metric.higher_is_better:
+                change = baseline / current - 1 if current else float("inf")
+            else:
+                change = current / baseline - 1
+            rows.append((name, metric.name, baseline, current, change, change > tolerance))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default=",".join(SCENARIOS), help="comma separated scenarios")
+    parser.add_argument("--baselines", type=Path, default=BASELINES)
+    parser.add_argument("--no-normalize", action="store_true")
+    parser.add_argument("--update", action="store_true", help="record the measured values as the new baselines")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    measured = measure(names, args.repeat, normalize=not args.no_normalize)
+
+    if args.update:
+        baselines = json.loads(args.baselines.read_text()) if args.baselines.exists() else {"scenarios": {}}
+        baselines["reference_calibration_s"] = REFERENCE_CALIBRATION
+        baselines["machine"] = f"{platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+        baselines["scenarios"].update(measured)
+        args.baselines.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Recorded baselines for {', '.join(names)} in {args.baselines}")
+        return
+
+    if not args.baselines.exists():
+        print(f"No baselines at {args.baselines}; record them with --update")
+        sys.exit(2)
+    baselines = json.loads(args.baselines.read_text())
+    if not args.no_normalize:
+        print(f"  normalised to a {REFERENCE_CALIBRATION * 1000:.0f} ms calibration loop")
+
+    rows = compare(measured, baselines, args.tolerance)
+    for name, metric, expected, current, change, regressed in rows:
+        if expected is None:
+            print(f"  {name:11} {metric:30} {current:12.2f}  (no baseline)")
+            continue
+        flag = "REGRESSION" if regressed else "ok"
+        print(f"  {name:11} {metric:30} {current:12.2f}  baseline {expected:12.2f}  {change:+7.1%}  {flag}")
+
+    regressions = [row for row in rows if row[5]]
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,34 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import REGISTRY
 import uvicorn
-from app.api import auth, trading, admin, bracket_orders
-from app.services.websocket_manager import WebSocketManager
+from app.api import auth, trading, admin, bracket_orders, risk
+from app.services.websocket_manager import WebSocketManager, OverflowPolicy
+from app.services.frame_encoder import negotiate_format
+from app.services.backplane import RedisBackplane, create_backplane
+from app.services.websocket_protocol import WebSocketProtocol
+from app.services.bracket_order_service import bracket_order_service, OPEN_STATUSES
+from app.exchange.factory import exchange_gateway
+from app.services.market_data import market_data_cache
+from app.services.order_book_service import order_book_service
+from app.services.candles import candle_aggregator
+from app.services.risk import risk_calculator
+from app.services.symbols import symbol_registry
+from app.services.trigger_engine import trigger_engine
+from app.services.amend_coalescer import amend_coalescer
+from app.services.health import health_monitor
+from app.services.metrics import MetricsMiddleware, WebSocketCollector, observe_exchange_request, render_metrics
+from app.services.structured_logging import configure_logging, logging_stats, parse_sample_rates, stop_logging
+from decouple import config
+
+# Log calls only enqueue; rendering and stdout writes happen on a writer thread
+configure_logging(
+    level=config("LOG_LEVEL", default="INFO"),
+    fmt=config("LOG_FORMAT", default="console"),
+    sample_rates=parse_sample_rates(config("LOG_SAMPLE_RATES", default="")) or None,
+    queue_size=config("LOG_QUEUE_SIZE", default=10000, cast=int),
+)
 
 app = FastAPI(
     title="Cronix Trading Terminal API",
@@ -20,14 +45,127 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency by route template for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # WebSocket manager
-websocket_manager = WebSocketManager()
+websocket_manager = WebSocketManager(
+    max_queue_size=config("WS_MAX_QUEUE_SIZE", default=256, cast=int),
+    overflow_policy=OverflowPolicy(config("WS_OVERFLOW_POLICY", default="coalesce")),
+    default_interval_ms=config("WS_PRICE_INTERVAL_MS", default=0, cast=int),
+    max_staleness_ms=config("WS_MAX_STALENESS_MS", default=1000, cast=int),
+    heartbeat_interval=config("WS_HEARTBEAT_INTERVAL", default=15.0, cast=float),
+    idle_timeout=config("WS_IDLE_TIMEOUT", default=45.0, cast=float),
+)
+websocket_protocol = WebSocketProtocol(
+    websocket_manager, bracket_order_service, order_book_service, candle_aggregator
+)
+
+# Connection, subscription and queue gauges are read at scrape time
+websocket_collector = WebSocketCollector(websocket_manager)
+if exchange_gateway is not None:
+    exchange_gateway.add_request_listener(observe_exchange_request)
+
+# Push bracket order status changes to subscribed WebSocket clients
+bracket_order_service.add_listener(
+    lambda event, order: websocket_manager.notify_order_update(event, order.dict())
+)
+
+# Coalesced drag edits are acknowledged before they are committed
+amend_coalescer.add_listener(
+    lambda event, order: websocket_manager.notify_order_update(f"amend_{event}", order.dict())
+)
+
+# One upstream market data stream per symbol, shared by every subscribed client
+websocket_manager.add_demand_listener(
+    lambda symbol, wanted: market_data_cache.acquire(symbol) if wanted else market_data_cache.release(symbol)
+)
+market_data_cache.add_listener(
+    lambda symbol, quote: websocket_manager.publish_local_price(symbol, quote.to_dict())
+)
+
+# L2 books are maintained while some client watches a (symbol, depth) group
+websocket_manager.add_depth_demand_listener(order_book_service.on_depth_demand)
+order_book_service.add_listener(websocket_manager.publish_depth)
+
+# OHLCV bars are folded from every streamed tick; chart subscribers keep their symbol streaming
+market_data_cache.add_listener(candle_aggregator.on_quote)
+candle_aggregator.add_listener(websocket_manager.publish_candles)
+websocket_manager.add_candle_demand_listener(
+    lambda symbol, wanted: market_data_cache.acquire(symbol) if wanted else market_data_cache.release(symbol)
+)
+
+# Stop losses / take profits of open brackets fire server-side on market ticks
+if bracket_order_service.server_side_exits:
+    trigger_engine.executor = bracket_order_service.execute_triggers
+    trigger_engine.loader = bracket_order_service.get_bracket_order
+    bracket_order_service.add_listener(trigger_engine.on_order_event)
+    market_data_cache.add_listener(trigger_engine.on_quote)
+
+# Dependency probes behind /health and /api/admin/system-health
+async def _probe_database():
+    await bracket_order_service.store.ping()
+    return {"store": type(bracket_order_service.store).__name__}
+
+async def _probe_redis():
+    # Redis is only used as the WebSocket backplane
+    if not isinstance(websocket_manager.backplane, RedisBackplane):
+        return {"status": "disabled"}
+    return await websocket_manager.backplane.ping()
+
+async def _probe_exchange():
+    if exchange_gateway is None:
+        return {"status": "disabled"}
+    return await exchange_gateway.ping()
+
+async def _probe_websocket():
+    return websocket_manager.health()
+
+health_monitor.add_probe("database", _probe_database, critical=True)
+health_monitor.add_probe("redis", _probe_redis)
+health_monitor.add_probe("exchange", _probe_exchange)
+health_monitor.add_probe("websocket", _probe_websocket, critical=True)
 
 # Include API routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(trading.router, prefix="/api/trading", tags=["trading"])
 app.include_router(bracket_orders.router, prefix="/api/bracket-orders", tags=["bracket-orders"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(risk.router, prefix="/api/risk", tags=["risk"])
+
+@app.on_event("startup")
+async def startup():
+    REGISTRY.register(websocket_collector)
+    health_monitor.start()
+    # Tick size, lot size and minimum value rules checked by bracket validation
+    await symbol_registry.start()
+    await bracket_order_service.start()
+    await market_data_cache.start()
+    await order_book_service.start()
+    if bracket_order_service.server_side_exits:
+        orders, _ = await bracket_order_service.store.query(statuses=list(OPEN_STATUSES))
+        trigger_engine.load(orders)
+    await websocket_manager.start(create_backplane(
+        config("WS_BACKPLANE", default="none"),
+        config("REDIS_URL", default="redis://localhost:6379"),
+    ))
+
+@app.on_event("shutdown")
+async def shutdown():
+    await health_monitor.stop()
+    await amend_coalescer.stop()
+    await websocket_manager.stop()
+    await trigger_engine.stop()
+    await market_data_cache.stop()
+    await order_book_service.stop()
+    await symbol_registry.stop()
+    if candle_aggregator.archive is not None:
+        candle_aggregator.flush_ticks()
+    await bracket_order_service.stop()
+    if exchange_gateway is not None:
+        await exchange_gateway.close()
+    REGISTRY.unregister(websocket_collector)
+    stop_logging()
 
 @app.get("/")
 async def root():
@@ -35,17 +173,82 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "cronix-api"}
+    report = await health_monitor.check()
+    return JSONResponse(
+        {
+            "status": report["status"],
+            "service": "cronix-api",
+            "checks": {name: check["status"] for name, check in report["checks"].items()},
+        },
+        status_code=503 if report["status"] == "unhealthy" else 200,
+    )
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+@app.get("/ws/stats")
+async def websocket_stats():
+    return websocket_manager.get_stats()
+
+@app.get("/market-data/stats")
+async def market_data_stats():
+    return market_data_cache.stats()
+
+@app.get("/order-books/stats")
+async def order_book_stats():
+    return order_book_service.stats()
+
+@app.get("/candles/stats")
+async def candle_stats():
+    return candle_aggregator.stats()
+
+@app.get("/symbols/stats")
+async def symbol_stats():
+    return symbol_registry.stats()
+
+@app.get("/risk/stats")
+async def risk_stats():
+    return risk_calculator.stats()
+
+@app.get("/triggers/stats")
+async def trigger_stats():
+    return trigger_engine.stats()
+
+@app.get("/amendments/stats")
+async def amendment_stats():
+    return amend_coalescer.stats()
+
+@app.get("/health/stats")
+async def health_stats():
+    return health_monitor.stats()
+
+@app.get("/logging/stats")
+async def log_stats():
+    return logging_stats()
+
+@app.get("/exchange/stats")
+async def exchange_stats():
+    return exchange_gateway.stats() if exchange_gateway is not None else {"gateway": None}
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
-    await websocket_manager.connect(websocket, client_id)
+    frame_format, subprotocol = negotiate_format(
+        websocket.query_params.get("format"),
+        websocket.scope.get("subprotocols", []),
+    )
+    await websocket_manager.connect(websocket, client_id, frame_format, subprotocol)
     try:
         while True:
-            data = await websocket.receive_text()
-            await websocket_manager.send_personal_message(f"Message received: {data}", client_id)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            await websocket_protocol.handle_raw(client_id, message.get("text"), message.get("bytes"))
     except WebSocketDisconnect:
-        websocket_manager.disconnect(client_id)
+        pass
+    finally:
+        websocket_manager.disconnect(client_id, websocket)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Coalesced amendments acknowledge exactly what gets committed"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from app.models.bracket_order import BracketOrderCreate, BracketOrderUpdate, EntryType, OrderSide, TakeProfitLevel
+from app.services.amend_coalescer import AmendCoalescer
+from app.services.bracket_order_service import BracketOrderService
+from app.storage.fill_log import InMemoryFillLog
+from app.storage.memory import InMemoryBracketOrderStore
+
+class SlowReadService(BracketOrderService):
+    async def get_bracket_order(self, order_id):
+        await asyncio.sleep(0)
+        return await super().get_bracket_order(order_id)
+
+@pytest.mark.asyncio
+async def test_concurrent_first_edits_build_on_each_other():
+    service = SlowReadService(InMemoryBracketOrderStore(), fill_log=InMemoryFillLog())
+    order = await service.create_bracket_order(BracketOrderCreate(
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal("44000"),
+        take_profit_levels=[TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("1"))],
+    ))
+    coalescer = AmendCoalescer(service, window_ms=10)
+
+    stop, target = await asyncio.gather(
+        coalescer.submit(order.id, BracketOrderUpdate(stop_loss_price=Decimal("44500"))),
+        coalescer.submit(order.id, BracketOrderUpdate(
+            take_profit_levels=[TakeProfitLevel(price=Decimal("47000"), quantity=Decimal("1"))]
+        )),
+    )
+    assert stop.stop_loss_price == Decimal("44500")
+    assert (target.stop_loss_price, target.take_profit_levels[0].price) == (Decimal("44500"), Decimal("47000"))
+
+    await coalescer.flush()
+    stored = await service.get_bracket_order(order.id)
+    assert (stored.stop_loss_price, stored.take_profit_levels[0].price) == (Decimal("44500"), Decimal("47000"))
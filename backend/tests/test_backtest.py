@@ -0,0 +1,35 @@
+"""Tick replay of bracket variants"""
+import numpy as np
+import pytest
+
+from app.models.bracket_order import OrderSide
+from app.services.backtest import CLOSED, REJECTED, BracketVariant, FillModel, replay, run_backtest
+from app.storage.columnar import ColumnarStore
+
+TIMES = np.array([1000, 2000, 3000], dtype=np.int64)
+PRICES = np.array([100.0, 99.5, 102.5])
+NO_COSTS = FillModel(spread_bps=0, slippage_bps=0, fee_bps=0)
+
+VARIANTS = [
+    BracketVariant(OrderSide.BUY, 1.0, (2.0,), (1.0,)),   # Take profit at 102
+    BracketVariant(OrderSide.SELL, 1.0, (2.0,), (1.0,)),  # Stop at 101, gapped through to 102.5
+    BracketVariant(OrderSide.BUY, 1.0, (2.0,), (0.5, 0.5)),
+]
+
+def test_replay_fills_take_profits_and_gapped_stops():
+    result = replay("BTC-USDT", TIMES, PRICES, VARIANTS, fill_model=NO_COSTS)
+
+    assert list(result["status"]) == [CLOSED, CLOSED, REJECTED]
+    assert result["realized_pnl"][0] == pytest.approx(2.0)
+    assert result["take_profit_filled"][0, 0]
+    assert result["stopped"][1] and result["realized_pnl"][1] == pytest.approx(-2.5)
+    assert list(result["exit_time"][:2]) == [3000, 3000]
+    assert set(result["rejections"]) == {2}
+
+def test_archived_replay_matches_in_memory_replay(tmp_path):
+    ColumnarStore(str(tmp_path)).ticks("BTC-USDT").append({"time": TIMES, "price": PRICES, "size": np.ones(3)})
+
+    archived = run_backtest(str(tmp_path), ["BTC-USDT"], VARIANTS, fill_model=NO_COSTS)["BTC-USDT"]
+    direct = replay("BTC-USDT", TIMES, PRICES, VARIANTS, fill_model=NO_COSTS)
+    np.testing.assert_array_equal(archived["status"], direct["status"])
+    np.testing.assert_allclose(archived["realized_pnl"], direct["realized_pnl"])
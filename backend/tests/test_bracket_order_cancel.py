@@ -0,0 +1,69 @@
+"""Batch cancels go through the bracket order lifecycle"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models.bracket_order import (
+    BracketLeg,
+    BracketOrderCreate,
+    EntryType,
+    FillEvent,
+    OrderSide,
+    OrderStatus,
+    TakeProfitLevel,
+)
+from app.services.bracket_order_service import BracketOrderService
+from app.storage.fill_log import InMemoryFillLog
+from app.storage.memory import InMemoryBracketOrderStore
+
+def _bracket() -> BracketOrderCreate:
+    return BracketOrderCreate(
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal("44000"),
+        take_profit_levels=[TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("1"))],
+    )
+
+def _fill(order_id: str, leg: BracketLeg, price: str) -> FillEvent:
+    return FillEvent(
+        order_id=order_id, leg=leg, quantity=Decimal("1"), price=Decimal(price), timestamp=datetime.utcnow()
+    )
+
+async def _closed(service: BracketOrderService) -> str:
+    """Id of a bracket whose entry and stop loss both filled"""
+    order = await service.create_bracket_order(_bracket())
+    await service.record_fills(order.id, [_fill(order.id, BracketLeg.ENTRY, "45000")])
+    await service.record_fills(order.id, [_fill(order.id, BracketLeg.STOP_LOSS, "44000")])
+    return order.id
+
+@pytest.fixture
+def service() -> BracketOrderService:
+    return BracketOrderService(InMemoryBracketOrderStore(), fill_log=InMemoryFillLog())
+
+@pytest.mark.asyncio
+async def test_batch_cancel_reports_invalid_transitions_per_item(service):
+    pending = await service.create_bracket_order(_bracket())
+    closed = await _closed(service)
+
+    response = await service.cancel_bracket_orders([pending.id, closed])
+    assert (response.succeeded, response.failed) == (1, 1)
+    assert response.results[0].order.status == OrderStatus.CANCELLED
+    assert response.results[1].error == "Bracket order cannot go from filled to cancelled"
+    assert (await service.get_bracket_order(closed)).status == OrderStatus.FILLED
+
+    again = await service.cancel_bracket_orders([pending.id])
+    assert again.results[0].error == "Bracket order is already cancelled"
+
+@pytest.mark.asyncio
+async def test_cancel_all_only_cancels_open_orders(service):
+    pending = await service.create_bracket_order(_bracket())
+    closed = await _closed(service)
+
+    response = await service.cancel_all_bracket_orders("BTC-USDT")
+    assert [item.order_id for item in response.results] == [pending.id]
+    assert (await service.get_bracket_order(pending.id)).status == OrderStatus.CANCELLED
+    assert (await service.get_bracket_order(closed)).status == OrderStatus.FILLED
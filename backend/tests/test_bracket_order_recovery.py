@@ -0,0 +1,153 @@
+"""Restart recovery of bracket orders from the fill log snapshot"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models.bracket_order import (
+    BracketLeg,
+    BracketOrderCreate,
+    BracketOrderUpdate,
+    EntryType,
+    FillEvent,
+    OrderSide,
+    OrderStatus,
+    TakeProfitLevel,
+)
+from app.services.bracket_order_service import BracketOrderService
+from app.storage.fill_log import FileFillLog
+from app.storage.memory import InMemoryBracketOrderStore
+
+def _bracket() -> BracketOrderCreate:
+    return BracketOrderCreate(
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal("44000"),
+        take_profit_levels=[TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("1"))],
+    )
+
+async def _started(path) -> BracketOrderService:
+    # The memory store loses everything on restart; only the log and its snapshot survive
+    service = BracketOrderService(InMemoryBracketOrderStore(), fill_log=FileFillLog(str(path)))
+    await service.start()
+    return service
+
+async def _fill_entry(service: BracketOrderService, order_id: str) -> None:
+    await service.record_fills(order_id, [FillEvent(
+        order_id=order_id,
+        leg=BracketLeg.ENTRY,
+        quantity=Decimal("1"),
+        price=Decimal("45000"),
+        timestamp=datetime.utcnow(),
+    )])
+
+@pytest.mark.asyncio
+async def test_changes_without_fills_survive_restart(tmp_path):
+    path = tmp_path / "fills.log"
+
+    service = await _started(path)
+    a = await service.create_bracket_order(_bracket())
+    b = await service.create_bracket_order(_bracket())
+    await _fill_entry(service, b.id)
+    await service.stop()
+
+    # No fill happens in this session: a cancel and a create only
+    service = await _started(path)
+    assert (await service.get_bracket_order(a.id)).status == OrderStatus.PENDING
+    assert await service.cancel_bracket_order(a.id)
+    c = await service.create_bracket_order(_bracket())
+    await service.stop()
+
+    service = await _started(path)
+    assert (await service.get_bracket_order(a.id)).status == OrderStatus.CANCELLED
+    assert (await service.get_bracket_order(b.id)).status == OrderStatus.ACTIVE
+    assert (await service.get_bracket_order(c.id)).status == OrderStatus.PENDING
+    await service.stop()
+
+@pytest.mark.asyncio
+async def test_batch_cancel_survives_restart(tmp_path):
+    path = tmp_path / "fills.log"
+
+    service = await _started(path)
+    a = await service.create_bracket_order(_bracket())
+    await service.stop()
+
+    service = await _started(path)
+    response = await service.cancel_bracket_orders([a.id])
+    assert response.succeeded == 1
+    await service.stop()
+
+    service = await _started(path)
+    assert (await service.get_bracket_order(a.id)).status == OrderStatus.CANCELLED
+    await service.stop()
+
+class RecordingFillLog(FileFillLog):
+    def __init__(self, path):
+        super().__init__(path)
+        self.snapshots = []
+
+    async def save_snapshot(self, position, orders):
+        self.snapshots.append([order.id for order in orders])
+        await super().save_snapshot(position, orders)
+
+@pytest.mark.asyncio
+async def test_snapshot_writes_only_orders_changed_since_the_last_one(tmp_path):
+    log = RecordingFillLog(str(tmp_path / "fills.log"))
+    service = BracketOrderService(InMemoryBracketOrderStore(), fill_log=log)
+    await service.start()
+    a = await service.create_bracket_order(_bracket())
+    b = await service.create_bracket_order(_bracket())
+    await service.snapshot()
+    await service.snapshot()
+    await _fill_entry(service, b.id)
+    await service.stop()
+
+    assert log.snapshots == [[a.id, b.id], [b.id]]
+    service = await _started(tmp_path / "fills.log")
+    assert (await service.get_bracket_order(a.id)).status == OrderStatus.PENDING
+    assert (await service.get_bracket_order(b.id)).status == OrderStatus.ACTIVE
+    await service.stop()
+
+@pytest.mark.asyncio
+async def test_lifecycle_changes_survive_a_crash(tmp_path):
+    path = tmp_path / "fills.log"
+
+    service = await _started(path)
+    a = await service.create_bracket_order(_bracket())
+    await service.snapshot()
+    b = await service.create_bracket_order(_bracket())
+    assert await service.cancel_bracket_order(a.id)
+    await service.update_bracket_order(b.id, BracketOrderUpdate(stop_loss_price=Decimal("44500")))
+    await _fill_entry(service, b.id)
+    # Crash: no final snapshot
+    service._snapshot_task.cancel()
+
+    service = await _started(path)
+    assert (await service.get_bracket_order(a.id)).status == OrderStatus.CANCELLED
+    recovered = await service.get_bracket_order(b.id)
+    assert (recovered.status, recovered.stop_loss_price) == (OrderStatus.ACTIVE, Decimal("44500"))
+    assert [fill.leg for fill in await service.get_fills(b.id)] == [BracketLeg.ENTRY]
+    await service.stop()
+
+@pytest.mark.asyncio
+async def test_fills_of_one_order_are_read_through_the_index(tmp_path):
+    path = tmp_path / "fills.log"
+
+    service = await _started(path)
+    a = await service.create_bracket_order(_bracket())
+    b = await service.create_bracket_order(_bracket())
+    await _fill_entry(service, a.id)
+    await service.stop()
+
+    service = await _started(path)
+    fills = await service.fill_log.read(order_id=a.id)
+    assert [fill.order_id for fill in fills] == [a.id]
+    assert await service.fill_log.read(order_id=b.id) == []
+    # Appends after the index is built are indexed as well
+    await _fill_entry(service, b.id)
+    fills = await service.fill_log.read(order_id=b.id)
+    assert [(fill.order_id, fill.leg) for fill in fills] == [(b.id, BracketLeg.ENTRY)]
+    await service.stop()
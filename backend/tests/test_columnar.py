@@ -0,0 +1,76 @@
+"""Columnar series: range reads, torn writes and readers in other processes"""
+import builtins
+import os
+
+import numpy as np
+import pytest
+
+from app.storage.columnar import ColumnarSeries, ColumnarStore, TICK_COLUMNS
+
+def _ticks(times):
+    times = np.asarray(times, dtype=np.int64)
+    return {"time": times, "price": times * 1.5, "size": np.ones(len(times))}
+
+def test_range_and_tail_reads(tmp_path):
+    series = ColumnarStore(str(tmp_path)).ticks("BTC-USDT")
+    series.append(_ticks([10, 20, 20, 30, 40]))
+
+    assert list(series.range(20, 40)["time"]) == [20, 20, 30]
+    assert list(series.range(None, 15)["price"]) == [15.0]
+    assert list(series.range(35)["time"]) == [40]
+    assert list(series.tail(2, end=40)["time"]) == [20, 30]
+    assert series.last_time() == 40
+
+def test_strict_series_rejects_repeated_timestamps(tmp_path):
+    series = ColumnarStore(str(tmp_path)).candles("BTC-USDT", "1m")
+    rows = {name: np.array([60]) for name in series.columns}
+    series.append(rows)
+    with pytest.raises(ValueError):
+        series.append(rows)
+
+def test_torn_write_is_ignored_and_repaired(tmp_path):
+    path = str(tmp_path / "ticks")
+    ColumnarSeries(path, TICK_COLUMNS, strict=False).append(_ticks([1, 2]))
+    # A crash after some columns of the next row were written
+    for name in ("price", "size"):
+        with open(f"{path}/{name}.bin", "ab") as f:
+            f.write(np.array([9.0]).tobytes())
+
+    series = ColumnarSeries(path, TICK_COLUMNS, strict=False)
+    assert len(series) == 2
+    assert list(series.range()["time"]) == [1, 2]
+
+    series.append(_ticks([3]))
+    assert list(series.range()["price"]) == [1.5, 3.0, 4.5]
+
+def test_reader_sees_rows_appended_by_another_writer(tmp_path):
+    path = str(tmp_path / "ticks")
+    writer = ColumnarSeries(path, TICK_COLUMNS, strict=False)
+    reader = ColumnarSeries(path, TICK_COLUMNS, strict=False)
+    writer.append(_ticks([1]))
+    assert list(reader.range()["time"]) == [1]
+
+    # Non-timestamp columns land first: the reader must not map the row yet
+    with open(f"{path}/price.bin", "ab") as f:
+        f.write(np.array([3.0]).tobytes())
+    assert len(reader.range()["time"]) == 1
+
+    with open(f"{path}/size.bin", "ab") as f:
+        f.write(np.array([1.0]).tobytes())
+    with open(f"{path}/time.bin", "ab") as f:
+        f.write(np.array([2], dtype=np.int64).tobytes())
+    assert list(reader.range()["time"]) == [1, 2]
+    assert reader.last_time() == 2
+
+def test_append_writes_the_timestamp_column_last(tmp_path, monkeypatch):
+    series = ColumnarSeries(str(tmp_path / "ticks"), TICK_COLUMNS, strict=False)
+    written = []
+
+    def recording_open(file, mode="r", *args, **kwargs):
+        if "a" in mode:
+            written.append(os.path.basename(file))
+        return builtins.open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr("app.storage.columnar.open", recording_open, raising=False)
+    series.append(_ticks([1]))
+    assert written[-1] == "time.bin"
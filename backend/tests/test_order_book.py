@@ -0,0 +1,54 @@
+"""L2 book maintenance and resyncs"""
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from app.services.order_book import OrderBook
+from app.services.order_book_service import OrderBookService
+
+SNAPSHOT = {"sequence": 10, "bids": [["100", "1"], ["99", "2"]], "asks": [["101", "1"]]}
+
+def _update(start: int, end: int, bids=(), asks=()) -> dict:
+    return {"sequenceStart": start, "sequenceEnd": end, "changes": {"bids": list(bids), "asks": list(asks)}}
+
+def test_zero_price_is_a_sequence_only_change_in_any_spelling():
+    book = OrderBook("BTC-USDT")
+    book.load_snapshot(10, SNAPSHOT["bids"], SNAPSHOT["asks"])
+
+    assert not book.apply(_update(11, 12, bids=[["0", "0", "11"], ["0.0", "1", "12"]]))
+    assert book.sequence == 12
+    assert len(book.bids) == 2
+    assert book.apply(_update(13, 13, bids=[["100", "0", "13"]]))
+    assert book.best_bid() == (Decimal("99"), Decimal("2"))
+
+@pytest.mark.asyncio
+async def test_malformed_snapshot_is_retried():
+    snapshots = [{"sequence": 10, "bids": [["100", "not a size"]], "asks": []}, SNAPSHOT]
+
+    async def fetch(symbol):
+        return snapshots.pop(0)
+
+    service = OrderBookService(snapshot_fetcher=fetch, resync_delay=0)
+    service.acquire("BTC-USDT")
+    state = service.books["BTC-USDT"]
+    await state.resync_task
+
+    assert service.stats()["malformed"] == 1
+    assert service.get_book("BTC-USDT").best_bid() == (Decimal("100"), Decimal("1"))
+
+@pytest.mark.asyncio
+async def test_malformed_update_triggers_a_resync():
+    async def fetch(symbol):
+        return SNAPSHOT
+
+    service = OrderBookService(snapshot_fetcher=fetch, resync_delay=0)
+    service.acquire("BTC-USDT")
+    await service.books["BTC-USDT"].resync_task
+
+    service.on_update("BTC-USDT", {"sequenceStart": 11, "sequenceEnd": 11, "changes": {"bids": [["100"]]}})
+    assert service.get_book("BTC-USDT") is None
+    await service.books["BTC-USDT"].resync_task
+    assert service.get_book("BTC-USDT").sequence == 10
+    assert service.stats()["malformed"] == 1
+    service.release("BTC-USDT")
@@ -0,0 +1,59 @@
+"""Symbol registry loads: shared in-flight loads and the /symbols listing"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import trading
+from app.exchange.base import ExchangeError
+from app.services.symbols import SymbolRegistry
+
+SYMBOLS = [{
+    "symbol": "BTC-USDT",
+    "baseCurrency": "BTC",
+    "quoteCurrency": "USDT",
+    "priceIncrement": "0.1",
+    "baseIncrement": "0.00000001",
+    "quoteIncrement": "0.000001",
+    "baseMinSize": "0.00001",
+    "minFunds": "0.1",
+}]
+
+class FailingGateway:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_symbols(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        raise ExchangeError("exchange unreachable")
+
+@pytest.mark.asyncio
+async def test_waiters_on_a_failed_load_get_the_failure():
+    gateway = FailingGateway()
+    registry = SymbolRegistry(gateway=gateway)
+
+    results = await asyncio.gather(registry.ensure_loaded(), registry.ensure_loaded(), return_exceptions=True)
+    assert gateway.calls == 1
+    assert all(isinstance(result, ExchangeError) for result in results)
+    assert not registry.loaded
+
+@pytest.mark.asyncio
+async def test_symbols_listing_needs_no_gateway_once_loaded(monkeypatch):
+    registry = SymbolRegistry()
+    monkeypatch.setattr(trading, "symbol_registry", registry)
+    with pytest.raises(HTTPException) as raised:
+        await trading.get_trading_symbols(if_none_match=None)
+    assert raised.value.status_code == 503
+
+    registry.load(SYMBOLS)
+    response = await trading.get_trading_symbols(if_none_match=None)
+    assert response.status_code == 200
+    assert b'"BTC-USDT"' in response.body
+
+@pytest.mark.asyncio
+async def test_symbols_listing_is_unavailable_when_the_load_fails(monkeypatch):
+    monkeypatch.setattr(trading, "symbol_registry", SymbolRegistry(gateway=FailingGateway()))
+    with pytest.raises(HTTPException) as raised:
+        await trading.get_trading_symbols(if_none_match=None)
+    assert raised.value.status_code == 503
@@ -0,0 +1,150 @@
+"""Trigger engine execution: paper fills, exchange placements and retries after failures"""
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.exchange.base import ExchangeError
+from app.models.bracket_order import (
+    BracketLeg,
+    BracketOrderCreate,
+    EntryType,
+    FillEvent,
+    OrderSide,
+    OrderStatus,
+    TakeProfitLevel,
+)
+from app.models.exchange import BracketLegs, ExchangeOrderType
+from app.services.bracket_order_service import BracketOrderService
+from app.services.trigger_engine import TriggerEngine
+from app.storage.fill_log import InMemoryFillLog
+from app.storage.memory import InMemoryBracketOrderStore
+
+def _bracket() -> BracketOrderCreate:
+    return BracketOrderCreate(
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal("44000"),
+        take_profit_levels=[TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("1"))],
+    )
+
+@pytest.mark.asyncio
+async def test_failed_execution_rearms_from_the_store():
+    service = BracketOrderService(InMemoryBracketOrderStore(), fill_log=InMemoryFillLog())
+    order = await service.create_bracket_order(_bracket())
+    calls = []
+
+    async def executor(order_id, legs):
+        calls.append(legs)
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        return await service.execute_triggers(order_id, legs)
+
+    engine = TriggerEngine(executor=executor, loader=service.get_bracket_order, retry_delay=0)
+    engine.load([order])
+
+    assert engine.check("BTC-USDT", Decimal("44990"), Decimal("45000")) == 1
+    await asyncio.gather(*engine._tasks.values())
+    assert engine.stats()["execution_failures"] == 1
+    assert engine.stats()["triggers"] == 1
+
+    # The next crossing tick retries the entry
+    assert engine.check("BTC-USDT", Decimal("44990"), Decimal("45000")) == 1
+    await asyncio.gather(*engine._tasks.values())
+    assert len(calls) == 2
+    assert (await service.get_bracket_order(order.id)).entry_filled_quantity == Decimal("1")
+
+class ExitGateway:
+    """Accepts the entry up front; exits are placed or rejected on demand"""
+    def __init__(self):
+        self.placed = []
+        self.cancelled = []
+        self.reject = False
+
+    async def submit_bracket(self, order, exits=True):
+        return BracketLegs(entry_order_id="entry")
+
+    async def place_order(self, request):
+        if self.reject:
+            raise ExchangeError("insufficient balance")
+        self.placed.append(request)
+        return f"exit-{len(self.placed)}"
+
+    async def cancel_order(self, order_id, stop=False):
+        self.cancelled.append(order_id)
+
+async def _active_on_exchange(gateway):
+    service = BracketOrderService(InMemoryBracketOrderStore(), gateway=gateway, fill_log=InMemoryFillLog(), server_side_exits=True)
+    order = await service.create_bracket_order(_bracket())
+    order = await service.record_fills(order.id, [FillEvent(
+        order_id=order.id,
+        leg=BracketLeg.ENTRY,
+        quantity=Decimal("1"),
+        price=Decimal("45000"),
+        exchange_order_id="entry",
+        timestamp=datetime.utcnow(),
+    )])
+    return service, order
+
+@pytest.mark.asyncio
+async def test_exits_are_placed_on_the_exchange_and_filled_by_reports():
+    gateway = ExitGateway()
+    service, order = await _active_on_exchange(gateway)
+    engine = TriggerEngine(executor=service.execute_triggers, loader=service.get_bracket_order)
+    service.add_listener(engine.on_order_event)
+    engine.load([order])
+
+    # The take profit is placed, not booked as filled
+    assert engine.check("BTC-USDT", Decimal("46000"), Decimal("46010")) == 1
+    await asyncio.gather(*engine._tasks.values())
+    stored = await service.get_bracket_order(order.id)
+    assert [(r.type, r.price) for r in gateway.placed] == [(ExchangeOrderType.LIMIT, Decimal("46000"))]
+    assert stored.take_profit_levels[0].order_id == "exit-1"
+    assert stored.take_profit_levels[0].filled_quantity == 0
+    assert stored.status == OrderStatus.ACTIVE
+    assert [fill.leg for fill in await service.get_fills(order.id)] == [BracketLeg.ENTRY]
+
+    # The working take profit is not re-sent; the stop pulls it and closes at market
+    assert engine.check("BTC-USDT", Decimal("43990"), Decimal("44000")) == 1
+    await asyncio.gather(*engine._tasks.values())
+    stored = await service.get_bracket_order(order.id)
+    assert gateway.cancelled == ["exit-1"]
+    assert gateway.placed[-1].type == ExchangeOrderType.MARKET
+    assert stored.stop_loss_order_id == "exit-2"
+    assert engine.stats()["triggers"] == 0
+
+    # The fill arrives as an execution report, at the price actually traded
+    closed = await service.record_fills(order.id, [FillEvent(
+        order_id=order.id,
+        leg=BracketLeg.STOP_LOSS,
+        quantity=Decimal("1"),
+        price=Decimal("43950"),
+        exchange_order_id="exit-2",
+        timestamp=datetime.utcnow(),
+    )])
+    assert closed.status == OrderStatus.FILLED
+
+@pytest.mark.asyncio
+async def test_rejected_exit_is_parked_before_it_is_retried():
+    gateway = ExitGateway()
+    gateway.reject = True
+    service, order = await _active_on_exchange(gateway)
+    engine = TriggerEngine(executor=service.execute_triggers, loader=service.get_bracket_order, retry_delay=0.05)
+    engine.load([order])
+
+    assert engine.check("BTC-USDT", Decimal("43990"), Decimal("44000")) == 1
+    await asyncio.sleep(0.01)
+    assert engine.stats()["parked"] == 1
+    # Crossing ticks while parked send nothing
+    assert engine.check("BTC-USDT", Decimal("43990"), Decimal("44000")) == 0
+
+    gateway.reject = False
+    await asyncio.gather(*engine._tasks.values())
+    assert engine.stats()["execution_failures"] == 1
+    assert engine.check("BTC-USDT", Decimal("43990"), Decimal("44000")) == 1
+    await asyncio.gather(*engine._tasks.values())
+    assert (await service.get_bracket_order(order.id)).stop_loss_order_id == "exit-1"
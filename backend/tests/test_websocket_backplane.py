@@ -0,0 +1,47 @@
+"""Order events across nodes sharing a backplane"""
+import asyncio
+
+import pytest
+
+from app.services.backplane import InMemoryBackplane, InMemoryHub
+from app.services.frame_encoder import decode_message
+from app.services.websocket_manager import ClientConnection, OverflowPolicy, WebSocketManager
+
+ORDER = {"id": "o1", "symbol": "BTC-USDT"}
+
+async def _node(hub: InMemoryHub, backplane=None) -> WebSocketManager:
+    manager = WebSocketManager(heartbeat_interval=0)
+    await manager.start(backplane or InMemoryBackplane(hub))
+    manager.active_connections["c1"] = ClientConnection(None, "c1", 256, OverflowPolicy.COALESCE, lambda *_: None)
+    assert await manager.subscribe_to_orders("c1")
+    manager.send_order_snapshot("c1", None, [])
+    return manager
+
+def _updates(manager: WebSocketManager) -> list:
+    frames = [decode_message(frame.data) for _, frame in manager.active_connections["c1"]._queue]
+    return [frame["order"]["id"] for frame in frames if frame["type"] == "order_update"]
+
+class DownBackplane(InMemoryBackplane):
+    async def publish(self, channel: str, data: bytes):
+        raise ConnectionError("redis unavailable")
+
+@pytest.mark.asyncio
+async def test_order_update_reaches_every_node_once():
+    hub = InMemoryHub()
+    local, remote = await _node(hub), await _node(hub)
+
+    local.notify_order_update("created", ORDER)
+    await asyncio.sleep(0.01)
+
+    assert _updates(local) == ["o1"]
+    assert _updates(remote) == ["o1"]
+
+@pytest.mark.asyncio
+async def test_local_subscribers_get_updates_while_the_backplane_is_down():
+    manager = await _node(InMemoryHub(), DownBackplane())
+
+    manager.notify_order_update("created", ORDER)
+    await asyncio.sleep(0.01)
+
+    assert _updates(manager) == ["o1"]
+    assert not manager._backplane_tasks
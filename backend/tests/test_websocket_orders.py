@@ -0,0 +1,71 @@
+"""Order subscriptions: open-orders snapshot with no updates lost around it"""
+from decimal import Decimal
+
+import pytest
+
+from app.models.bracket_order import BracketOrderCreate, EntryType, OrderSide, OrderStatus, TakeProfitLevel
+from app.services.bracket_order_service import BracketOrderService
+from app.services.frame_encoder import decode_message
+from app.services.websocket_manager import ClientConnection, OverflowPolicy, WebSocketManager
+from app.services.websocket_protocol import WebSocketProtocol
+from app.storage.fill_log import InMemoryFillLog
+from app.storage.memory import InMemoryBracketOrderStore
+
+def _bracket() -> BracketOrderCreate:
+    return BracketOrderCreate(
+        symbol="BTC-USDT",
+        side=OrderSide.BUY,
+        quantity=Decimal("1"),
+        entry_type=EntryType.LIMIT,
+        entry_price=Decimal("45000"),
+        stop_loss_price=Decimal("44000"),
+        take_profit_levels=[TakeProfitLevel(price=Decimal("46000"), quantity=Decimal("1"))],
+    )
+
+class RacingService(BracketOrderService):
+    """Publishes an update while the snapshot is being read"""
+    async def query_bracket_orders(self, *args, **kwargs):
+        result = await super().query_bracket_orders(*args, **kwargs)
+        self.manager.notify_order_update("updated", {"id": "late", "symbol": "BTC-USDT"})
+        return result
+
+def _frames(connection: ClientConnection) -> list:
+    return [decode_message(frame.data) for _, frame in connection._queue]
+
+@pytest.mark.asyncio
+async def test_order_snapshot_holds_open_orders_and_keeps_racing_updates():
+    manager = WebSocketManager()
+    service = RacingService(InMemoryBracketOrderStore(), fill_log=InMemoryFillLog())
+    service.manager = manager
+    connection = ClientConnection(None, "c1", 256, OverflowPolicy.COALESCE, lambda *_: None)
+    manager.active_connections["c1"] = connection
+
+    open_order = await service.create_bracket_order(_bracket())
+    cancelled = await service.create_bracket_order(_bracket())
+    await service.cancel_bracket_order(cancelled.id)
+
+    await WebSocketProtocol(manager, service).handle("c1", {"op": "subscribe_orders", "symbol": "BTC-USDT"})
+
+    snapshot, update = _frames(connection)
+    assert snapshot["type"] == "order_snapshot"
+    assert [order["id"] for order in snapshot["orders"]] == [open_order.id]
+    assert snapshot["orders"][0]["status"] == OrderStatus.PENDING
+    assert snapshot["more"] is False
+    assert (update["type"], update["order"]["id"]) == ("order_update", "late")
+
+class FailingStoreService(BracketOrderService):
+    async def query_bracket_orders(self, *args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+@pytest.mark.asyncio
+async def test_store_failure_answers_with_an_error_frame():
+    manager = WebSocketManager()
+    service = FailingStoreService(InMemoryBracketOrderStore(), fill_log=InMemoryFillLog())
+    connection = ClientConnection(None, "c1", 256, OverflowPolicy.COALESCE, lambda *_: None)
+    manager.active_connections["c1"] = connection
+
+    await WebSocketProtocol(manager, service).handle("c1", {"op": "subscribe_orders"})
+
+    [error] = _frames(connection)
+    assert (error["type"], error["op"]) == ("error", "subscribe_orders")
+    assert "c1" not in manager.order_subscribers